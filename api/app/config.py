@@ -21,11 +21,33 @@ def _build_database_url() -> str:
     # Fallback to local sqlite
     return "sqlite:///./mft.db"
 
+def _build_read_database_url() -> str:
+    # The async read tier queries the Django database; by default the same
+    # server as DATABASE_URL, through an async driver
+    env_url = os.getenv("READ_DATABASE_URL")
+    if env_url:
+        return env_url
+
+    url = _build_database_url()
+    for sync_prefix, async_prefix in (
+        ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        # Local SQLite needs aiosqlite from requirements-dev.txt
+        ("sqlite:///", "sqlite+aiosqlite:///"),
+    ):
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
 class Settings:
     APP_VERSION: str = "2.0.0"
     # Load .env once when settings is instantiated
     _loaded: bool = load_dotenv() or True
     DATABASE_URL: str = _build_database_url()
+    READ_DATABASE_URL: str = _build_read_database_url()
+    READ_POOL_SIZE: int = int(os.getenv("READ_POOL_SIZE", "10"))
+    READ_MAX_OVERFLOW: int = int(os.getenv("READ_MAX_OVERFLOW", "20"))
+    READ_PAGE_SIZE_MAX: int = int(os.getenv("READ_PAGE_SIZE_MAX", "500"))
     STORAGE_DIR: str = os.getenv("STORAGE_DIR", "./storage")
     DEBUG: bool = os.getenv("DEBUG", "true").lower() == "true"
     CORS_ORIGINS: List[str] = ["http://localhost:5173", "http://localhost:5000"]
@@ -0,0 +1,132 @@
+"""
+Explicit mappings of the Django-managed tables read by the async API.
+
+These tables are created and migrated by the Django project (api/sdc); they
+live on their own MetaData so Alembic never tries to manage them. Only the
+columns the read endpoints use are declared. Column names follow the Django
+models (camelCase for fitments), and UUID keys use ``Uuid`` so they match
+Django's storage on both PostgreSQL (uuid) and SQLite (32-char hex).
+"""
+from sqlalchemy import Boolean, Column, DateTime, Integer, MetaData, String, Table, Text, Uuid
+
+django_metadata = MetaData()
+
+
+tenants = Table(
+    "tenants_tenant",
+    django_metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("is_active", Boolean, nullable=False),
+)
+
+fitments = Table(
+    "fitments_fitment",
+    django_metadata,
+    Column("hash", String(64), primary_key=True),
+    Column("tenant_id", Uuid),
+    Column("partId", String(64), nullable=False),
+    Column("itemStatus", String(32), nullable=False),
+    Column("itemStatusCode", Integer, nullable=False),
+    Column("baseVehicleId", String(64), nullable=False),
+    Column("year", Integer, nullable=False),
+    Column("makeName", String(64), nullable=False),
+    Column("modelName", String(64), nullable=False),
+    Column("subModelName", String(64), nullable=False),
+    Column("driveTypeName", String(32), nullable=False),
+    Column("fuelTypeName", String(32), nullable=False),
+    Column("bodyNumDoors", Integer, nullable=False),
+    Column("bodyTypeName", String(64), nullable=False),
+    Column("ptid", String(32), nullable=False),
+    Column("partTypeDescriptor", String(128), nullable=False),
+    Column("uom", String(16), nullable=False),
+    Column("quantity", Integer, nullable=False),
+    Column("fitmentTitle", String(200), nullable=False),
+    Column("fitmentDescription", Text),
+    Column("fitmentNotes", Text),
+    Column("position", String(64), nullable=False),
+    Column("positionId", Integer, nullable=False),
+    Column("liftHeight", String(32), nullable=False),
+    Column("wheelType", String(64), nullable=False),
+    Column("fitmentType", String(50), nullable=False),
+    Column("createdAt", DateTime(timezone=True), nullable=False),
+    Column("createdBy", String(64), nullable=False),
+    Column("updatedAt", DateTime(timezone=True), nullable=False),
+    Column("updatedBy", String(64), nullable=False),
+    Column("isDeleted", Boolean, nullable=False),
+)
+
+
+def _lookup(name: str, key: str, value: str, length: int = 100) -> Table:
+    return Table(
+        name,
+        django_metadata,
+        Column(key, Integer, primary_key=True),
+        Column(value, String(length), nullable=False),
+    )
+
+
+vcdb_year = Table("vcdb_year", django_metadata, Column("year_id", Integer, primary_key=True))
+vcdb_make = _lookup("vcdb_make", "make_id", "make_name")
+vcdb_model = _lookup("vcdb_model", "model_id", "model_name")
+vcdb_submodel = _lookup("vcdb_submodel", "sub_model_id", "sub_model_name")
+vcdb_drivetype = _lookup("vcdb_drivetype", "drive_type_id", "drive_type_name")
+vcdb_fueltype = _lookup("vcdb_fueltype", "fuel_type_id", "fuel_type_name")
+vcdb_bodytype = _lookup("vcdb_bodytype", "body_type_id", "body_type_name")
+vcdb_bodynumdoors = _lookup("vcdb_bodynumdoors", "body_num_doors_id", "body_num_doors", length=10)
+
+vcdb_basevehicle = Table(
+    "vcdb_basevehicle",
+    django_metadata,
+    Column("base_vehicle_id", Integer, primary_key=True),
+    Column("make_id", Integer, nullable=False),
+    Column("model_id", Integer, nullable=False),
+    Column("year_id", Integer, nullable=False),
+)
+
+vcdb_vehicle = Table(
+    "vcdb_vehicle",
+    django_metadata,
+    Column("vehicle_id", Integer, primary_key=True),
+    Column("base_vehicle_id", Integer, nullable=False),
+    Column("sub_model_id", Integer, nullable=False),
+)
+
+vcdb_vehicletodrivetype = Table(
+    "vcdb_vehicletodrivetype",
+    django_metadata,
+    Column("vehicle_to_drive_type_id", Integer, primary_key=True),
+    Column("vehicle_id", Integer, nullable=False),
+    Column("drive_type_id", Integer, nullable=False),
+)
+
+vcdb_bodystyleconfig = Table(
+    "vcdb_bodystyleconfig",
+    django_metadata,
+    Column("body_style_config_id", Integer, primary_key=True),
+    Column("body_num_doors_id", Integer, nullable=False),
+    Column("body_type_id", Integer, nullable=False),
+)
+
+vcdb_vehicletobodystyleconfig = Table(
+    "vcdb_vehicletobodystyleconfig",
+    django_metadata,
+    Column("vehicle_to_body_style_config_id", Integer, primary_key=True),
+    Column("vehicle_id", Integer, nullable=False),
+    Column("body_style_config_id", Integer, nullable=False),
+)
+
+vcdb_engineconfig = Table(
+    "vcdb_engineconfig",
+    django_metadata,
+    Column("engine_config_id", Integer, primary_key=True),
+    Column("fuel_type_id", Integer, nullable=False),
+)
+
+vcdb_vehicletoengineconfig = Table(
+    "vcdb_vehicletotoengineconfig",
+    django_metadata,
+    Column("vehicle_to_engine_config_id", Integer, primary_key=True),
+    Column("vehicle_id", Integer, nullable=False),
+    Column("engine_config_id", Integer, nullable=False),
+)
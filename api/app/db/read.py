@@ -0,0 +1,58 @@
+"""
+Async engine for the read-only API endpoints.
+
+The engine is created on first use from ``settings.READ_DATABASE_URL``
+(asyncpg in production, aiosqlite in tests) and shared by every request;
+each request borrows one pooled connection for the duration of its queries.
+"""
+import uuid
+from typing import AsyncIterator, Optional
+
+from fastapi import Depends, Header, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from ..config import settings
+from .django_schema import tenants
+
+_engine: Optional[AsyncEngine] = None
+
+
+def get_read_engine() -> AsyncEngine:
+    global _engine
+    if _engine is None:
+        options = {"pool_pre_ping": True}
+        if not settings.READ_DATABASE_URL.startswith("sqlite"):
+            options.update(pool_size=settings.READ_POOL_SIZE, max_overflow=settings.READ_MAX_OVERFLOW)
+        _engine = create_async_engine(settings.READ_DATABASE_URL, **options)
+    return _engine
+
+
+async def dispose_read_engine() -> None:
+    global _engine
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+
+
+async def get_read_connection() -> AsyncIterator[AsyncConnection]:
+    async with get_read_engine().connect() as connection:
+        yield connection
+
+
+async def get_tenant_id(
+    x_tenant_id: str = Header(..., alias="X-Tenant-ID"),
+    connection: AsyncConnection = Depends(get_read_connection),
+) -> uuid.UUID:
+    """Active tenant named by the X-Tenant-ID header, as the Django API resolves it"""
+    try:
+        tenant_id = uuid.UUID(x_tenant_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid X-Tenant-ID")
+
+    found = await connection.scalar(
+        select(tenants.c.id).where(tenants.c.id == tenant_id, tenants.c.is_active.is_(True))
+    )
+    if found is None:
+        raise HTTPException(status_code=404, detail="Tenant not found")
+    return tenant_id
@@ -7,6 +7,7 @@ from pathlib import Path
 
 from .routers import diagnostics, vcdb, parts, fitments, potential, admin, tenants
 from .config import settings
+from .db.read import dispose_read_engine
 
 app = FastAPI(
     title="Mass Fitment Tool API",
@@ -23,6 +24,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("shutdown")
+async def close_read_engine():
+    await dispose_read_engine()
+
 # API routes
 app.include_router(diagnostics.router)
 app.include_router(vcdb.router, prefix="/api/vcdb", tags=["VCDB"])
@@ -1,12 +1,121 @@
-from fastapi import APIRouter
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from ..config import settings
+from ..db.django_schema import fitments
+from ..db.read import get_read_connection, get_tenant_id
 
 router = APIRouter()
 
+# Columns a listing can be ordered by; hash breaks ties so the order is total
+SORT_COLUMNS = ("updatedAt", "createdAt", "partId", "year", "makeName", "modelName")
+DATETIME_SORT_COLUMNS = ("updatedAt", "createdAt")
+# Filters applied as case-insensitive substring matches, as in the Django API
+CONTAINS_FILTERS = ("partId", "itemStatus", "makeName", "modelName", "subModelName", "position")
+SEARCH_COLUMNS = ("partId", "makeName", "modelName", "fitmentTitle", "fitmentDescription")
+
+
+def _encode_cursor(sort_by: str, value, fitment_hash: str) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort_by, value, fitment_hash]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def _decode_cursor(cursor: str, sort_by: str):
+    try:
+        cursor_sort, value, fitment_hash = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if cursor_sort != sort_by:
+            raise ValueError("cursor belongs to another sort order")
+        if sort_by in DATETIME_SORT_COLUMNS:
+            value = datetime.fromisoformat(value)
+        return value, fitment_hash
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+
+def _tenant_fitments(tenant_id: uuid.UUID):
+    return [fitments.c.tenant_id == tenant_id, fitments.c.isDeleted.is_(False)]
+
+
 @router.get("/")
-async def get_fitments():
-    """Get fitments list"""
-    # TODO: Implement actual fitments fetching
-    return {"fitments": [], "totalCount": 0}
+async def get_fitments(
+    tenant_id: uuid.UUID = Depends(get_tenant_id),
+    connection: AsyncConnection = Depends(get_read_connection),
+    limit: int = Query(50, ge=1),
+    cursor: Optional[str] = None,
+    sortBy: str = "updatedAt",
+    sortOrder: str = Query("desc", pattern="^(asc|desc)$"),
+    search: Optional[str] = None,
+    partId: Optional[str] = None,
+    itemStatus: Optional[str] = None,
+    makeName: Optional[str] = None,
+    modelName: Optional[str] = None,
+    subModelName: Optional[str] = None,
+    position: Optional[str] = None,
+    fitmentType: Optional[str] = None,
+    yearFrom: Optional[int] = None,
+    yearTo: Optional[int] = None,
+    includeTotal: bool = False,
+):
+    """
+    Get fitments list, keyset-paginated: pass the returned ``nextCursor``
+    back as ``cursor`` for the next page. ``totalCount`` is only computed
+    with ``includeTotal=true``.
+    """
+    if sortBy not in SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"sortBy must be one of {', '.join(SORT_COLUMNS)}")
+    limit = min(limit, settings.READ_PAGE_SIZE_MAX)
+
+    conditions = _tenant_fitments(tenant_id)
+    contains = {"partId": partId, "itemStatus": itemStatus, "makeName": makeName,
+                "modelName": modelName, "subModelName": subModelName, "position": position}
+    for column in CONTAINS_FILTERS:
+        if contains[column]:
+            conditions.append(fitments.c[column].icontains(contains[column], autoescape=True))
+    if search:
+        conditions.append(or_(*(fitments.c[column].icontains(search, autoescape=True) for column in SEARCH_COLUMNS)))
+    if fitmentType:
+        conditions.append(fitments.c.fitmentType == fitmentType)
+    if yearFrom is not None:
+        conditions.append(fitments.c.year >= yearFrom)
+    if yearTo is not None:
+        conditions.append(fitments.c.year <= yearTo)
+
+    total = None
+    if includeTotal:
+        total = await connection.scalar(select(func.count()).select_from(fitments).where(*conditions))
+
+    sort_column = fitments.c[sortBy]
+    descending = sortOrder == "desc"
+    page_conditions = list(conditions)
+    if cursor:
+        value, last_hash = _decode_cursor(cursor, sortBy)
+        key, last = tuple_(sort_column, fitments.c.hash), tuple_(value, last_hash)
+        page_conditions.append(key < last if descending else key > last)
+    order = (sort_column.desc(), fitments.c.hash.desc()) if descending else (sort_column.asc(), fitments.c.hash.asc())
+
+    result = await connection.execute(
+        select(fitments).where(*page_conditions).order_by(*order).limit(limit + 1)
+    )
+    rows = [dict(row) for row in result.mappings()]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(sortBy, rows[-1][sortBy], rows[-1]["hash"])
+
+    response = {"fitments": rows, "nextCursor": next_cursor}
+    if total is not None:
+        response["totalCount"] = total
+    return response
 
 @router.post("/")
 async def create_fitment(fitment_data: dict):
@@ -25,10 +134,49 @@ async def delete_fitments():
     return {"message": "Fitments deleted"}
 
 @router.get("/coverage")
-async def get_coverage():
-    """Get fitment coverage"""
-    # TODO: Implement coverage calculation
-    return []
+async def get_coverage(
+    tenant_id: uuid.UUID = Depends(get_tenant_id),
+    connection: AsyncConnection = Depends(get_read_connection),
+    yearFrom: int = 2010,
+    yearTo: int = 2030,
+    sortBy: str = "make",
+    sortOrder: str = Query("asc", pattern="^(asc|desc)$"),
+):
+    """
+    Get fitment coverage per make: distinct year/make/model configurations
+    with fitments against distinct year/make/model/submodel configurations,
+    computed like the Django coverage endpoint from one DISTINCT query.
+    """
+    result = await connection.execute(
+        select(fitments.c.year, fitments.c.makeName, fitments.c.modelName, fitments.c.subModelName)
+        .where(*_tenant_fitments(tenant_id), fitments.c.year.between(yearFrom, yearTo))
+        .distinct()
+    )
+
+    make_to_total = {}
+    make_to_fitted = {}
+    make_to_models = {}
+    for year, make, model, _ in result:
+        make_to_total[make] = make_to_total.get(make, 0) + 1
+        make_to_fitted.setdefault(make, set()).add((year, model))
+        make_to_models.setdefault(make, set()).add(model)
+
+    rows = []
+    for make, total in make_to_total.items():
+        fitted = len(make_to_fitted[make])
+        rows.append({
+            "make": make,
+            "configsCount": total,
+            "fittedConfigsCount": fitted,
+            "coveragePercent": int(round((fitted / total) * 100)) if total else 0,
+            "models": sorted(make_to_models[make]),
+        })
+
+    def sort_key(row):
+        return row.get(sortBy) if sortBy != "models" else len(row["models"])
+    rows.sort(key=sort_key, reverse=(sortOrder == "desc"))
+
+    return {"items": rows, "totalCount": len(rows), "tenant_id": str(tenant_id)}
 
 @router.get("/property/{property_name}")
 async def get_fitment_property(property_name: str):
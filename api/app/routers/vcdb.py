@@ -1,96 +1,160 @@
-from fastapi import APIRouter
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from ..config import settings
+from ..db.django_schema import (
+    vcdb_basevehicle, vcdb_bodynumdoors, vcdb_bodystyleconfig, vcdb_bodytype, vcdb_drivetype,
+    vcdb_engineconfig, vcdb_fueltype, vcdb_make, vcdb_model, vcdb_submodel, vcdb_vehicle,
+    vcdb_vehicletobodystyleconfig, vcdb_vehicletodrivetype, vcdb_vehicletoengineconfig,
+)
+from ..db.read import get_read_connection
 
 router = APIRouter()
 
+# Same property names as the Django VCDB property endpoint
+PROPERTY_COLUMNS = {
+    "make": vcdb_make.c.make_name,
+    "model": vcdb_model.c.model_name,
+    "year": vcdb_basevehicle.c.year_id,
+    "submodel": vcdb_submodel.c.sub_model_name,
+    "drive_type": vcdb_drivetype.c.drive_type_name,
+    "fuel_type": vcdb_fueltype.c.fuel_type_name,
+    "body_type": vcdb_bodytype.c.body_type_name,
+    "num_doors": vcdb_bodynumdoors.c.body_num_doors,
+}
+
 @router.get("/version")
 async def get_version():
     """Get VCDB dataset version"""
     return "2024.1"
 
 @router.get("/year-range")
-async def get_year_range():
+async def get_year_range(connection: AsyncConnection = Depends(get_read_connection)):
     """Get min/max years available"""
-    return {"minYear": 2010, "maxYear": 2025}
+    min_year, max_year = (await connection.execute(
+        select(func.min(vcdb_basevehicle.c.year_id), func.max(vcdb_basevehicle.c.year_id))
+    )).one()
+    if min_year is None:
+        # No VCDB data loaded yet
+        return {"minYear": 2010, "maxYear": 2025}
+    return {"minYear": min_year, "maxYear": max_year}
 
 @router.get("/property/{property_name}")
-async def get_property(property_name: str):
+async def get_property(property_name: str, connection: AsyncConnection = Depends(get_read_connection)):
     """Get VCDB property values"""
-    # TODO: Implement actual property filtering
-    return []
+    column = PROPERTY_COLUMNS.get(property_name)
+    if column is None:
+        raise HTTPException(status_code=400, detail=f"Unknown property: {property_name}")
+    result = await connection.execute(select(column).distinct().order_by(column))
+    return list(result.scalars())
 
 @router.get("/configurations")
-async def get_configurations():
-    """Get vehicle configurations"""
-    # Sample configurations for demo
-    sample_configs = [
-        {
-            "id": "cfg-1001",
-            "vehicleId": "VH-2025-ACURA-ADX",
-            "baseVehicleId": "BV-2025-ACURA-ADX",
-            "year": 2025,
-            "make": "Acura", 
-            "model": "ADX",
-            "submodel": "Advance",
-            "driveType": "AWD",
-            "fuelType": "Gas",
-            "numDoors": 4,
-            "bodyType": "Crossover"
-        },
-        {
-            "id": "cfg-1002", 
-            "vehicleId": "VH-2024-ACURA-ADX",
-            "baseVehicleId": "BV-2024-ACURA-ADX",
-            "year": 2024,
-            "make": "Acura",
-            "model": "ADX", 
-            "submodel": "Advance",
-            "driveType": "AWD",
-            "fuelType": "Gas",
-            "numDoors": 4,
-            "bodyType": "Crossover"
-        },
-        {
-            "id": "cfg-1003",
-            "vehicleId": "VH-2024-TOYOTA-RAV4",
-            "baseVehicleId": "BV-2024-TOYOTA-RAV4",
-            "year": 2024,
-            "make": "Toyota",
-            "model": "RAV4",
-            "submodel": "XLE", 
-            "driveType": "AWD",
-            "fuelType": "Gas",
-            "numDoors": 4,
-            "bodyType": "Crossover"
-        },
-        {
-            "id": "cfg-1004",
-            "vehicleId": "VH-2023-FORD-F150",
-            "baseVehicleId": "BV-2023-FORD-F150",
-            "year": 2023,
-            "make": "Ford",
-            "model": "F-150",
-            "submodel": "XLT",
-            "driveType": "4WD", 
-            "fuelType": "Gas",
-            "numDoors": 4,
-            "bodyType": "Truck"
-        },
+async def get_configurations(
+    connection: AsyncConnection = Depends(get_read_connection),
+    yearFrom: Optional[int] = None,
+    yearTo: Optional[int] = None,
+    make: Optional[str] = None,
+    model: Optional[str] = None,
+    limit: int = Query(100, ge=1),
+    cursor: Optional[int] = None,
+):
+    """
+    Get vehicle configurations, one per VCDB vehicle, ordered by vehicle ID.
+    Pass the returned ``nextCursor`` back as ``cursor`` for the next page.
+    Vehicles with several drive types, engines or body styles report the
+    first of each by name.
+    """
+    limit = min(limit, settings.READ_PAGE_SIZE_MAX)
+    vehicle = vcdb_vehicle.c.vehicle_id
+
+    drive_type = (
+        select(func.min(vcdb_drivetype.c.drive_type_name))
+        .join(vcdb_vehicletodrivetype, vcdb_vehicletodrivetype.c.drive_type_id == vcdb_drivetype.c.drive_type_id)
+        .where(vcdb_vehicletodrivetype.c.vehicle_id == vehicle)
+        .scalar_subquery()
+    )
+    fuel_type = (
+        select(func.min(vcdb_fueltype.c.fuel_type_name))
+        .join(vcdb_engineconfig, vcdb_engineconfig.c.fuel_type_id == vcdb_fueltype.c.fuel_type_id)
+        .join(vcdb_vehicletoengineconfig,
+              vcdb_vehicletoengineconfig.c.engine_config_id == vcdb_engineconfig.c.engine_config_id)
+        .where(vcdb_vehicletoengineconfig.c.vehicle_id == vehicle)
+        .scalar_subquery()
+    )
+    body_style = (
+        vcdb_bodystyleconfig
+        .join(vcdb_vehicletobodystyleconfig,
+              vcdb_vehicletobodystyleconfig.c.body_style_config_id == vcdb_bodystyleconfig.c.body_style_config_id)
+    )
+    body_type = (
+        select(func.min(vcdb_bodytype.c.body_type_name))
+        .select_from(body_style.join(vcdb_bodytype, vcdb_bodytype.c.body_type_id == vcdb_bodystyleconfig.c.body_type_id))
+        .where(vcdb_vehicletobodystyleconfig.c.vehicle_id == vehicle)
+        .scalar_subquery()
+    )
+    num_doors = (
+        select(func.min(vcdb_bodynumdoors.c.body_num_doors))
+        .select_from(body_style.join(
+            vcdb_bodynumdoors, vcdb_bodynumdoors.c.body_num_doors_id == vcdb_bodystyleconfig.c.body_num_doors_id
+        ))
+        .where(vcdb_vehicletobodystyleconfig.c.vehicle_id == vehicle)
+        .scalar_subquery()
+    )
+
+    query = (
+        select(
+            vehicle,
+            vcdb_basevehicle.c.base_vehicle_id,
+            vcdb_basevehicle.c.year_id,
+            vcdb_make.c.make_name,
+            vcdb_model.c.model_name,
+            vcdb_submodel.c.sub_model_name,
+            drive_type.label("drive_type"),
+            fuel_type.label("fuel_type"),
+            num_doors.label("num_doors"),
+            body_type.label("body_type"),
+        )
+        .join(vcdb_basevehicle, vcdb_basevehicle.c.base_vehicle_id == vcdb_vehicle.c.base_vehicle_id)
+        .join(vcdb_make, vcdb_make.c.make_id == vcdb_basevehicle.c.make_id)
+        .join(vcdb_model, vcdb_model.c.model_id == vcdb_basevehicle.c.model_id)
+        .join(vcdb_submodel, vcdb_submodel.c.sub_model_id == vcdb_vehicle.c.sub_model_id)
+        .order_by(vehicle)
+        .limit(limit + 1)
+    )
+    if yearFrom is not None:
+        query = query.where(vcdb_basevehicle.c.year_id >= yearFrom)
+    if yearTo is not None:
+        query = query.where(vcdb_basevehicle.c.year_id <= yearTo)
+    if make:
+        query = query.where(func.lower(vcdb_make.c.make_name) == make.lower())
+    if model:
+        query = query.where(func.lower(vcdb_model.c.model_name) == model.lower())
+    if cursor is not None:
+        query = query.where(vehicle > cursor)
+
+    rows = (await connection.execute(query)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].vehicle_id
+
+    configurations = [
         {
-            "id": "cfg-1005",
-            "vehicleId": "VH-2023-HONDA-CIVIC",
-            "baseVehicleId": "BV-2023-HONDA-CIVIC", 
-            "year": 2023,
-            "make": "Honda",
-            "model": "Civic",
-            "submodel": "Si",
-            "driveType": "FWD",
-            "fuelType": "Gas", 
-            "numDoors": 4,
-            "bodyType": "Sedan"
+            "id": f"cfg-{row.vehicle_id}",
+            "vehicleId": str(row.vehicle_id),
+            "baseVehicleId": str(row.base_vehicle_id),
+            "year": row.year_id,
+            "make": row.make_name,
+            "model": row.model_name,
+            "submodel": row.sub_model_name,
+            "driveType": row.drive_type,
+            "fuelType": row.fuel_type,
+            "numDoors": int(row.num_doors) if row.num_doors and row.num_doors.isdigit() else row.num_doors,
+            "bodyType": row.body_type,
         }
+        for row in rows
     ]
-    
-    return {
-        "configurations": sample_configs,
-        "totalCount": len(sample_configs)
-    }
\ No newline at end of file
+    return {"configurations": configurations, "nextCursor": next_cursor}
@@ -0,0 +1,128 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app.config import settings
+from app.db import django_schema as schema
+from app.main import app
+
+
+@pytest.fixture()
+def tenant_id(tmp_path, monkeypatch):
+    """A Django-shaped SQLite database with one tenant's fitments and a small VCDB"""
+    path = tmp_path / "django.db"
+    engine = create_engine(f"sqlite:///{path}")
+    schema.django_metadata.create_all(engine)
+
+    tenant, other = uuid.uuid4(), uuid.uuid4()
+    now = datetime(2025, 1, 1)
+    base = dict(
+        itemStatus="Active", itemStatusCode=0, baseVehicleId="1", subModelName="Base", driveTypeName="FWD",
+        fuelTypeName="Gas", bodyNumDoors=4, bodyTypeName="Sedan", ptid="P1", partTypeDescriptor="Pad", uom="EA",
+        quantity=1, fitmentTitle="t", position="Front", positionId=1, liftHeight="Stock", wheelType="Alloy",
+        fitmentType="manual_fitment", createdAt=now, createdBy="test", updatedBy="test", isDeleted=False,
+    )
+    rows = [
+        dict(base, hash=f"h{i:02d}", tenant_id=tenant, partId=f"P{i:02d}", year=2020 + i % 3,
+             makeName="Acura" if i % 2 else "Honda", modelName="ILX", updatedAt=now + timedelta(minutes=i // 2))
+        for i in range(7)
+    ]
+    rows.append(dict(base, hash="deleted", tenant_id=tenant, partId="PX", year=2021, makeName="Acura",
+                     modelName="ILX", updatedAt=now, isDeleted=True))
+    rows.append(dict(base, hash="foreign", tenant_id=other, partId="PF", year=2021, makeName="Acura",
+                     modelName="ILX", updatedAt=now))
+
+    with engine.begin() as connection:
+        connection.execute(schema.tenants.insert(), [
+            {"id": tenant, "name": "Read Tenant", "is_active": True},
+            {"id": other, "name": "Other", "is_active": True},
+        ])
+        connection.execute(schema.fitments.insert(), rows)
+        connection.execute(schema.vcdb_make.insert(), [{"make_id": 1, "make_name": "Acura"}])
+        connection.execute(schema.vcdb_model.insert(), [{"model_id": 1, "model_name": "ILX"}])
+        connection.execute(schema.vcdb_submodel.insert(), [{"sub_model_id": 1, "sub_model_name": "Base"}])
+        connection.execute(schema.vcdb_basevehicle.insert(), [
+            {"base_vehicle_id": 10 + year, "make_id": 1, "model_id": 1, "year_id": 2018 + year} for year in range(3)
+        ])
+        connection.execute(schema.vcdb_vehicle.insert(), [
+            {"vehicle_id": 100 + year, "base_vehicle_id": 10 + year, "sub_model_id": 1} for year in range(3)
+        ])
+        connection.execute(schema.vcdb_drivetype.insert(), [
+            {"drive_type_id": 1, "drive_type_name": "FWD"}, {"drive_type_id": 2, "drive_type_name": "AWD"},
+        ])
+        connection.execute(schema.vcdb_vehicletodrivetype.insert(), [
+            {"vehicle_to_drive_type_id": 1, "vehicle_id": 100, "drive_type_id": 1},
+            {"vehicle_to_drive_type_id": 2, "vehicle_id": 100, "drive_type_id": 2},
+        ])
+        connection.execute(schema.vcdb_bodytype.insert(), [{"body_type_id": 1, "body_type_name": "Sedan"}])
+        connection.execute(schema.vcdb_bodynumdoors.insert(), [{"body_num_doors_id": 1, "body_num_doors": "4"}])
+        connection.execute(schema.vcdb_bodystyleconfig.insert(), [
+            {"body_style_config_id": 1, "body_num_doors_id": 1, "body_type_id": 1},
+        ])
+        connection.execute(schema.vcdb_vehicletobodystyleconfig.insert(), [
+            {"vehicle_to_body_style_config_id": 1, "vehicle_id": 100, "body_style_config_id": 1},
+        ])
+    engine.dispose()
+
+    monkeypatch.setattr(settings, "READ_DATABASE_URL", f"sqlite+aiosqlite:///{path}")
+    yield tenant
+
+
+@pytest.fixture()
+def client(tenant_id):
+    with TestClient(app) as test_client:
+        test_client.headers["X-Tenant-ID"] = str(tenant_id)
+        yield test_client
+
+
+def test_fitments_keyset_pages_cover_the_tenant_once(client):
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3, "sortBy": "updatedAt"}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/api/fitments/", params=params).json()
+        seen.extend(fitment["hash"] for fitment in page["fitments"])
+        cursor = page["nextCursor"]
+        if not cursor:
+            break
+
+    # Newest first; ties on updatedAt are broken by hash
+    assert seen == ["h06", "h05", "h04", "h03", "h02", "h01", "h00"]
+
+
+def test_fitment_filters_and_total(client):
+    page = client.get("/api/fitments/", params={"makeName": "acu", "includeTotal": "true"}).json()
+
+    assert page["totalCount"] == 3
+    assert {fitment["partId"] for fitment in page["fitments"]} == {"P01", "P03", "P05"}
+
+
+def test_tenant_header_is_required_and_checked(client):
+    assert client.get("/api/fitments/", headers={"X-Tenant-ID": "nope"}).status_code == 400
+    assert client.get("/api/fitments/", headers={"X-Tenant-ID": str(uuid.uuid4())}).status_code == 404
+
+
+def test_coverage(client):
+    items = client.get("/api/fitments/coverage").json()["items"]
+
+    assert [(item["make"], item["configsCount"], item["fittedConfigsCount"]) for item in items] == [
+        ("Acura", 3, 3), ("Honda", 3, 3),
+    ]
+
+
+def test_vcdb_lookups(client):
+    assert client.get("/api/vcdb/year-range").json() == {"minYear": 2018, "maxYear": 2020}
+    assert client.get("/api/vcdb/property/drive_type").json() == ["AWD", "FWD"]
+    assert client.get("/api/vcdb/property/colour").status_code == 400
+
+    page = client.get("/api/vcdb/configurations", params={"limit": 2, "make": "acura"}).json()
+    assert [config["year"] for config in page["configurations"]] == [2018, 2019]
+    assert page["configurations"][0]["driveType"] == "AWD"
+    assert page["configurations"][0]["numDoors"] == 4
+    rest = client.get("/api/vcdb/configurations", params={"cursor": page["nextCursor"]}).json()
+    assert [config["vehicleId"] for config in rest["configurations"]] == ["102"]
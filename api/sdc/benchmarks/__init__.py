@@ -0,0 +1,9 @@
+"""
+Performance benchmarks for upload parsing, the upload workflow stages,
+manual fitment jobs and the fitments endpoints.
+
+Fixtures bundled with the repo (sample CSV/JSON files and the Challenge
+workbooks) are scaled to the requested sizes, every run uses its own local
+database, and results are written as JSON so runs can be compared over time.
+See ``benchmarks/run.py`` for usage.
+"""
@@ -0,0 +1,50 @@
+"""Fitments list, coverage and export endpoints over a seeded fitments table"""
+from .fixtures import api_client, create_tenant, seed_fitments
+from .harness import benchmark
+
+
+def _client(rows):
+    tenant = create_tenant()
+    seed_fitments(tenant, rows)
+    return api_client(tenant)
+
+
+def _get(client, path, params=None):
+    response = client.get(path, params or {})
+    if response.status_code >= 400:
+        raise RuntimeError(f"GET {path} returned {response.status_code}")
+    if response.streaming:
+        # Streaming exports do their work while the body is consumed
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+@benchmark('fitments.list')
+def fitments_list(rows):
+    client = _client(rows)
+    return lambda: _get(client, '/api/fitments/', {'page': 1, 'pageSize': 50, 'sortBy': 'partId'})
+
+
+@benchmark('fitments.list_last_page')
+def fitments_list_last_page(rows):
+    client = _client(rows)
+    return lambda: _get(client, '/api/fitments/', {'page': max(rows // 50, 1), 'pageSize': 50, 'sortBy': 'partId'})
+
+
+@benchmark('fitments.list_search')
+def fitments_list_search(rows):
+    client = _client(rows)
+    return lambda: _get(client, '/api/fitments/', {'search': 'Brake', 'page': 1, 'pageSize': 50})
+
+
+@benchmark('fitments.coverage')
+def fitments_coverage(rows):
+    client = _client(rows)
+    return lambda: _get(client, '/api/fitments/coverage', {'yearFrom': 1990, 'yearTo': 2030})
+
+
+@benchmark('fitments.export_csv')
+def fitments_export_csv(rows):
+    client = _client(rows)
+    return lambda: _get(client, '/api/fitments/export')
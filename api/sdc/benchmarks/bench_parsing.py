@@ -0,0 +1,67 @@
+"""Upload parsing, validation and row processing in data_uploads.utils"""
+import os
+import uuid
+
+from data_uploads.utils import DataProcessor, FileParser, ProductValidator, VCDBValidator
+
+from .datasets import materialize, scaled_fixture
+from .fixtures import create_tenant
+from .harness import benchmark
+
+ROW_AT_A_TIME_MAX_ROWS = 100_000
+WORKBOOK_MAX_ROWS = 100_000
+
+
+def _parse(name, rows, fmt):
+    path = materialize(name, rows, fmt)
+    filename = os.path.basename(path)
+    return lambda: FileParser.parse_file(path, filename)
+
+
+@benchmark('parse_file.fitments_csv')
+def parse_fitments_csv(rows):
+    return _parse('fitments', rows, 'csv')
+
+
+@benchmark('parse_file.products_json')
+def parse_products_json(rows):
+    return _parse('products_json', rows, 'json')
+
+
+@benchmark('parse_file.challenge1_xlsx', max_rows=WORKBOOK_MAX_ROWS)
+def parse_challenge1_xlsx(rows):
+    return _parse('challenge1', rows, 'xlsx')
+
+
+@benchmark('parse_file.challenge3_xlsx', max_rows=WORKBOOK_MAX_ROWS)
+def parse_challenge3_xlsx(rows):
+    return _parse('challenge3', rows, 'xlsx')
+
+
+@benchmark('vcdb_validator.validate_data')
+def vcdb_validate_data(rows):
+    df = scaled_fixture('vcdb', rows)
+    return lambda: VCDBValidator.validate_data(df)
+
+
+@benchmark('product_validator.validate_data')
+def product_validate_data(rows):
+    df = scaled_fixture('products', rows)
+    return lambda: ProductValidator.validate_data(df)
+
+
+@benchmark('data_processor.process_vcdb_data', max_rows=ROW_AT_A_TIME_MAX_ROWS, repeat=1, rollback=True)
+def process_vcdb_data(rows):
+    df = VCDBValidator.normalize_dataframe(scaled_fixture('vcdb', rows))
+    tenant = create_tenant()
+    session_id = str(uuid.uuid4())
+    return lambda: DataProcessor.process_vcdb_data(df, session_id, tenant=tenant)
+
+
+@benchmark('data_processor.process_product_data', max_rows=ROW_AT_A_TIME_MAX_ROWS, repeat=1, rollback=True)
+def process_product_data(rows):
+    # The fixture's "Part Number" header is not one the validator maps to id
+    df = ProductValidator.normalize_dataframe(scaled_fixture('products', rows).rename(columns={'Part Number': 'id'}))
+    tenant = create_tenant()
+    session_id = str(uuid.uuid4())
+    return lambda: DataProcessor.process_product_data(df, session_id, tenant=tenant, source_filename='bench.csv')
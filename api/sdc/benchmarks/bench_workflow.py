@@ -0,0 +1,61 @@
+"""Upload workflow stages (transform, VCDB validate, publish) and manual fitment jobs"""
+from products.models import ProductData
+from vcdb_categories.models import FitmentJob
+from vcdb_categories.tasks import process_manual_fitments
+
+from .datasets import materialize
+from .fixtures import api_client, create_tenant, create_upload, seed_products, seed_vcdb_category
+from .harness import SkipBenchmark, benchmark
+
+WORKFLOW_MAX_ROWS = 100_000
+# Manual fitment jobs cross every product with every vehicle; sizes count
+# product x vehicle pairs
+MANUAL_FITMENT_VEHICLES = 40
+MANUAL_FITMENT_MAX_ROWS = 100_000
+
+
+def _upload(rows):
+    tenant = create_tenant()
+    upload = create_upload(tenant, materialize('fitments', rows, 'csv'))
+    return api_client(tenant), upload
+
+
+def _post(client, upload, stage):
+    response = client.post(f"/api/uploads/{upload.id}/{stage}", format='json')
+    if response.status_code >= 400:
+        raise RuntimeError(f"{stage} returned {response.status_code}: {getattr(response, 'data', '')}")
+    return response
+
+
+@benchmark('workflow.transform', max_rows=WORKFLOW_MAX_ROWS)
+def workflow_transform(rows):
+    client, upload = _upload(rows)
+    return lambda: _post(client, upload, 'transform')
+
+
+@benchmark('workflow.vcdb_validate', max_rows=WORKFLOW_MAX_ROWS)
+def workflow_vcdb_validate(rows):
+    client, upload = _upload(rows)
+    _post(client, upload, 'transform')
+    return lambda: _post(client, upload, 'vcdb-validate')
+
+
+@benchmark('workflow.publish', max_rows=WORKFLOW_MAX_ROWS, repeat=1, rollback=True)
+def workflow_publish(rows):
+    client, upload = _upload(rows)
+    _post(client, upload, 'transform')
+    _post(client, upload, 'vcdb-validate')
+    return lambda: _post(client, upload, 'publish')
+
+
+@benchmark('vcdb_categories.process_manual_fitments', max_rows=MANUAL_FITMENT_MAX_ROWS, repeat=1, rollback=True)
+def manual_fitments(rows):
+    products = rows // MANUAL_FITMENT_VEHICLES
+    if not products:
+        raise SkipBenchmark(f"needs at least {MANUAL_FITMENT_VEHICLES} rows")
+    tenant = create_tenant()
+    seed_products(tenant, products)
+    category = seed_vcdb_category(MANUAL_FITMENT_VEHICLES)
+    job = FitmentJob.objects.create(tenant=tenant, job_type='manual', vcdb_categories=[str(category.id)])
+    product_data = ProductData.objects.filter(tenant=tenant).order_by('pk')
+    return lambda: process_manual_fitments(job, [category], product_data)
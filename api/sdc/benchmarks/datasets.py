@@ -0,0 +1,150 @@
+"""
+Benchmark datasets: the sample files and Challenge workbooks bundled with
+the repo, scaled to a target row count.
+
+Rows are tiled deterministically. Copies after the first get a ``-<copy>``
+suffix on their identifier columns and, where the fixture has a year column,
+a seeded year shift, so duplicate detection and indexes see realistic
+cardinality instead of the same 20 rows over and over. Scaled files are
+written once under ``benchmarks/.data`` and reused by later runs.
+"""
+import glob
+import json
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from workflow.workbook import detect_layout, workbook_rows
+
+SDC_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = os.path.dirname(os.path.dirname(SDC_ROOT))
+DATA_DIR = os.getenv('BENCH_DATA_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), '.data')
+
+DEFAULT_SEED = 20240101
+MIN_YEAR = 1990
+MAX_YEAR = 2030
+YEAR_JITTER = 5
+
+
+@dataclass(frozen=True)
+class Fixture:
+    """A bundled dataset and the columns that make its rows distinct"""
+    name: str
+    path: str
+    id_columns: List[str] = field(default_factory=list)
+    year_column: Optional[str] = None
+
+
+FIXTURES = {
+    'fitments': Fixture('fitments', os.path.join(REPO_ROOT, 'sample_fitments.csv'), ['PartID'], 'YearID'),
+    'products': Fixture('products', os.path.join(REPO_ROOT, 'sample_products_comprehensive.csv'), ['Part Number']),
+    'products_json': Fixture('products_json', os.path.join(REPO_ROOT, 'sample_products_*.json'), ['Part Number']),
+    'vcdb': Fixture('vcdb', os.path.join(REPO_ROOT, 'sample_data', 'vcdb_sample.csv'), ['id'], 'year'),
+    'challenge1': Fixture('challenge1', os.path.join(SDC_ROOT, 'Challenge 1 - Original Data + AI Processed Transmission Codes.xlsx')),
+    'challenge2': Fixture('challenge2', os.path.join(SDC_ROOT, 'Challenge 2 - Original Data.xlsx')),
+    'challenge3': Fixture('challenge3', os.path.join(SDC_ROOT, 'Challenge 3 - Original Data.xlsx')),
+}
+
+
+def load_fixture(name: str) -> pd.DataFrame:
+    """The unscaled fixture as a DataFrame (workbooks from their header row)"""
+    fixture = FIXTURES[name]
+    if fixture.path.endswith('.json'):
+        records = []
+        for path in sorted(glob.glob(fixture.path)):
+            with open(path) as fh:
+                records.extend(json.load(fh))
+        return pd.DataFrame(records)
+    if fixture.path.endswith('.xlsx'):
+        rows = workbook_rows(fixture.path)
+        layout = detect_layout(rows)
+        header, data = rows[layout.header_row], rows[layout.header_row + 1:]
+        return pd.DataFrame(data, columns=[str(value) for value in header])
+    return pd.read_csv(fixture.path, dtype=str, keep_default_na=False)
+
+
+def _identifier_columns(fixture: Fixture, frame: pd.DataFrame) -> List[str]:
+    if fixture.id_columns:
+        return [col for col in fixture.id_columns if col in frame.columns]
+    # Workbooks: the first part/SKU-like column identifies a row
+    for col in frame.columns:
+        lowered = str(col).lower()
+        if 'part' in lowered or 'sku' in lowered:
+            return [col]
+    return [frame.columns[0]] if len(frame.columns) else []
+
+
+def scale_frame(frame: pd.DataFrame, rows: int, id_columns: List[str], year_column: Optional[str] = None,
+                seed: int = DEFAULT_SEED) -> pd.DataFrame:
+    """Tile ``frame`` to exactly ``rows`` rows with distinct identifiers"""
+    if frame.empty:
+        raise ValueError("Cannot scale an empty fixture")
+    copies = -(-rows // len(frame))
+    out = pd.concat([frame] * copies, ignore_index=True).iloc[:rows].copy()
+    copy_no = np.arange(rows) // len(frame)
+    suffix = pd.Series(np.where(copy_no > 0, np.char.add('-', copy_no.astype(str)), ''), index=out.index)
+
+    for col in id_columns:
+        out[col] = out[col].astype(str) + suffix
+
+    if year_column and year_column in out.columns:
+        rng = np.random.default_rng(seed)
+        years = pd.to_numeric(out[year_column], errors='coerce')
+        shift = np.where(copy_no > 0, rng.integers(-YEAR_JITTER, YEAR_JITTER + 1, size=rows), 0)
+        shifted = (years + shift).clip(MIN_YEAR, MAX_YEAR)
+        out[year_column] = shifted.astype('Int64').astype(str).where(years.notna(), '')
+
+    return out
+
+
+def scaled_fixture(name: str, rows: int, seed: int = DEFAULT_SEED) -> pd.DataFrame:
+    fixture = FIXTURES[name]
+    frame = load_fixture(name)
+    return scale_frame(frame, rows, _identifier_columns(fixture, frame), fixture.year_column, seed)
+
+
+def _write_workbook(fixture: Fixture, frame: pd.DataFrame, path: str) -> None:
+    from openpyxl import Workbook
+
+    # Keep the rows above the header (Challenge 2's FRONT/REAR block) so the
+    # scaled file goes through the same layout detection as the original
+    source_rows = workbook_rows(fixture.path)
+    layout = detect_layout(source_rows)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    for row in source_rows[:layout.header_row + 1]:
+        ws.append(row)
+    for row in frame.itertuples(index=False, name=None):
+        ws.append(list(row))
+    wb.save(path)
+
+
+def materialize(name: str, rows: int, fmt: Optional[str] = None, seed: int = DEFAULT_SEED) -> str:
+    """
+    Path of the fixture scaled to ``rows`` rows in ``fmt`` (csv, json or
+    xlsx; defaults to the fixture's own format). Files are cached by fixture,
+    size, format and seed.
+    """
+    fixture = FIXTURES[name]
+    fmt = fmt or os.path.splitext(fixture.path)[1].lstrip('.')
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"{name}-{rows}-s{seed}.{fmt}")
+    if os.path.exists(path):
+        return path
+
+    frame = scaled_fixture(name, rows, seed)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if fmt == 'csv':
+        frame.to_csv(tmp_path, index=False)
+    elif fmt == 'json':
+        frame.to_json(tmp_path, orient='records')
+    elif fmt == 'xlsx':
+        _write_workbook(fixture, frame, tmp_path)
+    else:
+        raise ValueError(f"Unsupported benchmark dataset format: {fmt}")
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,151 @@
+"""Database fixtures for benchmarks: tenants, uploads, fitments, products and VCDB rows"""
+import hashlib
+import os
+import uuid
+
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from fitments.models import Fitment
+from products.models import ProductConfiguration, ProductData
+from tenants.models import Tenant
+from vcdb_categories.models import VCDBCategory, VCDBData
+from workflow.models import Upload
+from workflow.utils import preflight_path
+from workflow.views import _fallback_column_mapping, get_or_create_upload_job
+
+from .datasets import scaled_fixture
+
+BULK_CREATE_BATCH_SIZE = 5000
+
+
+def _file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def create_tenant(name=None):
+    name = name or f"bench-{uuid.uuid4().hex[:12]}"
+    return Tenant.objects.create(name=name, slug=name, is_active=True)
+
+
+def api_client(tenant):
+    """An authenticated client whose requests carry the tenant header"""
+    user = User.objects.create_user(username=f"bench-{uuid.uuid4().hex[:12]}")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    client.credentials(HTTP_X_TENANT_ID=str(tenant.id))
+    return client
+
+
+def create_upload(tenant, path, data_type='fitments'):
+    """An upload of ``path`` with its preflight report and fallback column mappings"""
+    filename = os.path.basename(path)
+    report = preflight_path(path, filename, _file_checksum(path))
+    report['dataType'] = data_type
+    upload = Upload.objects.create(
+        tenant=tenant,
+        filename=filename,
+        content_type=report.get('mime', ''),
+        storage_url=path,
+        file_size_bytes=os.path.getsize(path),
+        status='received',
+        checksum=report.get('checksum'),
+        file_format=report.get('fileFormat'),
+        preflight_report=report,
+    )
+    job = get_or_create_upload_job(upload, data_type)
+    job.result = {'columnMappings': _fallback_column_mapping(report.get('headers', []), data_type)}
+    job.status = 'mapped'
+    job.save()
+    return upload
+
+
+# sample_fitments.csv column -> Fitment field
+SAMPLE_FITMENT_FIELDS = {
+    'PartID': 'partId',
+    'MakeName': 'makeName',
+    'ModelName': 'modelName',
+    'SubModelName': 'subModelName',
+    'DriveTypeName': 'driveTypeName',
+    'FuelTypeName': 'fuelTypeName',
+    'BodyTypeName': 'bodyTypeName',
+    'PTID': 'ptid',
+    'FitmentTitle': 'fitmentTitle',
+    'FitmentDescription': 'fitmentDescription',
+    'FitmentNotes': 'fitmentNotes',
+    'Position': 'position',
+    'LiftHeight': 'liftHeight',
+    'UOM': 'uom',
+    'WheelType': 'wheelType',
+}
+
+
+def seed_fitments(tenant, rows):
+    """Insert ``rows`` fitments built from the scaled sample fitments"""
+    records = scaled_fixture('fitments', rows).to_dict('records')
+    for start in range(0, len(records), BULK_CREATE_BATCH_SIZE):
+        Fitment.objects.bulk_create(
+            [
+                Fitment(
+                    hash=uuid.uuid4().hex,
+                    tenant=tenant,
+                    baseVehicleId=f"{record['YearID']}-{record['MakeName']}-{record['ModelName']}",
+                    year=int(record['YearID']),
+                    bodyNumDoors=int(record['BodyNumDoors'] or 0),
+                    quantity=int(record['Quantity'] or 1),
+                    partTypeDescriptor=record['FitmentTitle'],
+                    positionId=1,
+                    **{target: record[source] for source, target in SAMPLE_FITMENT_FIELDS.items()},
+                )
+                for record in records[start:start + BULK_CREATE_BATCH_SIZE]
+            ]
+        )
+    return len(records)
+
+
+def seed_products(tenant, rows):
+    """Insert ``rows`` products built from the scaled sample products"""
+    configuration = ProductConfiguration.objects.create(tenant=tenant)
+    frame = scaled_fixture('products', rows)
+    products = [
+        ProductData(
+            tenant=tenant,
+            configuration=configuration,
+            part_number=part_number,
+            part_terminology_name=terminology,
+            ptid=ptid,
+        )
+        for part_number, terminology, ptid in zip(frame['Part Number'], frame['Part Terminology Name'], frame['PTID'])
+    ]
+    ProductData.objects.bulk_create(products, batch_size=BULK_CREATE_BATCH_SIZE)
+    return ProductData.objects.filter(tenant=tenant)
+
+
+def seed_vcdb_category(rows):
+    """A VCDB category holding ``rows`` vehicles built from the scaled VCDB sample"""
+    category = VCDBCategory.objects.create(name=f"bench-{uuid.uuid4().hex[:12]}", filename='vcdb_sample.csv',
+                                           is_valid=True, is_active=True)
+    frame = scaled_fixture('vcdb', rows)
+    VCDBData.objects.bulk_create(
+        [
+            VCDBData(
+                category=category,
+                year=int(record['year']),
+                make=record['make'],
+                model=record['model'],
+                submodel=record['submodel'],
+                drive_type=record['driveType'],
+                fuel_type=record['fuelType'],
+                num_doors=int(record['numDoors']) if record['numDoors'] else None,
+                body_type=record['bodyType'],
+                transmission=record['transmission'],
+            )
+            for record in frame.to_dict('records')
+        ],
+        batch_size=BULK_CREATE_BATCH_SIZE,
+    )
+    return category
@@ -0,0 +1,224 @@
+"""
+Benchmark registry, timing loop and JSON results.
+
+A benchmark is a function decorated with ``@benchmark`` that takes a row
+count, does its (untimed) setup and returns the zero-argument callable to
+time. The database is flushed before every setup, so each size starts from
+an empty schema. Benchmarks that write can ask for ``rollback=True``: each
+timed call then runs in a transaction that is rolled back, so repeats see
+the same starting state.
+"""
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import traceback
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from django.core.management import call_command
+from django.db import connection, transaction
+
+RESULTS_VERSION = 1
+DEFAULT_REPEAT = 3
+
+
+class SkipBenchmark(Exception):
+    """Raised by a benchmark's setup when it cannot run in this environment"""
+
+
+@dataclass
+class Benchmark:
+    name: str
+    func: Callable[[int], Callable[[], object]]
+    group: str
+    max_rows: Optional[int] = None
+    repeat: int = DEFAULT_REPEAT
+    rollback: bool = False
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    group: str
+    rows: int
+    status: str = 'ok'
+    times: List[float] = field(default_factory=list)
+    setup_seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        if not self.times:
+            return {}
+        return {
+            'min': min(self.times),
+            'median': statistics.median(self.times),
+            'mean': statistics.fmean(self.times),
+            'stdev': statistics.stdev(self.times) if len(self.times) > 1 else 0.0,
+            'rowsPerSecond': self.rows / min(self.times) if min(self.times) > 0 else 0.0,
+        }
+
+    def as_dict(self):
+        data = asdict(self)
+        data.update(self.stats)
+        return data
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, max_rows: Optional[int] = None, repeat: int = DEFAULT_REPEAT, rollback: bool = False):
+    """
+    Register a benchmark. ``max_rows`` caps the sizes it runs at (row-at-a-
+    time code paths take hours at 1M rows); ``--no-caps`` lifts the cap.
+    """
+    def decorator(func):
+        group = func.__module__.rsplit('.', 1)[-1].replace('bench_', '')
+        BENCHMARKS.append(Benchmark(name, func, group, max_rows, repeat, rollback))
+        return func
+    return decorator
+
+
+def reset_database() -> None:
+    call_command('flush', interactive=False, verbosity=0)
+
+
+@contextlib.contextmanager
+def _quiet(enabled: bool):
+    # Views print debug output per row; it is discarded so terminal I/O is
+    # not part of the timing
+    if not enabled:
+        yield
+        return
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        yield
+
+
+def _timed_call(fn: Callable[[], object], rollback: bool) -> float:
+    if rollback:
+        with transaction.atomic():
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            transaction.set_rollback(True)
+        return elapsed
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def run_benchmark(bench: Benchmark, rows: int, repeat: Optional[int] = None, quiet: bool = True) -> BenchmarkResult:
+    result = BenchmarkResult(name=bench.name, group=bench.group, rows=rows)
+    try:
+        with _quiet(quiet):
+            reset_database()
+            start = time.perf_counter()
+            fn = bench.func(rows)
+            result.setup_seconds = time.perf_counter() - start
+            for _ in range(repeat or bench.repeat):
+                result.times.append(_timed_call(fn, bench.rollback))
+    except SkipBenchmark as e:
+        result.status = 'skipped'
+        result.error = str(e)
+    except Exception as e:
+        result.status = 'error'
+        result.error = f"{type(e).__name__}: {str(e)}\n{traceback.format_exc(limit=5)}"
+    return result
+
+
+def select_benchmarks(patterns: Optional[List[str]] = None) -> List[Benchmark]:
+    if not patterns:
+        return list(BENCHMARKS)
+    return [bench for bench in BENCHMARKS if any(pattern in bench.name for pattern in patterns)]
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict[str, object]:
+    return {
+        'gitRevision': _git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpuCount': os.cpu_count(),
+        'database': connection.vendor,
+        'databaseVersion': _database_version(),
+    }
+
+
+def _database_version() -> Optional[str]:
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SHOW server_version')
+        elif connection.vendor == 'sqlite':
+            cursor.execute('SELECT sqlite_version()')
+        else:
+            return None
+        return cursor.fetchone()[0]
+
+
+def write_results(results: List[BenchmarkResult], path: str, seed: int) -> Dict:
+    payload = {
+        'version': RESULTS_VERSION,
+        'createdAt': datetime.now(timezone.utc).isoformat(),
+        'seed': seed,
+        'environment': environment(),
+        'results': [result.as_dict() for result in results],
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as fh:
+        json.dump(payload, fh, indent=2)
+    return payload
+
+
+def load_results(path: str) -> Dict:
+    with open(path) as fh:
+        payload = json.load(fh)
+    if payload.get('version') != RESULTS_VERSION:
+        raise ValueError(f"{path}: unsupported results version {payload.get('version')}")
+    return payload
+
+
+def compare_results(base: Dict, new: Dict, threshold: float = 0.10) -> List[Dict]:
+    """
+    Compare the median times of benchmarks present in both runs. A
+    benchmark regresses when it got slower by more than ``threshold``
+    (0.10 = 10%).
+    """
+    def index(payload):
+        return {
+            (item['name'], item['rows']): item
+            for item in payload['results']
+            if item['status'] == 'ok' and item.get('median')
+        }
+
+    base_index, new_index = index(base), index(new)
+    rows = []
+    for key in sorted(base_index.keys() & new_index.keys()):
+        before, after = base_index[key]['median'], new_index[key]['median']
+        change = (after - before) / before
+        rows.append({
+            'name': key[0],
+            'rows': key[1],
+            'baseMedian': before,
+            'newMedian': after,
+            'change': change,
+            'regressed': change > threshold,
+        })
+    return rows
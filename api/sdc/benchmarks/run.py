@@ -0,0 +1,126 @@
+"""
+Run the benchmark suite or compare two result files.
+
+    python -m benchmarks.run run [--sizes 10000 100000 1000000] [--only workflow fitments.list]
+                                 [--repeat N] [--no-caps] [--database-url postgres://...] [--output PATH]
+    python -m benchmarks.run compare BASE.json NEW.json [--threshold 0.10]
+
+``run`` creates a fresh benchmark database (SQLite under ``benchmarks/.data``
+unless a Postgres URL is given), runs every selected benchmark at every size
+and writes a JSON results file under ``benchmarks/results``. ``compare``
+prints the change in median time per benchmark and size, and exits with
+status 1 when anything regressed by more than the threshold.
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def _setup_django(database_url):
+    if database_url:
+        os.environ['BENCH_DATABASE_URL'] = database_url
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+    import django
+    django.setup()
+
+
+def _load_modules():
+    # Importing the modules registers their benchmarks
+    from . import bench_fitments, bench_parsing, bench_workflow  # noqa: F401
+
+
+def run(args):
+    _setup_django(args.database_url)
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    from .datasets import DEFAULT_SEED
+    from .harness import run_benchmark, select_benchmarks, write_results
+
+    _load_modules()
+    benchmarks = select_benchmarks(args.only)
+    if not benchmarks:
+        print("No benchmarks match", args.only)
+        return 2
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, keepdb=args.keepdb)
+    results = []
+    try:
+        for bench in benchmarks:
+            for rows in args.sizes:
+                if bench.max_rows and rows > bench.max_rows and not args.no_caps:
+                    print(f"{bench.name:<45} {rows:>9} skipped (cap {bench.max_rows})")
+                    continue
+                result = run_benchmark(bench, rows, repeat=args.repeat, quiet=not args.verbose)
+                results.append(result)
+                if result.status == 'ok':
+                    stats = result.stats
+                    print(f"{bench.name:<45} {rows:>9} median {stats['median']:.3f}s  min {stats['min']:.3f}s  "
+                          f"({stats['rowsPerSecond']:.0f} rows/s)")
+                else:
+                    print(f"{bench.name:<45} {rows:>9} {result.status}: {result.error.splitlines()[0]}")
+
+        output = args.output or os.path.join(
+            RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{connection.vendor}.json"
+        )
+        write_results(results, output, DEFAULT_SEED)
+        print(f"Results written to {output}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=args.keepdb)
+        teardown_test_environment()
+
+    return 1 if any(result.status == 'error' for result in results) else 0
+
+
+def compare(args):
+    # Comparing result files needs no database
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    import django
+    django.setup()
+    from .harness import compare_results, load_results
+
+    rows = compare_results(load_results(args.base), load_results(args.new), args.threshold)
+    regressed = False
+    for row in rows:
+        marker = 'REGRESSED' if row['regressed'] else ''
+        print(f"{row['name']:<45} {row['rows']:>9} {row['baseMedian']:.3f}s -> {row['newMedian']:.3f}s "
+              f"{row['change']:+.1%} {marker}")
+        regressed = regressed or row['regressed']
+    return 1 if regressed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description=__doc__.split('\n\n')[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='run benchmarks and write a JSON results file')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    run_parser.add_argument('--only', nargs='+', help='run benchmarks whose name contains any of these')
+    run_parser.add_argument('--repeat', type=int, help='timed calls per benchmark (overrides each benchmark)')
+    run_parser.add_argument('--no-caps', action='store_true', help='ignore per-benchmark row caps')
+    run_parser.add_argument('--database-url', default=os.getenv('BENCH_DATABASE_URL', ''),
+                            help='local Postgres URL; SQLite is used when empty')
+    run_parser.add_argument('--keepdb', action='store_true', help='keep the benchmark database between runs')
+    run_parser.add_argument('--output', help='results file (default: benchmarks/results/<timestamp>-<db>.json)')
+    run_parser.add_argument('--verbose', action='store_true', help='show output printed by the code under test')
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = subparsers.add_parser('compare', help='compare two results files')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help='relative slowdown counted as a regression (default 0.10)')
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+import pandas as pd
+from django.test import SimpleTestCase, TransactionTestCase
+
+from . import bench_parsing  # noqa: F401 (registers its benchmarks)
+from .datasets import MAX_YEAR, MIN_YEAR, YEAR_JITTER, scale_frame, scaled_fixture
+from .harness import run_benchmark, select_benchmarks
+
+
+class ScaleFrameTests(SimpleTestCase):
+    def test_copies_get_distinct_identifiers_and_shifted_years(self):
+        frame = pd.DataFrame({'PartID': ['A', 'B'], 'YearID': ['2020', ''], 'Note': ['x', 'y']})
+
+        scaled = scale_frame(frame, 5, ['PartID'], 'YearID')
+
+        self.assertEqual(scaled['PartID'].tolist(), ['A', 'B', 'A-1', 'B-1', 'A-2'])
+        self.assertEqual(scaled['Note'].tolist(), ['x', 'y', 'x', 'y', 'x'])
+        self.assertEqual(scaled['YearID'][0], '2020')
+        self.assertEqual(scaled['YearID'][3], '')
+        for year in (int(scaled['YearID'][2]), int(scaled['YearID'][4])):
+            self.assertTrue(max(MIN_YEAR, 2020 - YEAR_JITTER) <= year <= min(MAX_YEAR, 2020 + YEAR_JITTER))
+
+    def test_seeded_scaling_is_deterministic(self):
+        first, second = scaled_fixture('fitments', 120), scaled_fixture('fitments', 120)
+        self.assertEqual(len(first), 120)
+        self.assertTrue(first['PartID'].is_unique)
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_empty_fixture_is_rejected(self):
+        with self.assertRaises(ValueError):
+            scale_frame(pd.DataFrame({'PartID': []}), 10, ['PartID'])
+
+
+class BenchmarkSmokeTests(TransactionTestCase):
+    """The harness flushes the database, so these run outside a test transaction"""
+
+    def test_benchmarks_run_at_a_small_size(self):
+        for name in ('vcdb_validator.validate_data', 'data_processor.process_product_data'):
+            [bench] = select_benchmarks([name])
+            result = run_benchmark(bench, 50, repeat=1)
+            self.assertEqual(result.status, 'ok', result.error)
+            self.assertEqual(len(result.times), 1)
+            self.assertGreater(result.stats['rowsPerSecond'], 0)
@@ -4,10 +4,11 @@ AI Fitment Processor
 This module handles the AI-based generation of fitments for products.
 It matches products from ProductData with vehicles from VCDBData using AI/ML algorithms.
 """
+from __future__ import annotations
 
 import logging
 import json
-import pandas as pd
+from sdc.lazy_imports import lazy_module
 from typing import Tuple, List, Dict, Any
 from django.utils import timezone
 from django.db.models import Q
@@ -21,6 +22,8 @@ from .models import (
 )
 from .utils import FileParser, ProductValidator
 
+pd = lazy_module('pandas')
+
 logger = logging.getLogger(__name__)
 
 
@@ -363,246 +366,146 @@ def check_and_create_products(job: AiFitmentJob, df: pd.DataFrame) -> Tuple[bool
         return False, f"Database error: {str(e)}", []
 
 
-def process_product_file_for_ai_fitments(job: AiFitmentJob) -> Tuple[bool, str]:
+def _product_payload(product: ProductData) -> Dict[str, Any]:
+    """Product in the format expected by Azure AI"""
+    return {
+        'id': str(product.id),
+        'part_id': product.part_id,
+        'description': product.description,
+        'category': product.category,
+        'part_type': product.part_type,
+        'brand': product.brand,
+        'sku': product.sku,
+        'specifications': product.specifications or {}
+    }
+
+
+def _build_ai_fitment(job: AiFitmentJob, fitment_data: Dict[str, Any]):
+    """Fitment row (status 'ReadyToApprove') for one AI-generated fitment"""
+    from fitments.models import Fitment
+
+    return Fitment(
+        tenant=job.tenant,
+        ai_job_id=job.id,  # Link to AI job
+        partId=fitment_data.get('partId', ''),
+        itemStatus='ReadyToApprove',  # Ready for review
+        itemStatusCode=0,
+        baseVehicleId=f"BV_{fitment_data.get('year', 2020)}_{fitment_data.get('make', '')}_{fitment_data.get('model', '')}",
+        year=fitment_data.get('year', 2020),
+        makeName=fitment_data.get('make', ''),
+        modelName=fitment_data.get('model', ''),
+        subModelName=fitment_data.get('submodel', ''),
+        driveTypeName=fitment_data.get('driveType', ''),
+        fuelTypeName=fitment_data.get('fuelType', 'Gas'),
+        bodyNumDoors=fitment_data.get('numDoors', 4),
+        bodyTypeName=fitment_data.get('bodyType', 'Sedan'),
+        ptid=fitment_data.get('partId', ''),
+        partTypeDescriptor=fitment_data.get('partDescription', ''),
+        uom='EA',
+        quantity=fitment_data.get('quantity', 1),
+        fitmentTitle=f"AI Fitment - {fitment_data.get('partId', '')}",
+        fitmentDescription=fitment_data.get('partDescription', ''),
+        fitmentNotes=fitment_data.get('ai_reasoning', 'AI-generated fitment'),
+        position=fitment_data.get('position', 'Front'),
+        positionId=0,
+        liftHeight='',
+        wheelType='',
+        fitmentType='ai_fitment',
+        confidenceScore=fitment_data.get('confidence', 0.7),
+        aiDescription=fitment_data.get('confidence_explanation', ''),
+        dynamicFields={},
+        createdBy='AI System',
+        updatedBy='AI System'
+    )
+
+
+def _job_products(job: AiFitmentJob):
+    if job.tenant:
+        return ProductData.objects.filter(tenant=job.tenant)
+    return ProductData.objects.filter(tenant__isnull=True)
+
+
+def prepare_ai_job_products(job: AiFitmentJob) -> Tuple[bool, str, List[int]]:
     """
-    Process uploaded product file and generate AI fitments
-    Complete workflow:
-    1. Validate file
-    2. Check/create products in DB
-    3. Get VCDB data based on tenant's configured categories
-    4. Send to Azure AI for fitment generation
-    5. Store fitments with status 'pending' (ready_to_approve)
-    
-    Returns: (success: bool, message: str)
+    Resolve the products an AI job works on before it is split into chunks.
+    Upload jobs validate the product file and check/create its products;
+    selection jobs look up the selected products by database ID.
+
+    Returns: (success: bool, message: str, product_ids: List[int])
     """
     try:
-        # Step 1: Validate file
-        logger.info(f"Step 1: Validating product file for job {job.id}")
-        is_valid, message, df = validate_product_file(job)
-        if not is_valid:
-            job.error_message = message
-            job.save()
-            return False, message
-        
-        # Step 2: Check/create products in database
-        logger.info(f"Step 2: Checking/creating products in database for job {job.id}")
-        success, message, product_objects = check_and_create_products(job, df)
-        if not success:
-            job.error_message = message
-            job.save()
-            return False, message
-        
-        if not product_objects:
-            return False, "No valid products found in file"
-        
-        # Step 3: Get VCDB data based on tenant's configured categories
-        logger.info(f"Step 3: Fetching VCDB data for job {job.id}")
-        vcdb_data = get_vcdb_data_for_tenant(job.tenant)
-        if not vcdb_data:
-            error_msg = "No VCDB data available. Please ensure VCDB categories are configured for your tenant."
-            job.error_message = error_msg
-            job.save()
-            return False, error_msg
-        
-        logger.info(f"Found {len(vcdb_data)} VCDB records for AI processing")
-        
-        # Step 4: Convert products to format expected by Azure AI
-        logger.info(f"Step 4: Preparing data for Azure AI")
-        products_data = []
-        for product in product_objects:
-            product_dict = {
-                'id': str(product.id),
-                'part_id': product.part_id,
-                'description': product.description,
-                'category': product.category,
-                'part_type': product.part_type,
-                'brand': product.brand,
-                'sku': product.sku,
-                'specifications': product.specifications or {}
-            }
-            products_data.append(product_dict)
-        
-        # Step 5: Send to Azure AI for fitment generation
-        logger.info(f"Step 5: Generating fitments using Azure AI")
-        from fitment_uploads.azure_ai_service import azure_ai_service
-        ai_fitments = azure_ai_service.generate_fitments(vcdb_data, products_data)
-        
-        logger.info(f"Azure AI returned {len(ai_fitments)} fitments")
-        
-        # Step 6: Store fitments directly in Fitment table with status 'ReadyToApprove'
-        logger.info(f"Step 6: Storing AI-generated fitments in Fitment table")
-        from fitments.models import Fitment
-        import uuid
-        
-        generated_fitments = []
-        for fitment_data in ai_fitments:
-            fitment = Fitment(
-                tenant=job.tenant,
-                ai_job_id=job.id,  # Link to AI job
-                hash=f"{fitment_data.get('partId', 'PART')}_{fitment_data.get('year', 2020)}_{fitment_data.get('make', 'MAKE')}_{fitment_data.get('model', 'MODEL')}_{uuid.uuid4().hex[:8]}",
-                partId=fitment_data.get('partId', ''),
-                itemStatus='ReadyToApprove',  # Ready for review
-                itemStatusCode=0,
-                baseVehicleId=f"BV_{fitment_data.get('year', 2020)}_{fitment_data.get('make', '')}_{fitment_data.get('model', '')}",
-                year=fitment_data.get('year', 2020),
-                makeName=fitment_data.get('make', ''),
-                modelName=fitment_data.get('model', ''),
-                subModelName=fitment_data.get('submodel', ''),
-                driveTypeName=fitment_data.get('driveType', ''),
-                fuelTypeName=fitment_data.get('fuelType', 'Gas'),
-                bodyNumDoors=fitment_data.get('numDoors', 4),
-                bodyTypeName=fitment_data.get('bodyType', 'Sedan'),
-                ptid=fitment_data.get('partId', ''),
-                partTypeDescriptor=fitment_data.get('partDescription', ''),
-                uom='EA',
-                quantity=fitment_data.get('quantity', 1),
-                fitmentTitle=f"AI Fitment - {fitment_data.get('partId', '')}",
-                fitmentDescription=fitment_data.get('partDescription', ''),
-                fitmentNotes=fitment_data.get('ai_reasoning', 'AI-generated fitment'),
-                position=fitment_data.get('position', 'Front'),
-                positionId=0,
-                liftHeight='',
-                wheelType='',
-                fitmentType='ai_fitment',
-                confidenceScore=fitment_data.get('confidence', 0.7),
-                aiDescription=fitment_data.get('confidence_explanation', ''),
-                dynamicFields={},
-                createdBy='AI System',
-                updatedBy='AI System'
+        if job.job_type == 'upload':
+            # Step 1: Validate file
+            logger.info(f"Step 1: Validating product file for job {job.id}")
+            is_valid, message, df = validate_product_file(job)
+            if not is_valid:
+                return False, message, []
+
+            # Step 2: Check/create products in database
+            logger.info(f"Step 2: Checking/creating products in database for job {job.id}")
+            success, message, product_objects = check_and_create_products(job, df)
+            if not success:
+                return False, message, []
+            if not product_objects:
+                return False, "No valid products found in file", []
+            product_ids = sorted({product.id for product in product_objects})
+
+        elif job.job_type == 'selection':
+            if not job.product_ids:
+                return False, "No product IDs provided", []
+
+            product_ids = list(
+                _job_products(job).filter(id__in=job.product_ids).order_by('id').values_list('id', flat=True)
             )
-            generated_fitments.append(fitment)
-        
-        # Bulk create fitments in Fitment table
-        if generated_fitments:
-            Fitment.objects.bulk_create(generated_fitments)
-        
-        # Update job fitments count and status
-        job.fitments_count = len(generated_fitments)
-        job.status = 'review_required'  # Ready for review
-        job.completed_at = timezone.now()
-        job.save()
-        
-        success_message = (
-            f"Successfully generated {len(generated_fitments)} fitments from "
-            f"{len(product_objects)} products using Azure AI"
-        )
-        
-        logger.info(f"Job {job.id} completed: {success_message}")
-        return True, success_message
-        
+            if not product_ids:
+                return False, "No products found with provided IDs", []
+
+            # Update job product count
+            job.product_count = len(product_ids)
+            job.save()
+            message = f"{len(product_ids)} products selected"
+
+        else:
+            return False, f"Unknown job type: {job.job_type}", []
+
+        # Step 3: VCDB data based on tenant's configured categories
+        if not get_vcdb_data_for_tenant(job.tenant):
+            return False, "No VCDB data available. Please ensure VCDB categories are configured for your tenant.", []
+
+        return True, message, product_ids
+
     except Exception as e:
-        error_msg = f"Failed to process product file: {str(e)}"
+        error_msg = f"Failed to prepare products: {str(e)}"
         logger.error(error_msg, exc_info=True)
-        job.error_message = error_msg
-        job.save()
-        return False, error_msg
+        return False, error_msg, []
 
 
-def process_selected_products_for_ai_fitments(job: AiFitmentJob) -> Tuple[bool, str]:
+def generate_ai_fitments_for_products(job: AiFitmentJob, product_ids: List[int]) -> List[Dict[str, Any]]:
     """
-    Generate AI fitments for selected products from ProductData table using Azure AI
-    Returns: (success: bool, message: str)
+    Send one range of a job's products to Azure AI and return the raw
+    fitments. Nothing is written, so this is safe to repeat on retry.
     """
-    try:
-        if not job.product_ids:
-            return False, "No product IDs provided"
-        
-        # Get selected products by database ID
-        products = ProductData.objects.filter(
-            id__in=job.product_ids,
-            tenant=job.tenant if job.tenant else Q(tenant__isnull=True)
-        )
-        
-        if not products.exists():
-            return False, "No products found with provided IDs"
-        
-        # Update job product count
-        job.product_count = products.count()
-        job.save()
-        
-        # Get VCDB data for the tenant
-        vcdb_data = get_vcdb_data_for_tenant(job.tenant)
-        if not vcdb_data:
-            return False, "No VCDB data available for AI processing"
-        
-        # Convert products to format expected by Azure AI
-        products_data = []
-        for product in products:
-            product_dict = {
-                'id': str(product.id),
-                'part_id': product.part_id,
-                'description': product.description,
-                'category': product.category,
-                'part_type': product.part_type,
-                'brand': product.brand,
-                'sku': product.sku,
-                'specifications': product.specifications or {}
-            }
-            products_data.append(product_dict)
-        
-        # Use Azure AI service to generate fitments
-        from fitment_uploads.azure_ai_service import azure_ai_service
-        ai_fitments = azure_ai_service.generate_fitments(vcdb_data, products_data)
-        
-        # Convert AI fitments to Fitment objects (create directly in Fitment table)
-        from fitments.models import Fitment
-        import uuid
-        
-        generated_fitments = []
-        for fitment_data in ai_fitments:
-            fitment = Fitment(
-                tenant=job.tenant,
-                ai_job_id=job.id,  # Link to AI job
-                hash=f"{fitment_data.get('partId', 'PART')}_{fitment_data.get('year', 2020)}_{fitment_data.get('make', 'MAKE')}_{fitment_data.get('model', 'MODEL')}_{uuid.uuid4().hex[:8]}",
-                partId=fitment_data.get('partId', ''),
-                itemStatus='ReadyToApprove',  # Ready for review
-                itemStatusCode=0,
-                baseVehicleId=f"BV_{fitment_data.get('year', 2020)}_{fitment_data.get('make', '')}_{fitment_data.get('model', '')}",
-                year=fitment_data.get('year', 2020),
-                makeName=fitment_data.get('make', ''),
-                modelName=fitment_data.get('model', ''),
-                subModelName=fitment_data.get('submodel', ''),
-                driveTypeName=fitment_data.get('driveType', ''),
-                fuelTypeName=fitment_data.get('fuelType', 'Gas'),
-                bodyNumDoors=fitment_data.get('numDoors', 4),
-                bodyTypeName=fitment_data.get('bodyType', 'Sedan'),
-                ptid=fitment_data.get('partId', ''),
-                partTypeDescriptor=fitment_data.get('partDescription', ''),
-                uom='EA',
-                quantity=fitment_data.get('quantity', 1),
-                fitmentTitle=f"AI Fitment - {fitment_data.get('partId', '')}",
-                fitmentDescription=fitment_data.get('partDescription', ''),
-                fitmentNotes=fitment_data.get('ai_reasoning', 'AI-generated fitment'),
-                position=fitment_data.get('position', 'Front'),
-                positionId=0,
-                liftHeight='',
-                wheelType='',
-                fitmentType='ai_fitment',
-                confidenceScore=fitment_data.get('confidence', 0.7),
-                aiDescription=fitment_data.get('confidence_explanation', ''),
-                dynamicFields={},
-                createdBy='AI System',
-                updatedBy='AI System'
-            )
-            generated_fitments.append(fitment)
-        
-        # Bulk create fitments in Fitment table
-        if generated_fitments:
-            Fitment.objects.bulk_create(generated_fitments)
-        
-        # Update job fitments count and status
-        job.fitments_count = len(generated_fitments)
-        job.status = 'review_required'  # Ready for review
-        job.save()
-        
-        logger.info(
-            f"AI Job {job.id}: Generated {len(generated_fitments)} fitments "
-            f"from {products.count()} selected products using Azure AI"
-        )
-        
-        return True, f"Successfully generated {len(generated_fitments)} fitments from {products.count()} products using Azure AI"
-        
-    except Exception as e:
-        logger.error(f"Failed to process selected products for AI fitments: {str(e)}", exc_info=True)
-        return False, str(e)
+    vcdb_data = get_vcdb_data_for_tenant(job.tenant)
+    if not vcdb_data:
+        raise ValueError("No VCDB data available for AI processing")
+
+    products = _job_products(job).filter(id__in=product_ids).order_by('id')
+    products_data = [_product_payload(product) for product in products]
+    if not products_data:
+        return []
+
+    from fitment_uploads.azure_ai_service import get_azure_ai_service
+    ai_fitments = get_azure_ai_service().generate_fitments(vcdb_data, products_data)
+    logger.info(f"Azure AI returned {len(ai_fitments)} fitments for {len(products_data)} products of job {job.id}")
+    return ai_fitments
+
+
+def store_ai_fitments(job: AiFitmentJob, ai_fitments: List[Dict[str, Any]]) -> int:
+    """
+    Bulk create the Fitment rows for AI-generated fitments; returns the count.
+    Fitments the tenant already has are skipped.
+    """
+    from fitments.models import Fitment
 
+    generated_fitments = [_build_ai_fitment(job, fitment_data) for fitment_data in ai_fitments]
+    return len(Fitment.objects.bulk_create_new(generated_fitments))
@@ -2,12 +2,16 @@
 Dynamic Field Validator for VCDB and Product data validation
 based on field configuration from settings
 """
+from __future__ import annotations
 
-import pandas as pd
+from sdc.lazy_imports import lazy_module
 import re
 from typing import Dict, List, Tuple, Any, Optional
 from django.core.exceptions import ValidationError
 from field_config.models import FieldConfiguration
+from field_config.schema import get_compiled_schema
+
+pd = lazy_module('pandas')
 
 
 class DynamicFieldValidator:
@@ -25,18 +29,8 @@ class DynamicFieldValidator:
     
     def _load_field_configurations(self) -> Dict[str, FieldConfiguration]:
         """Load field configurations for the reference type"""
-        configs = {}
-        
-        # Get configurations for this reference type only
-        field_configs = FieldConfiguration.objects.filter(
-            is_enabled=True,
-            reference_type=self.reference_type
-        ).order_by('display_order')
-        
-        for config in field_configs:
-            configs[config.name] = config
-            
-        return configs
+        # Get configurations for this reference type only (compiled and cached)
+        return get_compiled_schema(self.reference_type, include_both=False).configs
     
     def validate_dataframe(self, df: pd.DataFrame) -> Tuple[bool, List[str]]:
         """
@@ -188,7 +182,7 @@ class DynamicFieldValidator:
         elif config.field_type == 'date':
             # Date fields should be parseable as dates
             try:
-                pd.to_datetime(non_null_series, errors='coerce')
+                # One parse per column; pandas infers the format from the first value
                 if pd.to_datetime(non_null_series, errors='coerce').isna().any():
                     errors.append(f"Field '{field_name}' contains invalid date values")
             except Exception:
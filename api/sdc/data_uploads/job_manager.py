@@ -165,10 +165,10 @@ class FitmentJobManager:
             FitmentJobManager.update_job_status(job.id, 'processing')
             
             # Import AI service
-            from fitment_uploads.azure_ai_service import azure_ai_service
+            from fitment_uploads.azure_ai_service import get_azure_ai_service
             
             # Process with AI
-            ai_fitments = azure_ai_service.generate_fitments(vcdb_data, products_data)
+            ai_fitments = get_azure_ai_service().generate_fitments(vcdb_data, products_data)
             
             # Update job with results
             FitmentJobManager.update_job_status(
@@ -236,31 +236,14 @@ class FitmentJobManager:
             
             # Create fitments
             applied_fitments = []
-            created_fitments = []
-            duplicates_count = 0
             errors_count = 0
             
+            # Fitments the tenant already has are skipped by the insert (ON CONFLICT DO NOTHING)
+            new_fitments = []
+            vehicle_by_hash = {}
             for vehicle in vehicles:
                 try:
-                    # Check for existing fitment to avoid duplicates
-                    existing_fitment = Fitment.objects.filter(
-                        tenant=tenant,
-                        partId=part_id,
-                        year=int(vehicle.year),
-                        makeName=str(vehicle.make),
-                        modelName=str(vehicle.model),
-                        subModelName=str(vehicle.submodel or ''),
-                        isDeleted=False
-                    ).first()
-                
-                    if existing_fitment:
-                        logger.warning(f"Fitment already exists for {part_id} and {vehicle.year} {vehicle.make} {vehicle.model}")
-                        duplicates_count += 1
-                        continue
-                
-                    # Create Fitment record
-                    fitment = Fitment.objects.create(
-                        hash=uuid.uuid4().hex,
+                    fitment = Fitment(
                         tenant=tenant,
                         partId=part_id,
                         itemStatus='Active',
@@ -289,9 +272,22 @@ class FitmentJobManager:
                         createdBy='manual_user',
                         updatedBy='manual_user'
                     )
-                    created_fitments.append(fitment)
-                    
-                    # Create AppliedFitment record for tracking
+                    fitment.set_identity()
+                    vehicle_by_hash[fitment.hash] = vehicle
+                    new_fitments.append(fitment)
+                except Exception as e:
+                    logger.error(f"Failed to create fitment for vehicle {vehicle.id}: {str(e)}")
+                    errors_count += 1
+            
+            created_fitments = Fitment.objects.bulk_create_new(new_fitments)
+            duplicates_count = len(new_fitments) - len(created_fitments)
+            if duplicates_count:
+                logger.warning(f"{duplicates_count} fitments already existed for {part_id}")
+            
+            # Create AppliedFitment records for tracking
+            for fitment in created_fitments:
+                vehicle = vehicle_by_hash[fitment.hash]
+                try:
                     applied_fitment = AppliedFitment.objects.create(
                         session_id=session_id,
                         tenant=tenant,
@@ -309,11 +305,9 @@ class FitmentJobManager:
                         notes=fitment_data.get('notes', 'Applied manually')
                     )
                     applied_fitments.append(applied_fitment)
-                    
                 except Exception as e:
-                    logger.error(f"Failed to create fitment for vehicle {vehicle.id}: {str(e)}")
+                    logger.error(f"Failed to record applied fitment for vehicle {vehicle.id}: {str(e)}")
                     errors_count += 1
-                    continue
             
             # Decide final status
             total_failures = duplicates_count + errors_count
@@ -0,0 +1,45 @@
+"""
+Management command to rebuild AI fitment job review counters from scratch
+"""
+
+from django.core.management.base import BaseCommand
+from data_uploads.models import AiFitmentJob
+
+
+class Command(BaseCommand):
+    help = 'Reconcile fitments/approved/rejected counters on AI fitment jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job-id', help='Only reconcile this job')
+        parser.add_argument('--tenant-id', help='Only reconcile jobs for this tenant')
+
+    def handle(self, *args, **options):
+        jobs = AiFitmentJob.objects.all()
+        if options.get('job_id'):
+            jobs = jobs.filter(id=options['job_id'])
+        if options.get('tenant_id'):
+            jobs = jobs.filter(tenant_id=options['tenant_id'])
+
+        fixed = 0
+        checked = 0
+        for job in jobs.iterator():
+            checked += 1
+            before = (job.fitments_count, job.approved_count, job.rejected_count)
+            try:
+                job.reconcile_review_counts()
+            except Exception as e:
+                self.stdout.write(
+                    self.style.ERROR(f'Failed to reconcile job {job.id}: {str(e)}')
+                )
+                continue
+
+            after = (job.fitments_count, job.approved_count, job.rejected_count)
+            if before != after:
+                fixed += 1
+                self.stdout.write(
+                    self.style.WARNING(f'Job {job.id}: {before} -> {after}')
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Reconciled {checked} jobs, corrected {fixed}')
+        )
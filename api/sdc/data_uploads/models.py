@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import F
 from django.utils import timezone
 from tenants.models import Tenant
 import uuid
@@ -422,6 +423,98 @@ class AiFitmentJob(models.Model):
     def pending_review_count(self):
         """Number of fitments still pending review"""
         return self.fitments_count - self.approved_count - self.rejected_count
+    
+    def apply_review_delta(self, approved=0, rejected=0):
+        """
+        Shift the review counters by the number of rows a status transition
+        actually touched. Uses F() expressions so concurrent reviewers never
+        overwrite each other's counts, and never re-counts the job's fitments.
+        """
+        if not approved and not rejected:
+            return self
+        
+        AiFitmentJob.objects.filter(pk=self.pk).update(
+            approved_count=F('approved_count') + approved,
+            rejected_count=F('rejected_count') + rejected,
+            updated_at=timezone.now(),
+        )
+        self.refresh_from_db(fields=['fitments_count', 'approved_count', 'rejected_count'])
+        return self
+    
+    def has_pending_review(self):
+        """Whether any of the job's fitments still await review, in one EXISTS query"""
+        from django.db.models import Exists, OuterRef, Q
+        from fitments.models import Fitment
+        
+        pending_generated = AiGeneratedFitment.objects.filter(job_id=OuterRef('pk'), status='pending')
+        pending_fitments = Fitment.objects.filter(ai_job_id=OuterRef('pk'), itemStatus='ReadyToApprove')
+        return AiFitmentJob.objects.filter(
+            Q(Exists(pending_generated)) | Q(Exists(pending_fitments)), pk=self.pk,
+        ).exists()
+    
+    def complete_if_reviewed(self):
+        """
+        Mark the job completed once no fitments remain pending review.
+        
+        The counters only say when to look: completion is confirmed against
+        the job's rows, and counters that disagree with them (pending rows
+        left, or fewer than zero pending) are reconciled instead.
+        """
+        if self.pending_review_count > 0 or self.status == 'completed':
+            return False
+        
+        if self.pending_review_count < 0 or self.has_pending_review():
+            self.reconcile_review_counts()
+            if self.pending_review_count > 0:
+                return False
+        
+        now = timezone.now()
+        AiFitmentJob.objects.filter(pk=self.pk).exclude(status='completed').update(
+            status='completed',
+            completed_at=now,
+            updated_at=now,
+        )
+        self.status = 'completed'
+        self.completed_at = now
+        return True
+    
+    def reconcile_review_counts(self):
+        """
+        Recompute fitments/approved/rejected counters from scratch.
+        
+        Jobs created through the review queue keep their rows in
+        AiGeneratedFitment; newer jobs write straight into the Fitment table,
+        where rejected rows are deleted and therefore only derivable from the
+        original fitments_count.
+        """
+        from django.db.models import Count, Q
+        
+        generated = self.generated_fitments.aggregate(
+            total=Count('id'),
+            approved=Count('id', filter=Q(status='approved')),
+            rejected=Count('id', filter=Q(status='rejected')),
+        )
+        
+        if generated['total']:
+            fitments_count = generated['total']
+            approved_count = generated['approved']
+            rejected_count = generated['rejected']
+        else:
+            from fitments.models import Fitment
+            
+            counts = Fitment.objects.filter(ai_job_id=self.id).aggregate(
+                approved=Count('hash', filter=Q(itemStatus='Active')),
+                pending=Count('hash', filter=Q(itemStatus='ReadyToApprove')),
+            )
+            approved_count = counts['approved']
+            fitments_count = max(self.fitments_count, approved_count + counts['pending'])
+            rejected_count = fitments_count - approved_count - counts['pending']
+        
+        self.fitments_count = fitments_count
+        self.approved_count = approved_count
+        self.rejected_count = rejected_count
+        self.save(update_fields=['fitments_count', 'approved_count', 'rejected_count', 'updated_at'])
+        return self
 
 
 class AiGeneratedFitment(models.Model):
@@ -490,30 +583,42 @@ class AiGeneratedFitment(models.Model):
     def __str__(self):
         return f"{self.part_id} -> {self.year} {self.make} {self.model} ({self.confidence:.2f})"
     
-    def approve(self, reviewed_by=None):
-        """Approve this fitment and create actual fitment record"""
-        self.status = 'approved'
-        self.reviewed_at = timezone.now()
+    def _transition(self, new_status, reviewed_by=None):
+        """
+        Move this fitment to new_status and adjust the job counters by the
+        number of rows the UPDATE actually changed.
+        """
+        previous_status = self.status
+        if previous_status == new_status:
+            return self
+        
+        now = timezone.now()
+        changes = {'status': new_status, 'reviewed_at': now, 'updated_at': now}
         if reviewed_by:
-            self.reviewed_by = reviewed_by
-        self.save()
+            changes['reviewed_by'] = reviewed_by
+        
+        # Guard on the status we loaded so a concurrent review is not counted twice
+        updated = AiGeneratedFitment.objects.filter(
+            pk=self.pk, status=previous_status
+        ).update(**changes)
         
-        # Update job counts
-        self.job.approved_count = self.job.generated_fitments.filter(status='approved').count()
-        self.job.save()
+        for field, value in changes.items():
+            setattr(self, field, value)
+        
+        if updated:
+            deltas = {'approved': 0, 'rejected': 0}
+            if new_status in deltas:
+                deltas[new_status] += updated
+            if previous_status in deltas:
+                deltas[previous_status] -= updated
+            self.job.apply_review_delta(**deltas)
         
         return self
     
+    def approve(self, reviewed_by=None):
+        """Approve this fitment and create actual fitment record"""
+        return self._transition('approved', reviewed_by)
+    
     def reject(self, reviewed_by=None):
         """Reject this fitment"""
-        self.status = 'rejected'
-        self.reviewed_at = timezone.now()
-        if reviewed_by:
-            self.reviewed_by = reviewed_by
-        self.save()
-        
-        # Update job counts
-        self.job.rejected_count = self.job.generated_fitments.filter(status='rejected').count()
-        self.job.save()
-        
-        return self
\ No newline at end of file
+        return self._transition('rejected', reviewed_by)
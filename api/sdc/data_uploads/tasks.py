@@ -3,20 +3,68 @@ Celery tasks for AI fitment generation
 """
 
 from celery import shared_task
+from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
 import logging
 from .models import AiFitmentJob, AiGeneratedFitment, ProductData, VCDBData
-from .ai_fitment_processor import process_selected_products_for_ai_fitments, process_product_file_for_ai_fitments
+from .ai_fitment_processor import (
+    prepare_ai_job_products,
+    generate_ai_fitments_for_products,
+    store_ai_fitments,
+)
+from sdc.progress import ProgressReporter
+from workflow.orchestration import (
+    CHUNK_TASK_OPTIONS,
+    chunk_progress,
+    chunk_summary,
+    dispatch_chunks,
+    index_ranges,
+    run_chunk,
+)
 
 logger = logging.getLogger(__name__)
 
+AI_JOB_KIND = 'ai_fitment_job'
+
+
+def _fail_ai_job(task, job, progress, message):
+    """Mark an AI job failed and report it on the task and progress hash"""
+    if job.status != 'failed':
+        job.status = 'failed'
+        job.error_message = message
+        job.completed_at = timezone.now()
+        job.save()
+
+    task.update_state(
+        state='FAILURE',
+        meta={
+            'current': 0,
+            'total': 100,
+            'status': 'AI fitment generation failed',
+            'job_id': str(job.id),
+            'job_type': job.job_type,
+            'error': message
+        }
+    )
+    progress.finish(current=0, total=100, status='failed', error=message)
+
+    logger.error(f"AI fitment generation failed for job {job.id}: {message}")
+
+    return {
+        'status': 'failed',
+        'job_id': str(job.id),
+        'error': message
+    }
+
 
 @shared_task(bind=True)
 def generate_ai_fitments_task(self, job_id):
     """
     Celery task to generate AI fitments for a job
-    Handles both 'upload' and 'selection' job types
+    Handles both 'upload' and 'selection' job types: products are resolved
+    here, then split into ranges that generate_ai_fitments_chunk processes in
+    parallel; finalize_ai_fitment_job sets the final status.
     """
     try:
         # Get the job
@@ -29,117 +77,67 @@ def generate_ai_fitments_task(self, job_id):
         
         logger.info(f"Starting AI fitment generation for job {job_id} (type: {job.job_type})")
         
+        # Task state updates are coalesced and mirrored to the job's Redis hash;
+        # the processor owns the job row, so nothing is flushed to the database
+        progress = ProgressReporter(job, task=self, percent_field='current', model_fields=())
+        
         # Update task progress - Initializing
-        self.update_state(
-            state='PROGRESS',
-            meta={
-                'current': 5,
-                'total': 100,
-                'status': 'Initializing AI fitment generation...',
-                'job_id': str(job.id),
-                'job_type': job.job_type
-            }
+        progress.update(
+            current=5,
+            total=100,
+            status='Initializing AI fitment generation...',
+            job_id=str(job.id),
+            job_type=job.job_type
         )
         
-        # Process based on job type
         if job.job_type == 'upload':
-            # Process uploaded file - more steps involved
-            self.update_state(
-                state='PROGRESS',
-                meta={
-                    'current': 10,
-                    'total': 100,
-                    'status': 'Validating uploaded product file...',
-                    'job_id': str(job.id),
-                    'job_type': job.job_type
-                }
+            progress.update(
+                current=10,
+                total=100,
+                status='Validating uploaded product file...',
+                job_id=str(job.id),
+                job_type=job.job_type
             )
-            
-            # The processor will handle:
-            # 1. File validation
-            # 2. Product DB check/creation
-            # 3. VCDB data fetching
-            # 4. Azure AI fitment generation
-            success, message = process_product_file_for_ai_fitments(job)
-            
         elif job.job_type == 'selection':
-            # Process selected products - simpler flow
-            self.update_state(
-                state='PROGRESS',
-                meta={
-                    'current': 15,
-                    'total': 100,
-                    'status': 'Processing selected products...',
-                    'job_id': str(job.id),
-                    'job_type': job.job_type
-                }
+            progress.update(
+                current=15,
+                total=100,
+                status='Processing selected products...',
+                job_id=str(job.id),
+                job_type=job.job_type
             )
-            
-            success, message = process_selected_products_for_ai_fitments(job)
-            
-        else:
-            success = False
-            message = f"Unknown job type: {job.job_type}"
         
-        # Refresh job from DB to get updated status
-        job.refresh_from_db()
+        success, message, product_ids = prepare_ai_job_products(job)
+        if not success:
+            return _fail_ai_job(self, job, progress, message)
         
-        if success:
-            # Job status is already set to 'review_required' by the processor
-            # Get final fitments count
-            fitments_count = AiGeneratedFitment.objects.filter(job=job).count()
-            
-            self.update_state(
-                state='SUCCESS',
-                meta={
-                    'current': 100,
-                    'total': 100,
-                    'status': 'AI fitment generation completed successfully!',
-                    'job_id': str(job.id),
-                    'job_type': job.job_type,
-                    'fitments_count': fitments_count
-                }
-            )
-            
-            logger.info(
-                f"AI fitment generation completed for job {job_id}: "
-                f"{fitments_count} fitments generated, status: {job.status}"
-            )
-            
-            return {
-                'status': job.status,  # Should be 'review_required'
-                'job_id': str(job.id),
-                'fitments_count': fitments_count,
-                'product_count': job.product_count,
-                'message': message
-            }
-        else:
-            # Update job status to failed if not already set
-            if job.status != 'failed':
-                job.status = 'failed'
-                job.error_message = message
-                job.completed_at = timezone.now()
-                job.save()
-            
-            self.update_state(
-                state='FAILURE',
-                meta={
-                    'current': 0,
-                    'total': 100,
-                    'status': 'AI fitment generation failed',
-                    'job_id': str(job.id),
-                    'job_type': job.job_type,
-                    'error': message
-                }
-            )
-            
-            logger.error(f"AI fitment generation failed for job {job_id}: {message}")
-            
-            return {
-                'status': 'failed',
-                'job_id': str(job.id),
-                'error': message
-            }
+        # Fan out: one chunk per range of products, aggregated by the finalizer
+        chunk_size = getattr(settings, 'AI_FITMENT_CHUNK_SIZE', 25)
+        specs = [
+            {'productIds': product_ids[start:stop]}
+            for start, stop in index_ranges(len(product_ids), chunk_size)
+        ]
+        progress.update(
+            current=20,
+            total=100,
+            status=f'Generating fitments for {len(product_ids)} products in {len(specs)} chunks...',
+            job_id=str(job.id),
+            job_type=job.job_type,
+            chunks=len(specs)
+        )
+        result = dispatch_chunks(AI_JOB_KIND, job.id, specs, generate_ai_fitments_chunk, finalize_ai_fitment_job)
+        
+        # Status polling follows the finalizer, which carries the final counts
+        AiFitmentJob.objects.filter(id=job.id).update(celery_task_id=result.id)
+        
+        return {
+            'status': 'processing',
+            'job_id': str(job.id),
+            'product_count': len(product_ids),
+            'chunks': len(specs),
+            'finalizer_task_id': result.id,
+            'message': message
+        }
             
     except AiFitmentJob.DoesNotExist:
         error_msg = f"AI fitment job {job_id} not found"
@@ -178,6 +176,84 @@ def generate_ai_fitments_task(self, job_id):
         }
 
 
+@shared_task(**CHUNK_TASK_OPTIONS)
+def generate_ai_fitments_chunk(self, job_id, index, spec):
+    """Generate and store AI fitments for one range of a job's products"""
+    job = AiFitmentJob.objects.filter(id=job_id).first()
+    if job is None:
+        return {'failed': True, 'error': f"AI fitment job {job_id} not found"}
+    
+    product_ids = spec.get('productIds', [])
+    result = run_chunk(
+        self, AI_JOB_KIND, job_id, index,
+        prepare=lambda: generate_ai_fitments_for_products(job, product_ids),
+        apply=lambda ai_fitments: {
+            'fitments_count': store_ai_fitments(job, ai_fitments),
+            'product_count': len(product_ids),
+        },
+        tenant_id=job.tenant_id,
+    )
+    
+    finished, total = chunk_progress(AI_JOB_KIND, job_id)
+    ProgressReporter(job, percent_field='current', model_fields=()).finish(
+        current=20 + int(75 * finished / total) if total else 95,
+        total=100,
+        status=f'Generated fitments for {finished} of {total} chunks...',
+        chunks_finished=finished,
+        chunks=total
+    )
+    return result
+
+
+@shared_task(bind=True)
+def finalize_ai_fitment_job(self, results, job_id):
+    """Aggregate chunk checkpoints into the job's counts and final status"""
+    try:
+        job = AiFitmentJob.objects.get(id=job_id)
+    except AiFitmentJob.DoesNotExist:
+        error_msg = f"AI fitment job {job_id} not found"
+        logger.error(error_msg)
+        return {'status': 'failed', 'error': error_msg}
+    
+    summary = chunk_summary(AI_JOB_KIND, job_id)
+    failed_chunks = summary['failedChunks']
+    fitments_count = summary.get('fitments_count', 0)
+    progress = ProgressReporter(job, task=self, percent_field='current', model_fields=())
+    
+    if failed_chunks and len(failed_chunks) == summary['chunks']:
+        job.fitments_count = fitments_count
+        return _fail_ai_job(self, job, progress, failed_chunks[0]['error'] or 'All chunks failed')
+    
+    # Ready for review; partially failed jobs keep what the other chunks produced
+    job.fitments_count = fitments_count
+    job.status = 'review_required'
+    job.completed_at = timezone.now()
+    if failed_chunks:
+        job.error_message = (
+            f"{len(failed_chunks)} of {summary['chunks']} chunks failed: {failed_chunks[0]['error']}"
+        )
+    job.save()
+    progress.finish(current=100, total=100, status=job.status, fitments_count=fitments_count)
+    
+    message = (
+        f"Successfully generated {fitments_count} fitments from "
+        f"{summary.get('product_count', 0)} products using Azure AI"
+    )
+    logger.info(
+        f"AI fitment generation completed for job {job_id}: "
+        f"{fitments_count} fitments generated in {summary['chunks']} chunks, status: {job.status}"
+    )
+    
+    return {
+        'status': job.status,  # Should be 'review_required'
+        'job_id': str(job.id),
+        'fitments_count': fitments_count,
+        'product_count': job.product_count,
+        'failed_chunks': len(failed_chunks),
+        'message': message
+    }
+
+
 @shared_task
 def cleanup_old_ai_jobs():
     """
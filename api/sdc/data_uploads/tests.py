@@ -0,0 +1,130 @@
+import io
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from fitments.analytics import get_dashboard_snapshot
+from fitments.models import Fitment
+from tenants.models import Tenant
+from tenants.statistics import get_tenant_statistics
+
+from .models import AiFitmentJob, AiGeneratedFitment
+from .views import approve_fitments
+
+
+def make_fitment(job, part_id, **overrides):
+    values = dict(
+        tenant_id=job.tenant_id, ai_job_id=job.id, itemStatus='ReadyToApprove', partId=part_id,
+        baseVehicleId='1', year=2020, makeName='Acura', modelName='ILX', subModelName='Base',
+        driveTypeName='FWD', fuelTypeName='Gas', bodyNumDoors=4, bodyTypeName='Sedan', ptid='P1',
+        partTypeDescriptor='Brake Pad', uom='EA', fitmentTitle=part_id, position='Front', positionId=1,
+        liftHeight='Stock', wheelType='Alloy',
+    )
+    values.update(overrides)
+    return Fitment.objects.create(**values)
+
+
+class AiFitmentJobReviewTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch('fitments.analytics.get_redis', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tenant = Tenant.objects.create(name='Review Tenant')
+        self.job = AiFitmentJob.objects.create(
+            tenant=self.tenant, job_type='selection', status='review_required', fitments_count=3,
+        )
+        for part_id in ('R1', 'R2', 'R3'):
+            make_fitment(self.job, part_id)
+
+    def test_concurrent_deltas_are_not_lost(self):
+        first = AiFitmentJob.objects.get(pk=self.job.pk)
+        second = AiFitmentJob.objects.get(pk=self.job.pk)
+
+        first.apply_review_delta(approved=2)
+        second.apply_review_delta(rejected=1)
+
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.approved_count, self.job.rejected_count), (2, 1))
+        self.assertEqual(second.pending_review_count, 0)
+
+    def test_job_completes_when_no_rows_are_pending(self):
+        Fitment.objects.filter(ai_job_id=self.job.id).update(itemStatus='Active')
+        self.job.apply_review_delta(approved=3)
+
+        with self.assertNumQueries(2):
+            self.assertTrue(self.job.complete_if_reviewed())
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'completed')
+        self.assertIsNotNone(self.job.completed_at)
+        self.assertFalse(self.job.complete_if_reviewed())
+
+    def test_pending_rows_prevent_completion_and_fix_the_counters(self):
+        Fitment.objects.filter(ai_job_id=self.job.id, partId='R1').update(itemStatus='Active')
+        # A double-counted delta makes the counters claim everything was reviewed
+        self.job.apply_review_delta(approved=3)
+
+        self.assertFalse(self.job.complete_if_reviewed())
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'review_required')
+        self.assertEqual((self.job.approved_count, self.job.rejected_count), (1, 0))
+        self.assertEqual(self.job.pending_review_count, 2)
+
+    def test_negative_pending_count_is_reconciled(self):
+        Fitment.objects.filter(ai_job_id=self.job.id).update(itemStatus='Active')
+        self.job.apply_review_delta(approved=3, rejected=1)
+        self.assertEqual(self.job.pending_review_count, -1)
+
+        self.assertTrue(self.job.complete_if_reviewed())
+
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.approved_count, self.job.rejected_count, self.job.status), (3, 0, 'completed'))
+
+    def test_pending_generated_fitments_prevent_completion(self):
+        job = AiFitmentJob.objects.create(tenant=self.tenant, job_type='upload', fitments_count=2, approved_count=2)
+        for status in ('approved', 'pending'):
+            AiGeneratedFitment.objects.create(job=job, part_id='G1', year=2020, make='Acura', model='ILX', status=status)
+
+        self.assertFalse(job.complete_if_reviewed())
+        self.assertEqual((job.approved_count, job.pending_review_count), (1, 1))
+
+    def test_reconcile_command_rebuilds_counters(self):
+        Fitment.objects.filter(ai_job_id=self.job.id, partId='R1').update(itemStatus='Active')
+        Fitment.objects.filter(ai_job_id=self.job.id, partId='R2').delete()
+        AiFitmentJob.objects.filter(pk=self.job.pk).update(approved_count=5, rejected_count=4)
+
+        out = io.StringIO()
+        call_command('reconcile_ai_job_counts', tenant_id=str(self.tenant.id), stdout=out)
+
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.fitments_count, self.job.approved_count, self.job.rejected_count), (3, 1, 1))
+        self.assertIn('Reconciled 1 jobs, corrected 1', out.getvalue())
+
+    def approve(self, part_ids):
+        hashes = Fitment.objects.filter(ai_job_id=self.job.id, partId__in=part_ids).values_list('hash', flat=True)
+        request = APIRequestFactory().post(
+            f'/api/data-uploads/ai-fitment-jobs/{self.job.id}/approve/', {'fitment_ids': list(hashes)}, format='json',
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            return approve_fitments(request, job_id=self.job.id)
+
+    def test_approval_moves_statistics_to_active(self):
+        statistics = get_tenant_statistics(self.tenant)
+        self.assertEqual(statistics.fitments_by_status, {'ReadyToApprove': 3})
+
+        self.assertEqual(self.approve(['R1', 'R2']).data['approved_count'], 2)
+
+        statistics.refresh_from_db()
+        self.assertEqual(statistics.fitment_count, 3)
+        self.assertEqual(statistics.fitments_by_status, {'Active': 2, 'ReadyToApprove': 1})
+
+    def test_approval_refreshes_the_dashboard_snapshot(self):
+        fitments = Fitment.objects.filter(tenant=self.tenant)
+        self.assertEqual(get_dashboard_snapshot(fitments, [self.tenant.id])['activeFitments'], 0)
+
+        self.approve(['R1'])
+
+        self.assertEqual(get_dashboard_snapshot(fitments, [self.tenant.id])['activeFitments'], 1)
@@ -1,10 +1,14 @@
-import pandas as pd
+from __future__ import annotations
+
+from sdc.lazy_imports import lazy_module
 import json
 import logging
 from typing import List, Dict, Any, Tuple
 from django.core.exceptions import ValidationError
 from field_config.utils import FieldValidator, validate_vcdb_data, validate_product_data
 
+pd = lazy_module('pandas')
+
 logger = logging.getLogger(__name__)
 
 
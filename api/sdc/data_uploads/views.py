@@ -1,7 +1,7 @@
 import os
 import csv
 import json
-import pandas as pd
+from sdc.lazy_imports import lazy_module
 import requests
 import uuid
 from django.conf import settings
@@ -19,7 +19,7 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from fitment_uploads.azure_ai_service import azure_ai_service
+from fitment_uploads.azure_ai_service import get_azure_ai_service
 from tenants.models import Tenant
 from .models import (
     DataUploadSession, 
@@ -37,6 +37,7 @@ from .models import (
     WheelDiameter,
     Backspacing,
 )
+from fitments.analytics import fitments_changed
 from fitments.models import Fitment
 from vcdb.models import (
     Vehicle, BaseVehicle, Make, Model, SubModel, Year,
@@ -55,8 +56,11 @@ from .serializers import (
 from .utils import FileParser, VCDBValidator, ProductValidator, DataProcessor
 from .dynamic_field_validator import DynamicFieldValidator
 from .job_manager import FitmentJobManager
+from sdc.progress import read_progress
 import logging
 
+pd = lazy_module('pandas')
+
 logger = logging.getLogger(__name__)
 
 
@@ -597,7 +601,7 @@ def process_ai_fitment(request):
         logger.info(f"Processing AI fitment with {len(vcdb_data)} vehicles and {len(products_data)} products")
         
         # Process with AI
-        ai_fitments = azure_ai_service.generate_fitments(vcdb_data, products_data)
+        ai_fitments = get_azure_ai_service().generate_fitments(vcdb_data, products_data)
         
         # Create a temporary session for tracking AI results (optional)
         # This allows us to maintain the existing data structure
@@ -922,10 +926,9 @@ def apply_ai_fitments(request):
             )
         
         # Apply fitments
-        applied_count = 0
-        for ai_result in ai_results:
-            # Create AppliedFitment record
-            applied_fitment = AppliedFitment.objects.create(
+        ai_results = list(ai_results)
+        AppliedFitment.objects.bulk_create([
+            AppliedFitment(
                 session=session,
                 ai_result=ai_result,
                 part_id=ai_result.part_id,
@@ -940,25 +943,12 @@ def apply_ai_fitments(request):
                 title=f"AI Generated Fitment",
                 description=ai_result.ai_reasoning
             )
-            
-            # Check for existing fitment to avoid duplicates
-            existing_fitment = Fitment.objects.filter(
-                tenant=tenant,
-                partId=ai_result.part_id,
-                year=ai_result.year,
-                makeName=ai_result.make,
-                modelName=ai_result.model,
-                subModelName=ai_result.submodel,
-                isDeleted=False
-            ).first()
-            
-            if existing_fitment:
-                logger.warning(f"AI Fitment already exists for {ai_result.part_id} and {ai_result.year} {ai_result.make} {ai_result.model}")
-                continue
-            
-            # Create Fitment record
-            fitment = Fitment.objects.create(
-                hash=f"{tenant.id}_{uuid.uuid4().hex}",  # Include tenant ID in hash for uniqueness
+            for ai_result in ai_results
+        ])
+        
+        # Create Fitment records, unless the tenant already has them
+        fitments = {
+            ai_result.id: Fitment(
                 tenant=tenant,  # Associate with tenant
                 partId=ai_result.part_id,
                 itemStatus='Active',
@@ -987,12 +977,20 @@ def apply_ai_fitments(request):
                 createdBy='ai_system',
                 updatedBy='ai_system'
             )
-            
-            # Mark AI result as applied
-            ai_result.is_applied = True
-            ai_result.save()
-            
-            applied_count += 1
+            for ai_result in ai_results
+        }
+        inserted = {fitment.hash for fitment in Fitment.objects.bulk_create_new(fitments.values())}
+        
+        applied_ids = []
+        for ai_result in ai_results:
+            if fitments[ai_result.id].hash in inserted:
+                applied_ids.append(ai_result.id)
+            else:
+                logger.warning(f"AI Fitment already exists for {ai_result.part_id} and {ai_result.year} {ai_result.make} {ai_result.model}")
+        
+        # Mark AI results as applied
+        AIFitmentResult.objects.filter(id__in=applied_ids).update(is_applied=True)
+        applied_count = len(applied_ids)
         
         # Update job status to completed
         FitmentJobManager.update_job_status(
@@ -1076,10 +1074,8 @@ def apply_ai_fitments_direct(request):
             )
         
         # Apply fitments
-        applied_count = 0
-        for fitment_data in fitments_data:
-            # Create AppliedFitment record
-            applied_fitment = AppliedFitment.objects.create(
+        AppliedFitment.objects.bulk_create([
+            AppliedFitment(
                 session=latest_session,
                 ai_result=None,  # No AI result reference for direct application
                 part_id=fitment_data.get('part_id'),
@@ -1094,10 +1090,12 @@ def apply_ai_fitments_direct(request):
                 title=f"AI Generated Fitment",
                 description=fitment_data.get('ai_reasoning', '')
             )
-            
-            # Create Fitment record
-            fitment = Fitment.objects.create(
-                hash=f"{tenant.id}_{uuid.uuid4().hex}",  # Include tenant ID in hash for uniqueness
+            for fitment_data in fitments_data
+        ])
+        
+        # Create Fitment records, unless the tenant already has them
+        fitments = [
+            Fitment(
                 tenant=tenant,  # Associate with tenant
                 partId=fitment_data.get('part_id'),
                 itemStatus='Active',
@@ -1130,8 +1128,13 @@ def apply_ai_fitments_direct(request):
                 # Include dynamic fields
                 dynamicFields=fitment_data.get('dynamicFields', {})
             )
-            
-            applied_count += 1
+            for fitment_data in fitments_data
+        ]
+        inserted = {fitment.hash for fitment in Fitment.objects.bulk_create_new(fitments)}
+        for fitment in fitments:
+            if fitment.hash not in inserted:
+                logger.warning(f"AI Fitment already exists for {fitment.partId} and {fitment.year} {fitment.makeName} {fitment.modelName}")
+        applied_count = len(inserted)
         
         return Response({
             'message': f'Successfully applied {applied_count} fitments',
@@ -2474,24 +2477,15 @@ def approve_fitments(request, job_id):
             updatedBy=request.user.email if request.user.is_authenticated else 'AI System',
             updatedAt=timezone.now()
         )
+        if approved_count:
+            fitments_changed([job.tenant_id], {
+                (job.tenant_id, 'ReadyToApprove', False): -approved_count,
+                (job.tenant_id, 'Active', False): approved_count,
+            })
         
-        # Update job approved count
-        job.approved_count = Fitment.objects.filter(
-            ai_job_id=job.id,
-            itemStatus='Active'
-        ).count()
-        
-        # Check if all fitments are reviewed (no more ReadyToApprove)
-        remaining_to_review = Fitment.objects.filter(
-            ai_job_id=job.id,
-            itemStatus='ReadyToApprove'
-        ).count()
-        
-        if remaining_to_review == 0:
-            job.status = 'completed'
-            job.completed_at = timezone.now()
-        
-        job.save()
+        # Update job counters from the rows actually changed
+        job.apply_review_delta(approved=approved_count)
+        job.complete_if_reviewed()
         
         return Response({
             'approved_count': approved_count,
@@ -2564,7 +2558,8 @@ def get_ai_job_status(request, job_id):
         
         return Response({
             'job': job_serializer.data,
-            'task': task_info
+            'task': task_info,
+            'progress': read_progress(job)
         })
         
     except AiFitmentJob.DoesNotExist:
@@ -2609,25 +2604,14 @@ def reject_fitments(request, job_id):
             itemStatus='ReadyToApprove'
         )
         
-        rejected_count = fitments_to_reject.count()
-        
         # Delete fitments from Fitment table
-        fitments_to_reject.delete()
-        
-        # Update job rejected count
-        job.rejected_count += rejected_count
-        
-        # Check if all fitments are reviewed (no more ReadyToApprove)
-        remaining_to_review = Fitment.objects.filter(
-            ai_job_id=job.id,
-            itemStatus='ReadyToApprove'
-        ).count()
-        
-        if remaining_to_review == 0:
-            job.status = 'completed'
-            job.completed_at = timezone.now()
+        rejected_count, _ = fitments_to_reject.delete()
+        if rejected_count:
+            fitments_changed([job.tenant_id], {(job.tenant_id, 'ReadyToApprove', False): -rejected_count})
         
-        job.save()
+        # Update job counters from the rows actually deleted
+        job.apply_review_delta(rejected=rejected_count)
+        job.complete_if_reviewed()
         
         return Response({
             'rejected_count': rejected_count,
@@ -2750,7 +2734,8 @@ def get_job_progress(request, job_id):
         serializer = AiFitmentJobSerializer(job)
         return Response({
             'job': serializer.data,
-            'task_status': task_status
+            'task_status': task_status,
+            'progress': read_progress(job)
         })
         
     except AiFitmentJob.DoesNotExist:
@@ -2788,8 +2773,7 @@ def bulk_approve_fitments(request, job_id):
         ).update(status='approved')
         
         # Update job counts
-        job.approved_count += updated_count
-        job.save()
+        job.apply_review_delta(approved=updated_count)
         
         return Response({
             'message': f'Successfully approved {updated_count} fitments',
@@ -2831,8 +2815,7 @@ def bulk_reject_fitments(request, job_id):
         ).update(status='rejected')
         
         # Update job counts
-        job.rejected_count += updated_count
-        job.save()
+        job.apply_review_delta(rejected=updated_count)
         
         return Response({
             'message': f'Successfully rejected {updated_count} fitments',
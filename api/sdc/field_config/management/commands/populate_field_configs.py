@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from field_config.models import FieldConfiguration
+from field_config.schema import invalidate_field_schemas
 
 
 class Command(BaseCommand):
@@ -253,6 +254,8 @@ class Command(BaseCommand):
                     self.style.WARNING(f'Product field already exists: {field.display_name}')
                 )
 
+        invalidate_field_schemas()
+
         total_fields = FieldConfiguration.objects.count()
         self.stdout.write(
             self.style.SUCCESS(f'Total field configurations: {total_fields}')
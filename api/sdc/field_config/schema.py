@@ -0,0 +1,269 @@
+"""
+Compiled field configuration schemas.
+
+A tenant's enabled FieldConfiguration rows are compiled once into an immutable
+CompiledSchema (precomputed bounds, enum sets, date layouts) and cached per
+(tenant, reference_type, config version). FieldConfigurationViewSet bumps the
+version on every change, so validators never re-read stale rules and
+validation-heavy code paths never re-query the configuration per row.
+
+The version is shared across processes through Redis but read from it at most
+every FIELD_CONFIG_VERSION_TTL_SECONDS; a change made in this process takes
+effect immediately, one made elsewhere within that interval.
+"""
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import models
+
+from .models import FieldConfiguration
+from sdc.redis_client import get_redis, reset_redis
+
+VERSION_KEY = 'field-config:version'
+
+BOOLEAN_VALUES = frozenset(['true', '1', 'yes', 'on', 'false', '0', 'no', 'off'])
+
+# Each supported date layout is recognised by its shape first, so a value is
+# parsed with exactly one strptime format (two for ambiguous m/d vs d/m dates)
+DATE_PATTERNS = (
+    (re.compile(r'^\d{4}-\d{1,2}-\d{1,2}$'), ('%Y-%m-%d',)),
+    (re.compile(r'^\d{1,2}/\d{1,2}/\d{4}$'), ('%m/%d/%Y', '%d/%m/%Y')),
+    (re.compile(r'^\d{4}-\d{1,2}-\d{1,2} \d{1,2}:\d{2}:\d{2}$'), ('%Y-%m-%d %H:%M:%S',)),
+)
+
+_local_version = 0
+# (monotonic time the Redis version must be re-read after, Redis version)
+_shared_version: Tuple[float, int] = (0.0, 0)
+_schemas: Dict[Tuple[Optional[str], str, bool, Tuple[int, int]], 'CompiledSchema'] = {}
+_lock = threading.Lock()
+
+
+class DateLayout:
+    """
+    The date format of one field's values. It is detected from the first
+    value and tried first for the following ones; a value in another layout
+    is detected again, so mixed columns validate as before.
+    """
+
+    def __init__(self):
+        self.format: Optional[str] = None
+
+    def parse(self, value: str) -> Optional[datetime]:
+        fmt = self.format
+        if fmt is not None:
+            try:
+                return datetime.strptime(value, fmt)
+            except ValueError:
+                pass
+        for pattern, formats in DATE_PATTERNS:
+            if pattern.match(value):
+                for fmt in formats:
+                    try:
+                        parsed = datetime.strptime(value, fmt)
+                    except ValueError:
+                        continue
+                    self.format = fmt
+                    return parsed
+                return None
+        return None
+
+
+@dataclass(frozen=True)
+class CompiledField:
+    """Validation rules for one field, derived once from its configuration"""
+    name: str
+    display_name: str
+    field_type: str
+    required: bool
+    min_length: Optional[int]
+    max_length: Optional[int]
+    min_value: Optional[float]
+    max_value: Optional[float]
+    enum_options: FrozenSet[str]
+    enum_display: str
+    date_layout: DateLayout
+
+    @classmethod
+    def from_config(cls, config: FieldConfiguration) -> 'CompiledField':
+        return cls(
+            name=config.name,
+            display_name=config.display_name,
+            field_type=config.field_type,
+            required=config.is_required,
+            min_length=config.min_length,
+            max_length=config.max_length,
+            min_value=float(config.min_value) if config.min_value is not None else None,
+            max_value=float(config.max_value) if config.max_value is not None else None,
+            enum_options=frozenset(config.enum_options or []),
+            enum_display=', '.join(config.enum_options or []),
+            date_layout=DateLayout(),
+        )
+
+    def validate(self, value: Any) -> Optional[str]:
+        """Return an error message for an invalid non-empty value, else None"""
+        field_type = self.field_type
+
+        if field_type in ('string', 'text'):
+            if not isinstance(value, str):
+                return f"Field '{self.display_name}' must be a string"
+            value_len = len(value)
+            if self.min_length is not None and value_len < self.min_length:
+                return f"Field '{self.display_name}' must be at least {self.min_length} characters"
+            if self.max_length is not None and value_len > self.max_length:
+                return f"Field '{self.display_name}' must be at most {self.max_length} characters"
+
+        elif field_type in ('number', 'decimal', 'integer'):
+            try:
+                num_value = int(value) if field_type == 'integer' else float(value)
+            except (ValueError, TypeError):
+                return f"Field '{self.display_name}' must be a valid number"
+            if self.min_value is not None and num_value < self.min_value:
+                return f"Field '{self.display_name}' must be at least {self.min_value}"
+            if self.max_value is not None and num_value > self.max_value:
+                return f"Field '{self.display_name}' must be at most {self.max_value}"
+
+        elif field_type == 'boolean':
+            if not isinstance(value, bool) and not (
+                isinstance(value, str) and value.lower() in BOOLEAN_VALUES
+            ):
+                return f"Field '{self.display_name}' must be a boolean value"
+
+        elif field_type == 'enum':
+            try:
+                allowed = value in self.enum_options
+            except TypeError:
+                allowed = False
+            if not allowed:
+                return f"Field '{self.display_name}' must be one of: {self.enum_display}"
+
+        elif field_type == 'date':
+            if not isinstance(value, datetime) and not (
+                isinstance(value, str) and self.date_layout.parse(value) is not None
+            ):
+                return f"Field '{self.display_name}' must be a valid date"
+
+        return None
+
+
+def parse_date(value: str) -> Optional[datetime]:
+    """Parse a date string in any supported layout, or return None"""
+    return DateLayout().parse(value)
+
+
+class CompiledSchema:
+    """Immutable, precompiled view of a reference type's enabled fields"""
+
+    def __init__(self, configs: List[FieldConfiguration]):
+        # Later rows win on duplicate names, matching the previous dict build
+        by_name = {config.name: config for config in configs}
+        self.configs: Dict[str, FieldConfiguration] = by_name
+        self.fields: Tuple[CompiledField, ...] = tuple(
+            CompiledField.from_config(config) for config in by_name.values()
+        )
+        self.required_fields: Tuple[str, ...] = tuple(f.name for f in self.fields if f.required)
+        self.optional_fields: Tuple[str, ...] = tuple(
+            config.name for config in by_name.values() if config.requirement_level == 'optional'
+        )
+        self.form_fields: Tuple[FieldConfiguration, ...] = tuple(
+            config for config in by_name.values() if config.show_in_forms
+        )
+        self.filter_fields: Tuple[FieldConfiguration, ...] = tuple(
+            config for config in by_name.values() if config.show_in_filters
+        )
+        self.defaults: Tuple[Tuple[str, str], ...] = tuple(
+            (config.name, config.default_value)
+            for config in by_name.values() if config.default_value
+        )
+
+    def validate(self, data: Dict[str, Any]) -> Tuple[bool, Dict[str, List[str]]]:
+        """Validate one record; same contract as FieldValidator.validate_data"""
+        errors = {}
+        for field in self.fields:
+            value = data.get(field.name)
+            if value is None or value == "":
+                if field.required:
+                    errors[field.name] = [f"Field '{field.display_name}' is required"]
+                continue
+
+            error = field.validate(value)
+            if error:
+                errors[field.name] = [error]
+
+        return len(errors) == 0, errors
+
+
+def get_config_version() -> Tuple[int, int]:
+    """Current field configuration version: (changes made here, changes recorded in Redis)"""
+    global _shared_version
+
+    expires_at, shared = _shared_version
+    now = time.monotonic()
+    if now >= expires_at:
+        client = get_redis()
+        if client is not None:
+            try:
+                shared = int(client.get(VERSION_KEY) or 0)
+            except Exception:
+                reset_redis()
+        _shared_version = (now + getattr(settings, 'FIELD_CONFIG_VERSION_TTL_SECONDS', 5), shared)
+    return _local_version, shared
+
+
+def invalidate_field_schemas() -> None:
+    """Bump the configuration version so every process recompiles on next use"""
+    global _local_version, _shared_version
+
+    with _lock:
+        _local_version += 1
+        _shared_version = (0.0, _shared_version[1])
+        _schemas.clear()
+
+    client = get_redis()
+    if client is not None:
+        try:
+            client.incr(VERSION_KEY)
+        except Exception:
+            reset_redis()
+
+
+def get_compiled_schema(reference_type: str, tenant=None, include_both: bool = True) -> CompiledSchema:
+    """
+    Return the compiled schema for a reference type.
+
+    ``tenant`` restricts the rows to one tenant; without it all enabled rows
+    are used, as FieldValidator always did. ``include_both`` adds fields whose
+    reference_type is 'both'.
+    """
+    tenant_id = str(getattr(tenant, 'id', tenant)) if tenant is not None else None
+    key = (tenant_id, reference_type, include_both, get_config_version())
+
+    schema = _schemas.get(key)
+    if schema is not None:
+        return schema
+
+    if include_both:
+        condition = models.Q(reference_type=reference_type) | models.Q(reference_type='both')
+    else:
+        condition = models.Q(reference_type=reference_type)
+    # Fields are validated and listed in display order, within each reference type
+    queryset = FieldConfiguration.objects.filter(condition, is_enabled=True).order_by(
+        'reference_type', 'display_order', 'name',
+    )
+    if tenant_id is not None:
+        queryset = queryset.filter(tenant_id=tenant_id)
+
+    schema = CompiledSchema(list(queryset))
+
+    with _lock:
+        # Drop schemas compiled for older versions
+        stale = [k for k in _schemas if k[3] != key[3]]
+        for k in stale:
+            del _schemas[k]
+        _schemas[key] = schema
+
+    return schema
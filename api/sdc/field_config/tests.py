@@ -0,0 +1,125 @@
+from unittest import mock
+
+import pandas as pd
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from data_uploads.dynamic_field_validator import DynamicFieldValidator
+
+from . import schema
+from .models import FieldConfiguration
+from .schema import DateLayout, get_compiled_schema, invalidate_field_schemas
+from .utils import FieldValidator
+from .views import FieldConfigurationViewSet
+
+
+class FakeRedis:
+    """The GET and INCR calls the schema cache makes"""
+
+    def __init__(self):
+        self.values = {}
+        self.gets = 0
+
+    def get(self, key):
+        self.gets += 1
+        return self.values.get(key)
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key) or 0) + 1
+        return self.values[key]
+
+
+def make_config(name, display_order, **overrides):
+    values = dict(
+        name=name, display_name=name.title(), field_type='string', reference_type='vcdb',
+        requirement_level='required', display_order=display_order,
+    )
+    values.update(overrides)
+    return FieldConfiguration.objects.create(**values)
+
+
+class CompiledSchemaTests(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        patcher = mock.patch.object(schema, 'get_redis', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        invalidate_field_schemas()
+        self.model = make_config('model', 2)
+        self.make = make_config('make', 1)
+        self.year = make_config('year', 3, field_type='integer', reference_type='both')
+
+    def test_fields_follow_display_order(self):
+        self.assertEqual(list(DynamicFieldValidator('vcdb').field_configs), ['make', 'model'])
+        self.assertEqual(list(FieldValidator('vcdb').field_configs), ['year', 'make', 'model'])
+
+        is_valid, errors = DynamicFieldValidator('vcdb').validate_dataframe(pd.DataFrame({'other': [1]}))
+        self.assertFalse(is_valid)
+        self.assertEqual(errors, [
+            "Required field 'Make' (make) is missing",
+            "Required field 'Model' (model) is missing",
+        ])
+
+    def test_schema_is_reused_until_a_configuration_is_saved(self):
+        first = get_compiled_schema('vcdb')
+        version = self.redis.values[schema.VERSION_KEY]
+        with self.assertNumQueries(0):
+            self.assertIs(get_compiled_schema('vcdb'), first)
+            FieldValidator('vcdb')
+
+        request = APIRequestFactory().patch(
+            f'/api/field-config/fields/{self.make.id}/', {'display_order': 5}, format='json',
+        )
+        force_authenticate(request, user=User.objects.create_user('configurer'))
+        response = FieldConfigurationViewSet.as_view({'patch': 'partial_update'})(request, pk=self.make.id)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.redis.values[schema.VERSION_KEY], version + 1)
+        self.assertEqual(list(get_compiled_schema('vcdb', include_both=False).configs), ['model', 'make'])
+
+    def test_shared_version_is_read_once_per_interval(self):
+        get_compiled_schema('vcdb')
+        gets = self.redis.gets
+        for _ in range(5):
+            FieldValidator('vcdb')
+        self.assertEqual(self.redis.gets, gets)
+
+        # Another process saved a configuration
+        self.redis.incr(schema.VERSION_KEY)
+        FieldConfiguration.objects.filter(pk=self.model.pk).update(is_enabled=False)
+        self.assertIn('model', get_compiled_schema('vcdb').configs)
+        # The interval elapsed
+        schema._shared_version = (0.0, schema._shared_version[1])
+        self.assertNotIn('model', get_compiled_schema('vcdb').configs)
+        self.assertEqual(self.redis.gets, gets + 1)
+
+    def test_compiled_date_field_validates_mixed_values(self):
+        make_config('released', 4, field_type='date', requirement_level='optional')
+
+        validator = FieldValidator('vcdb')
+        record = {'make': 'Acura', 'model': 'ILX', 'year': 2024}
+        self.assertTrue(validator.validate_data(dict(record, released='01/31/2024'))[0])
+        self.assertTrue(validator.validate_data(dict(record, released='2024-01-31 10:00:00'))[0])
+        self.assertEqual(
+            validator.validate_data(dict(record, released='31-01-2024'))[1],
+            {'released': ["Field 'Released' must be a valid date"]},
+        )
+
+
+class DateLayoutTests(SimpleTestCase):
+    def test_detected_format_is_reused(self):
+        layout = DateLayout()
+        self.assertIsNotNone(layout.parse('2024-01-31'))
+        self.assertEqual(layout.format, '%Y-%m-%d')
+
+        with mock.patch.object(schema, 'DATE_PATTERNS', ()):
+            # Same layout: parsed without detecting it again
+            self.assertIsNotNone(layout.parse('2024-02-29'))
+
+        # Other layouts are still accepted, including day-first dates
+        self.assertIsNotNone(layout.parse('31/01/2024'))
+        self.assertEqual(layout.format, '%d/%m/%Y')
+        self.assertIsNotNone(layout.parse('2024-03-01'))
+        self.assertIsNone(layout.parse('2024-02-30'))
+        self.assertIsNone(layout.parse('yesterday'))
@@ -1,7 +1,7 @@
 from typing import Dict, List, Any, Tuple, Optional
 from django.core.exceptions import ValidationError
-from django.db import models
 from .models import FieldConfiguration
+from .schema import get_compiled_schema
 
 
 class FieldValidationError(ValidationError):
@@ -12,23 +12,10 @@ class FieldValidationError(ValidationError):
 class FieldValidator:
     """Utility class for validating field data based on configuration"""
     
-    def __init__(self, reference_type: str):
+    def __init__(self, reference_type: str, tenant=None):
         self.reference_type = reference_type
-        self.field_configs = self._load_field_configs()
-    
-    def _load_field_configs(self) -> Dict[str, FieldConfiguration]:
-        """Load field configurations for the reference type"""
-        configs = {}
-        fields = FieldConfiguration.objects.filter(
-            models.Q(reference_type=self.reference_type) | 
-            models.Q(reference_type='both'),
-            is_enabled=True
-        )
-        
-        for field in fields:
-            configs[field.name] = field
-        
-        return configs
+        self.schema = get_compiled_schema(reference_type, tenant)
+        self.field_configs = self.schema.configs
     
     def validate_data(self, data: Dict[str, Any]) -> Tuple[bool, Dict[str, List[str]]]:
         """
@@ -37,168 +24,31 @@ class FieldValidator:
         Returns:
             Tuple of (is_valid, errors_dict)
         """
-        errors = {}
-        
-        for field_name, field_config in self.field_configs.items():
-            field_errors = []
-            value = data.get(field_name)
-            
-            # Check if required field is missing
-            if field_config.is_required and (value is None or value == ""):
-                field_errors.append(f"Field '{field_config.display_name}' is required")
-                continue
-            
-            # Skip validation for empty optional fields
-            if not field_config.is_required and (value is None or value == ""):
-                continue
-            
-            # Validate field value
-            try:
-                self._validate_field_value(field_config, value)
-            except FieldValidationError as e:
-                field_errors.extend(e.messages)
-            
-            if field_errors:
-                errors[field_name] = field_errors
-        
-        return len(errors) == 0, errors
-    
-    def _validate_field_value(self, field_config: FieldConfiguration, value: Any) -> None:
-        """Validate a single field value"""
-        field_type = field_config.field_type
-        
-        # Type-specific validation
-        if field_type == 'string':
-            self._validate_string_field(field_config, value)
-        elif field_type == 'text':
-            self._validate_text_field(field_config, value)
-        elif field_type in ['number', 'decimal', 'integer']:
-            self._validate_numeric_field(field_config, value)
-        elif field_type == 'boolean':
-            self._validate_boolean_field(field_config, value)
-        elif field_type == 'enum':
-            self._validate_enum_field(field_config, value)
-        elif field_type == 'date':
-            self._validate_date_field(field_config, value)
-    
-    def _validate_string_field(self, field_config: FieldConfiguration, value: Any) -> None:
-        """Validate string field"""
-        if not isinstance(value, str):
-            raise FieldValidationError(f"Field '{field_config.display_name}' must be a string")
-        
-        value_len = len(value)
-        
-        if field_config.min_length is not None and value_len < field_config.min_length:
-            raise FieldValidationError(
-                f"Field '{field_config.display_name}' must be at least {field_config.min_length} characters"
-            )
-        
-        if field_config.max_length is not None and value_len > field_config.max_length:
-            raise FieldValidationError(
-                f"Field '{field_config.display_name}' must be at most {field_config.max_length} characters"
-            )
-    
-    def _validate_text_field(self, field_config: FieldConfiguration, value: Any) -> None:
-        """Validate text field (same as string but typically longer)"""
-        self._validate_string_field(field_config, value)
-    
-    def _validate_numeric_field(self, field_config: FieldConfiguration, value: Any) -> None:
-        """Validate numeric field"""
-        try:
-            if field_config.field_type == 'integer':
-                num_value = int(value)
-            else:
-                num_value = float(value)
-        except (ValueError, TypeError):
-            raise FieldValidationError(f"Field '{field_config.display_name}' must be a valid number")
-        
-        if field_config.min_value is not None and num_value < field_config.min_value:
-            raise FieldValidationError(
-                f"Field '{field_config.display_name}' must be at least {field_config.min_value}"
-            )
-        
-        if field_config.max_value is not None and num_value > field_config.max_value:
-            raise FieldValidationError(
-                f"Field '{field_config.display_name}' must be at most {field_config.max_value}"
-            )
-    
-    def _validate_boolean_field(self, field_config: FieldConfiguration, value: Any) -> None:
-        """Validate boolean field"""
-        if isinstance(value, bool):
-            return
-        
-        if isinstance(value, str):
-            if value.lower() in ['true', '1', 'yes', 'on']:
-                return
-            elif value.lower() in ['false', '0', 'no', 'off']:
-                return
-        
-        raise FieldValidationError(f"Field '{field_config.display_name}' must be a boolean value")
-    
-    def _validate_enum_field(self, field_config: FieldConfiguration, value: Any) -> None:
-        """Validate enum field"""
-        if value not in field_config.enum_options:
-            options_str = ', '.join(field_config.enum_options)
-            raise FieldValidationError(
-                f"Field '{field_config.display_name}' must be one of: {options_str}"
-            )
-    
-    def _validate_date_field(self, field_config: FieldConfiguration, value: Any) -> None:
-        """Validate date field"""
-        from datetime import datetime
-        
-        if isinstance(value, datetime):
-            return
-        
-        if isinstance(value, str):
-            try:
-                # Try common date formats
-                for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y-%m-%d %H:%M:%S']:
-                    try:
-                        datetime.strptime(value, fmt)
-                        return
-                    except ValueError:
-                        continue
-            except:
-                pass
-        
-        raise FieldValidationError(f"Field '{field_config.display_name}' must be a valid date")
+        return self.schema.validate(data)
     
     def get_required_fields(self) -> List[str]:
         """Get list of required field names"""
-        return [
-            field.name for field in self.field_configs.values()
-            if field.is_required
-        ]
+        return list(self.schema.required_fields)
     
     def get_optional_fields(self) -> List[str]:
         """Get list of optional field names"""
-        return [
-            field.name for field in self.field_configs.values()
-            if field.requirement_level == 'optional'
-        ]
+        return list(self.schema.optional_fields)
     
     def get_form_fields(self) -> List[FieldConfiguration]:
         """Get field configurations for form rendering"""
-        return [
-            field for field in self.field_configs.values()
-            if field.show_in_forms
-        ]
+        return list(self.schema.form_fields)
     
     def get_filter_fields(self) -> List[FieldConfiguration]:
         """Get field configurations for filter rendering"""
-        return [
-            field for field in self.field_configs.values()
-            if field.show_in_filters
-        ]
+        return list(self.schema.filter_fields)
     
     def apply_default_values(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Apply default values for missing optional fields"""
         result = data.copy()
         
-        for field_name, field_config in self.field_configs.items():
-            if field_name not in result and field_config.default_value:
-                result[field_name] = field_config.default_value
+        for field_name, default_value in self.schema.defaults:
+            if field_name not in result:
+                result[field_name] = default_value
         
         return result
 
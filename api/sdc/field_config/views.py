@@ -12,6 +12,7 @@ from .serializers import (
     FieldConfigurationHistorySerializer
 )
 from .filters import FieldConfigurationFilter
+from .schema import invalidate_field_schemas
 
 
 class FieldConfigurationViewSet(viewsets.ModelViewSet):
@@ -87,6 +88,7 @@ class FieldConfigurationViewSet(viewsets.ModelViewSet):
             created_by=self.request.user.username if hasattr(self.request, 'user') else 'system',
             tenant=tenant
         )
+        invalidate_field_schemas()
     
     def perform_update(self, serializer):
         """Update field configuration and create history record"""
@@ -130,6 +132,8 @@ class FieldConfigurationViewSet(viewsets.ModelViewSet):
                 new_values=new_values,
                 reason=self.request.data.get('reason', '')
             )
+        
+        invalidate_field_schemas()
     
     def destroy(self, request, *args, **kwargs):
         """Hard delete field configuration"""
@@ -176,6 +180,7 @@ class FieldConfigurationViewSet(viewsets.ModelViewSet):
         # Hard delete - completely remove from database
         # The history record will remain with field_config set to NULL
         instance.delete()
+        invalidate_field_schemas()
         
         return Response(
             {'message': 'Field configuration deleted successfully'},
@@ -189,6 +194,7 @@ class FieldConfigurationViewSet(viewsets.ModelViewSet):
         old_enabled = field_config.is_enabled
         field_config.is_enabled = not field_config.is_enabled
         field_config.save(update_fields=['is_enabled'])
+        invalidate_field_schemas()
         
         # Create history record
         tenant = self.get_tenant()
@@ -1,10 +1,9 @@
 import os
 import json
-import pandas as pd
+import threading
 from typing import List, Dict, Any
 from django.conf import settings
 import asyncio
-from openai import AzureOpenAI
 
 
 class AzureAIService:
@@ -17,6 +16,9 @@ class AzureAIService:
         
         # Initialize Azure OpenAI client
         if self._initialized:
+            # The OpenAI SDK is only loaded by processes that call the AI
+            from openai import AzureOpenAI
+
             self.client = AzureOpenAI(
                 api_version=self.api_version,
                 azure_endpoint=self.endpoint,
@@ -287,5 +289,23 @@ Generate 15-20 fitments. Return ONLY JSON array:
         return fitments
 
 
-# Global instance
-azure_ai_service = AzureAIService()
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_azure_ai_service() -> AzureAIService:
+    """The process-wide service, constructed on first use"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = AzureAIService()
+    return _service
+
+
+def __getattr__(name):
+    # ``from fitment_uploads.azure_ai_service import azure_ai_service`` keeps
+    # working and builds the service at that point rather than at import
+    if name == 'azure_ai_service':
+        return get_azure_ai_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -6,7 +6,7 @@ from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.views import View
-import pandas as pd
+from sdc.lazy_imports import lazy_module
 import json
 import asyncio
 import uuid
@@ -23,7 +23,9 @@ from .serializers import (
     AIFitmentRequestSerializer,
     ApplyFitmentsRequestSerializer
 )
-from .azure_ai_service import azure_ai_service
+from .azure_ai_service import get_azure_ai_service
+
+pd = lazy_module('pandas')
 
 
 @api_view(['POST'])
@@ -122,7 +124,7 @@ def process_ai_fitment(request):
         products_data = parse_file_data(session.products_file)
         
         # Process with AI
-        ai_fitments = azure_ai_service.generate_fitments(vcdb_data, products_data)
+        ai_fitments = get_azure_ai_service().generate_fitments(vcdb_data, products_data)
         
         # Save AI results
         ai_results = []
@@ -198,10 +200,9 @@ def apply_ai_fitments(request):
             )
         
         # Apply fitments
-        applied_count = 0
-        for ai_result in ai_results:
-            # Create AppliedFitment record
-            applied_fitment = AppliedFitment.objects.create(
+        ai_results = list(ai_results)
+        AppliedFitment.objects.bulk_create([
+            AppliedFitment(
                 session=session,
                 ai_result=ai_result,
                 part_id=ai_result.part_id,
@@ -216,25 +217,12 @@ def apply_ai_fitments(request):
                 title=f"AI Generated Fitment",
                 description=ai_result.ai_reasoning
             )
-            
-            # Check for existing fitment to avoid duplicates within tenant
-            existing_fitment = Fitment.objects.filter(
-                tenant=session.tenant,  # Check within tenant scope
-                partId=ai_result.part_id,
-                year=ai_result.year,
-                makeName=ai_result.make,
-                modelName=ai_result.model,
-                subModelName=ai_result.submodel,
-                isDeleted=False
-            ).first()
-            
-            if existing_fitment:
-                logger.warning(f"AI Fitment already exists for {ai_result.part_id} and {ai_result.year} {ai_result.make} {ai_result.model} in tenant {session.tenant.id}")
-                continue
-            
-            # Create Fitment record with tenant association
-            fitment = Fitment.objects.create(
-                hash=f"{session.tenant.id}_{uuid.uuid4().hex}",  # Include tenant ID in hash for uniqueness
+            for ai_result in ai_results
+        ])
+        
+        # Create Fitment records with tenant association, unless the tenant already has them
+        fitments = {
+            ai_result.id: Fitment(
                 tenant=session.tenant,  # Associate with tenant
                 partId=ai_result.part_id,
                 itemStatus='Active',
@@ -263,12 +251,20 @@ def apply_ai_fitments(request):
                 createdBy='ai_system',
                 updatedBy='ai_system'
             )
-            
-            # Mark AI result as applied
-            ai_result.is_applied = True
-            ai_result.save()
-            
-            applied_count += 1
+            for ai_result in ai_results
+        }
+        inserted = {fitment.hash for fitment in Fitment.objects.bulk_create_new(fitments.values())}
+        
+        applied_ids = []
+        for ai_result in ai_results:
+            if fitments[ai_result.id].hash in inserted:
+                applied_ids.append(ai_result.id)
+            else:
+                logger.warning(f"AI Fitment already exists for {ai_result.part_id} and {ai_result.year} {ai_result.make} {ai_result.model} in tenant {session.tenant.id}")
+        
+        # Mark AI results as applied
+        AIFitmentResult.objects.filter(id__in=applied_ids).update(is_applied=True)
+        applied_count = len(applied_ids)
         
         return Response({
             'message': f'Successfully applied {applied_count} fitments',
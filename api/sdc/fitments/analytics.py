@@ -0,0 +1,164 @@
+"""
+Fitment dashboard analytics.
+
+``compute_dashboard`` derives every dashboard metric from three queries: one
+conditional aggregate over the fitments (totals, per status, per type, the
+30-day window and the five-year histogram), the distinct vehicle
+configuration count and the top makes.
+
+``get_dashboard_snapshot`` serves a stored result per scope (one tenant, a set
+of tenants, or all fitments). Snapshots live in Redis for
+DASHBOARD_SNAPSHOT_TTL_SECONDS and carry the generation of every tenant they
+cover; ``invalidate_dashboard`` bumps those generations after a write commits,
+so the next read recomputes. Without Redis the same is kept per process.
+
+Fitment writers report changes through ``fitments_changed``, which also
+applies them to the tenants' stored statistics.
+"""
+import json
+import logging
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from sdc.redis_client import get_redis, reset_redis
+from tenants.statistics import record_fitment_changes
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'fitment-dashboard'
+ALL_SCOPE = 'all'
+AI_FITMENT_TYPES = ['ai_fitment', 'potential_fitment']
+RECENT_ACTIVITY_DAYS = 30
+YEARLY_STATS_YEARS = 5
+TOP_MAKES = 5
+
+_lock = threading.Lock()
+_local_generations: Dict[str, int] = {}
+_local_snapshots: Dict[str, tuple] = {}
+
+
+def compute_dashboard(queryset) -> Dict:
+    """Dashboard metrics for a fitment queryset"""
+    now = timezone.now()
+    years = list(range(now.year - YEARLY_STATS_YEARS + 1, now.year + 1))
+
+    yearly = {f"year{year}": Count('pk', filter=Q(year=year)) for year in years}
+    totals = queryset.aggregate(
+        totalFitments=Count('pk'),
+        manualFitments=Count('pk', filter=Q(fitmentType='manual_fitment')),
+        aiFitments=Count('pk', filter=Q(fitmentType__in=AI_FITMENT_TYPES)),
+        totalParts=Count('partId', distinct=True),
+        recentActivity=Count('pk', filter=Q(createdAt__gte=now - timedelta(days=RECENT_ACTIVITY_DAYS))),
+        activeFitments=Count('pk', filter=Q(itemStatus='Active')),
+        inactiveFitments=Count('pk', filter=Q(itemStatus='Inactive')),
+        pendingReviewCount=Count('pk', filter=Q(itemStatus__iexact='pending') | Q(itemStatus__iexact='review')),
+        **yearly,
+    )
+    yearly_stats = [{'year': year, 'count': totals.pop(f"year{year}")} for year in years]
+
+    total_vcdb_configs = queryset.values('year', 'makeName', 'modelName', 'subModelName').distinct().count()
+    top_makes = list(
+        queryset.values('makeName').annotate(count=Count('pk')).order_by('-count', 'makeName')[:TOP_MAKES]
+    )
+
+    total = totals['totalFitments']
+    return {
+        **totals,
+        'totalVcdbConfigs': total_vcdb_configs,
+        'successRate': round(totals['activeFitments'] / total * 100, 1) if total else 0,
+        # Simplified: fitments per distinct vehicle configuration, capped at 100
+        'coveragePercentage': min(100, round(total / max(total_vcdb_configs, 1) * 100, 1)),
+        'topMakes': top_makes,
+        'yearlyStats': yearly_stats,
+        'lastUpdated': now.isoformat(),
+    }
+
+
+def _scope(tenant_ids: Optional[Iterable]) -> str:
+    if tenant_ids is None:
+        return ALL_SCOPE
+    return ','.join(sorted(str(tenant_id) for tenant_id in tenant_ids))
+
+
+def _generation_keys(scope: str) -> List[str]:
+    return [f"{KEY_PREFIX}:gen:{name}" for name in scope.split(',')]
+
+
+def get_dashboard_snapshot(queryset, tenant_ids: Optional[Iterable] = None) -> Dict:
+    """
+    Dashboard metrics for ``queryset``, which must cover exactly the fitments
+    of ``tenant_ids`` (None: all fitments). Reuses the stored snapshot unless
+    it expired or one of the tenants changed since.
+    """
+    scope = _scope(tenant_ids)
+    ttl = getattr(settings, 'DASHBOARD_SNAPSHOT_TTL_SECONDS', 60)
+    snapshot_key = f"{KEY_PREFIX}:snapshot:{scope}"
+    generation_keys = _generation_keys(scope)
+
+    client = get_redis()
+    if client is not None:
+        try:
+            cached, *generations = client.mget([snapshot_key] + generation_keys)
+            if cached:
+                stored = json.loads(cached)
+                if stored['generations'] == generations:
+                    return stored['data']
+            data = compute_dashboard(queryset)
+            client.set(snapshot_key, json.dumps({'generations': generations, 'data': data}), ex=ttl)
+            return data
+        except Exception as e:
+            logger.warning(f"Dashboard snapshot unavailable for {scope}: {str(e)}")
+            reset_redis()
+
+    with _lock:
+        generations = [_local_generations.get(key, 0) for key in generation_keys]
+        cached = _local_snapshots.get(scope)
+    if cached and cached[0] > time.monotonic() and cached[1] == generations:
+        return cached[2]
+    data = compute_dashboard(queryset)
+    with _lock:
+        _local_snapshots[scope] = (time.monotonic() + ttl, generations, data)
+    return data
+
+
+def _bump_generations(keys: List[str]) -> None:
+    with _lock:
+        for key in keys:
+            _local_generations[key] = _local_generations.get(key, 0) + 1
+
+    client = get_redis()
+    if client is not None:
+        try:
+            pipe = client.pipeline(transaction=False)
+            for key in keys:
+                pipe.incr(key)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not invalidate dashboard snapshots: {str(e)}")
+            reset_redis()
+
+
+def invalidate_dashboard(tenant_ids: Iterable) -> None:
+    """Mark the snapshots of these tenants (and of all fitments) stale once the current transaction commits"""
+    keys = _generation_keys(ALL_SCOPE)
+    keys += [key for tenant_id in set(tenant_ids) if tenant_id for key in _generation_keys(str(tenant_id))]
+    transaction.on_commit(lambda: _bump_generations(keys))
+
+
+def fitments_changed(tenant_ids: Iterable, changes: Optional[Mapping] = None) -> None:
+    """
+    Invalidate what is derived from these tenants' fitments once the current
+    transaction commits. ``changes`` are signed fitment counts per state for
+    the stored tenant statistics (see ``tenants.statistics.count_transitions``).
+    """
+    tenant_ids = set(tenant_ids)
+    tenant_ids.update(tenant_id for tenant_id, _, _ in (changes or {}))
+    invalidate_dashboard(tenant_ids)
+    record_fitment_changes(tenant_ids, changes)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FitmentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'fitments'
+
+    def ready(self):
+        # Dashboard snapshots and tenant statistics are invalidated when a fitment is saved
+        from . import signals
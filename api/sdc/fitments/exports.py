@@ -0,0 +1,262 @@
+"""
+Streaming fitment exports.
+
+Each writer takes a filtered, tenant-scoped queryset and the columns to
+export and returns an iterator of bytes for a ``StreamingHttpResponse``:
+
+- ``stream_csv`` compiles the queryset to SQL and runs
+  ``COPY (SELECT ...) TO STDOUT WITH CSV HEADER`` on PostgreSQL (psycopg2), so
+  PostgreSQL formats the rows and Python only forwards buffers. Other
+  databases fall back to ``values_list`` tuples and ``csv.writer``.
+- ``stream_ndjson`` writes one JSON object per line from ``values_list``
+  tuples fetched in chunks.
+- ``stream_parquet`` writes a Parquet row group every
+  ``PARQUET_ROW_GROUP_SIZE`` rows with pyarrow, imported on first use; the
+  endpoint answers 501 where it is not installed.
+
+None of them build model instances or hold more than one chunk in memory.
+"""
+import csv
+import io
+import json
+import queue
+import threading
+from typing import Iterator, List, Optional
+
+from django.db import connections, models
+
+from .models import Fitment
+
+# Exportable columns, in default order
+EXPORT_COLUMNS = [
+    "hash", "partId", "itemStatus", "itemStatusCode", "baseVehicleId", "year", "makeName", "modelName", "subModelName",
+    "driveTypeName", "fuelTypeName", "bodyNumDoors", "bodyTypeName", "ptid", "partTypeDescriptor", "uom", "quantity",
+    "fitmentTitle", "fitmentDescription", "fitmentNotes", "position", "positionId", "liftHeight", "wheelType",
+    "createdAt", "createdBy", "updatedAt", "updatedBy",
+]
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+FETCH_CHUNK_SIZE = 5000
+# Bytes collected before a chunk is handed to the response
+STREAM_CHUNK_BYTES = 64 * 1024
+# COPY output buffers queued ahead of a slow client
+COPY_QUEUE_SIZE = 64
+PARQUET_ROW_GROUP_SIZE = 50000
+
+
+class ExportUnavailable(Exception):
+    """The requested export format cannot be produced on this server"""
+
+
+def export_columns(requested: Optional[str]) -> List[str]:
+    """Columns from a comma-separated ``columns`` parameter, defaulting to all"""
+    if not requested:
+        return list(EXPORT_COLUMNS)
+    columns = [column.strip() for column in requested.split(',') if column.strip()]
+    unknown = [column for column in columns if column not in EXPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown export columns: {', '.join(unknown)}")
+    return list(dict.fromkeys(columns))
+
+
+def stream_csv(queryset, columns: List[str]) -> Iterator[bytes]:
+    connection = connections[queryset.db]
+    # An empty queryset (no tenant) has no SQL to COPY
+    if connection.vendor == 'postgresql' and not queryset.query.is_empty():
+        from django.db.backends.postgresql.psycopg_any import is_psycopg3
+        if not is_psycopg3:
+            return _copy_csv(queryset, columns)
+    return _writer_csv(queryset, columns)
+
+
+class _ExportCancelled(Exception):
+    pass
+
+
+class _QueueWriter:
+    """File object for copy_expert that hands each buffer to the response thread"""
+
+    def __init__(self, chunks: queue.Queue, cancelled: threading.Event):
+        self.chunks = chunks
+        self.cancelled = cancelled
+
+    def write(self, data):
+        if self.cancelled.is_set():
+            raise _ExportCancelled()
+        self.chunks.put(data if isinstance(data, bytes) else data.encode())
+
+
+def _copy_csv(queryset, columns: List[str]) -> Iterator[bytes]:
+    connection = connections[queryset.db]
+    sql, params = queryset.values_list(*columns).query.sql_with_params()
+    chunks = queue.Queue(maxsize=COPY_QUEUE_SIZE)
+    cancelled = threading.Event()
+    done = object()
+    errors = []
+
+    def run_copy(raw_connection):
+        try:
+            with raw_connection.cursor() as cursor:
+                select = cursor.mogrify(sql, params).decode()
+                cursor.copy_expert(
+                    f"COPY ({select}) TO STDOUT WITH (FORMAT csv, HEADER)",
+                    _QueueWriter(chunks, cancelled),
+                )
+        except Exception as e:
+            errors.append(e)
+        finally:
+            chunks.put(done)
+
+    def generate():
+        connection.ensure_connection()
+        # The COPY runs on its own thread so the response is sent while
+        # PostgreSQL is still producing rows; the bounded queue pauses the
+        # COPY when the client falls behind
+        worker = threading.Thread(
+            target=run_copy, args=(connection.connection,), name='fitment-export-copy', daemon=True,
+        )
+        worker.start()
+        buffer = []
+        size = 0
+        try:
+            while True:
+                chunk = chunks.get()
+                if chunk is done:
+                    break
+                buffer.append(chunk)
+                size += len(chunk)
+                if size >= STREAM_CHUNK_BYTES:
+                    yield b''.join(buffer)
+                    buffer, size = [], 0
+        finally:
+            if worker.is_alive():
+                # Client went away: stop the COPY and drop the connection it was using
+                cancelled.set()
+                while worker.is_alive():
+                    try:
+                        chunks.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+                connection.close()
+        if errors:
+            raise errors[0]
+        if buffer:
+            yield b''.join(buffer)
+
+    return generate()
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _writer_csv(queryset, columns: List[str]) -> Iterator[bytes]:
+    writer = csv.writer(_Echo())
+    buffer = [writer.writerow(columns)]
+    size = len(buffer[0])
+    for row in queryset.values_list(*columns).iterator(chunk_size=FETCH_CHUNK_SIZE):
+        line = writer.writerow(['' if value is None else value for value in row])
+        buffer.append(line)
+        size += len(line)
+        if size >= STREAM_CHUNK_BYTES:
+            yield ''.join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer).encode()
+
+
+def stream_ndjson(queryset, columns: List[str]) -> Iterator[bytes]:
+    buffer = []
+    size = 0
+    for row in queryset.values_list(*columns).iterator(chunk_size=FETCH_CHUNK_SIZE):
+        line = json.dumps(dict(zip(columns, row)), default=str) + '\n'
+        buffer.append(line)
+        size += len(line)
+        if size >= STREAM_CHUNK_BYTES:
+            yield ''.join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer).encode()
+
+
+class _ParquetSink(io.RawIOBase):
+    """Write-only stream that keeps what pyarrow wrote until it is drained"""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def _arrow_type(pa, field):
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp('us', tz='UTC')
+    if isinstance(field, (models.IntegerField, models.BigIntegerField)):
+        return pa.int64()
+    if isinstance(field, models.FloatField):
+        return pa.float64()
+    if isinstance(field, models.BooleanField):
+        return pa.bool_()
+    return pa.string()
+
+
+def stream_parquet(queryset, columns: List[str]) -> Iterator[bytes]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportUnavailable("Parquet export requires pyarrow")
+
+    schema = pa.schema([(column, _arrow_type(pa, Fitment._meta.get_field(column))) for column in columns])
+
+    def generate():
+        sink = _ParquetSink()
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+        batch = []
+
+        def write_batch():
+            arrays = [
+                pa.array([row[position] for row in batch], type=schema.field(position).type)
+                for position in range(len(columns))
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            batch.clear()
+
+        for row in queryset.values_list(*columns).iterator(chunk_size=FETCH_CHUNK_SIZE):
+            batch.append(row)
+            if len(batch) >= PARQUET_ROW_GROUP_SIZE:
+                write_batch()
+                yield sink.drain()
+        if batch:
+            write_batch()
+        writer.close()
+        yield sink.drain()
+
+    return generate()
+
+
+STREAMS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+    'parquet': stream_parquet,
+}
@@ -0,0 +1,66 @@
+"""
+Canonical fitment identity.
+
+Within a tenant a fitment is identified by the part, the vehicle
+configuration (year, make, model, submodel, drive type, fuel type, which
+uploads also use for the engine, door count and body type) and the
+position. ``fitment_key`` digests those values, normalized (whitespace
+collapsed, case folded), into the ``naturalKey`` column. A partial unique
+index on live (not deleted) fitments enforces it, so writers insert with
+``ON CONFLICT DO NOTHING`` instead of looking for an existing row first.
+
+The key digests the values as stored, including the defaults some writers
+fill in for attributes they do not know (such as 'Gas' or 4 doors).
+``baseVehicleId`` is not part of the identity: several writers fill it with
+per-row ids.
+"""
+import hashlib
+from typing import Callable, Mapping
+
+IDENTITY_FIELDS = (
+    'partId', 'year', 'makeName', 'modelName', 'subModelName',
+    'driveTypeName', 'fuelTypeName', 'bodyNumDoors', 'bodyTypeName', 'position',
+)
+
+
+def _normalize(value) -> str:
+    if value is None:
+        return ''
+    return ' '.join(str(value).split()).casefold()
+
+
+def fitment_key(tenant_id, values: Mapping) -> str:
+    """SHA-256 hex digest identifying a fitment with these field values in the tenant"""
+    parts = [_normalize(tenant_id)] + [_normalize(values.get(name)) for name in IDENTITY_FIELDS]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def tenant_fitment_keyer(tenant_id, defaults: Mapping, cache_size: int = 100_000) -> Callable[[Mapping], str]:
+    """
+    ``fitment_key`` for many rows of one tenant, for bulk writers. Fields
+    missing from a row take ``defaults``. Normalized string and integer
+    values are memoized, since makes, models, years and the like repeat
+    across rows; the memo is cleared once it holds ``cache_size`` values.
+    """
+    prefix = _normalize(tenant_id)
+    fields = [(name, defaults.get(name)) for name in IDENTITY_FIELDS]
+    # Keyed by type as well: 1 and True are equal but normalize differently
+    normalized = {}
+
+    def key(row: Mapping) -> str:
+        parts = [prefix]
+        for name, default in fields:
+            value = row.get(name, default)
+            kind = type(value)
+            if kind is str or kind is int:
+                text = normalized.get((kind, value))
+                if text is None:
+                    if len(normalized) >= cache_size:
+                        normalized.clear()
+                    text = normalized[(kind, value)] = _normalize(value)
+            else:
+                text = _normalize(value)
+            parts.append(text)
+        return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+    return key
@@ -0,0 +1,239 @@
+"""
+COPY-based fitment ingestion.
+
+``ingest_fitments`` takes an iterable of row dicts keyed by Fitment field
+names. On PostgreSQL the rows are streamed with ``COPY ... FROM STDIN`` into a
+temporary staging table (temporary tables are not WAL-logged and are dropped
+at commit) and moved into the fitments table with one
+``INSERT ... SELECT ... ON CONFLICT DO NOTHING``, which the unique index on
+live natural keys (``fitments.identity``) turns into duplicate skipping. Rows
+whose natural key already exists for the tenant, or repeats an earlier row of
+the same input, are counted as duplicates. Nothing is materialized in Python beyond the
+current COPY buffer.
+
+Other databases (SQLite in tests) build Fitment objects and go through
+``bulk_publish_fitments``, which applies the same duplicate rules.
+"""
+import copy
+import io
+import json
+import logging
+import uuid
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator
+
+from django.db import connections, transaction
+from django.db.models import JSONField
+from django.utils import timezone
+
+from .analytics import fitments_changed
+from .identity import tenant_fitment_keyer
+from .models import Fitment
+from .publishing import PublishResult, bulk_publish_fitments
+
+logger = logging.getLogger(__name__)
+
+# Characters that must be escaped in COPY text format
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+_COPY_NULL = '\\N'
+COPY_BUFFER_SIZE = 1 << 20
+COPY_BATCH_ROWS = 1000
+
+
+def _copy_text(value) -> str:
+    """COPY text for a non-string value (escaping is applied separately)"""
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class _CopyStream(io.TextIOBase):
+    """File-like view over an iterator of COPY lines, read by the driver in chunks"""
+
+    def __init__(self, lines: Iterator[str]):
+        self._lines = lines
+        self._buffer = ''
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = COPY_BUFFER_SIZE
+        parts = [self._buffer]
+        length = len(self._buffer)
+        for line in self._lines:
+            parts.append(line)
+            length += len(line)
+            if length >= size:
+                break
+        data = ''.join(parts)
+        self._buffer = data[size:]
+        return data[:size]
+
+
+class FitmentIngestor:
+    """Column layout and defaults shared by every row of one ingest"""
+
+    def __init__(self, tenant, created_by: str = 'bulk_upload'):
+        now = timezone.now()
+        self.fields = list(Fitment._meta.concrete_fields)
+        self.json_fields = {field.attname for field in self.fields if isinstance(field, JSONField)}
+        self.defaults = {}
+        for field in self.fields:
+            if field.attname in ('createdAt', 'updatedAt'):
+                self.defaults[field.attname] = now
+            elif field.has_default():
+                self.defaults[field.attname] = field.get_default()
+            else:
+                self.defaults[field.attname] = None
+        self.defaults.update({
+            'tenant_id': tenant.id if tenant else None,
+            'createdBy': created_by,
+            'updatedBy': created_by,
+        })
+        self.tenant = tenant
+
+    def complete(self, row: Dict) -> Dict:
+        """Row values for every concrete field, with a fresh hash"""
+        values = dict(self.defaults)
+        for attname in self.json_fields:
+            values[attname] = copy.deepcopy(values[attname])
+        values.update(row)
+        if not values.get('hash'):
+            values['hash'] = uuid.uuid4().hex
+        return values
+
+    def copy_lines(self, rows: Iterable[Dict], counter: list) -> Iterator[str]:
+        """COPY text for ``rows``, yielded in blocks of COPY_BATCH_ROWS lines"""
+        attnames = [field.attname for field in self.fields]
+        width = len(attnames)
+        hash_position = attnames.index('hash')
+        key_position = attnames.index('naturalKey')
+        natural_key = tenant_fitment_keyer(self.defaults['tenant_id'], self.defaults)
+        # Defaults are converted to COPY text once, row values as they come
+        defaults = {
+            attname: None if value is None
+            else json.dumps(value) if attname in self.json_fields
+            else value if type(value) is str
+            else _copy_text(value)
+            for attname, value in self.defaults.items()
+        }
+        json_fields = self.json_fields
+        lines = []
+        for row in rows:
+            merged = {**defaults, **row}
+            for attname in json_fields.intersection(row):
+                if row[attname] is not None:
+                    merged[attname] = json.dumps(row[attname])
+            values = [merged[attname] for attname in attnames]
+            if values[hash_position] is None:
+                values[hash_position] = uuid.uuid4().hex
+            values[key_position] = natural_key(row)
+            texts = [
+                _COPY_NULL if value is None else value if type(value) is str else _copy_text(value)
+                for value in values
+            ]
+            line = '\t'.join(texts)
+            # Each NULL marker accounts for one backslash; anything else needs escaping
+            if ('\n' in line or '\r' in line or line.count('\t') != width - 1
+                    or line.count('\\') != values.count(None)):
+                line = '\t'.join(
+                    text if value is None else text.translate(_COPY_ESCAPES)
+                    for value, text in zip(values, texts)
+                )
+            lines.append(line)
+            if len(lines) >= COPY_BATCH_ROWS:
+                counter[0] += len(lines)
+                lines.append('')
+                yield '\n'.join(lines)
+                lines = []
+        if lines:
+            counter[0] += len(lines)
+            lines.append('')
+            yield '\n'.join(lines)
+
+
+def _copy(cursor, sql: str, stream: _CopyStream) -> None:
+    raw = cursor.cursor
+    if hasattr(raw, 'copy_expert'):
+        raw.copy_expert(sql, stream, size=COPY_BUFFER_SIZE)
+        return
+    # psycopg 3
+    with raw.copy(sql) as writer:
+        while True:
+            chunk = stream.read(COPY_BUFFER_SIZE)
+            if not chunk:
+                break
+            writer.write(chunk)
+
+
+def _ingest_postgresql(rows: Iterable[Dict], ingestor: FitmentIngestor, using: str) -> PublishResult:
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    opts = Fitment._meta
+    table = quote(opts.db_table)
+    staging = quote(f"fitment_ingest_{uuid.uuid4().hex[:12]}")
+    columns = ', '.join(quote(field.column) for field in ingestor.fields)
+    key = quote(opts.get_field('naturalKey').column)
+    state = ', '.join(quote(opts.get_field(name).column) for name in ('itemStatus', 'isDeleted'))
+
+    staged = [0]
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        cursor.execute(f"ALTER TABLE {staging} ADD COLUMN ingest_row BIGSERIAL")
+        _copy(
+            cursor,
+            f"COPY {staging} ({columns}) FROM STDIN",
+            _CopyStream(ingestor.copy_lines(rows, staged)),
+        )
+        cursor.execute(f"ANALYZE {staging}")
+        # The first row of each natural key wins; keys the tenant already has
+        # are skipped. Inserted rows are counted per state for the statistics.
+        cursor.execute(
+            f"""
+            WITH inserted AS (
+                INSERT INTO {table} ({columns})
+                SELECT {columns} FROM (
+                    SELECT DISTINCT ON ({key}) *
+                    FROM {staging}
+                    ORDER BY {key}, ingest_row
+                ) s
+                ON CONFLICT DO NOTHING
+                RETURNING {state}
+            )
+            SELECT {state}, COUNT(*) FROM inserted GROUP BY {state}
+            """
+        )
+        tenant_id = ingestor.defaults['tenant_id']
+        changes = {(tenant_id, item_status, is_deleted): count for item_status, is_deleted, count in cursor.fetchall()}
+        created = sum(changes.values())
+        if created:
+            fitments_changed([tenant_id], changes)
+
+    return PublishResult(created=created, duplicates=staged[0] - created)
+
+
+def ingest_fitments(rows: Iterable[Dict], tenant, created_by: str = 'bulk_upload',
+                    using: str = 'default') -> PublishResult:
+    """
+    Insert fitment rows (dicts of Fitment field values) for ``tenant``.
+    Missing fields take the model defaults; the hash is generated.
+    """
+    ingestor = FitmentIngestor(tenant, created_by=created_by)
+    if connections[using].vendor == 'postgresql':
+        result = _ingest_postgresql(rows, ingestor, using)
+    else:
+        fitments = [Fitment(**ingestor.complete(row)) for row in rows]
+        result = bulk_publish_fitments(fitments, tenant)
+    logger.info(
+        f"Ingested fitments for tenant {tenant.id if tenant else None}: "
+        f"{result.created} created, {result.duplicates} duplicates"
+    )
+    return result
@@ -0,0 +1,118 @@
+"""
+Management command to fill in or recompute fitment natural keys
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, transaction
+
+from fitments.identity import IDENTITY_FIELDS
+from fitments.models import Fitment
+
+CHANGED_BY = 'backfill_fitment_keys'
+
+
+class Command(BaseCommand):
+    help = (
+        'Set naturalKey on every fitment whose key is missing or was computed from other identity fields. '
+        'Of live fitments sharing a key the oldest stays live; the others are reported and soft deleted.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant-id', help='Only backfill fitments of this tenant')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing')
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.dry_run = options['dry_run']
+        fitments = Fitment.all_objects.all()
+        if options.get('tenant_id'):
+            fitments = fitments.filter(tenant_id=options['tenant_id'])
+
+        self.keyed = 0
+        self.duplicates = 0
+        # Natural key -> hash of the fitment holding it, for the current tenant
+        self.holders = {}
+        tenant_id = object()
+        pending, pending_duplicates = [], []
+        live = fitments.filter(isDeleted=False).order_by('tenant_id', 'createdAt', 'hash')
+        for fitment in live.only('hash', 'tenant_id', 'naturalKey', *IDENTITY_FIELDS).iterator(chunk_size=self.batch_size):
+            if fitment.tenant_id != tenant_id:
+                self._flush(pending, pending_duplicates)
+                tenant_id = fitment.tenant_id
+                self.holders = {}
+            key = fitment.compute_natural_key()
+            holder = self.holders.setdefault(key, fitment.hash)
+            if holder != fitment.hash:
+                self._report(fitment.hash, holder)
+                fitment.naturalKey = key
+                pending_duplicates.append(fitment)
+            elif fitment.naturalKey != key:
+                fitment.naturalKey = key
+                pending.append(fitment)
+                self.keyed += 1
+            if len(pending) + len(pending_duplicates) >= self.batch_size:
+                self._flush(pending, pending_duplicates)
+        self._flush(pending, pending_duplicates)
+
+        # Deleted fitments need a current key too, so a restore can check it
+        deleted = fitments.filter(isDeleted=True)
+        pending = []
+        for fitment in deleted.only('hash', 'tenant_id', 'naturalKey', *IDENTITY_FIELDS).iterator(chunk_size=self.batch_size):
+            key = fitment.compute_natural_key()
+            if fitment.naturalKey != key:
+                fitment.naturalKey = key
+                pending.append(fitment)
+                self.keyed += 1
+            if len(pending) >= self.batch_size:
+                self._write_keys(pending)
+        self._write_keys(pending)
+
+        if self.dry_run:
+            message = f'Would set {self.keyed} natural keys and soft delete {self.duplicates} duplicate fitments'
+        else:
+            message = f'Set {self.keyed} natural keys, soft deleted {self.duplicates} duplicate fitments'
+        self.stdout.write(self.style.SUCCESS(message))
+
+    def _report(self, fitment_hash, holder):
+        self.duplicates += 1
+        self.stdout.write(self.style.WARNING(f'Fitment {fitment_hash} duplicates fitment {holder}'))
+
+    def _write_keys(self, pending):
+        if not self.dry_run and pending:
+            Fitment.all_objects.bulk_update(pending, ['naturalKey'], batch_size=self.batch_size)
+        pending.clear()
+
+    def _flush(self, pending, pending_duplicates):
+        """Write one batch of live fitments: duplicates first, so the keys they held are free"""
+        if self.dry_run:
+            pending.clear()
+            pending_duplicates.clear()
+            return
+        self._collapse(pending_duplicates)
+        try:
+            with transaction.atomic():
+                Fitment.all_objects.bulk_update(pending, ['naturalKey'], batch_size=self.batch_size)
+        except IntegrityError:
+            # The key is held by a fitment later in the scan or inserted since it started
+            late_duplicates = []
+            for fitment in pending:
+                try:
+                    with transaction.atomic():
+                        Fitment.all_objects.filter(hash=fitment.hash).update(naturalKey=fitment.naturalKey)
+                except IntegrityError:
+                    holder = Fitment.objects.filter(naturalKey=fitment.naturalKey).values_list('hash', flat=True).first()
+                    self.holders[fitment.naturalKey] = holder
+                    self.keyed -= 1
+                    self._report(fitment.hash, holder)
+                    late_duplicates.append(fitment)
+            self._collapse(late_duplicates)
+        pending.clear()
+        pending_duplicates.clear()
+
+    def _collapse(self, duplicates):
+        """Soft delete duplicate fitments, then give them their key like other deleted fitments"""
+        if not duplicates:
+            return
+        Fitment.objects.filter(hash__in=[fitment.hash for fitment in duplicates]).bulk_soft_delete(changed_by=CHANGED_BY)
+        Fitment.all_objects.bulk_update(duplicates, ['naturalKey'], batch_size=self.batch_size)
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.7 on 2026-10-19 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fitments', '0010_fitment_ai_job_id'),
+        ('tenants', '0004_tenant_default_fitment_method'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FitmentHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fitment_hash', models.CharField(db_index=True, max_length=64)),
+                ('action', models.CharField(choices=[('deleted', 'Deleted'), ('restored', 'Restored'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('status_changed', 'Status Changed')], max_length=20)),
+                ('changed_by', models.CharField(max_length=64)),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+                ('new_values', models.JSONField(blank=True, default=dict)),
+                ('tenant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='fitment_history', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name_plural': 'Fitment Histories',
+                'ordering': ['-changed_at'],
+            },
+        ),
+    ]
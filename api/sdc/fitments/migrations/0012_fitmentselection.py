@@ -0,0 +1,29 @@
+# Generated by Django 5.0.7 on 2026-10-19 11:00
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fitments', '0011_fitmenthistory'),
+        ('tenants', '0004_tenant_default_fitment_method'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FitmentSelection',
+            fields=[
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filters', models.JSONField(blank=True, default=dict)),
+                ('include', models.JSONField(blank=True, default=list)),
+                ('exclude', models.JSONField(blank=True, default=list)),
+                ('created_by', models.CharField(default='api_user', max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fitment_selections', to='tenants.tenant')),
+            ],
+        ),
+    ]
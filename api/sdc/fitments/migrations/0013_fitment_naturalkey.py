@@ -0,0 +1,24 @@
+# Generated by Django 5.0.7 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fitments', '0012_fitmentselection'),
+    ]
+
+    # Existing rows keep a NULL natural key until
+    # `manage.py backfill_fitment_keys` fills it in and soft deletes duplicates
+    operations = [
+        migrations.AddField(
+            model_name='fitment',
+            name='naturalKey',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='fitment',
+            constraint=models.UniqueConstraint(condition=models.Q(('isDeleted', False)), fields=('naturalKey',), name='fitment_live_natural_key'),
+        ),
+    ]
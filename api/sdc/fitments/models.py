@@ -1,12 +1,184 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import Now, RowNumber
 from django.utils import timezone
 from django.contrib.auth.models import User
 from tenants.models import Tenant
+from tenants.statistics import count_transitions
+from .analytics import fitments_changed
+from .identity import IDENTITY_FIELDS, fitment_key
 import uuid
+from collections import Counter
 
 # Create your models here.
 
-class FitmentManager(models.Manager):
+# Status values used by the review queue (both spellings exist in the data)
+READY_TO_APPROVE_STATUSES = ['readyToApprove', 'ReadyToApprove']
+# Hashes per query when checking which rows an insert created
+INSERTED_LOOKUP_CHUNK_SIZE = 2000
+
+
+def _report_created(fitments):
+    """Report inserted fitments to the dashboard and tenant statistics"""
+    if not fitments:
+        return
+    for fitment in fitments:
+        fitment._counted_state = fitment.statistics_state()
+    fitments_changed(
+        {fitment.tenant_id for fitment in fitments},
+        count_transitions((None, fitment._counted_state) for fitment in fitments),
+    )
+
+
+class FitmentQuerySet(models.QuerySet):
+    """
+    Set-based state changes. Each method locks a chunk of up to
+    FITMENT_BULK_CHUNK_SIZE selected fitments with ``SELECT ... FOR UPDATE``
+    and updates it with one ``UPDATE`` (``bulk_reject``: one ``DELETE``),
+    each chunk in its own transaction, and returns the hashes it changed. Audit
+    timestamps come from the database clock. With ``record_history``
+    (default: FITMENT_BULK_RECORD_HISTORY) one ``FitmentHistory`` row per
+    fitment is written with a single ``bulk_create`` per chunk.
+
+    ``bulk_create`` fills each fitment's hash and natural key, which
+    ``Model.save`` would otherwise do; ``bulk_create_new`` skips fitments
+    that already exist. Every method reports what it changed through
+    ``fitments_changed``.
+    """
+
+    def bulk_soft_delete(self, changed_by='system', record_history=None, chunk_size=None):
+        return self.filter(isDeleted=False)._transition(
+            'deleted', {'isDeleted': True, 'deletedAt': Now(), 'deletedBy': changed_by},
+            changed_by, record_history, chunk_size,
+        )
+
+    def bulk_restore(self, changed_by='system', record_history=None, chunk_size=None):
+        """
+        Fitments whose natural key has been taken by a live fitment since stay
+        deleted. Of several deleted fitments with one natural key only the
+        most recently updated is restored.
+        """
+        deleted = self.filter(isDeleted=True)
+        live_keys = self.model.objects.using(self.db).filter(naturalKey__isnull=False).values('naturalKey')
+        newest_per_key = deleted.filter(naturalKey__isnull=False).annotate(
+            key_rank=Window(
+                RowNumber(), partition_by=F('naturalKey'), order_by=[F('updatedAt').desc(), F('pk').desc()],
+            ),
+        ).filter(key_rank=1).values('pk')
+        return deleted.filter(
+            Q(naturalKey__isnull=True) | Q(pk__in=newest_per_key)
+        ).exclude(naturalKey__in=live_keys)._transition(
+            'restored', {'isDeleted': False, 'deletedAt': None, 'deletedBy': None},
+            changed_by, record_history, chunk_size,
+        )
+
+    def bulk_set_status(self, item_status, changed_by='system', record_history=None, chunk_size=None):
+        return self.filter(isDeleted=False).exclude(itemStatus=item_status)._transition(
+            'status_changed', {'itemStatus': item_status},
+            changed_by, record_history, chunk_size,
+        )
+
+    def bulk_approve(self, changed_by='system', record_history=None, chunk_size=None):
+        return self.filter(isDeleted=False, itemStatus__in=READY_TO_APPROVE_STATUSES)._transition(
+            'approved', {'itemStatus': 'Active'},
+            changed_by, record_history, chunk_size,
+        )
+
+    def bulk_reject(self, changed_by='system', record_history=None, chunk_size=None):
+        """Rejected fitments are deleted, not soft deleted"""
+        return self.filter(isDeleted=False, itemStatus__in=READY_TO_APPROVE_STATUSES)._transition(
+            'rejected', None, changed_by, record_history, chunk_size,
+        )
+
+    def bulk_create(self, objs, batch_size=None, ignore_conflicts=False, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.set_identity()
+        created = super().bulk_create(objs, batch_size=batch_size, ignore_conflicts=ignore_conflicts, **kwargs)
+        # With ignore_conflicts the inserted rows are unknown; bulk_create_new reports them
+        if not ignore_conflicts:
+            _report_created(objs)
+        return created
+
+    def bulk_create_new(self, objs, batch_size=None):
+        """
+        Insert the fitments whose natural key has no live fitment yet, with
+        ``ON CONFLICT DO NOTHING``; repeats within ``objs`` keep the first.
+        Returns the inserted fitments.
+        """
+        objs = list(objs)
+        if not objs:
+            return []
+        self.bulk_create(objs, batch_size=batch_size, ignore_conflicts=True)
+        # Hashes are random, so a hash in the table is a row this insert created
+        hashes = [obj.hash for obj in objs]
+        inserted = set()
+        target = self.model.all_objects.using(self.db)
+        for start in range(0, len(hashes), INSERTED_LOOKUP_CHUNK_SIZE):
+            chunk = hashes[start:start + INSERTED_LOOKUP_CHUNK_SIZE]
+            inserted.update(target.filter(hash__in=chunk).values_list('hash', flat=True))
+        created = [obj for obj in objs if obj.hash in inserted]
+        _report_created(created)
+        return created
+
+    def _transition(self, action, values, changed_by, record_history, chunk_size):
+        """Apply ``values`` to the selection, or delete it when ``values`` is None"""
+        chunk_size = chunk_size or getattr(settings, 'FITMENT_BULK_CHUNK_SIZE', 5000)
+        if record_history is None:
+            record_history = getattr(settings, 'FITMENT_BULK_RECORD_HISTORY', True)
+        if values is not None:
+            values = dict(values, updatedAt=Now(), updatedBy=changed_by)
+        # Every transition moves rows out of the selection, so re-running the
+        # same bounded subquery picks up the next chunk
+        selection = self.order_by().values('pk')[:chunk_size]
+        target = self.model.all_objects.using(self.db)
+        history = {key: value for key, value in (values or {}).items() if not hasattr(value, 'resolve_expression')}
+
+        changed = []
+        tenants = set()
+        changes = Counter()
+        try:
+            while True:
+                with transaction.atomic(using=self.db):
+                    # Locked rows cannot change or leave the selection before the UPDATE
+                    rows = list(
+                        target.select_for_update().filter(pk__in=selection)
+                        .values_list('pk', 'tenant_id', 'itemStatus', 'isDeleted')
+                    )
+                    if rows:
+                        locked = target.filter(pk__in=[row[0] for row in rows])
+                        if values is None:
+                            locked.delete()
+                        else:
+                            locked.update(**values)
+                    if record_history and rows:
+                        FitmentHistory.objects.using(self.db).bulk_create([
+                            FitmentHistory(
+                                fitment_hash=fitment_hash, tenant_id=tenant_id, action=action,
+                                changed_by=changed_by, new_values=history,
+                            )
+                            for fitment_hash, tenant_id, _, _ in rows
+                        ])
+                changed.extend(row[0] for row in rows)
+                tenants.update(row[1] for row in rows)
+                changes.update(count_transitions(
+                    (
+                        (tenant_id, item_status, is_deleted),
+                        None if values is None else
+                        (tenant_id, values.get('itemStatus', item_status), values.get('isDeleted', is_deleted)),
+                    )
+                    for _, tenant_id, item_status, is_deleted in rows
+                ))
+                if len(rows) < chunk_size:
+                    return changed
+        finally:
+            # Chunks commit on their own, so report the committed ones even after a failure
+            if tenants:
+                fitments_changed(tenants, changes)
+
+
+class FitmentManager(models.Manager.from_queryset(FitmentQuerySet)):
     """Custom manager to handle soft delete functionality"""
     
     def get_queryset(self):
@@ -86,9 +258,12 @@ class Fitment(models.Model):
     deletedAt = models.DateTimeField(null=True, blank=True)
     deletedBy = models.CharField(max_length=64, blank=True, null=True)
 
+    # Digest of tenant and IDENTITY_FIELDS, unique among live fitments (see fitments.identity)
+    naturalKey = models.CharField(max_length=64, null=True, blank=True, editable=False)
+
     # Custom manager
     objects = FitmentManager()
-    all_objects = models.Manager()  # Access to all objects including deleted
+    all_objects = FitmentQuerySet.as_manager()  # Access to all objects including deleted
 
     class Meta:
         indexes = [
@@ -98,10 +273,39 @@ class Fitment(models.Model):
             models.Index(fields=['year']),
             models.Index(fields=['updatedAt']),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['naturalKey'], condition=models.Q(isDeleted=False), name='fitment_live_natural_key',
+            ),
+        ]
 
-    def save(self, *args, **kwargs):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The state the tenant statistics count this fitment under
+        instance._counted_state = instance.statistics_state()
+        return instance
+
+    def statistics_state(self):
+        """``(tenant_id, itemStatus, isDeleted)`` as in ``tenants.statistics``; None if not loaded"""
+        if not {'tenant_id', 'itemStatus', 'isDeleted'} <= self.__dict__.keys():
+            return None
+        return (self.tenant_id, self.itemStatus, self.isDeleted)
+
+    def compute_natural_key(self):
+        return fitment_key(self.tenant_id, {name: getattr(self, name) for name in IDENTITY_FIELDS})
+
+    def set_identity(self):
+        """Fill the hash (random) and the natural key from the current field values"""
         if not self.hash:
             self.hash = uuid.uuid4().hex
+        self.naturalKey = self.compute_natural_key()
+
+    def save(self, *args, **kwargs):
+        self.set_identity()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'tenant', 'tenant_id', *IDENTITY_FIELDS} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'naturalKey'}
         return super().save(*args, **kwargs)
     
     def soft_delete(self, deleted_by='system'):
@@ -121,7 +325,57 @@ class Fitment(models.Model):
     
     def hard_delete(self):
         """Permanently delete the fitment"""
+        counted = getattr(self, '_counted_state', None) or self.statistics_state()
         super().delete()
+        fitments_changed([self.tenant_id], count_transitions([(counted, None)]))
+
+
+class FitmentHistory(models.Model):
+    """State changes applied to fitments by the bulk actions"""
+
+    ACTION_TYPES = [
+        ('deleted', 'Deleted'),
+        ('restored', 'Restored'),
+        ('approved', 'Approved'),
+        ('rejected', 'Rejected'),
+        ('status_changed', 'Status Changed'),
+    ]
+
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='fitment_history', null=True, blank=True)
+    # Not a foreign key: history outlives hard deleted fitments
+    fitment_hash = models.CharField(max_length=64, db_index=True)
+    action = models.CharField(max_length=20, choices=ACTION_TYPES)
+    changed_by = models.CharField(max_length=64)
+    changed_at = models.DateTimeField(auto_now_add=True)
+    new_values = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ['-changed_at']
+        verbose_name_plural = "Fitment Histories"
+
+    def __str__(self):
+        return f"{self.fitment_hash} - {self.action} by {self.changed_by}"
+
+
+class FitmentSelection(models.Model):
+    """
+    A server-side selection for bulk actions: the fitment list filters plus
+    hashes added to or removed from the filtered set. Bulk endpoints accept
+    the token instead of an explicit hash list and act on the fitments that
+    matched when the selection was made.
+    """
+
+    token = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='fitment_selections')
+    filters = models.JSONField(default=dict, blank=True)
+    include = models.JSONField(default=list, blank=True)
+    exclude = models.JSONField(default=list, blank=True)
+    created_by = models.CharField(max_length=64, default='api_user')
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Selection {self.token} ({self.tenant_id})"
 
 
 class FitmentUploadSession(models.Model):
@@ -0,0 +1,72 @@
+"""
+Bulk fitment publishing.
+
+Fitments are inserted with ``Fitment.objects.bulk_create_new`` inside one
+transaction: fitments whose natural key (``fitments.identity``) the tenant
+already has are skipped by the database's unique index and counted as
+duplicates. Each batch runs in its own savepoint so a bad batch is counted as
+errors without losing the rest of the publish.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from django.db import DatabaseError, transaction
+
+from .models import Fitment
+
+logger = logging.getLogger(__name__)
+
+BULK_CREATE_BATCH_SIZE = 2000
+MAX_RECORDS_IN_RESULT = 50
+
+
+@dataclass
+class PublishResult:
+    """Structured outcome of a bulk publish"""
+    created: int = 0
+    duplicates: int = 0
+    skipped: int = 0
+    errors: int = 0
+    records: List[Dict] = field(default_factory=list)
+
+    def as_dict(self) -> Dict:
+        return {
+            "createdCount": self.created,
+            "duplicateCount": self.duplicates,
+            "skippedCount": self.skipped,
+            "errorCount": self.errors,
+        }
+
+
+def bulk_publish_fitments(fitments: List[Fitment], tenant, result: Optional[PublishResult] = None,
+                          batch_size: int = BULK_CREATE_BATCH_SIZE) -> PublishResult:
+    """
+    Insert fitments that do not already exist for the tenant (by natural key).
+    Duplicates within the input and against the database are counted, not
+    inserted.
+    """
+    result = result or PublishResult()
+    with transaction.atomic():
+        for start in range(0, len(fitments), batch_size):
+            batch = fitments[start:start + batch_size]
+            try:
+                with transaction.atomic():
+                    inserted = Fitment.objects.bulk_create_new(batch)
+            except DatabaseError as e:
+                logger.error(f"Failed to insert fitment batch at offset {start} ({len(batch)} rows): {str(e)}")
+                result.errors += len(batch)
+                continue
+
+            result.created += len(inserted)
+            result.duplicates += len(batch) - len(inserted)
+            room = MAX_RECORDS_IN_RESULT - len(result.records)
+            if room > 0:
+                result.records.extend(
+                    {"type": "fitment", "id": fitment.hash, "partId": fitment.partId}
+                    for fitment in inserted[:room]
+                )
+
+    return result
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from tenants.statistics import count_transitions
+
+from .analytics import fitments_changed
+from .models import Fitment
+
+
+# No post_delete receiver: one would make Django delete fitments row by row
+# instead of with one DELETE. Deleting code calls fitments_changed itself.
+@receiver(post_save, sender=Fitment)
+def fitment_changed(sender, instance, created, **kwargs):
+    after = instance.statistics_state()
+    before = None if created else getattr(instance, '_counted_state', None)
+    if created or (before is not None and after is not None):
+        changes = count_transitions([(before, after)])
+    else:
+        # Previous state unknown: counts are left to the nightly recount
+        changes = None
+    instance._counted_state = after
+    fitments_changed([instance.tenant_id], changes)
@@ -1,3 +1,487 @@
+import csv
+import io
+import json
+import sys
+import unittest
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import DatabaseError, IntegrityError, transaction
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from tenants.models import Tenant
+
+from .analytics import compute_dashboard, get_dashboard_snapshot
+from .identity import fitment_key, tenant_fitment_keyer
+from .ingest import ingest_fitments
+from .models import Fitment, FitmentHistory, FitmentSelection
+from .publishing import bulk_publish_fitments
+from .views import (
+    apply_potential_fitments, bulk_delete_fitments, bulk_update_status, create_fitment_selection, export_csv,
+    get_base_vehicle_recommendations, get_parts_with_fitments,
+)
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def fitment_values(tenant, part_id, **overrides):
+    values = dict(
+        tenant=tenant, partId=part_id, baseVehicleId='1', year=2020, makeName='Acura',
+        modelName='ILX', subModelName='Base', driveTypeName='FWD', fuelTypeName='Gas',
+        bodyNumDoors=4, bodyTypeName='Sedan', ptid='P1', partTypeDescriptor='Brake Pad',
+        uom='EA', fitmentTitle=part_id, position='Front', positionId=1, liftHeight='Stock',
+        wheelType='Alloy',
+    )
+    values.update(overrides)
+    return values
+
+
+def make_fitment(tenant, part_id, **overrides):
+    return Fitment.objects.create(**fitment_values(tenant, part_id, **overrides))
+
+
+class FitmentBulkTransitionTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='Bulk Tenant')
+        self.other = Tenant.objects.create(name='Other Tenant')
+        self.fitments = [make_fitment(self.tenant, f"P{i}") for i in range(7)]
+        self.foreign = make_fitment(self.other, 'X1')
+        self.hashes = [fitment.hash for fitment in self.fitments]
+
+    def test_soft_delete_is_chunked_and_tenant_scoped(self):
+        selection = Fitment.objects.filter(hash__in=self.hashes + [self.foreign.hash], tenant=self.tenant)
+
+        # Per chunk: savepoint, SELECT ... FOR UPDATE, UPDATE, history INSERT, release
+        with self.assertNumQueries(3 * 5):
+            changed = selection.bulk_soft_delete(changed_by='tester', record_history=True, chunk_size=3)
+
+        self.assertCountEqual(changed, self.hashes)
+        self.assertFalse(Fitment.objects.filter(tenant=self.tenant).exists())
+        self.assertTrue(Fitment.objects.filter(hash=self.foreign.hash).exists())
+        deleted = Fitment.all_objects.get(hash=self.hashes[0])
+        self.assertEqual(deleted.deletedBy, 'tester')
+        self.assertEqual(deleted.updatedBy, 'tester')
+        self.assertIsNotNone(deleted.deletedAt)
+        self.assertEqual(FitmentHistory.objects.filter(action='deleted', tenant=self.tenant).count(), 7)
+
+    def test_restore_only_touches_deleted_rows(self):
+        Fitment.objects.filter(hash__in=self.hashes[:2]).bulk_soft_delete(record_history=False)
+
+        restored = Fitment.all_objects.filter(hash__in=self.hashes).bulk_restore(record_history=False)
+
+        self.assertCountEqual(restored, self.hashes[:2])
+        self.assertEqual(Fitment.objects.filter(tenant=self.tenant).count(), 7)
+        self.assertIsNone(Fitment.objects.get(hash=self.hashes[0]).deletedAt)
+
+    def test_restore_keeps_one_fitment_per_natural_key(self):
+        older = self.fitments[0]
+        older.soft_delete()
+        newer = make_fitment(self.tenant, 'P0')
+        newer.soft_delete()
+        Fitment.all_objects.filter(hash=older.hash).update(updatedAt=timezone.now() - timedelta(days=1))
+        self.fitments[1].soft_delete()
+
+        restored = Fitment.all_objects.filter(
+            hash__in=[older.hash, newer.hash, self.hashes[1]],
+        ).bulk_restore(record_history=False, chunk_size=2)
+
+        self.assertCountEqual(restored, [newer.hash, self.hashes[1]])
+        self.assertTrue(Fitment.all_objects.get(hash=older.hash).isDeleted)
+        self.assertEqual(Fitment.objects.filter(tenant=self.tenant, partId='P0').get().hash, newer.hash)
+
+    def test_approve_and_reject_review_queue(self):
+        Fitment.objects.filter(hash__in=self.hashes[:4]).update(itemStatus='readyToApprove')
+
+        approved = Fitment.objects.filter(hash__in=self.hashes[:2]).bulk_approve(record_history=False)
+        rejected = Fitment.objects.filter(hash__in=self.hashes).bulk_reject(record_history=False)
+
+        self.assertCountEqual(approved, self.hashes[:2])
+        self.assertCountEqual(rejected, self.hashes[2:4])
+        self.assertEqual(Fitment.objects.get(hash=self.hashes[0]).itemStatus, 'Active')
+        self.assertFalse(Fitment.all_objects.filter(hash__in=self.hashes[2:4]).exists())
+
+    def test_set_status_skips_unchanged_rows(self):
+        Fitment.objects.filter(hash=self.hashes[0]).update(itemStatus='Inactive')
+
+        changed = Fitment.objects.filter(tenant=self.tenant).bulk_set_status('Inactive', record_history=True)
+
+        self.assertEqual(len(changed), 6)
+        history = FitmentHistory.objects.filter(action='status_changed').first()
+        self.assertEqual(history.new_values['itemStatus'], 'Inactive')
+
+    def test_empty_selection(self):
+        self.assertEqual(Fitment.objects.filter(hash__in=['missing']).bulk_soft_delete(), [])
+
+
+class FitmentSelectionTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user('selector')
+        self.tenant = Tenant.objects.create(name='Selection Tenant')
+        self.other = Tenant.objects.create(name='Other Selection Tenant')
+        self.acura = [make_fitment(self.tenant, f"A{i}") for i in range(5)]
+        self.honda = make_fitment(self.tenant, 'H1', makeName='Honda')
+        self.foreign = make_fitment(self.other, 'A9')
+
+    def post(self, view, data, tenant=None):
+        request = self.factory.post('/', data, format='json', HTTP_X_TENANT_ID=str((tenant or self.tenant).id))
+        force_authenticate(request, user=self.user)
+        return view(request)
+
+    def select(self, **data):
+        response = self.post(create_fitment_selection, data)
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data
+
+    def test_selection_applies_filters_and_deltas(self):
+        selection = self.select(
+            filters={'makeName': 'acura'}, include=[self.honda.hash], exclude=[self.acura[0].hash],
+        )
+        self.assertEqual(selection['count'], 5)
+
+        response = self.post(bulk_update_status, {'selection_token': selection['selection_token'], 'status': 'Inactive'})
+
+        self.assertEqual(response.data['updated_count'], 5)
+        inactive = set(Fitment.objects.filter(itemStatus='Inactive').values_list('hash', flat=True))
+        self.assertEqual(inactive, {f.hash for f in self.acura[1:]} | {self.honda.hash})
+
+    def test_selection_is_a_snapshot(self):
+        selection = self.select(filters={'makeName': 'acura'})
+        make_fitment(self.tenant, 'A-late')
+
+        response = self.post(bulk_delete_fitments, {'selection_token': selection['selection_token']})
+
+        self.assertEqual(response.data['deleted_count'], 5)
+        self.assertTrue(Fitment.objects.filter(partId='A-late').exists())
+        self.assertTrue(Fitment.objects.filter(hash=self.foreign.hash).exists())
+
+    def test_selection_is_tenant_scoped_and_expires(self):
+        token = self.select(filters={})['selection_token']
+
+        self.assertEqual(self.post(bulk_delete_fitments, {'selection_token': token}, tenant=self.other).status_code, 404)
+        FitmentSelection.objects.filter(token=token).update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.post(bulk_delete_fitments, {'selection_token': token}).status_code, 404)
+        self.assertEqual(self.post(bulk_delete_fitments, {'selection_token': 'not-a-token'}).status_code, 404)
+
+
+class FitmentIngestTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='Ingest Tenant')
+
+    def row(self, part_id, **overrides):
+        values = dict(
+            partId=part_id, baseVehicleId='1', year=2021, makeName='Toyota', modelName='Camry',
+            subModelName='LE', driveTypeName='FWD', fuelTypeName='Gas', bodyNumDoors=4,
+            bodyTypeName='Sedan', ptid='P1', partTypeDescriptor='Rotor', uom='EA',
+            fitmentTitle=part_id, position='Front', positionId=1, liftHeight='Stock', wheelType='Steel',
+        )
+        values.update(overrides)
+        return values
+
+    def test_rows_are_inserted_with_defaults(self):
+        result = ingest_fitments(
+            [self.row('R1', fitmentNotes='tab\there\nnew line \\ backslash'), self.row('R2', fitmentDescription=None)],
+            self.tenant, created_by='tester',
+        )
+
+        self.assertEqual((result.created, result.duplicates), (2, 0))
+        fitment = Fitment.objects.get(partId='R1')
+        self.assertEqual(fitment.tenant, self.tenant)
+        self.assertEqual(fitment.fitmentNotes, 'tab\there\nnew line \\ backslash')
+        self.assertEqual(fitment.itemStatus, 'Active')
+        self.assertEqual(fitment.createdBy, 'tester')
+        self.assertEqual(fitment.dynamicFields, {})
+        self.assertEqual(len(fitment.hash), 32)
+        self.assertIsNone(Fitment.objects.get(partId='R2').fitmentDescription)
+
+    def test_duplicates_in_input_and_database_are_skipped(self):
+        make_fitment(self.tenant, 'R1', year=2021, makeName='Toyota', modelName='Camry', subModelName='LE')
+        other = Tenant.objects.create(name='Other Ingest Tenant')
+        make_fitment(other, 'R2', year=2021, makeName='Toyota', modelName='Camry', subModelName='LE')
+
+        result = ingest_fitments(
+            [
+                self.row('R1'), self.row('R2'), self.row('R2', fitmentTitle='second'),
+                self.row('R2', makeName=' toyota'), self.row('R2', position='Rear'),
+            ],
+            self.tenant,
+        )
+
+        self.assertEqual((result.created, result.duplicates), (2, 3))
+        self.assertEqual(Fitment.objects.get(tenant=self.tenant, partId='R2', position='Front').fitmentTitle, 'R2')
+
+
+class FitmentIdentityTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='Identity Tenant')
+
+    def test_live_natural_key_is_unique(self):
+        fitment = make_fitment(self.tenant, 'K1')
+        self.assertEqual(len(fitment.naturalKey), 64)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            make_fitment(self.tenant, 'k1 ', makeName='ACURA')
+
+        # Another configuration of the same vehicle is a different fitment
+        make_fitment(self.tenant, 'K1', driveTypeName='AWD')
+        make_fitment(self.tenant, 'K1', driveTypeName='', fuelTypeName='', bodyNumDoors=0, bodyTypeName='')
+
+        fitment.soft_delete()
+        replacement = make_fitment(self.tenant, 'K1')
+        self.assertEqual(replacement.naturalKey, fitment.naturalKey)
+        # The deleted fitment's key is taken again, so it stays deleted
+        self.assertEqual(Fitment.all_objects.filter(hash=fitment.hash).bulk_restore(), [])
+
+    def test_tenant_keyer_matches_fitment_key(self):
+        defaults = {'subModelName': '', 'bodyNumDoors': 0, 'position': 'Front'}
+        keyer = tenant_fitment_keyer(self.tenant.id, defaults, cache_size=2)
+        rows = [
+            {'partId': 'K1', 'year': 2020, 'makeName': ' Acura ', 'modelName': 'ILX'},
+            {'partId': 'K1', 'year': 2020, 'makeName': 'acura', 'modelName': 'ILX', 'bodyNumDoors': 1},
+            {'partId': 'K1', 'year': 2020, 'makeName': 'acura', 'modelName': 'ILX', 'bodyNumDoors': True},
+            {'partId': 'K2', 'year': '2020', 'makeName': 'ACURA', 'modelName': None, 'position': 'Rear'},
+        ]
+
+        keys = [keyer(row) for row in rows]
+
+        self.assertEqual(keys, [fitment_key(self.tenant.id, {**defaults, **row}) for row in rows])
+        self.assertNotEqual(keys[1], keys[2])
+
+    def test_bulk_create_new_skips_existing_fitments(self):
+        existing = make_fitment(self.tenant, 'K1')
+        other = Tenant.objects.create(name='Other Identity Tenant')
+        candidates = [
+            Fitment(**{**fitment_values(self.tenant, 'K1'), 'fitmentTitle': 'again'}),
+            Fitment(**fitment_values(self.tenant, 'K2')),
+            Fitment(**fitment_values(self.tenant, 'K2')),
+            Fitment(**fitment_values(other, 'K1')),
+        ]
+
+        with self.assertNumQueries(2):
+            inserted = Fitment.objects.bulk_create_new(candidates)
+
+        self.assertEqual([fitment.hash for fitment in inserted], [candidates[1].hash, candidates[3].hash])
+        self.assertEqual(Fitment.objects.get(tenant=self.tenant, partId='K1').hash, existing.hash)
+
+    def test_bulk_publish_counts_each_batch(self):
+        make_fitment(self.tenant, 'K1')
+        candidates = [Fitment(**fitment_values(self.tenant, part_id)) for part_id in ('K1', 'K2', 'K2', 'K3', 'K4')]
+        insert = Fitment.objects.bulk_create_new
+
+        def fail_last_batch(batch):
+            if batch[0].partId == 'K4':
+                raise DatabaseError('batch rejected')
+            return insert(batch)
+
+        with mock.patch.object(Fitment.objects, 'bulk_create_new', side_effect=fail_last_batch), \
+                self.assertLogs('fitments.publishing', 'ERROR'):
+            result = bulk_publish_fitments(candidates, self.tenant, batch_size=2)
+
+        self.assertEqual(result.as_dict(), {'createdCount': 2, 'duplicateCount': 2, 'skippedCount': 0, 'errorCount': 1})
+        self.assertEqual([record['partId'] for record in result.records], ['K2', 'K3'])
+        self.assertCountEqual(
+            Fitment.objects.filter(tenant=self.tenant).values_list('partId', flat=True), ['K1', 'K2', 'K3'],
+        )
+
+    def test_apply_potential_fitments_inserts_once(self):
+        make_fitment(self.tenant, 'K1')
+        request = APIRequestFactory().post('/', {
+            'partId': 'K1',
+            'configurationIds': ['2020_Acura_ILX_Base', '2021_Acura_ILX_Base', '2021_Acura_ILX_Base', 'bad'],
+        }, format='json', HTTP_X_TENANT_ID=str(self.tenant.id))
+        force_authenticate(request, user=User.objects.create_user('applier'))
+
+        with mock.patch.object(Fitment.objects, 'bulk_create_new', wraps=Fitment.objects.bulk_create_new) as insert:
+            response = apply_potential_fitments(request)
+
+        insert.assert_called_once()
+        self.assertEqual(
+            [(detail['configId'], detail['status']) for detail in response.data['details']],
+            [('2020_Acura_ILX_Base', 'failed'), ('2021_Acura_ILX_Base', 'created'),
+             ('2021_Acura_ILX_Base', 'failed'), ('bad', 'failed')],
+        )
+        self.assertEqual(Fitment.objects.filter(tenant=self.tenant, partId='K1', year=2021).count(), 1)
+
+    def test_backfill_soft_deletes_duplicates(self):
+        first = make_fitment(self.tenant, 'K1')
+        second = make_fitment(self.tenant, 'K2')
+        awd = make_fitment(self.tenant, 'K1', driveTypeName='AWD')
+        deleted = make_fitment(self.tenant, 'K3', isDeleted=True)
+        # Rows written before the natural key existed, or with an older identity
+        Fitment.all_objects.update(naturalKey=None)
+        Fitment.objects.filter(hash=awd.hash).update(naturalKey='0' * 64)
+        Fitment.objects.filter(hash=second.hash).update(partId='K1')
+
+        out = io.StringIO()
+        call_command('backfill_fitment_keys', '--dry-run', stdout=out)
+        self.assertIn('Would set 3 natural keys and soft delete 1 duplicate fitments', out.getvalue())
+        self.assertEqual(Fitment.objects.count(), 3)
+        self.assertFalse(Fitment.all_objects.filter(naturalKey__isnull=False).exclude(hash=awd.hash).exists())
+
+        out = io.StringIO()
+        call_command('backfill_fitment_keys', stdout=out)
+
+        self.assertIn(f'Fitment {second.hash} duplicates fitment {first.hash}', out.getvalue())
+        self.assertIn('Set 3 natural keys, soft deleted 1 duplicate fitments', out.getvalue())
+        self.assertCountEqual(Fitment.objects.values_list('hash', flat=True), [first.hash, awd.hash])
+        self.assertEqual(Fitment.objects.get(hash=first.hash).naturalKey, first.naturalKey)
+        self.assertEqual(Fitment.objects.get(hash=awd.hash).naturalKey, awd.naturalKey)
+        duplicate = Fitment.all_objects.get(hash=second.hash)
+        self.assertTrue(duplicate.isDeleted)
+        self.assertEqual(duplicate.naturalKey, first.naturalKey)
+        self.assertEqual(Fitment.all_objects.get(hash=deleted.hash).naturalKey, deleted.naturalKey)
+        self.assertFalse(Fitment.all_objects.filter(naturalKey__isnull=True).exists())
+
+
+class FitmentExportTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user('exporter')
+        self.tenant = Tenant.objects.create(name='Export Tenant')
+        self.other = Tenant.objects.create(name='Other Export Tenant')
+        make_fitment(self.tenant, 'E1', fitmentNotes='comma, "quoted"\nnote')
+        make_fitment(self.tenant, 'E2', makeName='Honda')
+        make_fitment(self.other, 'E3')
+
+    def export(self, **params):
+        request = self.factory.get('/', params, HTTP_X_TENANT_ID=str(self.tenant.id))
+        force_authenticate(request, user=self.user)
+        return export_csv(request)
+
+    def test_csv_is_tenant_scoped_and_filtered(self):
+        response = self.export(sortBy='partId', sortOrder='asc')
+
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['partId'] for row in rows], ['E1', 'E2'])
+        self.assertEqual(rows[0]['fitmentNotes'], 'comma, "quoted"\nnote')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="fitments.csv"')
+
+        response = self.export(makeName='honda', columns='partId,makeName')
+        self.assertEqual(b''.join(response.streaming_content).decode().splitlines(), ['partId,makeName', 'E2,Honda'])
+
+    def test_ndjson_with_selected_columns(self):
+        response = self.export(exportFormat='ndjson', columns='partId,year', sortBy='partId')
+
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(lines, [{'partId': 'E1', 'year': 2020}, {'partId': 'E2', 'year': 2020}])
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.export(exportFormat='xml').status_code, 400)
+        self.assertEqual(self.export(columns='partId,password').status_code, 400)
+
+    @unittest.skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_parquet(self):
+        import pyarrow.parquet as pq
+
+        response = self.export(exportFormat='parquet', columns='partId,year,createdAt')
+
+        table = pq.read_table(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(sorted(table.column('partId').to_pylist()), ['E1', 'E2'])
+        self.assertEqual(str(table.schema.field('year').type), 'int64')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="fitments.parquet"')
+
+    def test_parquet_without_pyarrow(self):
+        with mock.patch.dict(sys.modules, {'pyarrow': None, 'pyarrow.parquet': None}):
+            response = self.export(exportFormat='parquet')
+
+        self.assertEqual(response.status_code, 501)
+        self.assertEqual(response.data, {'error': 'Parquet export requires pyarrow'})
+
+
+class FitmentDashboardTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch('fitments.analytics.get_redis', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tenant = Tenant.objects.create(name='Dashboard Tenant')
+        year = timezone.now().year
+        make_fitment(self.tenant, 'D1', year=year, fitmentType='manual_fitment')
+        make_fitment(self.tenant, 'D1', year=year, modelName='RDX', itemStatus='Inactive', fitmentType='potential_fitment')
+        make_fitment(self.tenant, 'D2', year=year - 1, makeName='Honda', fitmentType='ai_fitment', itemStatus='Pending')
+        make_fitment(Tenant.objects.create(name='Other Dashboard Tenant'), 'D3')
+        self.fitments = Fitment.objects.filter(tenant=self.tenant)
+
+    def test_metrics_come_from_three_queries(self):
+        with self.assertNumQueries(3):
+            data = compute_dashboard(self.fitments)
+
+        self.assertEqual(data['totalFitments'], 3)
+        self.assertEqual((data['manualFitments'], data['aiFitments']), (1, 2))
+        self.assertEqual((data['activeFitments'], data['inactiveFitments'], data['pendingReviewCount']), (1, 1, 1))
+        self.assertEqual((data['totalParts'], data['totalVcdbConfigs'], data['recentActivity']), (2, 3, 3))
+        self.assertEqual(data['topMakes'], [{'makeName': 'Acura', 'count': 2}, {'makeName': 'Honda', 'count': 1}])
+        self.assertEqual([stats['count'] for stats in data['yearlyStats']], [0, 0, 0, 1, 2])
+        self.assertEqual(data['successRate'], 33.3)
+        self.assertEqual(data['coveragePercentage'], 100)
+
+    def test_snapshot_is_reused_until_the_tenant_changes(self):
+        first = get_dashboard_snapshot(self.fitments, [self.tenant.id])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_dashboard_snapshot(self.fitments, [self.tenant.id]), first)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_fitment(self.tenant, 'D4')
+        self.assertEqual(get_dashboard_snapshot(self.fitments, [self.tenant.id])['totalFitments'], 4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fitments.filter(partId='D4').bulk_soft_delete(record_history=False)
+        self.assertEqual(get_dashboard_snapshot(self.fitments, [self.tenant.id])['totalFitments'], 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fitments.get(partId='D2').hard_delete()
+        self.assertEqual(get_dashboard_snapshot(self.fitments, [self.tenant.id])['totalFitments'], 2)
+
+    def test_queryset_delete_is_one_statement(self):
+        # Fitment has no delete signal receivers, so Django does not load the rows
+        with self.assertNumQueries(1):
+            deleted, _ = self.fitments.delete()
+        self.assertEqual(deleted, 3)
+
+
+class PartsWithFitmentsTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user('picker')
+        self.tenant = Tenant.objects.create(name='Parts Tenant')
+        for i in range(3):
+            make_fitment(self.tenant, 'BRK-1', year=2018 + i, baseVehicleId='10')
+        make_fitment(self.tenant, 'BRK-2', baseVehicleId='10', subModelName='Sport', uom='PR', itemStatusCode=1)
+        make_fitment(self.tenant, 'BRK-2', baseVehicleId='10', subModelName='Touring')
+        make_fitment(self.tenant, 'RTR-1', baseVehicleId='20')
+        make_fitment(Tenant.objects.create(name='Other Parts Tenant'), 'BRK-9')
+
+    def get(self, **params):
+        request = self.factory.get('/', params, HTTP_X_TENANT_ID=str(self.tenant.id))
+        force_authenticate(request, user=self.user)
+        return get_parts_with_fitments(request)
+
+    def test_summary_is_one_grouped_query(self):
+        # Tenant lookup, then the summary itself
+        with self.assertNumQueries(2):
+            parts = self.get().data
+
+        self.assertEqual([(part['id'], part['fitmentCount']) for part in parts], [('BRK-1', 3), ('BRK-2', 2), ('RTR-1', 1)])
+
+    def test_search_and_pagination(self):
+        data = self.get(search='brk', page=2, pageSize=1).data
+
+        self.assertEqual(data['totalCount'], 2)
+        self.assertEqual([part['id'] for part in data['parts']], ['BRK-2'])
+
+    def test_base_vehicle_recommendations(self):
+        with self.assertNumQueries(2):
+            recommendations = get_base_vehicle_recommendations('BRK-1')
 
-# Create your tests here.
+        self.assertEqual(sorted(rec['submodel'] for rec in recommendations), ['Sport', 'Touring'])
+        evidence = recommendations[0]['sourceEvidence']
+        self.assertEqual(len(evidence), 3)
+        self.assertEqual({item['fitment']['partId'] for item in evidence}, {'BRK-1'})
+        self.assertEqual(get_base_vehicle_recommendations('RTR-1'), [])
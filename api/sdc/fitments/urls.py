@@ -24,6 +24,9 @@ urlpatterns = [
     path('submit/<uuid:session_id>/', views.submit_validated_fitments, name='submit_validated_fitments'),
     path('validation/<uuid:session_id>/', views.get_validation_results, name='get_validation_results'),
     
+    # Server-side selections for bulk actions
+    path('selections/', views.create_fitment_selection, name='create_fitment_selection'),
+    
     # Individual fitment operations
     path('<str:fitment_hash>/', views.fitment_detail, name='fitment_detail'),
     path('<str:fitment_hash>/update/', views.update_fitment, name='update_fitment'),
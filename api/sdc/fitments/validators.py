@@ -1,6 +1,8 @@
-import pandas as pd
+from sdc.lazy_imports import lazy_module
 from django.core.exceptions import ValidationError
 
+pd = lazy_module('pandas')
+
 
 def validate_fitment_row(row, row_number):
     """Validate a single fitment row"""
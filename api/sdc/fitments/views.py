@@ -2,32 +2,46 @@ from django.shortcuts import render
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Q, Count, Case, When, IntegerField, Min, Max
+from django.db import IntegrityError
+from django.db.models import Q, Count, Case, When, IntegerField, Min, Max, F, Window
+from django.db.models.functions import RowNumber
 from django.http import StreamingHttpResponse, HttpResponse, JsonResponse
 from django.core.paginator import Paginator
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
-from .models import Fitment, FitmentUploadSession, FitmentValidationResult, PotentialVehicleConfiguration
+from django.core.exceptions import ValidationError
+from django.conf import settings
+from django.utils import timezone
+from .models import Fitment, FitmentSelection, FitmentUploadSession, FitmentValidationResult, PotentialVehicleConfiguration
 from .validators import validate_fitment_row
+from .ingest import ingest_fitments
+from .analytics import get_dashboard_snapshot
+from .exports import EXPORT_FORMATS, STREAMS as EXPORT_STREAMS, ExportUnavailable, export_columns, stream_csv
 from tenants.utils import get_tenant_from_request, filter_queryset_by_tenant, get_tenant_id_from_request
+from sdc.db_routing import replica_reads
 import os
 import csv
 import json
-import openpyxl
-from openpyxl.styles import Font, PatternFill
 from io import BytesIO
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
 import logging
-import pandas as pd
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sdc.lazy_imports import lazy_module
+
+# Loaded on first use: most requests never touch them
+openpyxl = lazy_module('openpyxl')
+pd = lazy_module('pandas')
+np = lazy_module('numpy')
 
 logger = logging.getLogger(__name__)
 
+VALIDATION_RESULT_BATCH_SIZE = 5000
+DUPLICATE_FITMENT_ERROR = "A fitment for this part, vehicle and position already exists"
+
 
 # Create your views here.
 
@@ -264,6 +278,36 @@ def _apply_sort(queryset, sort_by: str | None, sort_order: str | None):
     return queryset.order_by(field)
 
 
+def _selection_queryset(selection):
+    """Fitments in a saved selection, as a lazy queryset usable as an UPDATE subquery"""
+    tenant_fitments = Fitment.objects.filter(tenant_id=selection.tenant_id)
+    # Fitments created after the selection was made are not part of it
+    matched = _apply_filters(tenant_fitments, selection.filters).filter(createdAt__lte=selection.created_at)
+    if selection.include:
+        matched = tenant_fitments.filter(Q(pk__in=matched.values('pk')) | Q(hash__in=selection.include))
+    if selection.exclude:
+        matched = matched.exclude(hash__in=selection.exclude)
+    return matched
+
+
+def _bulk_action_fitments(data, tenant_id):
+    """
+    Fitments targeted by a bulk action: a ``selection_token`` from
+    ``create_fitment_selection`` or an explicit ``fitment_hashes`` list.
+    Returns None when the token is unknown, expired or from another tenant.
+    """
+    token = data.get('selection_token')
+    if not token:
+        return Fitment.objects.filter(hash__in=data.get('fitment_hashes', []), tenant_id=tenant_id)
+    try:
+        selection = FitmentSelection.objects.filter(
+            token=token, tenant_id=tenant_id, expires_at__gt=timezone.now()
+        ).first()
+    except ValidationError:
+        return None
+    return _selection_queryset(selection) if selection else None
+
+
 @api_view(["GET", "POST", "DELETE"])
 def fitments_root(request):
     if request.method == "GET":
@@ -339,7 +383,10 @@ def fitments_root(request):
             positionId=int(payload.get("positionId", 1)), liftHeight=payload.get("liftHeight", "Stock"),
             wheelType=payload.get("wheelType", "Alloy"), createdBy="api", updatedBy="api",
         )
-        fitment.save()
+        try:
+            fitment.save()
+        except IntegrityError:
+            return Response({"error": DUPLICATE_FITMENT_ERROR}, status=status.HTTP_409_CONFLICT)
         return Response({
             "message": "Fitment created successfully",
             "hash": fitment.hash,
@@ -369,13 +416,8 @@ def fitments_root(request):
             "error": "No tenant available. Please create a tenant first."
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    for fitment_hash in hashes:
-        try:
-            fitment = Fitment.all_objects.get(hash=fitment_hash, tenant=tenant)
-            fitment.soft_delete(deleted_by=deleted_by)
-            deleted_count += 1
-        except Fitment.DoesNotExist:
-            continue
+    if hashes:
+        deleted_count = len(Fitment.objects.filter(hash__in=hashes, tenant=tenant).bulk_soft_delete(changed_by=deleted_by))
     
     return Response({
         "message": f"Deleted {deleted_count} fitments",
@@ -384,6 +426,7 @@ def fitments_root(request):
 
 
 @api_view(["GET"]) 
+@replica_reads
 def coverage(request):
     """Enhanced coverage analysis with real VCDB data filtered by tenant or entity_ids"""
     qp = request.query_params
@@ -484,6 +527,7 @@ def coverage(request):
 
 
 @api_view(["GET"])
+@replica_reads
 def detailed_coverage(request):
     """Get detailed coverage by model within a make filtered by tenant or entity_ids"""
     make = request.GET.get('make')
@@ -569,6 +613,7 @@ def detailed_coverage(request):
 
 
 @api_view(["GET"])
+@replica_reads
 def coverage_trends(request):
     """Get coverage trends by year for a specific make filtered by tenant or entity_ids"""
     make = request.GET.get('make')
@@ -639,6 +684,7 @@ def coverage_trends(request):
 
 
 @api_view(["GET"])
+@replica_reads
 def coverage_gaps(request):
     """Find models with low coverage that need attention filtered by tenant or entity_ids"""
     make = request.GET.get('make')
@@ -848,33 +894,44 @@ class Echo:
         return value
 
 
+def _export_queryset(request):
+    """Tenant-scoped fitments matching the list filters and sort of the request"""
+    params = request.query_params
+    qs = filter_queryset_by_tenant(Fitment.objects.all(), request)
+    qs = _apply_filters(qs, params)
+    return _apply_sort(qs, params.get("sortBy"), params.get("sortOrder"))
+
+
 @api_view(["GET"]) 
+@replica_reads
 def export_csv(request):
-    qs = Fitment.objects.all()
-    qs = _apply_filters(qs, request.query_params)
-    qs = _apply_sort(qs, request.query_params.get("sortBy"), request.query_params.get("sortOrder"))
-    pseudo_buffer = Echo()
-    writer = csv.writer(pseudo_buffer)
-    headers = [
-        "hash","partId","itemStatus","itemStatusCode","baseVehicleId","year","makeName","modelName","subModelName",
-        "driveTypeName","fuelTypeName","bodyNumDoors","bodyTypeName","ptid","partTypeDescriptor","uom","quantity",
-        "fitmentTitle","fitmentDescription","fitmentNotes","position","positionId","liftHeight","wheelType","createdAt","createdBy","updatedAt","updatedBy"
-    ]
-    def row_iter():
-        yield writer.writerow(headers)
-        for f in qs.iterator():
-            yield writer.writerow([
-                f.hash,f.partId,f.itemStatus,f.itemStatusCode,f.baseVehicleId,f.year,f.makeName,f.modelName,f.subModelName,
-                f.driveTypeName,f.fuelTypeName,f.bodyNumDoors,f.bodyTypeName,f.ptid,f.partTypeDescriptor,f.uom,f.quantity,
-                f.fitmentTitle,f.fitmentDescription or "",f.fitmentNotes or "",f.position,f.positionId,f.liftHeight,f.wheelType,
-                f.createdAt.isoformat(),f.createdBy,f.updatedAt.isoformat(),f.updatedBy
-            ])
-    response = StreamingHttpResponse(row_iter(), content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="fitments.csv"'
+    """
+    Stream fitments as csv (default), ndjson or parquet.
+    ``exportFormat`` picks the format and ``columns`` (comma-separated) the columns.
+    """
+    export_format = request.query_params.get("exportFormat", "csv").lower()
+    if export_format not in EXPORT_FORMATS:
+        return Response(
+            {"error": f"Invalid exportFormat. Use {', '.join(EXPORT_FORMATS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        columns = export_columns(request.query_params.get("columns"))
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        chunks = EXPORT_STREAMS[export_format](_export_queryset(request), columns)
+    except ExportUnavailable as e:
+        return Response({"error": str(e)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+    content_type, extension = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="fitments.{extension}"'
     return response
 
 
 @api_view(["GET"]) 
+@replica_reads
 def coverage_export(request):
     # Get coverage data directly instead of calling the view function
     qp = request.query_params
@@ -1063,6 +1120,8 @@ def _export_xls_response(fitments_data, filename_prefix):
     ]
     
     # Style for headers
+    from openpyxl.styles import Font, PatternFill
+
     header_font = Font(bold=True)
     header_fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
     
@@ -1302,6 +1361,8 @@ def update_fitment(request, fitment_hash):
             {"error": "Fitment not found"}, 
             status=status.HTTP_404_NOT_FOUND
         )
+    except IntegrityError:
+        return Response({"error": DUPLICATE_FITMENT_ERROR}, status=status.HTTP_409_CONFLICT)
     except Exception as e:
         logger.error(f"Error updating fitment: {str(e)}")
         return Response(
@@ -1311,6 +1372,7 @@ def update_fitment(request, fitment_hash):
 
 
 @api_view(["GET"])
+@replica_reads
 def fitment_filter_options(request):
     """Get filter options for fitments (unique values for dropdowns)"""
     try:
@@ -1346,31 +1408,20 @@ def fitment_filter_options(request):
 
 
 @api_view(["GET"])
+@replica_reads
 def export_fitments_advanced_csv(request):
-    """Export fitments with advanced filtering in CSV or XLSX format"""
+    """Export fitments with advanced filtering in CSV format"""
     try:
-        print(request.query_params)
-        
-        # Get filtered queryset
-        qs = Fitment.objects.all()
-        qs = _apply_filters(qs, request.query_params)
-        qs = _apply_sort(qs, request.query_params.get("sortBy"), request.query_params.get("sortOrder"))
-        
-        # Convert to list of dictionaries
-        fitments_data = list(qs.values())
-        
-        
-        return _export_csv_response(fitments_data, 'fitments_export')
-        
-            
-    except Exception as e:
-        logger.error(f"Error exporting fitments: {str(e)}")
-        return Response(
-            {"error": "Failed to export fitments"}, 
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
+        columns = export_columns(request.query_params.get("columns"))
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    response = StreamingHttpResponse(stream_csv(_export_queryset(request), columns), content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="fitments_export.csv"'
+    return response
 
 @api_view(["GET"])
+@replica_reads
 def export_fitments_advanced_xlsx(request):
     """Export fitments with advanced filtering in CSV or XLSX format"""
     try:
@@ -1481,6 +1532,8 @@ def validate_fitments_csv(request):
         repaired_rows = {}
         invalid_rows = {}
         ignored_columns = []
+        # Cell results are written with bulk_create, not one INSERT per cell
+        pending_results = []
         
         # Validate each row
         for index, row in df.iterrows():
@@ -1491,19 +1544,19 @@ def validate_fitments_csv(request):
             if validation_result['is_valid']:
                 # Row is valid - store all fields as valid
                 for column, value in row.items():
-                    FitmentValidationResult.objects.create(
+                    pending_results.append(FitmentValidationResult(
                         session=session,
                         row_number=row_number,
                         column_name=column,
                         original_value=str(value) if not pd.isna(value) else '',
                         is_valid=True
-                    )
+                    ))
             elif validation_result['can_repair']:
                 # Row can be auto-repaired
                 repaired_rows[row_number] = validation_result['repairs']
                 for column, value in row.items():
                     corrected_value = validation_result['repairs'].get(column, value)
-                    FitmentValidationResult.objects.create(
+                    pending_results.append(FitmentValidationResult(
                         session=session,
                         row_number=row_number,
                         column_name=column,
@@ -1511,20 +1564,26 @@ def validate_fitments_csv(request):
                         corrected_value=str(corrected_value) if not pd.isna(corrected_value) else '',
                         is_valid=True,
                         error_message='Auto-corrected' if column in validation_result['repairs'] else None
-                    )
+                    ))
             else:
                 # Row has errors that cannot be auto-repaired
                 invalid_rows[row_number] = validation_result['errors']
                 for column, value in row.items():
                     error_message = validation_result['errors'].get(column)
-                    FitmentValidationResult.objects.create(
+                    pending_results.append(FitmentValidationResult(
                         session=session,
                         row_number=row_number,
                         column_name=column,
                         original_value=str(value) if not pd.isna(value) else '',
                         is_valid=column not in validation_result['errors'],
                         error_message=error_message
-                    )
+                    ))
+        
+            if len(pending_results) >= VALIDATION_RESULT_BATCH_SIZE:
+                FitmentValidationResult.objects.bulk_create(pending_results)
+                pending_results = []
+        
+        FitmentValidationResult.objects.bulk_create(pending_results)
         
         # Calculate statistics
         valid_rows = session.total_rows - len(invalid_rows)
@@ -1550,6 +1609,47 @@ def validate_fitments_csv(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def _validated_rows(validation_results):
+    """(row_number, {column: value}) per row, preferring corrected values"""
+    cells = validation_results.order_by('row_number').values_list(
+        'row_number', 'column_name', 'corrected_value', 'original_value'
+    )
+    for row_number, row_cells in groupby(cells, key=itemgetter(0)):
+        yield row_number, {column: corrected or original for _, column, corrected, original in row_cells}
+
+
+def _fitment_from_validated_row(row_data):
+    """Fitment field values for one validated upload row"""
+    required_fields = ['PartID', 'YearID', 'MakeName', 'ModelName', 'PTID']
+    for field in required_fields:
+        if not row_data.get(field):
+            raise ValueError(f'Missing required field: {field}')
+    
+    return {
+        'partId': row_data['PartID'],
+        'year': int(row_data['YearID']),
+        'makeName': row_data['MakeName'],
+        'modelName': row_data['ModelName'],
+        'subModelName': row_data.get('SubModelName', ''),
+        'driveTypeName': row_data.get('DriveTypeName', ''),
+        'fuelTypeName': row_data.get('FuelTypeName', ''),
+        'bodyNumDoors': int(row_data.get('BodyNumDoors', 4)),
+        'bodyTypeName': row_data.get('BodyTypeName', ''),
+        'ptid': row_data['PTID'],
+        'partTypeDescriptor': row_data.get('PTID', ''),  # Using PTID as descriptor
+        'quantity': int(row_data.get('Quantity', 1)),
+        'fitmentTitle': row_data.get('FitmentTitle', ''),
+        'fitmentDescription': row_data.get('FitmentDescription', ''),
+        'fitmentNotes': row_data.get('FitmentNotes', ''),
+        'position': row_data.get('Position', ''),
+        'positionId': int(row_data.get('PositionId', 1)),
+        'liftHeight': row_data.get('LiftHeight', ''),
+        'uom': row_data.get('UOM', 'EA'),
+        'wheelType': row_data.get('WheelType', ''),
+        'fitmentType': 'manual_fitment',
+    }
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def submit_validated_fitments(request, session_id):
@@ -1582,82 +1682,29 @@ def submit_validated_fitments(request, session_id):
                 'error': 'No valid fitments to submit'
             }, status=400)
         
-        # Group by row number and create fitment records
-        rows_data = {}
-        for result in valid_results:
-            row_num = result.row_number
-            if row_num not in rows_data:
-                rows_data[row_num] = {}
-            
-            # Use corrected value if available, otherwise original
-            value = result.corrected_value or result.original_value
-            rows_data[row_num][result.column_name] = value
-        
-        # Create fitment records
+        # Rows are read a batch at a time; each batch is COPYed through the
+        # ingest engine, which also skips duplicates against earlier batches
         created_count = 0
         skipped_count = 0
+        total_rows = 0
         errors = []
-        
-        for row_number, row_data in rows_data.items():
-            try:
-                # Validate required fields
-                required_fields = ['PartID', 'YearID', 'MakeName', 'ModelName', 'PTID']
-                for field in required_fields:
-                    if not row_data.get(field):
-                        raise ValueError(f'Missing required field: {field}')
-                
-                # Check for existing fitment with same key data (filtered by tenant)
-                existing_fitment = Fitment.objects.filter(
-                    partId=row_data['PartID'],
-                    year=int(row_data['YearID']),
-                    makeName=row_data['MakeName'],
-                    modelName=row_data['ModelName'],
-                    ptid=row_data['PTID'],
-                    isDeleted=False
-                )
-                
-                # Apply tenant filtering if tenant exists
-                if tenant:
-                    existing_fitment = existing_fitment.filter(tenant=tenant)
-                
-                existing_fitment = existing_fitment.first()
-                
-                if existing_fitment:
-                    skipped_count += 1
-                    continue  # Skip creating duplicate
-                
-                # Create fitment record
-                fitment = Fitment.objects.create(
-                    partId=row_data['PartID'],
-                    year=int(row_data['YearID']),
-                    makeName=row_data['MakeName'],
-                    modelName=row_data['ModelName'],
-                    subModelName=row_data.get('SubModelName', ''),
-                    driveTypeName=row_data.get('DriveTypeName', ''),
-                    fuelTypeName=row_data.get('FuelTypeName', ''),
-                    bodyNumDoors=int(row_data.get('BodyNumDoors', 4)),
-                    bodyTypeName=row_data.get('BodyTypeName', ''),
-                    tenant=tenant,  # Add tenant to fitment
-                    ptid=row_data['PTID'],
-                    partTypeDescriptor=row_data.get('PTID', ''),  # Using PTID as descriptor
-                    quantity=int(row_data.get('Quantity', 1)),
-                    fitmentTitle=row_data.get('FitmentTitle', ''),
-                    fitmentDescription=row_data.get('FitmentDescription', ''),
-                    fitmentNotes=row_data.get('FitmentNotes', ''),
-                    position=row_data.get('Position', ''),
-                    positionId=int(row_data.get('PositionId', 1)),
-                    liftHeight=row_data.get('LiftHeight', ''),
-                    uom=row_data.get('UOM', 'EA'),
-                    wheelType=row_data.get('WheelType', ''),
-                    fitmentType='manual_fitment',
-                    createdBy='bulk_upload',
-                    updatedBy='bulk_upload'
-                )
-                created_count += 1
-                
-            except Exception as e:
-                errors.append(f'Row {row_number}: {str(e)}')
-                continue
+        batch_rows = getattr(settings, 'FITMENT_INGEST_BATCH_ROWS', 20000)
+        last_row = valid_results.aggregate(last=Max('row_number'))['last'] or 0
+        
+        for first_row in range(0, last_row + 1, batch_rows):
+            fitment_rows = []
+            for row_number, row_data in _validated_rows(
+                valid_results.filter(row_number__gte=first_row, row_number__lt=first_row + batch_rows)
+            ):
+                total_rows += 1
+                try:
+                    fitment_rows.append(_fitment_from_validated_row(row_data))
+                except Exception as e:
+                    errors.append(f'Row {row_number}: {str(e)}')
+            if fitment_rows:
+                result = ingest_fitments(fitment_rows, tenant, created_by='bulk_upload')
+                created_count += result.created
+                skipped_count += result.duplicates
         
         # Update session status
         session.status = 'submitted'
@@ -1667,7 +1714,7 @@ def submit_validated_fitments(request, session_id):
             'success': True,
             'created_count': created_count,
             'skipped_count': skipped_count,
-            'total_rows': len(rows_data),
+            'total_rows': total_rows,
             'errors': errors,
             'tenant_id': str(tenant.id) if tenant else None,
             'tenant_name': tenant.name if tenant else None,
@@ -1734,9 +1781,6 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.db.models import Q
 from .models import Fitment, PotentialVehicleConfiguration
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import logging
 
 logger = logging.getLogger(__name__)
@@ -1834,6 +1878,8 @@ def get_similarity_recommendations(part_id):
         all_features = np.array(all_features)
         
         # Calculate similarity using cosine similarity
+        from sklearn.metrics.pairwise import cosine_similarity
+
         similarity_matrix = cosine_similarity(all_features, existing_features)
         
         # Calculate average similarity scores for each configuration with source evidence
@@ -1933,143 +1979,155 @@ def get_similarity_recommendations(part_id):
         return []
 
 
+BASE_VEHICLE_EVIDENCE_FIELDS = (
+    'baseVehicleId', 'partId', 'year', 'makeName', 'modelName', 'subModelName', 'driveTypeName',
+    'fuelTypeName', 'bodyNumDoors', 'bodyTypeName', 'position', 'fitmentTitle',
+)
+
+
 def get_base_vehicle_recommendations(part_id):
     """
     Base vehicle relationship recommendations
     """
     try:
-        # Get existing fitments
-        existing_fitments = Fitment.objects.filter(partId=part_id, isDeleted=False)
+        # Up to 3 fitments of the part per base vehicle serve as source evidence
+        existing_fitments = Fitment.objects.filter(partId=part_id)
+        evidence_rows = existing_fitments.annotate(
+            evidence_rank=Window(RowNumber(), partition_by=[F('baseVehicleId')], order_by=F('hash').asc())
+        ).filter(evidence_rank__lte=3).values(*BASE_VEHICLE_EVIDENCE_FIELDS)
         
-        if not existing_fitments.exists():
+        evidence_by_base_vehicle = {}
+        for row in evidence_rows:
+            evidence_by_base_vehicle.setdefault(row['baseVehicleId'], []).append(row)
+        
+        if not evidence_by_base_vehicle:
             return []
         
-        # Get base vehicle IDs from existing fitments
-        existing_base_vehicle_ids = existing_fitments.values_list('baseVehicleId', flat=True).distinct()
+        # Configurations of other parts that share one of those base vehicles
+        related_configs = Fitment.objects.filter(
+            baseVehicleId__in=existing_fitments.values('baseVehicleId')
+        ).exclude(
+            partId=part_id  # Exclude current part
+        ).values(
+            'baseVehicleId', 'year', 'makeName', 'modelName', 'subModelName',
+            'driveTypeName', 'fuelTypeName', 'bodyNumDoors', 'bodyTypeName'
+        ).distinct().order_by('baseVehicleId', 'year', 'makeName', 'modelName', 'subModelName')
         
-        # Find configurations with same base vehicle but different submodels
-        recommendations = []
-        for base_vehicle_id in existing_base_vehicle_ids:
-            # Get all fitments with this base vehicle ID
-            related_fitments = Fitment.objects.filter(
-                baseVehicleId=base_vehicle_id,
-                isDeleted=False
-            ).exclude(
-                partId=part_id  # Exclude current part
-            ).values(
-                'baseVehicleId', 'year', 'makeName', 'modelName', 'subModelName',
-                'driveTypeName', 'fuelTypeName', 'bodyNumDoors', 'bodyTypeName'
-            ).distinct()
+        recommendations = {}
+        for config in related_configs.iterator():
+            config_key = f"{config['year']}_{config['makeName']}_{config['modelName']}_{config['subModelName']}"
+            if config_key in recommendations:
+                continue
+            base_vehicle_id = config['baseVehicleId']
             
-            for config in related_fitments:
-                config_key = f"{config['year']}_{config['makeName']}_{config['modelName']}_{config['subModelName']}"
-                
-                # Get source fitments that share the same base vehicle
-                source_fitments = Fitment.objects.filter(
-                    baseVehicleId=base_vehicle_id,
-                    partId=part_id,
-                    isDeleted=False
-                )[:3]  # Get up to 3 source fitments
-                
-                source_evidence = []
-                for source_fitment in source_fitments:
-                    source_evidence.append({
-                        'fitment': {
-                            'partId': source_fitment.partId,
-                            'year': source_fitment.year,
-                            'makeName': source_fitment.makeName,
-                            'modelName': source_fitment.modelName,
-                            'subModelName': source_fitment.subModelName,
-                            'driveTypeName': source_fitment.driveTypeName,
-                            'fuelTypeName': source_fitment.fuelTypeName,
-                            'position': source_fitment.position,
-                            'fitmentTitle': source_fitment.fitmentTitle
-                        },
-                        'relationship': 'same_base_vehicle',
-                        'matchedAttributes': _calculate_matched_attributes_base_vehicle(config, {
-                            'year': source_fitment.year,
-                            'makeName': source_fitment.makeName,
-                            'modelName': source_fitment.modelName,
-                            'subModelName': source_fitment.subModelName,
-                            'driveTypeName': source_fitment.driveTypeName,
-                            'fuelTypeName': source_fitment.fuelTypeName,
-                            'bodyNumDoors': source_fitment.bodyNumDoors,
-                            'bodyTypeName': source_fitment.bodyTypeName
-                        })
-                    })
-                
-                # Generate AI explanation based on base vehicle relationship
-                explanation = _generate_base_vehicle_explanation(config, base_vehicle_id)
-                
-                # Build confidence breakdown
-                confidence_breakdown = _build_confidence_breakdown_base_vehicle(config, source_evidence)
-                
-                recommendations.append({
-                    'id': config_key,
-                    'vehicleId': f"{config['year']}_{config['makeName']}_{config['modelName']}",
-                    'baseVehicleId': config['baseVehicleId'],
-                    'year': config['year'],
-                    'make': config['makeName'],
-                    'model': config['modelName'],
-                    'submodel': config['subModelName'],
-                    'driveType': config['driveTypeName'],
-                    'fuelType': config['fuelTypeName'],
-                    'numDoors': config['bodyNumDoors'],
-                    'bodyType': config['bodyTypeName'],
-                    'relevance': 85,  # High confidence for base vehicle method
-                    'method': 'base-vehicle',
-                    'explanation': explanation,
-                    'sourceEvidence': source_evidence,
-                    'confidenceBreakdown': confidence_breakdown
+            source_evidence = []
+            for source_fitment in evidence_by_base_vehicle.get(base_vehicle_id, []):
+                source_evidence.append({
+                    'fitment': {
+                        field: source_fitment[field]
+                        for field in (
+                            'partId', 'year', 'makeName', 'modelName', 'subModelName',
+                            'driveTypeName', 'fuelTypeName', 'position', 'fitmentTitle'
+                        )
+                    },
+                    'relationship': 'same_base_vehicle',
+                    'matchedAttributes': _calculate_matched_attributes_base_vehicle(config, source_fitment)
                 })
+            
+            # Generate AI explanation based on base vehicle relationship
+            explanation = _generate_base_vehicle_explanation(config, base_vehicle_id)
+            
+            # Build confidence breakdown
+            confidence_breakdown = _build_confidence_breakdown_base_vehicle(config, source_evidence)
+            
+            recommendations[config_key] = {
+                'id': config_key,
+                'vehicleId': f"{config['year']}_{config['makeName']}_{config['modelName']}",
+                'baseVehicleId': base_vehicle_id,
+                'year': config['year'],
+                'make': config['makeName'],
+                'model': config['modelName'],
+                'submodel': config['subModelName'],
+                'driveType': config['driveTypeName'],
+                'fuelType': config['fuelTypeName'],
+                'numDoors': config['bodyNumDoors'],
+                'bodyType': config['bodyTypeName'],
+                'relevance': 85,  # High confidence for base vehicle method
+                'method': 'base-vehicle',
+                'explanation': explanation,
+                'sourceEvidence': source_evidence,
+                'confidenceBreakdown': confidence_breakdown
+            }
+            # Every recommendation has the same relevance, so the first 50 are the top 50
+            if len(recommendations) == 50:
+                break
         
-        # Remove duplicates and sort by relevance
-        unique_recommendations = {}
-        for rec in recommendations:
-            if rec['id'] not in unique_recommendations:
-                unique_recommendations[rec['id']] = rec
-        
-        return sorted(unique_recommendations.values(), key=lambda x: x['relevance'], reverse=True)[:50]
+        return list(recommendations.values())
         
     except Exception as e:
         logger.error(f"Error in get_base_vehicle_recommendations: {str(e)}")
         return []
 
 
+def _parts_summary(queryset):
+    """
+    One row per part: fitment count plus uom and status of its representative
+    (lowest hash) fitment, computed with window functions in a single query.
+    """
+    partition = {'partition_by': [F('partId')]}
+    return queryset.annotate(
+        part_rank=Window(RowNumber(), order_by=F('hash').asc(), **partition),
+        fitment_count=Window(Count('pk'), **partition),
+    ).filter(part_rank=1).values('partId', 'uom', 'itemStatusCode', 'fitment_count').order_by('partId')
+
+
 @api_view(['GET'])
+@replica_reads
 def get_parts_with_fitments(request):
     """
-    GET /api/fitments/parts-with-fitments/
+    GET /api/fitments/parts-with-fitments/?search=&page=&pageSize=
     
-    Returns list of parts that have existing fitments.
+    Returns the parts of the current tenant that have existing fitments,
+    optionally filtered by ``search`` (part ID substring). With ``page`` the
+    response is paginated: {parts, totalCount, page, pageSize}.
     """
     try:
-        # Get parts that have at least one fitment
-        parts_with_fitments = Fitment.objects.filter(isDeleted=False).values(
-            'partId'
-        ).distinct()
-        
-        parts_data = []
-        for part_info in parts_with_fitments:
-            part_id = part_info['partId']
-            
-            # Get fitment count for this part
-            fitment_count = Fitment.objects.filter(partId=part_id, isDeleted=False).count()
-            
-            # Get first fitment to get part details
-            first_fitment = Fitment.objects.filter(partId=part_id, isDeleted=False).first()
-            
-            if first_fitment:
-                parts_data.append({
-                    'id': part_id,
-                    'description': f"Part {part_id}",  # Could be enhanced with actual part descriptions
-                    'unitOfMeasure': first_fitment.uom,
-                    'itemStatus': 'Active' if first_fitment.itemStatusCode == 0 else 'Inactive',
-                    'fitmentCount': fitment_count
-                })
+        params = request.query_params
+        tenant_fitments = filter_queryset_by_tenant(Fitment.objects.all(), request)
+        search = (params.get('search') or '').strip()
+        if search:
+            tenant_fitments = tenant_fitments.filter(partId__icontains=search)
+        
+        summary = _parts_summary(tenant_fitments)
+        paginated = 'page' in params
+        if paginated:
+            page = max(int(params.get('page', 1)), 1)
+            page_size = min(max(int(params.get('pageSize', 50)), 1), 500)
+            total = tenant_fitments.values('partId').distinct().count()
+            summary = summary[(page - 1) * page_size:page * page_size]
+        
+        parts_data = [
+            {
+                'id': part['partId'],
+                'description': f"Part {part['partId']}",  # Could be enhanced with actual part descriptions
+                'unitOfMeasure': part['uom'],
+                'itemStatus': 'Active' if part['itemStatusCode'] == 0 else 'Inactive',
+                'fitmentCount': part['fitment_count']
+            }
+            for part in summary
+        ]
         
+        if paginated:
+            return Response({
+                'parts': parts_data,
+                'totalCount': total,
+                'page': page,
+                'pageSize': page_size
+            })
         return Response(parts_data)
         
+    except ValueError:
+        return Response({'error': 'page and pageSize must be integers'}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         logger.error(f"Error in get_parts_with_fitments: {str(e)}")
         return Response(
@@ -2111,6 +2169,8 @@ def apply_potential_fitments(request):
             )
         
         created_fitments = []
+        # (position in created_fitments, config id, fitment, note) for the single insert below
+        new_fitments = []
         
         for config_id in configuration_ids:
             # Parse configuration ID to get vehicle details
@@ -2145,7 +2205,7 @@ def apply_potential_fitments(request):
                     
                     # Create new fitment with tenant association
                     # Use matching fitment data if available, otherwise use sensible defaults
-                    new_fitment = Fitment.objects.create(
+                    new_fitment = Fitment(
                         tenant=tenant,  # Associate with current tenant
                         partId=part_id,
                         itemStatus='Active',
@@ -2174,13 +2234,9 @@ def apply_potential_fitments(request):
                         createdBy='ai_system',
                         updatedBy='ai_system'
                     )
-                    
-                    created_fitments.append({
-                        'id': new_fitment.hash,
-                        'configId': config_id,
-                        'status': 'created',
-                        'note': 'Used default values' if not matching_fitment else 'Used matching fitment data'
-                    })
+                    note = 'Used default values' if not matching_fitment else 'Used matching fitment data'
+                    new_fitments.append((len(created_fitments), config_id, new_fitment, note))
+                    created_fitments.append(None)
                 else:
                     created_fitments.append({
                         'id': None,
@@ -2197,6 +2253,25 @@ def apply_potential_fitments(request):
                     'error': str(e)
                 })
         
+        inserted = {
+            fitment.hash for fitment in Fitment.objects.bulk_create_new([fitment for _, _, fitment, _ in new_fitments])
+        }
+        for position, config_id, new_fitment, note in new_fitments:
+            if new_fitment.hash in inserted:
+                created_fitments[position] = {
+                    'id': new_fitment.hash,
+                    'configId': config_id,
+                    'status': 'created',
+                    'note': note
+                }
+            else:
+                created_fitments[position] = {
+                    'id': None,
+                    'configId': config_id,
+                    'status': 'failed',
+                    'error': 'Fitment already exists'
+                }
+        
         success_count = len([f for f in created_fitments if f['status'] == 'created'])
         failed_count = len([f for f in created_fitments if f['status'] == 'failed'])
         
@@ -2218,6 +2293,7 @@ def apply_potential_fitments(request):
 
 
 @api_view(['GET'])
+@replica_reads
 def analytics_dashboard(request):
     """
     GET /api/analytics/dashboard/
@@ -2225,129 +2301,38 @@ def analytics_dashboard(request):
     Returns aggregated analytics data for the dashboard filtered by current tenant or entity_ids.
     """
     try:
-        from datetime import timedelta
-        from django.db.models import Count, Q
-        from django.utils import timezone
-        from tenants.utils import filter_queryset_by_tenant, get_tenant_from_request
-        
         # Check if entity_ids parameter is provided
         entity_ids = request.query_params.get("entity_ids")
+        tenant = None
         
         if entity_ids:
             # If entity_ids is provided, filter by those specific entities
             entity_id_list = [eid.strip() for eid in entity_ids.split(',') if eid.strip()]
             if entity_id_list:
                 tenant_fitments = Fitment.objects.filter(tenant_id__in=entity_id_list)
-                tenant = None  # No single tenant when using entity_ids
-                print(f"DEBUG: Using entity_ids filtering: {entity_id_list}")
+                tenant_ids = entity_id_list
             else:
                 tenant_fitments = Fitment.objects.all()
-                tenant = None
+                tenant_ids = None
         else:
-            # Get tenant-filtered fitments queryset
             try:
                 tenant = get_tenant_from_request(request)
-                tenant_fitments = filter_queryset_by_tenant(Fitment.objects.all(), request)
-                print(f"DEBUG: Tenant found: {tenant.name} (ID: {tenant.id})")
-                print(f"DEBUG: X-Tenant-ID header: {request.headers.get('X-Tenant-ID')}")
+                tenant_fitments = Fitment.objects.filter(tenant_id=tenant.id)
+                tenant_ids = [tenant.id]
             except Exception as e:
                 # Fallback to all fitments if no tenant found (for testing)
                 tenant_fitments = Fitment.objects.all()
-                tenant = None
-                print(f"DEBUG: No tenant found, using all fitments. Error: {str(e)}")
-                print(f"DEBUG: X-Tenant-ID header: {request.headers.get('X-Tenant-ID')}")
-        
-        print(f"DEBUG: Total fitments before filtering: {Fitment.objects.count()}")
-        print(f"DEBUG: Tenant-filtered fitments: {tenant_fitments.count()}")
-        
-        # Debug: Check fitments with and without tenant
-        if tenant:
-            fitments_with_tenant = Fitment.objects.filter(tenant_id=tenant.id).count()
-            fitments_without_tenant = Fitment.objects.filter(tenant_id__isnull=True).count()
-            print(f"DEBUG: Fitments with tenant {tenant.id}: {fitments_with_tenant}")
-            print(f"DEBUG: Fitments without tenant (NULL): {fitments_without_tenant}")
-            
-            # Debug: Show first few fitments and their tenant IDs
-            sample_fitments = Fitment.objects.all()[:5]
-            for fitment in sample_fitments:
-                print(f"DEBUG: Fitment {fitment.hash}: tenant_id = {fitment.tenant_id}")
-        # Get total fitments count (tenant-filtered)
-        total_fitments = tenant_fitments.count()
-        
-        # Get manual fitments count (fitmentType = 'manual_fitment')
-        manual_fitments = tenant_fitments.filter(fitmentType='manual_fitment').count()
-        
-        # Get AI fitments count (fitmentType = 'ai_fitment' or 'potential_fitment')
-        ai_fitments = tenant_fitments.filter(
-            Q(fitmentType='ai_fitment') | Q(fitmentType='potential_fitment')
-        ).count()
-        
-        # Get total parts count (unique partIds)
-        total_parts = tenant_fitments.values('partId').distinct().count()
-        
-        # Get total VCDB configurations count (unique vehicle configurations)
-        total_vcdb_configs = tenant_fitments.values(
-            'year', 'makeName', 'modelName', 'subModelName'
-        ).distinct().count()
-        
-        # Get recent activity (fitments created in last 30 days)
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-        recent_activity = tenant_fitments.filter(
-            createdAt__gte=thirty_days_ago
-        ).count()
-        
-        # Get fitments by status
-        active_fitments = tenant_fitments.filter(itemStatus='Active').count()
-        inactive_fitments = tenant_fitments.filter(itemStatus='Inactive').count()
-        
-        # Get pending review count (fitments with status 'pending' or 'review')
-        pending_review_count = tenant_fitments.filter(
-            Q(itemStatus__iexact='pending') | Q(itemStatus__iexact='review')
-        ).count()
-        
-        # Get fitments by make (top 5)
-        top_makes = tenant_fitments.values('makeName').annotate(
-            count=Count('hash')
-        ).order_by('-count')[:5]
-        
-        # Get fitments by year (last 5 years)
-        current_year = timezone.now().year
-        yearly_stats = []
-        for year in range(current_year - 4, current_year + 1):
-            year_count = tenant_fitments.filter(year=year).count()
-            yearly_stats.append({
-                'year': year,
-                'count': year_count
-            })
-        
-        # Calculate success rate (active vs total)
-        success_rate = round((active_fitments / total_fitments * 100), 1) if total_fitments > 0 else 0
-        
-        # Calculate coverage percentage (fitments with vehicles vs total possible)
-        # This is a simplified calculation - in reality you'd compare against actual VCDB
-        coverage_percentage = min(100, round((total_fitments / max(total_vcdb_configs, 1)) * 100), 1)
-        
-        analytics_data = {
-            'totalFitments': total_fitments,
-            'manualFitments': manual_fitments,
-            'aiFitments': ai_fitments,
-            'totalParts': total_parts,
-            'totalVcdbConfigs': total_vcdb_configs,
-            'recentActivity': recent_activity,
-            'activeFitments': active_fitments,
-            'inactiveFitments': inactive_fitments,
-            'successRate': success_rate,
-            'coveragePercentage': coverage_percentage,
-            'pendingReviewCount': pending_review_count,
-            'topMakes': list(top_makes),
-            'yearlyStats': yearly_stats,
-            'lastUpdated': timezone.now().isoformat(),
-            'tenant': {
-                'id': str(tenant.id) if tenant else None,
-                'name': tenant.name if tenant else 'All Entities',
-                'slug': tenant.slug if tenant else None
+                tenant_ids = None
+                logger.debug(f"analytics_dashboard: no tenant found, using all fitments: {str(e)}")
+        
+        analytics_data = dict(
+            get_dashboard_snapshot(tenant_fitments, tenant_ids),
+            tenant={
+                'id': str(tenant.id),
+                'name': tenant.name,
+                'slug': tenant.slug
             } if tenant else None
-        }
+        )
         
         return Response(analytics_data)
         
@@ -2661,6 +2646,60 @@ def _build_confidence_breakdown_base_vehicle(config, source_evidence):
     return breakdown
 
 
+@api_view(['POST'])
+def create_fitment_selection(request):
+    """
+    Save a bulk-action selection and return its token.
+
+    Body: ``filters`` (the fitments list query parameters), ``include`` and
+    ``exclude`` (hashes added to or removed from the filtered set). The
+    bulk endpoints accept ``selection_token`` in place of ``fitment_hashes``.
+    """
+    try:
+        data = request.data
+        filters = data.get('filters') or {}
+        include = data.get('include') or []
+        exclude = data.get('exclude') or []
+        
+        if not isinstance(filters, dict) or not isinstance(include, list) or not isinstance(exclude, list):
+            return Response(
+                {'error': 'filters must be an object, include and exclude must be lists'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        tenant_id = get_tenant_id_from_request(request)
+        if not tenant_id:
+            return Response(
+                {'error': 'Tenant not found'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        now = timezone.now()
+        # Expired selections are cleaned up as new ones are made
+        FitmentSelection.objects.filter(expires_at__lte=now).delete()
+        selection = FitmentSelection.objects.create(
+            tenant_id=tenant_id,
+            filters={key: str(value) for key, value in filters.items()},
+            include=[str(fitment_hash) for fitment_hash in include],
+            exclude=[str(fitment_hash) for fitment_hash in exclude],
+            created_by=data.get('createdBy', 'api_user'),
+            expires_at=now + timedelta(seconds=getattr(settings, 'FITMENT_SELECTION_TTL_SECONDS', 3600)),
+        )
+        
+        return Response({
+            'selection_token': str(selection.token),
+            'count': _selection_queryset(selection).count(),
+            'expires_at': selection.expires_at.isoformat()
+        }, status=status.HTTP_201_CREATED)
+        
+    except Exception as e:
+        logger.error(f"Error creating fitment selection: {str(e)}")
+        return Response(
+            {'error': 'Failed to create selection'}, 
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
 @api_view(['POST'])
 def bulk_update_status(request):
     """Bulk update fitment status"""
@@ -2669,9 +2708,9 @@ def bulk_update_status(request):
         fitment_hashes = data.get('fitment_hashes', [])
         new_status = data.get('status', 'Active')
         
-        if not fitment_hashes:
+        if not fitment_hashes and not data.get('selection_token'):
             return Response(
-                {'error': 'No fitment hashes provided'}, 
+                {'error': 'No fitment hashes or selection token provided'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
@@ -2683,21 +2722,23 @@ def bulk_update_status(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Filter fitments by tenant and provided hashes
-        fitments = Fitment.objects.filter(
-            hash__in=fitment_hashes,
-            tenant_id=tenant_id
-        )
+        # Filter fitments by tenant and provided hashes or selection
+        fitments = _bulk_action_fitments(data, tenant_id)
+        if fitments is None:
+            return Response(
+                {'error': 'Selection not found or expired'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        # Fitments already in the new status are left alone
+        updated_count = len(fitments.bulk_set_status(new_status, changed_by=data.get('updatedBy', 'api_user')))
         
-        if not fitments.exists():
+        if not updated_count and not fitments.exists():
             return Response(
                 {'error': 'No fitments found for the provided hashes'}, 
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Update status
-        updated_count = fitments.update(itemStatus=new_status)
-        
         return Response({
             'message': f'Successfully updated {updated_count} fitments to {new_status}',
             'updated_count': updated_count,
@@ -2720,9 +2761,9 @@ def approve_fitments(request):
         data = request.data
         fitment_hashes = data.get('fitment_hashes', [])
         
-        if not fitment_hashes:
+        if not fitment_hashes and not data.get('selection_token'):
             return Response(
-                {'error': 'No fitment hashes provided'}, 
+                {'error': 'No fitment hashes or selection token provided'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
@@ -2734,23 +2775,22 @@ def approve_fitments(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Filter fitments by tenant and provided hashes
-        # Handle both 'readyToApprove' and 'ReadyToApprove' status values
-        fitments = Fitment.objects.filter(
-            hash__in=fitment_hashes,
-            tenant_id=tenant_id,
-            itemStatus__in=['readyToApprove', 'ReadyToApprove']
-        )
+        # Filter fitments by tenant and provided hashes or selection
+        fitments = _bulk_action_fitments(data, tenant_id)
+        if fitments is None:
+            return Response(
+                {'error': 'Selection not found or expired'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        updated_count = len(fitments.bulk_approve(changed_by=data.get('approvedBy', 'api_user')))
         
-        if not fitments.exists():
+        if not updated_count:
             return Response(
                 {'error': 'No fitments found for approval'}, 
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Update status to Active
-        updated_count = fitments.update(itemStatus='Active')
-        
         return Response({
             'message': f'Successfully approved {updated_count} fitments',
             'approved_count': updated_count
@@ -2773,9 +2813,9 @@ def bulk_delete_fitments(request):
         data = request.data
         fitment_hashes = data.get('fitment_hashes', [])
         
-        if not fitment_hashes:
+        if not fitment_hashes and not data.get('selection_token'):
             return Response(
-                {'error': 'No fitment hashes provided'}, 
+                {'error': 'No fitment hashes or selection token provided'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
@@ -2788,23 +2828,22 @@ def bulk_delete_fitments(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Filter fitments by tenant and provided hashes
-        fitments = Fitment.objects.filter(
-            hash__in=fitment_hashes,
-            tenant_id=tenant_id
-        )
-        
-        if not fitments.exists():
+        # Filter fitments by tenant and provided hashes or selection
+        fitments = _bulk_action_fitments(data, tenant_id)
+        if fitments is None:
             return Response(
-                {'error': 'No fitments found to delete'}, 
+                {'error': 'Selection not found or expired'}, 
                 status=status.HTTP_404_NOT_FOUND
             )
         
         # Soft delete fitments
-        deleted_count = 0
-        for fitment in fitments:
-            fitment.soft_delete(deleted_by='bulk_delete_user')
-            deleted_count += 1
+        deleted_count = len(fitments.bulk_soft_delete(changed_by='bulk_delete_user'))
+        
+        if not deleted_count:
+            return Response(
+                {'error': 'No fitments found to delete'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
         
         return Response({
             'message': f'Successfully deleted {deleted_count} fitments',
@@ -2827,9 +2866,9 @@ def reject_fitments(request):
         data = request.data
         fitment_hashes = data.get('fitment_hashes', [])
         
-        if not fitment_hashes:
+        if not fitment_hashes and not data.get('selection_token'):
             return Response(
-                {'error': 'No fitment hashes provided'}, 
+                {'error': 'No fitment hashes or selection token provided'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
@@ -2841,24 +2880,22 @@ def reject_fitments(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Filter fitments by tenant and provided hashes
-        # Handle both 'readyToApprove' and 'ReadyToApprove' status values
-        fitments = Fitment.objects.filter(
-            hash__in=fitment_hashes,
-            tenant_id=tenant_id,
-            itemStatus__in=['readyToApprove', 'ReadyToApprove']
-        )
+        # Filter fitments by tenant and provided hashes or selection
+        fitments = _bulk_action_fitments(data, tenant_id)
+        if fitments is None:
+            return Response(
+                {'error': 'Selection not found or expired'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        deleted_count = len(fitments.bulk_reject(changed_by=data.get('rejectedBy', 'api_user')))
         
-        if not fitments.exists():
+        if not deleted_count:
             return Response(
                 {'error': 'No fitments found for rejection'}, 
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Delete fitments
-        deleted_count = fitments.count()
-        fitments.delete()
-        
         return Response({
             'message': f'Successfully rejected and deleted {deleted_count} fitments',
             'rejected_count': deleted_count
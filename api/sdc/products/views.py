@@ -5,7 +5,7 @@ from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.shortcuts import get_object_or_404
 from django.db import transaction
 from django.utils import timezone
-import pandas as pd
+from sdc.lazy_imports import lazy_module
 import json
 import os
 from .models import ProductConfiguration, ProductData, ProductUpload
@@ -14,8 +14,11 @@ from .serializers import (
     ProductUploadSerializer, ProductUploadCreateSerializer
 )
 from tenants.models import Tenant
+from tenants.statistics import record_count_change
 from tenants.utils import get_tenant_id_from_request
 
+pd = lazy_module('pandas')
+
 
 class ProductConfigurationViewSet(viewsets.ModelViewSet):
     queryset = ProductConfiguration.objects.all()
@@ -66,6 +69,11 @@ class ProductDataViewSet(viewsets.ModelViewSet):
             return ProductData.objects.filter(tenant_id=tenant_id)
         return ProductData.objects.all()
 
+    def perform_destroy(self, instance):
+        # ProductData has no post_delete receiver, so tenant deletes stay fast
+        instance.delete()
+        record_count_change(instance.tenant_id, 'product_count', -1)
+
 
 class ProductUploadViewSet(viewsets.ModelViewSet):
     queryset = ProductUpload.objects.all()
@@ -317,7 +325,7 @@ class ProductUploadViewSet(viewsets.ModelViewSet):
                     # Process and save product data
                     with transaction.atomic():
                         # If updating existing data, clear old data for this tenant first
-                        ProductData.objects.filter(tenant_id=tenant_id).delete()
+                        _, deleted = ProductData.objects.filter(tenant_id=tenant_id).delete()
                         
                         product_records = []
                         for _, row in df.iterrows():
@@ -352,6 +360,12 @@ class ProductUploadViewSet(viewsets.ModelViewSet):
                         
                         if product_records:
                             ProductData.objects.bulk_create(product_records, ignore_conflicts=True)
+                        # Neither the delete nor bulk_create send signals. The tenant has
+                        # no products left, so only repeated part numbers conflict.
+                        inserted = len({record.part_number for record in product_records})
+                        record_count_change(
+                            tenant_id, 'product_count', inserted - deleted.get(ProductData._meta.label, 0),
+                        )
                     
                     upload.status = 'completed'
                     upload.processed_at = timezone.now()
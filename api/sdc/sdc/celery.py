@@ -7,7 +7,8 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sdc.settings')
 app = Celery('sdc')
 
 # Using a string here means the worker doesn't have to serialize
-# the configuration object to child processes.
+# the configuration object to child processes. Queues, routes, priorities
+# and per-queue time limits come from sdc/celery_queues.py via settings.
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Load task modules from all registered Django apps.
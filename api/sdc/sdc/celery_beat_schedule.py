@@ -21,6 +21,12 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'vcdb.tasks.schedule_quarterly_vcdb_sync',
         'schedule': crontab(day_of_month=1, hour=3, minute=0, month_of_year='1,4,7,10'),
     },
+
+    # Tenant statistics - Recount every tenant nightly at 4 AM
+    'tenant-statistics-reconcile': {
+        'task': 'tenants.tasks.reconcile_tenant_statistics',
+        'schedule': crontab(hour=4, minute=0),
+    },
 }
 
 # Use DatabaseScheduler for persistent task scheduling
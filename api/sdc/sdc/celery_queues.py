@@ -0,0 +1,113 @@
+"""
+Celery queues, task routes, priorities and per-queue time limits.
+
+Work is split across four queues so long-running work cannot starve short,
+user-facing tasks:
+
+- ``interactive``: job coordinators, finalizers and workflow jobs (short)
+- ``bulk``: fitment job chunks fanned out by ``workflow.orchestration``
+- ``sync``: the multi-hour VCDB sync
+- ``maintenance``: cleanup, status checks and queue monitoring
+
+Run one worker pool per queue (or group) so each keeps its own slots, e.g.::
+
+    celery -A sdc worker -Q interactive -c 4 -n interactive@%h
+    celery -A sdc worker -Q bulk -c 4 -n bulk@%h
+    celery -A sdc worker -Q sync,maintenance -c 1 -n sync@%h
+
+On the Redis broker priorities are emulated with one list per priority step;
+0 is the highest priority. Priorities and time limits are applied through
+task annotations derived from ``TASK_PLACEMENT``, so a task moved to another
+queue takes that queue's limits.
+"""
+import os
+
+from kombu import Exchange, Queue
+
+QUEUE_INTERACTIVE = 'interactive'
+QUEUE_BULK = 'bulk'
+QUEUE_SYNC = 'sync'
+QUEUE_MAINTENANCE = 'maintenance'
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+# (soft, hard) time limits in seconds per queue
+QUEUE_TIME_LIMITS = {
+    QUEUE_INTERACTIVE: (10 * 60, 12 * 60),
+    QUEUE_BULK: (25 * 60, 30 * 60),
+    QUEUE_SYNC: (6 * 60 * 60, 6 * 60 * 60 + 10 * 60),
+    QUEUE_MAINTENANCE: (10 * 60, 15 * 60),
+}
+
+CELERY_TASK_QUEUES = tuple(
+    Queue(name, Exchange(name, type='direct'), routing_key=name, queue_arguments={'x-max-priority': 10})
+    for name in QUEUE_TIME_LIMITS
+)
+CELERY_TASK_DEFAULT_QUEUE = QUEUE_INTERACTIVE
+CELERY_TASK_DEFAULT_EXCHANGE = QUEUE_INTERACTIVE
+CELERY_TASK_DEFAULT_ROUTING_KEY = QUEUE_INTERACTIVE
+CELERY_TASK_DEFAULT_PRIORITY = PRIORITY_NORMAL
+CELERY_TASK_QUEUE_MAX_PRIORITY = 10
+
+# Task name -> (queue, priority)
+TASK_PLACEMENT = {
+    # Interactive: short tasks a user is waiting on
+    'workflow.tasks.process_workflow_job': (QUEUE_INTERACTIVE, PRIORITY_HIGH),
+    'data_uploads.tasks.generate_ai_fitments_task': (QUEUE_INTERACTIVE, PRIORITY_HIGH),
+    'data_uploads.tasks.finalize_ai_fitment_job': (QUEUE_INTERACTIVE, PRIORITY_HIGH),
+    'vcdb_categories.tasks.process_fitment_job': (QUEUE_INTERACTIVE, PRIORITY_HIGH),
+    'vcdb_categories.tasks.finalize_fitment_job': (QUEUE_INTERACTIVE, PRIORITY_HIGH),
+    'sdc.celery.debug_task': (QUEUE_INTERACTIVE, PRIORITY_NORMAL),
+
+    # Bulk: chunk tasks; chunks of small jobs are dispatched with PRIORITY_HIGH
+    'data_uploads.tasks.generate_ai_fitments_chunk': (QUEUE_BULK, PRIORITY_NORMAL),
+    'vcdb_categories.tasks.process_fitment_job_chunk': (QUEUE_BULK, PRIORITY_NORMAL),
+
+    # Sync: multi-hour external data sync
+    'vcdb.tasks.sync_vcdb_data_task': (QUEUE_SYNC, PRIORITY_LOW),
+
+    # Maintenance: periodic housekeeping
+    'vcdb.tasks.schedule_quarterly_vcdb_sync': (QUEUE_MAINTENANCE, PRIORITY_NORMAL),
+    'vcdb.tasks.check_vcdb_sync_status': (QUEUE_MAINTENANCE, PRIORITY_NORMAL),
+    'data_uploads.tasks.cleanup_old_ai_jobs': (QUEUE_MAINTENANCE, PRIORITY_LOW),
+    'workflow.tasks.process_pending_jobs': (QUEUE_MAINTENANCE, PRIORITY_NORMAL),
+    'workflow.tasks.monitor_pending_jobs': (QUEUE_MAINTENANCE, PRIORITY_NORMAL),
+    'tenants.tasks.reconcile_tenant_statistics': (QUEUE_MAINTENANCE, PRIORITY_LOW),
+}
+
+
+def task_annotations(placement, time_limits):
+    """
+    Annotations giving every placed task its priority and its queue's time
+    limits. Priorities live here rather than in the routes because a task's
+    default priority takes precedence over route options.
+    """
+    annotations = {}
+    for task_name, (queue, priority) in placement.items():
+        soft, hard = time_limits[queue]
+        annotations[task_name] = {'priority': priority, 'soft_time_limit': soft, 'time_limit': hard}
+    return annotations
+
+
+CELERY_TASK_ROUTES = {task_name: {'queue': queue} for task_name, (queue, _) in TASK_PLACEMENT.items()}
+CELERY_TASK_ANNOTATIONS = task_annotations(TASK_PLACEMENT, QUEUE_TIME_LIMITS)
+
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'priority_steps': list(range(10)),
+    'sep': ':',
+    'queue_order_strategy': 'priority',
+    # Late-acked messages are redelivered after this long, so it must exceed
+    # the longest hard time limit
+    'visibility_timeout': max(hard for _, hard in QUEUE_TIME_LIMITS.values()) + 30 * 60,
+}
+
+# Per-tenant concurrency tokens: at most this many bulk tasks per tenant run
+# at once; the others wait and retry
+TENANT_MAX_CONCURRENT_TASKS = int(os.getenv('TENANT_MAX_CONCURRENT_TASKS', '2'))
+TENANT_TOKEN_RETRY_SECONDS = int(os.getenv('TENANT_TOKEN_RETRY_SECONDS', '5'))
+# Tokens held by a worker that died are reclaimed after the bulk hard limit
+TENANT_TOKEN_TTL_SECONDS = QUEUE_TIME_LIMITS[QUEUE_BULK][1]
+# Jobs with at most this many chunks get high-priority chunks
+SMALL_JOB_MAX_CHUNKS = int(os.getenv('SMALL_JOB_MAX_CHUNKS', '4'))
@@ -0,0 +1,202 @@
+"""
+Read-replica routing for reporting and export endpoints.
+
+Views decorated with ``replica_reads`` run their ORM reads (including the
+ones made while a streaming response is consumed) against the
+``REPLICA_DATABASE_ALIAS`` database; everything else, and every write, uses
+``default``. A request stays on the primary when:
+
+- no replica is configured;
+- the caller wrote recently: ``ReplicaRoutingMiddleware`` marks successful
+  POST/PUT/PATCH/DELETE requests with a cookie on the client and a Redis
+  marker for the tenant, both lasting ``REPLICA_READ_YOUR_WRITES_SECONDS``.
+  Background jobs can call ``mark_recent_write`` for the same effect;
+- the replica is more than ``REPLICA_MAX_LAG_SECONDS`` behind, or its lag
+  cannot be measured. The lag is measured at most every
+  ``REPLICA_LAG_CHECK_SECONDS`` per process.
+"""
+import functools
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.http import StreamingHttpResponse
+
+from .redis_client import get_redis, reset_redis
+
+logger = logging.getLogger(__name__)
+
+MARKER_PREFIX = 'db-recent-write'
+COOKIE_NAME = 'db_primary_until'
+UNSAFE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+# Alias used for reads in the current request (None: default)
+_read_alias: ContextVar[Optional[str]] = ContextVar('read_alias', default=None)
+
+_lag_lock = threading.Lock()
+_lag_checked_at = 0.0
+_lag_seconds: Optional[float] = None
+
+# Seconds since the replica last replayed a transaction, or 0 when it has
+# replayed everything it received (an idle primary sends nothing new)
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+def replica_alias() -> Optional[str]:
+    alias = getattr(settings, 'REPLICA_DATABASE_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+class ReplicaRouter:
+    """Sends reads to the alias chosen for the current request and writes to default"""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+
+def _measure_lag(alias: str) -> Optional[float]:
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(REPLICA_LAG_SQL)
+            return float(cursor.fetchone()[0])
+    except DatabaseError as e:
+        logger.warning(f"Could not measure lag of database {alias}: {str(e)}")
+        return None
+
+
+def replica_lag_seconds(alias: str) -> Optional[float]:
+    """Replication lag of ``alias`` in seconds (None if unreachable), cached per process"""
+    global _lag_checked_at, _lag_seconds
+    interval = getattr(settings, 'REPLICA_LAG_CHECK_SECONDS', 5)
+    with _lag_lock:
+        if time.monotonic() - _lag_checked_at < interval:
+            return _lag_seconds
+        # Claim the check so concurrent requests use the previous value meanwhile
+        _lag_checked_at = time.monotonic()
+    lag = _measure_lag(alias)
+    with _lag_lock:
+        _lag_seconds = lag
+    return lag
+
+
+def _writer_key(request) -> Optional[str]:
+    tenant_id = request.headers.get('X-Tenant-ID')
+    if tenant_id:
+        return f"tenant:{tenant_id}"
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    return None
+
+
+def mark_recent_write(key: str) -> None:
+    """Keep reads for ``key`` (``tenant:<id>`` or ``user:<id>``) on the primary for a while"""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.set(f"{MARKER_PREFIX}:{key}", 1, ex=getattr(settings, 'REPLICA_READ_YOUR_WRITES_SECONDS', 10))
+    except Exception as e:
+        logger.warning(f"Could not record recent write for {key}: {str(e)}")
+        reset_redis()
+
+
+def _wrote_recently(request) -> bool:
+    try:
+        if float(request.COOKIES.get(COOKIE_NAME, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+
+    key = _writer_key(request)
+    client = get_redis() if key else None
+    if client is None:
+        return False
+    try:
+        return bool(client.exists(f"{MARKER_PREFIX}:{key}"))
+    except Exception:
+        reset_redis()
+        return False
+
+
+def choose_read_alias(request) -> Optional[str]:
+    """Replica alias for a read-only request, or None to stay on the primary"""
+    alias = replica_alias()
+    if alias is None or _wrote_recently(request):
+        return None
+    lag = replica_lag_seconds(alias)
+    if lag is None or lag > getattr(settings, 'REPLICA_MAX_LAG_SECONDS', 5):
+        return None
+    return alias
+
+
+def _route_stream(chunks, alias):
+    """Route the reads made while each chunk is produced"""
+    iterator = iter(chunks)
+    while True:
+        token = _read_alias.set(alias)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _read_alias.reset(token)
+        yield chunk
+
+
+def replica_reads(view):
+    """Run a read-only view's queries on the replica when it is safe to"""
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        alias = choose_read_alias(request)
+        if alias is None:
+            return view(request, *args, **kwargs)
+
+        token = _read_alias.set(alias)
+        try:
+            response = view(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+        if isinstance(response, StreamingHttpResponse):
+            response.streaming_content = _route_stream(response.streaming_content, alias)
+        return response
+
+    return wrapper
+
+
+class ReplicaRoutingMiddleware:
+    """Marks callers that just wrote so their next reads see the write"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method in UNSAFE_METHODS and response.status_code < 400 and replica_alias():
+            seconds = getattr(settings, 'REPLICA_READ_YOUR_WRITES_SECONDS', 10)
+            response.set_cookie(COOKIE_NAME, str(int(time.time() + seconds)), max_age=seconds, httponly=True)
+            key = _writer_key(request)
+            if key:
+                mark_recent_write(key)
+        return response
@@ -0,0 +1,49 @@
+"""
+Deferred imports for heavy libraries.
+
+``pd = lazy_module('pandas')`` binds a module proxy that imports pandas the
+first time one of its attributes is used. Views and helpers that only need
+pandas, numpy, openpyxl or scikit-learn for some requests then cost nothing
+when Django, gunicorn or a Celery worker starts, and workers that never run
+that code never load the library.
+
+Annotations such as ``df: pd.DataFrame`` are evaluated when the function is
+defined, so modules using the proxy in signatures start with
+``from __future__ import annotations``.
+"""
+import importlib
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            # import_module holds the import lock, so concurrent first uses are safe
+            module = importlib.import_module(self.__name__)
+            self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        value = getattr(self._load(), attr)
+        # Later lookups hit the proxy's own __dict__ and skip __getattr__
+        self.__dict__[attr] = value
+        return value
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    """A proxy for ``name`` that is imported on first use"""
+    return LazyModule(name)
@@ -0,0 +1,115 @@
+"""
+In-process request and database metrics in the Prometheus text format.
+
+Counters live in the memory of each server process and are exported by the
+``/metrics`` view; Prometheus scrapes every instance separately, so no shared
+store is needed. Labels are the HTTP method, the URL route pattern (not the
+raw path, which would give one series per fitment hash) and the status code.
+"""
+import hmac
+import threading
+from collections import defaultdict
+from typing import Dict, Tuple
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+# Request duration histogram buckets, in seconds
+DURATION_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values) -> str:
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+class RequestMetrics:
+    """Thread-safe per-process counters for requests and their database work"""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests: Dict[Tuple, int] = defaultdict(int)
+            self.duration_buckets: Dict[Tuple, list] = {}
+            self.duration_sum: Dict[Tuple, float] = defaultdict(float)
+            self.duration_count: Dict[Tuple, int] = defaultdict(int)
+            self.db_seconds: Dict[Tuple, float] = defaultdict(float)
+            self.db_queries: Dict[Tuple, int] = defaultdict(int)
+            self.db_rows: Dict[Tuple, int] = defaultdict(int)
+            self.n_plus_one: Dict[Tuple, int] = defaultdict(int)
+
+    def observe(self, method: str, route: str, status: int, seconds: float, db_seconds: float,
+                queries: int, rows: int, suspected_n_plus_one: bool) -> None:
+        key = (method, route)
+        with self._lock:
+            self.requests[(method, route, status)] += 1
+            counts = self.duration_buckets.setdefault(key, [0] * len(self.buckets))
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[index] += 1
+            self.duration_sum[key] += seconds
+            self.duration_count[key] += 1
+            self.db_seconds[key] += db_seconds
+            self.db_queries[key] += queries
+            self.db_rows[key] += rows
+            if suspected_n_plus_one:
+                self.n_plus_one[key] += 1
+
+    def render(self) -> str:
+        """All series in the Prometheus text exposition format"""
+        lines = []
+        key_names = ('method', 'route')
+        with self._lock:
+            lines += [
+                '# HELP http_requests_total HTTP requests by method, route and status.',
+                '# TYPE http_requests_total counter',
+            ]
+            for values, count in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{{_labels(("method", "route", "status"), values)}}} {count}')
+
+            lines += [
+                '# HELP http_request_duration_seconds Wall time spent producing a response.',
+                '# TYPE http_request_duration_seconds histogram',
+            ]
+            for key in sorted(self.duration_count):
+                labels = _labels(key_names, key)
+                for bound, count in zip(self.buckets, self.duration_buckets[key]):
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {self.duration_count[key]}')
+                lines.append(f'http_request_duration_seconds_sum{{{labels}}} {self.duration_sum[key]:.6f}')
+                lines.append(f'http_request_duration_seconds_count{{{labels}}} {self.duration_count[key]}')
+
+            for name, kind, help_text, series in (
+                ('db_query_duration_seconds_total', 'counter', 'Time spent executing SQL.', self.db_seconds),
+                ('db_queries_total', 'counter', 'SQL statements executed.', self.db_queries),
+                ('db_rows_returned_total', 'counter', 'Rows reported by the database driver.', self.db_rows),
+                ('http_requests_n_plus_one_total', 'counter',
+                 'Requests that repeated one SQL statement more often than the N+1 threshold.', self.n_plus_one),
+            ):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+                for key, value in sorted(series.items()):
+                    formatted = f'{value:.6f}' if isinstance(value, float) else value
+                    lines.append(f'{name}{{{_labels(key_names, key)}}} {formatted}')
+        return '\n'.join(lines) + '\n'
+
+
+request_metrics = RequestMetrics()
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. The scraper must send ``PERF_METRICS_TOKEN``
+    as a bearer token; while no token is configured every request is denied.
+    """
+    token = getattr(settings, 'PERF_METRICS_TOKEN', '')
+    if not token or not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden('Forbidden')
+    return HttpResponse(request_metrics.render(), content_type=CONTENT_TYPE)
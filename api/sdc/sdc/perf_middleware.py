@@ -0,0 +1,131 @@
+"""
+Per-request performance instrumentation.
+
+``PerformanceMiddleware`` installs a database ``execute_wrapper`` for the
+duration of each request and records wall time, time spent in SQL, the number
+of statements, rows reported by the driver and how often each statement
+shape (its fingerprint) repeated. The numbers are:
+
+- sent back in a ``Server-Timing`` header (visible in browser dev tools);
+- added to the per-process counters served at ``/metrics``;
+- logged as a suspected N+1 when one fingerprint repeats at least
+  ``PERF_N_PLUS_ONE_THRESHOLD`` times in a single request.
+
+The wrapper only does a clock read, a regex substitution and a dict update
+per statement, so it can stay on in production. Queries run while a
+streaming response is being consumed happen after the middleware returns and
+are not counted.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import request_metrics
+
+logger = logging.getLogger(__name__)
+
+# Fingerprints ignore literal values and the length of IN lists, so the same
+# lookup issued for different rows counts as one statement shape
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_NUMBER = re.compile(r'\b\d+\b')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+# Distinct fingerprints tracked per request; further ones are only counted
+MAX_FINGERPRINTS = 500
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+def fingerprint(sql: str) -> str:
+    sql = _STRING.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _NUMBER.sub('?', sql)
+
+
+class QueryStats:
+    """SQL statistics for one request, filled in by the execute wrapper"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+            rowcount = getattr(context.get('cursor'), 'rowcount', -1)
+            if rowcount and rowcount > 0:
+                self.rows += rowcount
+            key = fingerprint(sql)
+            if key in self.fingerprints or len(self.fingerprints) < MAX_FINGERPRINTS:
+                self.fingerprints[key] += 1
+
+    def most_repeated(self):
+        """(fingerprint, count) of the statement repeated most often, or (None, 0)"""
+        if not self.fingerprints:
+            return None, 0
+        return self.fingerprints.most_common(1)[0]
+
+    @property
+    def duplicates(self) -> int:
+        """Statements that repeated an earlier statement shape"""
+        return sum(count - 1 for count in self.fingerprints.values())
+
+
+def _route(request) -> str:
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNMATCHED_ROUTE
+    return '/' + match.route.lstrip('^') if match.route else match.view_name
+
+
+class PerformanceMiddleware:
+    """Record timing and query statistics for every request"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'PERF_INSTRUMENTATION_ENABLED', True)
+        self.server_timing = getattr(settings, 'PERF_SERVER_TIMING', True)
+        self.n_plus_one_threshold = getattr(settings, 'PERF_N_PLUS_ONE_THRESHOLD', 10)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        stats = QueryStats()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        route = _route(request)
+        repeated_sql, repeated = stats.most_repeated()
+        suspected = repeated >= self.n_plus_one_threshold
+        if suspected:
+            logger.warning(
+                f"Suspected N+1 on {request.method} {route}: {repeated} executions of "
+                f"{repeated_sql[:300]!r} ({stats.count} queries, {stats.seconds * 1000:.1f}ms in SQL)"
+            )
+
+        if self.server_timing:
+            response['Server-Timing'] = (
+                f'app;dur={(elapsed - stats.seconds) * 1000:.1f}, '
+                f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries, {stats.duplicates} repeated", '
+                f'total;dur={elapsed * 1000:.1f}'
+            )
+
+        request_metrics.observe(
+            request.method, route, response.status_code, elapsed, stats.seconds,
+            stats.count, stats.rows, suspected,
+        )
+        return response
@@ -0,0 +1,162 @@
+"""
+Coalesced progress reporting for long-running background jobs.
+
+Workers call ``ProgressReporter.update()`` as often as they like. Updates are
+published to a Redis hash per job (throttled by time and by progress delta)
+and written back to the job row at most every ``JOB_PROGRESS_DB_FLUSH_SECONDS``
+and once more on ``finish()``. Polling endpoints read the live state with
+``read_progress()`` instead of hitting Postgres.
+"""
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from .redis_client import get_redis, reset_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'job-progress'
+KEY_TTL_SECONDS = 24 * 60 * 60
+
+
+def progress_key(job):
+    """Redis key for a job instance"""
+    return f"{KEY_PREFIX}:{job._meta.label_lower}:{job.pk}"
+
+
+def read_progress(job):
+    """
+    Return the latest published progress for a job, or None when no live
+    progress is available (job finished long ago, or Redis is down).
+    """
+    client = get_redis()
+    if client is None:
+        return None
+
+    try:
+        raw = client.hgetall(progress_key(job))
+    except Exception as e:
+        logger.warning(f"Could not read progress for {job.pk}: {str(e)}")
+        reset_redis()
+        return None
+
+    if not raw:
+        return None
+    return {field: json.loads(value) for field, value in raw.items()}
+
+
+class ProgressReporter:
+    """
+    Buffer progress updates for a job and publish them with coalescing.
+
+    Values passed to ``update()`` are set on the in-memory job as well, so a
+    final ``job.save()`` by the caller still persists the latest numbers.
+    Only keys that are concrete model fields are written to the database;
+    anything else (e.g. Celery-style ``current``/``total``) lives in Redis.
+    Pass ``model_fields=()`` to keep every value out of the job row.
+    """
+
+    def __init__(self, job, task=None, percent_field='progress_percentage', model_fields=None):
+        self.job = job
+        self.task = task
+        self.percent_field = percent_field
+        self.key = progress_key(job)
+
+        self.publish_interval = getattr(settings, 'JOB_PROGRESS_PUBLISH_SECONDS', 0.5)
+        self.flush_interval = getattr(settings, 'JOB_PROGRESS_DB_FLUSH_SECONDS', 5)
+        self.min_delta = getattr(settings, 'JOB_PROGRESS_MIN_DELTA', 1)
+
+        if model_fields is None:
+            model_fields = [
+                field.attname for field in job._meta.concrete_fields if not field.primary_key
+            ]
+        self._model_fields = set(model_fields)
+        self._state = {}
+        self._pending = {}
+        self._dirty_fields = set()
+        self._last_publish = 0.0
+        self._last_flush = time.monotonic()
+        self._last_percent = None
+
+    def _record(self, values):
+        self._state.update(values)
+        for field, value in values.items():
+            self._pending[field] = value
+            if field in self._model_fields:
+                setattr(self.job, field, value)
+                self._dirty_fields.add(field)
+
+    def update(self, **values):
+        """Record new progress values and publish/flush if due"""
+        self._record(values)
+
+        now = time.monotonic()
+        percent = values.get(self.percent_field)
+        moved = (
+            percent is not None
+            and (self._last_percent is None or abs(percent - self._last_percent) >= self.min_delta)
+        )
+
+        if moved or now - self._last_publish >= self.publish_interval:
+            self.publish()
+        if now - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def publish(self, update_task=True):
+        """Push buffered values to Redis (and the Celery result backend)"""
+        if not self._pending:
+            return
+
+        self._pending['updated_at'] = timezone.now().isoformat()
+        self._last_publish = time.monotonic()
+        if self.percent_field in self._pending:
+            self._last_percent = self._pending[self.percent_field]
+
+        if update_task and self.task is not None:
+            try:
+                self.task.update_state(state='PROGRESS', meta=dict(self._state))
+            except Exception as e:
+                logger.warning(f"Could not update task state for {self.job.pk}: {str(e)}")
+
+        client = get_redis()
+        if client is not None:
+            try:
+                pipe = client.pipeline()
+                pipe.hset(
+                    self.key,
+                    mapping={field: json.dumps(value, default=str) for field, value in self._pending.items()},
+                )
+                pipe.expire(self.key, KEY_TTL_SECONDS)
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"Could not publish progress for {self.job.pk}: {str(e)}")
+                reset_redis()
+                return
+
+        self._pending = {}
+
+    def flush(self):
+        """Write dirty model fields to the job row with a single UPDATE"""
+        self._last_flush = time.monotonic()
+        if not self._dirty_fields:
+            return
+
+        changes = {field: getattr(self.job, field) for field in self._dirty_fields}
+        if hasattr(self.job, 'updated_at'):
+            changes['updated_at'] = timezone.now()
+
+        type(self.job).objects.filter(pk=self.job.pk).update(**changes)
+        self._dirty_fields = set()
+
+    def finish(self, **values):
+        """
+        Publish and flush the final state regardless of throttling. The Celery
+        task state is left alone so the caller's terminal state is not
+        overwritten with PROGRESS.
+        """
+        self._record(values)
+        self.publish(update_task=False)
+        self.flush()
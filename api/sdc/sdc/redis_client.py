@@ -0,0 +1,51 @@
+"""
+Shared Redis connection for short-lived coordination state (job progress,
+markers, tokens). Callers must tolerate ``get_redis()`` returning None so the
+app keeps working when Redis is unavailable.
+"""
+import logging
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_unavailable_until = 0.0
+
+# How long to stop retrying after a failed connection attempt
+RETRY_AFTER_SECONDS = 30
+
+
+def get_redis():
+    """Return a process-wide Redis client, or None if Redis is unreachable"""
+    global _client, _unavailable_until
+
+    if _client is not None:
+        return _client
+    if time.monotonic() < _unavailable_until:
+        return None
+
+    try:
+        import redis
+
+        client = redis.Redis.from_url(
+            getattr(settings, 'REDIS_URL', settings.CELERY_BROKER_URL),
+            socket_connect_timeout=1,
+            socket_timeout=1,
+            decode_responses=True,
+        )
+        client.ping()
+    except Exception as e:
+        logger.warning(f"Redis unavailable, falling back to database: {str(e)}")
+        _unavailable_until = time.monotonic() + RETRY_AFTER_SECONDS
+        return None
+
+    _client = client
+    return _client
+
+
+def reset_redis():
+    """Drop the cached client (used after fork or when a command fails)"""
+    global _client
+    _client = None
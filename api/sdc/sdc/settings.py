@@ -58,6 +58,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so its timings cover the rest of the stack
+    'sdc.perf_middleware.PerformanceMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'sdc.cors_middleware.FixCorsCredentialsMiddleware',  # Fix duplicate CORS credentials header
     'django.middleware.security.SecurityMiddleware',
@@ -65,10 +67,20 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     # 'django.middleware.csrf.CsrfViewMiddleware',  # Disabled for JWT authentication
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'sdc.db_routing.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request performance instrumentation (sdc.perf_middleware)
+PERF_INSTRUMENTATION_ENABLED = os.getenv('PERF_INSTRUMENTATION_ENABLED', 'True').lower() == 'true'
+PERF_SERVER_TIMING = os.getenv('PERF_SERVER_TIMING', 'True').lower() == 'true'
+# Requests repeating one SQL statement shape this often are logged as suspected N+1
+PERF_N_PLUS_ONE_THRESHOLD = int(os.getenv('PERF_N_PLUS_ONE_THRESHOLD', '10'))
+# Bearer token Prometheus must send to scrape /metrics; /metrics denies every
+# request while it is unset
+PERF_METRICS_TOKEN = os.getenv('PERF_METRICS_TOKEN', '')
+
 # Session configuration for authentication
 SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 SESSION_COOKIE_AGE = 86400  # 24 hours
@@ -118,6 +130,23 @@ DATABASES = {
     }
 }
 
+# Optional streaming read replica for reporting and export endpoints (sdc.db_routing)
+DB_REPLICA_HOST = os.getenv('DB_REPLICA_HOST', '')
+REPLICA_DATABASE_ALIAS = 'replica'
+if DB_REPLICA_HOST:
+    DATABASES[REPLICA_DATABASE_ALIAS] = {
+        **DATABASES['default'],
+        'HOST': DB_REPLICA_HOST,
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['sdc.db_routing.ReplicaRouter']
+# Reads fall back to the primary when the replica is further behind than this
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', '5'))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv('REPLICA_LAG_CHECK_SECONDS', '5'))
+# After a write, the caller's reads stay on the primary for this long
+REPLICA_READ_YOUR_WRITES_SECONDS = int(os.getenv('REPLICA_READ_YOUR_WRITES_SECONDS', '10'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -226,6 +255,7 @@ CSRF_TRUSTED_ORIGINS = [
 CORS_EXPOSE_HEADERS = [
     'content-type',
     'x-csrftoken',
+    'server-timing',
 ]
 
 # Ensure CORS preflight requests are handled correctly
@@ -284,10 +314,23 @@ AUTOCARE_CLIENT_ID = os.getenv('AUTOCARE_CLIENT_ID', '')
 AUTOCARE_CLIENT_SECRET = os.getenv('AUTOCARE_CLIENT_SECRET', '')
 AUTOCARE_USERNAME = os.getenv('AUTOCARE_USERNAME', '')
 AUTOCARE_PASSWORD = os.getenv('AUTOCARE_PASSWORD', '')
+# AutoCare HTTP transport (vcdb.transport)
+AUTOCARE_BASE_URL = os.getenv('AUTOCARE_BASE_URL', 'https://vcdb.autocarevip.com/api/v1.0/vcdb')
+AUTOCARE_AUTH_URL = os.getenv('AUTOCARE_AUTH_URL', 'https://autocare-identity.autocare.org/connect/token')
+AUTOCARE_HTTP_POOL_SIZE = int(os.getenv('AUTOCARE_HTTP_POOL_SIZE', '4'))
+AUTOCARE_MAX_RETRIES = int(os.getenv('AUTOCARE_MAX_RETRIES', '5'))
+AUTOCARE_RETRY_BACKOFF_SECONDS = float(os.getenv('AUTOCARE_RETRY_BACKOFF_SECONDS', '1'))
+AUTOCARE_RETRY_BACKOFF_MAX_SECONDS = float(os.getenv('AUTOCARE_RETRY_BACKOFF_MAX_SECONDS', '60'))
+AUTOCARE_TIMEOUT_SECONDS = int(os.getenv('AUTOCARE_TIMEOUT_SECONDS', '60'))
+AUTOCARE_PAGE_SIZE = int(os.getenv('AUTOCARE_PAGE_SIZE', '1000'))
+# Pages downloaded ahead while the current page is being written
+AUTOCARE_PREFETCH_PAGES = int(os.getenv('AUTOCARE_PREFETCH_PAGES', '1'))
 
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Parsed workbook rows and lookup indexes; must not be a directory uploads are written to
+WORKBOOK_CACHE_DIR = os.getenv('WORKBOOK_CACHE_DIR') or os.path.join(MEDIA_ROOT, 'cache')
 
 # Celery Configuration
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
@@ -315,6 +358,41 @@ CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True  # Retry connection on startup
 CELERY_BROKER_CONNECTION_RETRY = True  # Retry connection if lost
 CELERY_BROKER_CONNECTION_MAX_RETRIES = 10  # Max retry attempts
 
+# Redis for short-lived coordination state (job progress, markers)
+REDIS_URL = os.getenv('REDIS_URL', CELERY_BROKER_URL)
+
+# Job progress coalescing: publish to Redis at most every N seconds (or when
+# the percentage moves by MIN_DELTA) and write back to the job row every N seconds
+JOB_PROGRESS_PUBLISH_SECONDS = float(os.getenv('JOB_PROGRESS_PUBLISH_SECONDS', '0.5'))
+JOB_PROGRESS_DB_FLUSH_SECONDS = float(os.getenv('JOB_PROGRESS_DB_FLUSH_SECONDS', '5'))
+JOB_PROGRESS_MIN_DELTA = int(os.getenv('JOB_PROGRESS_MIN_DELTA', '1'))
+
+# Fitment jobs are split into chunks of this many products, processed in parallel
+AI_FITMENT_CHUNK_SIZE = int(os.getenv('AI_FITMENT_CHUNK_SIZE', '25'))
+MANUAL_FITMENT_CHUNK_SIZE = int(os.getenv('MANUAL_FITMENT_CHUNK_SIZE', '50'))
+
+# Bulk fitment state changes (delete, restore, approve, ...) update this many
+# rows per statement, each chunk in its own short transaction
+FITMENT_BULK_CHUNK_SIZE = int(os.getenv('FITMENT_BULK_CHUNK_SIZE', '5000'))
+FITMENT_BULK_RECORD_HISTORY = os.getenv('FITMENT_BULK_RECORD_HISTORY', 'True').lower() == 'true'
+# Validated upload rows are COPYed into the fitments table this many rows at a time
+FITMENT_INGEST_BATCH_ROWS = int(os.getenv('FITMENT_INGEST_BATCH_ROWS', '20000'))
+# Selection tokens for bulk actions expire after this many seconds
+FITMENT_SELECTION_TTL_SECONDS = int(os.getenv('FITMENT_SELECTION_TTL_SECONDS', '3600'))
+# Dashboard analytics snapshots are recomputed after this many seconds, or earlier when the tenant's fitments change
+DASHBOARD_SNAPSHOT_TTL_SECONDS = int(os.getenv('DASHBOARD_SNAPSHOT_TTL_SECONDS', '60'))
+# Other processes pick up field configuration changes within this many seconds
+FIELD_CONFIG_VERSION_TTL_SECONDS = int(os.getenv('FIELD_CONFIG_VERSION_TTL_SECONDS', '5'))
+
+# Celery queues, routes, priorities and per-queue time limits
+from .celery_queues import (
+    CELERY_TASK_QUEUES, CELERY_TASK_DEFAULT_QUEUE, CELERY_TASK_DEFAULT_EXCHANGE,
+    CELERY_TASK_DEFAULT_ROUTING_KEY, CELERY_TASK_DEFAULT_PRIORITY, CELERY_TASK_QUEUE_MAX_PRIORITY,
+    CELERY_TASK_ROUTES, CELERY_TASK_ANNOTATIONS, CELERY_BROKER_TRANSPORT_OPTIONS,
+    TENANT_MAX_CONCURRENT_TASKS, TENANT_TOKEN_RETRY_SECONDS, TENANT_TOKEN_TTL_SECONDS,
+    SMALL_JOB_MAX_CHUNKS,
+)
+
 # Celery Beat Schedule
 from .celery_beat_schedule import CELERY_BEAT_SCHEDULE, CELERY_BEAT_SCHEDULER
 
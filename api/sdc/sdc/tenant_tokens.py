@@ -0,0 +1,85 @@
+"""
+Per-tenant concurrency tokens for background tasks.
+
+Each tenant has a Redis sorted set of held tokens scored by acquisition time.
+A task takes a token before doing bulk work and gives it back afterwards; if
+the tenant already holds ``TENANT_MAX_CONCURRENT_TASKS`` tokens the task is
+told to retry later, which leaves worker slots to other tenants. Tokens held
+by a worker that died expire after ``TENANT_TOKEN_TTL_SECONDS``. Without Redis
+no limit is applied.
+"""
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from .redis_client import get_redis, reset_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'tenant-tokens'
+
+
+class TenantBusy(Exception):
+    """The tenant already runs as many tasks as it is allowed to"""
+
+
+def token_key(tenant_id):
+    return f"{KEY_PREFIX}:{tenant_id}"
+
+
+def _acquire(client, key, token, limit, ttl):
+    now = time.time()
+    pipe = client.pipeline()
+    pipe.zremrangebyscore(key, '-inf', now - ttl)
+    pipe.zadd(key, {token: now})
+    pipe.zrank(key, token)
+    pipe.expire(key, int(ttl))
+    rank = pipe.execute()[2]
+    if rank is not None and rank < limit:
+        return True
+    client.zrem(key, token)
+    return False
+
+
+@contextmanager
+def tenant_token(tenant_id, limit=None, ttl=None):
+    """
+    Hold one of the tenant's concurrency tokens for the duration of the block.
+    Raises ``TenantBusy`` when none is free.
+    """
+    limit = limit or getattr(settings, 'TENANT_MAX_CONCURRENT_TASKS', 2)
+    ttl = ttl or getattr(settings, 'TENANT_TOKEN_TTL_SECONDS', 30 * 60)
+    client = get_redis() if tenant_id else None
+
+    key = token_key(tenant_id)
+    token = uuid.uuid4().hex
+    acquired = False
+    if client is not None:
+        try:
+            acquired = _acquire(client, key, token, limit, ttl)
+        except Exception as e:
+            logger.warning(f"Could not take a concurrency token for tenant {tenant_id}: {str(e)}")
+            reset_redis()
+            client = None
+        else:
+            if not acquired:
+                raise TenantBusy(f"Tenant {tenant_id} is at its limit of {limit} concurrent tasks")
+
+    try:
+        yield
+    finally:
+        if acquired:
+            try:
+                client.zrem(key, token)
+            except Exception as e:
+                logger.warning(f"Could not release concurrency token for tenant {tenant_id}: {str(e)}")
+                reset_redis()
+
+
+def retry_when_busy(task):
+    """Re-queue a task that could not get a tenant token, without using up its error retries"""
+    countdown = getattr(settings, 'TENANT_TOKEN_RETRY_SECONDS', 5)
+    return task.retry(countdown=countdown, max_retries=task.request.retries + 1)
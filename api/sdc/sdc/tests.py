@@ -0,0 +1,370 @@
+import os
+import re
+import subprocess
+import sys
+import time
+import unittest
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from sdc import db_routing, progress
+from sdc.metrics import CONTENT_TYPE, RequestMetrics, metrics_view
+from sdc.perf_middleware import PerformanceMiddleware, fingerprint
+from sdc.progress import ProgressReporter, read_progress
+from tenants.models import Tenant
+from vcdb_categories.models import FitmentJob
+from vcdb_categories.views import FitmentJobViewSet
+
+# What a web or Celery worker process does before it serves anything
+STARTUP_SCRIPT = (
+    "import django; django.setup(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns"
+)
+STARTUP_IMPORT_BUDGET_MS = int(os.getenv('STARTUP_IMPORT_BUDGET_MS', '2500'))
+# Libraries that must only be loaded by the code paths that use them
+DEFERRED_MODULES = ('pandas', 'numpy', 'sklearn', 'scipy', 'openpyxl', 'openai', 'azure')
+
+# "import time: <self us> | <cumulative us> | <two spaces per nesting level><module>"
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\| (\s*)(\S+)$')
+
+
+def parse_importtime(output):
+    """(total cumulative microseconds of top-level imports, set of imported modules)"""
+    total = 0
+    modules = set()
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, module = int(match.group(2)), match.group(3), match.group(4)
+        modules.add(module)
+        if not indent:
+            total += cumulative
+    return total, modules
+
+
+class StartupImportTests(SimpleTestCase):
+    """
+    ``django.setup()`` plus URL loading is measured in a fresh interpreter
+    with ``python -X importtime``. Set STARTUP_IMPORT_BUDGET_MS to adjust
+    the budget for slower machines.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'sdc.settings'))
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, timeout=120,
+        )
+        if completed.returncode != 0:
+            raise AssertionError(f"Startup script failed:\n{completed.stderr[-2000:]}")
+        cls.total_us, cls.modules = parse_importtime(completed.stderr)
+
+    def test_startup_imports_within_budget(self):
+        total_ms = self.total_us / 1000
+        self.assertLessEqual(
+            total_ms, STARTUP_IMPORT_BUDGET_MS,
+            f"Startup imports took {total_ms:.0f}ms, budget is {STARTUP_IMPORT_BUDGET_MS}ms",
+        )
+
+    def test_heavy_libraries_are_not_imported_at_startup(self):
+        loaded = sorted(
+            module for module in self.modules
+            if module.split('.')[0] in DEFERRED_MODULES
+        )
+        self.assertEqual(loaded, [], f"Imported at startup: {', '.join(loaded[:10])}")
+
+    def test_parse_importtime(self):
+        total, modules = parse_importtime(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   _io\n"
+            "import time:       300 |        420 | io\n"
+            "import time:        50 |         50 | json\n"
+        )
+        self.assertEqual(total, 470)
+        self.assertEqual(modules, {'_io', 'io', 'json'})
+
+REPLICA_ALIAS = db_routing.replica_alias()
+
+
+@mock.patch('sdc.db_routing.get_redis', return_value=None)
+@mock.patch('sdc.db_routing.replica_alias', return_value='replica')
+class ReplicaChoiceTests(SimpleTestCase):
+    """When a read-only request may use the replica"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_replica_within_lag(self, *mocks):
+        with mock.patch('sdc.db_routing.replica_lag_seconds', return_value=1.0):
+            self.assertEqual(db_routing.choose_read_alias(self.factory.get('/')), 'replica')
+
+    @override_settings(REPLICA_MAX_LAG_SECONDS=5)
+    def test_primary_when_replica_lags_or_is_unreachable(self, *mocks):
+        for lag in (6.0, None):
+            with mock.patch('sdc.db_routing.replica_lag_seconds', return_value=lag):
+                self.assertIsNone(db_routing.choose_read_alias(self.factory.get('/')))
+
+    def test_primary_after_recent_write(self, *mocks):
+        request = self.factory.get('/')
+        request.COOKIES[db_routing.COOKIE_NAME] = str(int(time.time()) + 5)
+        with mock.patch('sdc.db_routing.replica_lag_seconds', return_value=0.0):
+            self.assertIsNone(db_routing.choose_read_alias(request))
+
+        request.COOKIES[db_routing.COOKIE_NAME] = str(int(time.time()) - 5)
+        with mock.patch('sdc.db_routing.replica_lag_seconds', return_value=0.0):
+            self.assertEqual(db_routing.choose_read_alias(request), 'replica')
+
+    def test_router_sends_writes_to_primary(self, *mocks):
+        router = db_routing.ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Tenant))
+        token = db_routing._read_alias.set('replica')
+        try:
+            self.assertEqual(router.db_for_read(Tenant), 'replica')
+            self.assertEqual(router.db_for_write(Tenant), 'default')
+        finally:
+            db_routing._read_alias.reset(token)
+
+    def test_middleware_marks_successful_writes(self, *mocks):
+        middleware = db_routing.ReplicaRoutingMiddleware(lambda request: HttpResponse(status=201))
+        response = middleware(self.factory.post('/'))
+        self.assertIn(db_routing.COOKIE_NAME, response.cookies)
+
+        self.assertNotIn(db_routing.COOKIE_NAME, middleware(self.factory.get('/')).cookies)
+        failing = db_routing.ReplicaRoutingMiddleware(lambda request: HttpResponse(status=400))
+        self.assertNotIn(db_routing.COOKIE_NAME, failing(self.factory.post('/')).cookies)
+
+
+@unittest.skipUnless(REPLICA_ALIAS, "No replica database configured")
+@mock.patch('sdc.db_routing.get_redis', return_value=None)
+@mock.patch('sdc.db_routing.replica_lag_seconds', return_value=0.0)
+class ReplicaRoutingTests(TestCase):
+    databases = {'default', REPLICA_ALIAS} if REPLICA_ALIAS else {'default'}
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.replica = connections[REPLICA_ALIAS]
+
+    def test_view_reads_use_replica(self, *mocks):
+        @db_routing.replica_reads
+        def view(request):
+            return HttpResponse(str(Tenant.objects.count()))
+
+        with CaptureQueriesContext(self.replica) as replica_queries, \
+                CaptureQueriesContext(connections['default']) as default_queries:
+            view(self.factory.get('/'))
+            Tenant.objects.count()
+        self.assertEqual(len(replica_queries), 1)
+        self.assertEqual(len(default_queries), 1)
+
+    def test_streamed_reads_use_replica(self, *mocks):
+        @db_routing.replica_reads
+        def view(request):
+            return StreamingHttpResponse(str(Tenant.objects.count()) for _ in range(2))
+
+        response = view(self.factory.get('/'))
+        with CaptureQueriesContext(self.replica) as replica_queries:
+            b''.join(response.streaming_content)
+        self.assertEqual(len(replica_queries), 2)
+
+
+class PerformanceMiddlewareTests(TestCase):
+    """Query statistics in the Server-Timing header and the Prometheus series"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.metrics = RequestMetrics()
+        patcher = mock.patch('sdc.perf_middleware.request_metrics', self.metrics)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tenants = [Tenant.objects.create(name=f'Perf Tenant {index}') for index in range(3)]
+
+    def test_fingerprint_ignores_literals_and_in_list_length(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 12 AND name = 'it''s' AND k IN (%s, %s, %s)"),
+            "SELECT * FROM t WHERE id = ? AND name = ? AND k IN (...)",
+        )
+        self.assertEqual(fingerprint('SELECT 1 WHERE k IN (%s)'), fingerprint('SELECT 2 WHERE k IN (%s, %s)'))
+
+    @override_settings(PERF_INSTRUMENTATION_ENABLED=True, PERF_SERVER_TIMING=True, PERF_N_PLUS_ONE_THRESHOLD=3)
+    def test_repeated_queries_are_counted_and_exported(self):
+        def view(request):
+            names = [Tenant.objects.get(pk=tenant.pk).name for tenant in self.tenants]
+            return HttpResponse(str(len(names) + Tenant.objects.count()))
+
+        request = self.factory.get('/api/tenants/')
+        request.resolver_match = mock.Mock(route='api/tenants/')
+        with self.assertLogs('sdc.perf_middleware', level='WARNING') as logs:
+            response = PerformanceMiddleware(view)(request)
+
+        self.assertIn('desc="4 queries, 2 repeated"', response['Server-Timing'])
+        self.assertRegex(response['Server-Timing'], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc=".*", total;dur=[\d.]+$')
+        self.assertIn('3 executions of', logs.output[0])
+
+        rendered = self.metrics.render()
+        labels = 'method="GET",route="/api/tenants/"'
+        self.assertIn(f'http_requests_total{{{labels},status="200"}} 1', rendered)
+        self.assertIn(f'http_request_duration_seconds_count{{{labels}}} 1', rendered)
+        self.assertIn(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1', rendered)
+        self.assertIn(f'db_queries_total{{{labels}}} 4', rendered)
+        self.assertIn(f'http_requests_n_plus_one_total{{{labels}}} 1', rendered)
+
+    @override_settings(PERF_INSTRUMENTATION_ENABLED=True, PERF_SERVER_TIMING=False)
+    def test_unmatched_request_without_server_timing(self):
+        response = PerformanceMiddleware(lambda request: HttpResponse(status=404))(self.factory.get('/missing'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertIn('http_requests_total{method="GET",route="<unmatched>",status="404"} 1', self.metrics.render())
+
+
+class MetricsViewTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    @override_settings(PERF_METRICS_TOKEN='')
+    def test_denied_without_configured_token(self):
+        self.assertEqual(metrics_view(self.factory.get('/metrics')).status_code, 403)
+        self.assertEqual(metrics_view(self.factory.get('/metrics', HTTP_AUTHORIZATION='Bearer ')).status_code, 403)
+
+    @override_settings(PERF_METRICS_TOKEN='scrape-secret')
+    def test_requires_bearer_token(self):
+        self.assertEqual(metrics_view(self.factory.get('/metrics')).status_code, 403)
+        wrong = self.factory.get('/metrics', HTTP_AUTHORIZATION='Bearer other')
+        self.assertEqual(metrics_view(wrong).status_code, 403)
+
+        response = metrics_view(self.factory.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], CONTENT_TYPE)
+        self.assertIn(b'# TYPE http_requests_total counter', response.content)
+
+
+class FakeRedis:
+    """The hash and pipeline calls progress reporting makes"""
+
+    def __init__(self):
+        self.hashes = {}
+        self.executes = 0
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def expire(self, key, seconds):
+        pass
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def hset(self, *args, **kwargs):
+        self.commands.append((self.client.hset, args, kwargs))
+
+    def expire(self, *args, **kwargs):
+        self.commands.append((self.client.expire, args, kwargs))
+
+    def execute(self):
+        self.client.executes += 1
+        for command, args, kwargs in self.commands:
+            command(*args, **kwargs)
+
+
+@override_settings(JOB_PROGRESS_PUBLISH_SECONDS=1, JOB_PROGRESS_DB_FLUSH_SECONDS=10, JOB_PROGRESS_MIN_DELTA=5)
+class ProgressReporterTests(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.now = 100.0
+        for target, value in (
+            ('get_redis', mock.Mock(return_value=self.redis)),
+            ('time', mock.Mock(monotonic=lambda: self.now)),
+        ):
+            patcher = mock.patch.object(progress, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.tenant = Tenant.objects.create(name='Progress Tenant')
+        self.job = FitmentJob.objects.create(tenant=self.tenant, job_type='manual', status='in_progress')
+        self.user = User.objects.create_user('progress-poller')
+
+    def stored(self):
+        return FitmentJob.objects.get(pk=self.job.pk)
+
+    def get_progress(self):
+        request = APIRequestFactory().get('/', HTTP_X_TENANT_ID=str(self.tenant.id))
+        force_authenticate(request, user=self.user)
+        response = FitmentJobViewSet.as_view({'get': 'progress'})(request, pk=self.job.pk)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_updates_are_throttled(self):
+        reporter = ProgressReporter(self.job)
+        with self.assertNumQueries(0):
+            reporter.update(progress_percentage=1, completed_steps=1)
+            reporter.update(progress_percentage=2, completed_steps=2)
+            reporter.update(progress_percentage=3, completed_steps=3)
+        # The first update is published, the small moves right after it are not
+        self.assertEqual(self.redis.executes, 1)
+        self.assertEqual(read_progress(self.job)['completed_steps'], 1)
+
+        # Publish interval elapsed
+        self.now += 1.5
+        reporter.update(progress_percentage=4, completed_steps=4)
+        # Large move within the interval
+        reporter.update(progress_percentage=10, completed_steps=10)
+        self.assertEqual(self.redis.executes, 3)
+        self.assertEqual(read_progress(self.job)['progress_percentage'], 10)
+        self.assertEqual(self.stored().completed_steps, 0)
+
+        # Flush interval elapsed: one UPDATE of the dirty fields
+        self.now += 10
+        with self.assertNumQueries(1):
+            reporter.update(completed_steps=11)
+        stored = self.stored()
+        self.assertEqual((stored.progress_percentage, stored.completed_steps), (10, 11))
+
+    def test_finish_publishes_and_flushes_regardless_of_throttling(self):
+        task = mock.Mock()
+        reporter = ProgressReporter(self.job, task=task)
+        reporter.update(progress_percentage=1, completed_steps=1)
+        reporter.update(progress_percentage=2, completed_steps=2)
+
+        reporter.finish(status='completed', progress_percentage=100, completed_steps=20)
+
+        self.assertEqual(self.redis.executes, 2)
+        live = read_progress(self.job)
+        self.assertEqual((live['status'], live['completed_steps']), ('completed', 20))
+        stored = self.stored()
+        self.assertEqual((stored.status, stored.progress_percentage, stored.completed_steps), ('completed', 100, 20))
+        # The caller sets the terminal task state, not finish()
+        task.update_state.assert_called_once()
+
+    def test_status_endpoint_reads_live_progress(self):
+        reporter = ProgressReporter(self.job)
+        reporter.update(progress_percentage=40, completed_steps=40, current_step='Matching vehicles')
+
+        data = self.get_progress()
+        self.assertEqual(self.stored().completed_steps, 0)
+        self.assertEqual(
+            (data['progress_percentage'], data['completed_steps'], data['current_step']),
+            (40, 40, 'Matching vehicles'),
+        )
+
+        reporter.finish(status='completed', progress_percentage=100, completed_steps=50)
+        # A finished job is read from its row
+        self.redis.hashes.clear()
+        data = self.get_progress()
+        self.assertEqual((data['status'], data['progress_percentage'], data['completed_steps']), ('completed', 100, 50))
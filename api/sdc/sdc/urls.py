@@ -20,13 +20,16 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from tenants.views import TenantListCreateView, TenantDetailView, get_current_tenant, switch_tenant, tenant_stats
 from tenants.views_auth import login_view, logout_view, current_user_view, user_roles_view, refresh_token_view
 # from vcdb.views import version, year_range, configurations  # These views don't exist in the new VCDB implementation
-from fitments.views import export_fitments_advanced_csv, export_fitments_advanced_xlsx, fitments_root, coverage, property_values, validate, submit, export_csv, coverage_export, export_ai_fitments, ai_fitments_list, applied_fitments_list, fitment_filter_options, fitment_detail, update_fitment, delete_fitment, validate_fitments_csv, submit_validated_fitments, get_validation_results, detailed_coverage, coverage_trends, coverage_gaps, get_potential_fitments, get_parts_with_fitments, apply_potential_fitments, analytics_dashboard, approve_fitments, reject_fitments, bulk_delete_fitments
+from fitments.views import export_fitments_advanced_csv, export_fitments_advanced_xlsx, fitments_root, coverage, property_values, validate, submit, export_csv, coverage_export, export_ai_fitments, ai_fitments_list, applied_fitments_list, fitment_filter_options, fitment_detail, update_fitment, delete_fitment, validate_fitments_csv, submit_validated_fitments, get_validation_results, detailed_coverage, coverage_trends, coverage_gaps, get_potential_fitments, get_parts_with_fitments, apply_potential_fitments, analytics_dashboard, approve_fitments, reject_fitments, bulk_delete_fitments, bulk_update_status, create_fitment_selection
+from sdc.metrics import metrics_view
 from workflow.views import uploads as wf_uploads, ai_map, transform_data, vcdb_validate, review_queue, review_actions, publish, download_published_file, presets as wf_presets, preset_detail, ai_fitments, apply_fitments_batch, fitment_rules_upload, job_history, publish_for_review, export_invalid_rows, get_job_review_data, approve_job_rows, export_job_review_xlsx
 
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    # Prometheus scrape endpoint
+    path('metrics', metrics_view),
     # Authentication endpoints
     path('api/auth/login/', login_view),
     path('api/auth/logout/', logout_view),
@@ -70,6 +73,8 @@ urlpatterns = [
     path('api/fitments/approve/', approve_fitments),
     path('api/fitments/reject/', reject_fitments),
     path('api/fitments/bulk-delete/', bulk_delete_fitments),
+    path('api/fitments/bulk-update-status/', bulk_update_status),
+    path('api/fitments/selections/', create_fitment_selection),
     path('api/fitments/<str:fitment_hash>/update/', update_fitment),
     path('api/fitments/<str:fitment_hash>/delete/', delete_fitment),
     path('api/fitments/<str:fitment_hash>/', fitment_detail),
@@ -2,12 +2,13 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import Tenant, Role, UserProfile
+from .models import Tenant, Role, UserProfile, TenantStatistics
 
 
 @admin.register(Tenant)
 class TenantAdmin(admin.ModelAdmin):
-    list_display = ['name', 'slug', 'is_active', 'is_default', 'user_count', 'created_at']
+    list_display = ['name', 'slug', 'is_active', 'is_default', 'user_count', 'fitment_count', 'last_activity', 'created_at']
+    list_select_related = ['statistics']
     list_filter = ['is_active', 'is_default', 'created_at']
     search_fields = ['name', 'slug', 'description', 'contact_email']
     readonly_fields = ['id', 'created_at', 'updated_at', 'user_count_display']
@@ -32,9 +33,26 @@ class TenantAdmin(admin.ModelAdmin):
         }),
     )
     
+    def _statistics(self, obj):
+        try:
+            return obj.statistics
+        except TenantStatistics.DoesNotExist:
+            return None
+
     def user_count(self, obj):
-        return obj.users.count()
+        statistics = self._statistics(obj)
+        return statistics.user_count if statistics else obj.users.count()
     user_count.short_description = 'Users'
+
+    def fitment_count(self, obj):
+        statistics = self._statistics(obj)
+        return statistics.fitment_count if statistics else '-'
+    fitment_count.short_description = 'Fitments'
+
+    def last_activity(self, obj):
+        statistics = self._statistics(obj)
+        return (statistics.last_activity_at if statistics else None) or '-'
+    last_activity.short_description = 'Last activity'
     
     def user_count_display(self, obj):
         count = obj.users.count()
@@ -83,3 +101,17 @@ class UserProfileAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(TenantStatistics)
+class TenantStatisticsAdmin(admin.ModelAdmin):
+    list_display = [
+        'tenant', 'user_count', 'fitment_count', 'deleted_fitment_count', 'product_count',
+        'upload_count', 'refreshed_at'
+    ]
+    list_select_related = ['tenant']
+    search_fields = ['tenant__name', 'tenant__slug']
+    readonly_fields = [field.name for field in TenantStatistics._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
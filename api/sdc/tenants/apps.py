@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class TenantsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tenants'
+
+    def ready(self):
+        # Stored tenant statistics are marked stale when their sources change
+        from .signals import connect_statistics_signals
+        connect_statistics_signals()
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.7 on 2026-10-19 12:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0004_tenant_default_fitment_method'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantStatistics',
+            fields=[
+                ('tenant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to='tenants.tenant')),
+                ('user_count', models.IntegerField(default=0)),
+                ('fitment_count', models.IntegerField(default=0, help_text='Live (not deleted) fitments')),
+                ('deleted_fitment_count', models.IntegerField(default=0)),
+                ('fitments_by_status', models.JSONField(blank=True, default=dict, help_text='Live fitments per item status')),
+                ('product_count', models.IntegerField(default=0)),
+                ('upload_count', models.IntegerField(default=0)),
+                ('last_fitment_at', models.DateTimeField(blank=True, null=True)),
+                ('last_product_at', models.DateTimeField(blank=True, null=True)),
+                ('last_upload_at', models.DateTimeField(blank=True, null=True)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Last write that affects these counts')),
+                ('refreshed_at', models.DateTimeField(blank=True, help_text='Start of the last recount', null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Tenant statistics',
+            },
+        ),
+    ]
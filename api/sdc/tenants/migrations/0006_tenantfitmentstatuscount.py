@@ -0,0 +1,46 @@
+# Generated by Django 5.0.7 on 2026-10-19 14:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def recount_on_first_read(apps, schema_editor):
+    # Stored rows have no status counts yet; tenants.statistics recounts a
+    # tenant whose row was never refreshed the first time it is read
+    apps.get_model('tenants', 'TenantStatistics').objects.update(refreshed_at=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0005_tenantstatistics'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='tenantstatistics',
+            name='changed_at',
+        ),
+        migrations.RemoveField(
+            model_name='tenantstatistics',
+            name='fitments_by_status',
+        ),
+        migrations.AlterField(
+            model_name='tenantstatistics',
+            name='refreshed_at',
+            field=models.DateTimeField(blank=True, help_text='Start of the last full recount', null=True),
+        ),
+        migrations.CreateModel(
+            name='TenantFitmentStatusCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_status', models.CharField(max_length=32)),
+                ('count', models.IntegerField(default=0)),
+                ('statistics', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_counts', to='tenants.tenantstatistics')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('statistics', 'item_status'), name='tenant_fitment_status_count_unique')],
+            },
+        ),
+        migrations.RunPython(recount_on_first_read, migrations.RunPython.noop),
+    ]
@@ -106,3 +106,52 @@ class UserProfile(models.Model):
 
     def __str__(self):
         return f"{self.user.username} @ {self.tenant.slug}"
+
+
+class TenantStatistics(models.Model):
+    """
+    Stored per-tenant counts, kept current by ``tenants.statistics`` so that
+    stats screens do not count the fitment table on every request. Writes
+    apply deltas; ``refreshed_at`` is the start of the last full recount.
+    """
+    tenant = models.OneToOneField(Tenant, on_delete=models.CASCADE, primary_key=True, related_name='statistics')
+    user_count = models.IntegerField(default=0)
+    fitment_count = models.IntegerField(default=0, help_text="Live (not deleted) fitments")
+    deleted_fitment_count = models.IntegerField(default=0)
+    product_count = models.IntegerField(default=0)
+    upload_count = models.IntegerField(default=0)
+    last_fitment_at = models.DateTimeField(null=True, blank=True)
+    last_product_at = models.DateTimeField(null=True, blank=True)
+    last_upload_at = models.DateTimeField(null=True, blank=True)
+    refreshed_at = models.DateTimeField(null=True, blank=True, help_text="Start of the last full recount")
+
+    class Meta:
+        verbose_name_plural = "Tenant statistics"
+
+    def __str__(self):
+        return f"Statistics for {self.tenant_id}"
+
+    @property
+    def fitments_by_status(self):
+        """Live fitments per item status (prefetch ``status_counts`` when listing)"""
+        return {row.item_status: row.count for row in self.status_counts.all() if row.count}
+
+    @property
+    def last_activity_at(self):
+        timestamps = [ts for ts in (self.last_fitment_at, self.last_product_at, self.last_upload_at) if ts]
+        return max(timestamps) if timestamps else None
+
+
+class TenantFitmentStatusCount(models.Model):
+    """Live fitments of a tenant with one item status"""
+    statistics = models.ForeignKey(TenantStatistics, on_delete=models.CASCADE, related_name='status_counts')
+    item_status = models.CharField(max_length=32)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['statistics', 'item_status'], name='tenant_fitment_status_count_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.statistics_id} {self.item_status}: {self.count}"
@@ -1,21 +1,50 @@
 from rest_framework import serializers
-from .models import Tenant, UserProfile
+from .models import Tenant, TenantStatistics, UserProfile
+
+
+class TenantStatisticsSerializer(serializers.ModelSerializer):
+    last_activity_at = serializers.DateTimeField(read_only=True)
+
+    class Meta:
+        model = TenantStatistics
+        fields = [
+            'user_count', 'fitment_count', 'deleted_fitment_count', 'fitments_by_status',
+            'product_count', 'upload_count', 'last_fitment_at', 'last_product_at', 'last_upload_at',
+            'last_activity_at', 'refreshed_at'
+        ]
+        read_only_fields = fields
 
 
 class TenantSerializer(serializers.ModelSerializer):
     user_count = serializers.SerializerMethodField()
+    statistics = serializers.SerializerMethodField()
     
     class Meta:
         model = Tenant
         fields = [
             'id', 'name', 'slug', 'description', 'fitment_settings', 'ai_instructions',
             'contact_email', 'contact_phone', 'company_address', 'is_active', 
-            'is_default', 'default_fitment_method', 'created_at', 'updated_at', 'user_count'
+            'is_default', 'default_fitment_method', 'created_at', 'updated_at', 'user_count',
+            'statistics'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'user_count']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'user_count', 'statistics']
+
+    def _statistics(self, obj):
+        # Select tenants with select_related('statistics') and
+        # prefetch_related('statistics__status_counts') to avoid queries per tenant
+        try:
+            statistics = obj.statistics
+        except TenantStatistics.DoesNotExist:
+            return None
+        return statistics if statistics.refreshed_at else None
     
     def get_user_count(self, obj):
-        return obj.users.count()
+        statistics = self._statistics(obj)
+        return statistics.user_count if statistics else obj.users.count()
+
+    def get_statistics(self, obj):
+        statistics = self._statistics(obj)
+        return TenantStatisticsSerializer(statistics).data if statistics else None
 
 
 class TenantCreateSerializer(serializers.ModelSerializer):
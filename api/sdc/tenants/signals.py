@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+
+from .statistics import record_count_change
+
+# Model -> stored counter it feeds
+COUNTED_MODELS = {
+    'tenants.UserProfile': 'user_count',
+    'data_uploads.DataUploadSession': 'upload_count',
+    'products.ProductData': 'product_count',
+}
+# A post_delete receiver would turn the bulk deletes of a tenant's products
+# into per-row deletes; the deleting code reports those instead
+UNCOUNTED_DELETES = {'products.ProductData'}
+
+
+def counted_model_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        record_count_change(instance.tenant_id, COUNTED_MODELS[sender._meta.label], 1 if created else 0)
+
+
+def counted_model_deleted(sender, instance, **kwargs):
+    record_count_change(instance.tenant_id, COUNTED_MODELS[sender._meta.label], -1)
+
+
+def connect_statistics_signals():
+    for sender in COUNTED_MODELS:
+        post_save.connect(counted_model_saved, sender=sender, dispatch_uid=f'tenant-statistics:{sender}')
+        if sender not in UNCOUNTED_DELETES:
+            post_delete.connect(counted_model_deleted, sender=sender, dispatch_uid=f'tenant-statistics:{sender}')
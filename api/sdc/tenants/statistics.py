@@ -0,0 +1,199 @@
+"""
+Materialized tenant statistics.
+
+``TenantStatistics`` holds one row of counts per tenant: users, live fitments
+(in total and, in ``TenantFitmentStatusCount``, per item status), deleted
+fitments, products and uploads, and the last activity on each. Reads never
+count the underlying tables.
+
+Writers report what they changed and the stored counts move by ``F()``
+deltas once the write commits:
+
+- fitment writers pass signed counts per ``(tenant_id, itemStatus,
+  isDeleted)`` state to ``record_fitment_changes``, through
+  ``fitments.analytics.fitments_changed`` (saves, ``bulk_create_new``, bulk
+  transitions, ingest and deletes). ``count_transitions`` builds them from
+  ``(before, after)`` states;
+- user, upload and product writes call ``record_count_change``, from
+  ``tenants.signals`` or from the code doing bulk product writes.
+
+A tenant is counted in full the first time its statistics are read. Celery
+beat recounts every tenant nightly (``reconcile_tenant_statistics``) to
+repair changes no writer reported, such as raw queryset updates.
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from .models import TenantFitmentStatusCount, TenantStatistics
+
+# Counter -> last activity field set along with it
+ACTIVITY_FIELDS = {
+    'user_count': None,
+    'product_count': 'last_product_at',
+    'upload_count': 'last_upload_at',
+}
+
+# (tenant_id, itemStatus, isDeleted); None for a fitment that does not exist
+FitmentState = Optional[Tuple]
+
+
+@dataclass
+class _FitmentDelta:
+    live: int = 0
+    deleted: int = 0
+    statuses: Counter = field(default_factory=Counter)
+
+
+def compute_tenant_statistics(tenant_id) -> Dict:
+    """Current counts for one tenant, from four grouped queries"""
+    Fitment = apps.get_model('fitments', 'Fitment')
+    ProductData = apps.get_model('products', 'ProductData')
+    DataUploadSession = apps.get_model('data_uploads', 'DataUploadSession')
+    UserProfile = apps.get_model('tenants', 'UserProfile')
+
+    fitment_count = 0
+    deleted_fitment_count = 0
+    fitments_by_status = {}
+    last_fitment_at = None
+    rows = (
+        Fitment.all_objects.filter(tenant_id=tenant_id)
+        .values('itemStatus', 'isDeleted')
+        .annotate(count=Count('pk'), last=Max('updatedAt'))
+        .order_by()
+    )
+    for row in rows:
+        if row['isDeleted']:
+            deleted_fitment_count += row['count']
+        else:
+            fitment_count += row['count']
+            fitments_by_status[row['itemStatus']] = fitments_by_status.get(row['itemStatus'], 0) + row['count']
+        if last_fitment_at is None or row['last'] > last_fitment_at:
+            last_fitment_at = row['last']
+
+    products = ProductData.objects.filter(tenant_id=tenant_id).aggregate(count=Count('pk'), last=Max('updated_at'))
+    uploads = DataUploadSession.objects.filter(tenant_id=tenant_id).aggregate(count=Count('pk'), last=Max('updated_at'))
+
+    return {
+        'user_count': UserProfile.objects.filter(tenant_id=tenant_id).count(),
+        'fitment_count': fitment_count,
+        'deleted_fitment_count': deleted_fitment_count,
+        'fitments_by_status': fitments_by_status,
+        'product_count': products['count'],
+        'upload_count': uploads['count'],
+        'last_fitment_at': last_fitment_at,
+        'last_product_at': products['last'],
+        'last_upload_at': uploads['last'],
+    }
+
+
+def refresh_tenant_statistics(tenant_ids: Iterable) -> List[TenantStatistics]:
+    """
+    Recount the given tenants and store the results. Deltas committed while
+    a tenant is being counted can be lost or applied twice; the next
+    recount corrects them.
+    """
+    refreshed = []
+    for tenant_id in set(tenant_ids):
+        started = timezone.now()
+        values = compute_tenant_statistics(tenant_id)
+        fitments_by_status = values.pop('fitments_by_status')
+        with transaction.atomic():
+            statistics, _ = TenantStatistics.objects.update_or_create(
+                tenant_id=tenant_id, defaults={**values, 'refreshed_at': started},
+            )
+            statistics.status_counts.all().delete()
+            TenantFitmentStatusCount.objects.bulk_create([
+                TenantFitmentStatusCount(statistics=statistics, item_status=item_status, count=count)
+                for item_status, count in fitments_by_status.items()
+            ])
+        refreshed.append(statistics)
+    return refreshed
+
+
+def get_tenant_statistics(tenant) -> TenantStatistics:
+    """Stored statistics for a tenant; counted on the spot only the first time"""
+    try:
+        statistics = tenant.statistics
+    except TenantStatistics.DoesNotExist:
+        statistics = None
+    if statistics is None or statistics.refreshed_at is None:
+        statistics = refresh_tenant_statistics([tenant.id])[0]
+        tenant.statistics = statistics
+    return statistics
+
+
+def count_transitions(transitions: Iterable[Tuple[FitmentState, FitmentState]]) -> Counter:
+    """Signed fitment counts per state from ``(before, after)`` state pairs"""
+    changes = Counter()
+    for before, after in transitions:
+        if before == after:
+            continue
+        if before is not None:
+            changes[before] -= 1
+        if after is not None:
+            changes[after] += 1
+    return changes
+
+
+def _apply_fitment_deltas(deltas: Dict) -> None:
+    for tenant_id, delta in deltas.items():
+        updated = TenantStatistics.objects.filter(tenant_id=tenant_id).update(
+            fitment_count=F('fitment_count') + delta.live,
+            deleted_fitment_count=F('deleted_fitment_count') + delta.deleted,
+            last_fitment_at=Now(),
+        )
+        # A tenant without a row is counted in full when first read
+        if not updated:
+            continue
+        for item_status, count in delta.statuses.items():
+            if not count:
+                continue
+            status_counts = TenantFitmentStatusCount.objects.filter(statistics_id=tenant_id, item_status=item_status)
+            if not status_counts.update(count=F('count') + count):
+                TenantFitmentStatusCount.objects.bulk_create(
+                    [TenantFitmentStatusCount(statistics_id=tenant_id, item_status=item_status)], ignore_conflicts=True,
+                )
+                status_counts.update(count=F('count') + count)
+
+
+def record_fitment_changes(tenant_ids: Iterable, changes: Optional[Mapping] = None) -> None:
+    """
+    Once the current transaction commits, add ``changes`` (signed fitment
+    counts per state) to the stored statistics and set the last fitment
+    activity of their tenants and of ``tenant_ids``.
+    """
+    deltas = {tenant_id: _FitmentDelta() for tenant_id in tenant_ids if tenant_id}
+    for (tenant_id, item_status, is_deleted), count in (changes or {}).items():
+        if not tenant_id or not count:
+            continue
+        delta = deltas.setdefault(tenant_id, _FitmentDelta())
+        if is_deleted:
+            delta.deleted += count
+        else:
+            delta.live += count
+            delta.statuses[item_status] += count
+    if deltas:
+        transaction.on_commit(lambda: _apply_fitment_deltas(deltas), robust=True)
+
+
+def record_count_change(tenant_id, counter: str, delta: int) -> None:
+    """
+    Once the current transaction commits, add ``delta`` to a stored counter
+    (a key of ACTIVITY_FIELDS) and set the matching last activity.
+    """
+    activity_field = ACTIVITY_FIELDS[counter]
+    if not tenant_id or not (delta or activity_field):
+        return
+    values = {counter: F(counter) + delta}
+    if activity_field:
+        values[activity_field] = Now()
+    transaction.on_commit(
+        lambda: TenantStatistics.objects.filter(tenant_id=tenant_id).update(**values), robust=True,
+    )
@@ -0,0 +1,21 @@
+"""
+Celery tasks keeping the stored tenant statistics correct
+"""
+
+from celery import shared_task
+import logging
+
+from .models import Tenant
+from .statistics import refresh_tenant_statistics
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def reconcile_tenant_statistics():
+    """
+    Recount the statistics of every tenant, repairing changes no writer reported
+    """
+    refreshed = refresh_tenant_statistics(Tenant.objects.values_list('id', flat=True))
+    logger.info(f"Reconciled statistics of {len(refreshed)} tenants")
+    return f"Reconciled statistics of {len(refreshed)} tenants"
@@ -1,3 +1,173 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from data_uploads.models import DataUploadSession
+from fitments.ingest import ingest_fitments
+from fitments.models import Fitment
+from products.models import ProductConfiguration, ProductData
+
+from .models import Tenant, TenantStatistics, UserProfile
+from .statistics import compute_tenant_statistics, get_tenant_statistics, refresh_tenant_statistics
+from .tasks import reconcile_tenant_statistics
+from .views import tenant_stats
+
+
+def fitment_values(tenant, part_id, **overrides):
+    values = dict(
+        tenant=tenant, partId=part_id, baseVehicleId='1', year=2020, makeName='Acura',
+        modelName='ILX', subModelName='Base', driveTypeName='FWD', fuelTypeName='Gas',
+        bodyNumDoors=4, bodyTypeName='Sedan', ptid='P1', partTypeDescriptor='Brake Pad',
+        uom='EA', fitmentTitle=part_id, position='Front', positionId=1, liftHeight='Stock',
+        wheelType='Alloy',
+    )
+    values.update(overrides)
+    return values
+
+
+def make_fitment(tenant, part_id, **overrides):
+    return Fitment.objects.create(**fitment_values(tenant, part_id, **overrides))
+
+
+class TenantStatisticsTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch('fitments.analytics.get_redis', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tenant = Tenant.objects.create(name='Stats Tenant')
+        self.other = Tenant.objects.create(name='Other Stats Tenant')
+        make_fitment(self.tenant, 'S1')
+        make_fitment(self.tenant, 'S2', itemStatus='Inactive')
+        make_fitment(self.tenant, 'S3').soft_delete()
+        make_fitment(self.other, 'S4')
+        configuration = ProductConfiguration.objects.create(tenant=self.tenant)
+        ProductData.objects.create(tenant=self.tenant, configuration=configuration, part_number='S1')
+        DataUploadSession.objects.create(tenant=self.tenant)
+        UserProfile.objects.create(user=User.objects.create_user('stats-user'), tenant=self.tenant)
+
+    def statistics(self):
+        return TenantStatistics.objects.get(tenant=self.tenant)
+
+    def test_refresh_counts_the_tenant(self):
+        statistics = refresh_tenant_statistics([self.tenant.id])[0]
+
+        self.assertEqual((statistics.fitment_count, statistics.deleted_fitment_count), (2, 1))
+        self.assertEqual(statistics.fitments_by_status, {'Active': 1, 'Inactive': 1})
+        self.assertEqual((statistics.product_count, statistics.upload_count, statistics.user_count), (1, 1, 1))
+        self.assertIsNotNone(statistics.last_fitment_at)
+        self.assertEqual(
+            statistics.last_activity_at,
+            max(statistics.last_fitment_at, statistics.last_product_at, statistics.last_upload_at),
+        )
+
+    def test_fitment_writes_apply_deltas(self):
+        refresh_tenant_statistics([self.tenant.id, self.other.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_fitment(self.tenant, 'S5')
+        with self.captureOnCommitCallbacks(execute=True):
+            Fitment.objects.filter(tenant=self.tenant, partId='S1').bulk_soft_delete(record_history=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            Fitment.objects.filter(tenant=self.tenant, partId='S2').bulk_set_status('Archived', record_history=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            fitment = Fitment.objects.get(tenant=self.tenant, partId='S5')
+            fitment.itemStatus = 'Inactive'
+            fitment.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            Fitment.all_objects.get(tenant=self.tenant, partId='S3').hard_delete()
+
+        statistics = self.statistics()
+        self.assertEqual((statistics.fitment_count, statistics.deleted_fitment_count), (2, 1))
+        self.assertEqual(statistics.fitments_by_status, {'Inactive': 1, 'Archived': 1})
+        self.assertEqual(statistics.fitments_by_status, compute_tenant_statistics(self.tenant.id)['fitments_by_status'])
+        self.assertEqual(TenantStatistics.objects.get(tenant=self.other).fitment_count, 1)
+
+    def test_deltas_are_applied_only_on_commit(self):
+        refresh_tenant_statistics([self.tenant.id])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            make_fitment(self.tenant, 'S5')
+            self.assertEqual(self.statistics().fitment_count, 2)
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.statistics().fitment_count, 3)
+
+    def test_delta_for_a_tenant_without_statistics_is_skipped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            make_fitment(self.other, 'S5')
+
+        self.assertFalse(TenantStatistics.objects.filter(tenant=self.other).exists())
+        self.assertEqual(get_tenant_statistics(self.other).fitment_count, 2)
+
+    def test_bulk_create_new_reports_inserted_rows(self):
+        refresh_tenant_statistics([self.tenant.id])
+        fitments = [Fitment(**fitment_values(self.tenant, part_id)) for part_id in ('S1', 'S6')]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inserted = Fitment.objects.bulk_create_new(fitments)
+
+        self.assertEqual(len(inserted), 1)
+        self.assertEqual(self.statistics().fitments_by_status['Active'], 2)
+
+    def test_ingest_reports_inserted_rows(self):
+        refresh_tenant_statistics([self.tenant.id])
+        rows = [
+            {key: value for key, value in fitment_values(self.tenant, part_id).items() if key != 'tenant'}
+            for part_id in ('S1', 'S6', 'S7')
+        ]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = ingest_fitments(rows, self.tenant)
+
+        self.assertEqual(result.created, 2)
+        statistics = self.statistics()
+        self.assertEqual((statistics.fitment_count, statistics.fitments_by_status['Active']), (4, 3))
+
+    def test_counted_models_apply_deltas(self):
+        refresh_tenant_statistics([self.tenant.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            DataUploadSession.objects.create(tenant=self.tenant)
+        with self.captureOnCommitCallbacks(execute=True):
+            UserProfile.objects.filter(tenant=self.tenant).get().delete()
+
+        statistics = self.statistics()
+        self.assertEqual((statistics.upload_count, statistics.user_count, statistics.product_count), (2, 0, 1))
+        self.assertIsNotNone(statistics.last_upload_at)
+
+    def test_reconcile_repairs_unreported_changes(self):
+        refresh_tenant_statistics([self.tenant.id])
+        # Queryset updates send no signals
+        Fitment.objects.filter(tenant=self.tenant).update(itemStatus='Inactive')
+
+        reconcile_tenant_statistics()
+
+        self.assertEqual(self.statistics().fitments_by_status, {'Inactive': 2})
+        self.assertTrue(TenantStatistics.objects.filter(tenant=self.other).exists())
+
+    def test_stats_endpoint_reads_the_stored_row(self):
+        request = APIRequestFactory().get(f'/api/tenants/{self.tenant.id}/stats/')
+        force_authenticate(request, user=User.objects.get(username='stats-user'))
+        response = tenant_stats(request, tenant_id=self.tenant.id)
+        self.assertEqual(response.data['fitment_count'], 2)
+        self.assertEqual(response.data['tenant']['statistics']['fitment_count'], 2)
+
+        make_fitment(self.tenant, 'S5')
+        # Counts come from the stored rows: tenant with statistics, then status counts
+        with self.assertNumQueries(2):
+            response = tenant_stats(request, tenant_id=self.tenant.id)
+        self.assertEqual(response.data['fitment_count'], 2)
+        self.assertEqual(response.data['upload_count'], 1)
+        self.assertEqual(response.data['preset_count'], 0)
+
+    def test_statistics_are_computed_on_first_read(self):
+        statistics = get_tenant_statistics(self.tenant)
 
-# Create your tests here.
+        self.assertEqual(statistics.fitment_count, 2)
+        self.assertEqual(statistics.refreshed_at, self.statistics().refreshed_at)
+        self.assertLess(timezone.now() - statistics.refreshed_at, timedelta(minutes=1))
@@ -1,10 +1,8 @@
-import requests
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-from django.conf import settings
-from django.utils import timezone
-import json
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+
+from .transport import AutoCareError, AutoCareTransport, get_transport
 
 logger = logging.getLogger(__name__)
 
@@ -12,67 +10,40 @@ logger = logging.getLogger(__name__)
 class AutoCareAPIClient:
     """Client for AutoCare VCDB API integration"""
     
-    def __init__(self):
-        self.base_url = "https://vcdb.autocarevip.com/api/v1.0/vcdb"
-        self.auth_url = "https://autocare-identity.autocare.org/connect/token"
-        
-        # AutoCare API credentials from environment variables
-        self.client_id = getattr(settings, 'AUTOCARE_CLIENT_ID')
-        self.client_secret = getattr(settings, 'AUTOCARE_CLIENT_SECRET')
-        self.username = getattr(settings, 'AUTOCARE_USERNAME')
-        self.password = getattr(settings, 'AUTOCARE_PASSWORD')
-        self.scope = "VcdbApis CommonApis openid profile offline_access"
-        
-        self.access_token = None
-        self.token_expires_at = None
-        self.refresh_token = None
+    def __init__(self, transport: Optional[AutoCareTransport] = None):
+        # Clients share the process-wide pooled session and access token
+        self.transport = transport or get_transport()
+        self.base_url = self.transport.base_url
+        self.auth_url = self.transport.auth_url
+    
+    @property
+    def access_token(self):
+        return self.transport.token.access_token
+    
+    @property
+    def refresh_token(self):
+        return self.transport.token.refresh_token
+    
+    @property
+    def token_expires_at(self):
+        return self.transport.token.expires_at
     
     def authenticate(self) -> bool:
         """Authenticate with AutoCare API and get access token"""
         try:
-            auth_data = {
-                'grant_type': 'password',
-                'client_id': self.client_id,
-                'client_secret': self.client_secret,
-                'username': self.username,
-                'password': self.password,
-                'scope': self.scope
-            }
-            
-            headers = {
-                'Content-Type': 'application/x-www-form-urlencoded'
-            }
-            
-            logger.info("Authenticating with AutoCare API...")
-            response = requests.post(self.auth_url, data=auth_data, headers=headers, timeout=30)
-            response.raise_for_status()
-            
-            token_data = response.json()
-            self.access_token = token_data['access_token']
-            self.refresh_token = token_data.get('refresh_token')
-            
-            # Calculate token expiration time
-            expires_in = token_data.get('expires_in', 3600)
-            self.token_expires_at = timezone.now() + timedelta(seconds=expires_in - 60)  # 1 minute buffer
-            
-            logger.info(f"Successfully authenticated. Token expires at: {self.token_expires_at}")
+            self.transport.token.invalidate(self.access_token)
+            self.transport.token.get()
             return True
-            
-        except requests.exceptions.RequestException as e:
+        except AutoCareError as e:
             logger.error(f"Authentication failed: {str(e)}")
             return False
-        except KeyError as e:
-            logger.error(f"Invalid response format: {str(e)}")
-            return False
         except Exception as e:
             logger.error(f"Unexpected error during authentication: {str(e)}")
             return False
     
     def is_token_valid(self) -> bool:
         """Check if current token is still valid"""
-        if not self.access_token or not self.token_expires_at:
-            return False
-        return timezone.now() < self.token_expires_at
+        return self.transport.token.is_valid()
     
     def ensure_authenticated(self) -> bool:
         """Ensure we have a valid token, re-authenticate if needed"""
@@ -81,135 +52,46 @@ class AutoCareAPIClient:
             return self.authenticate()
         return True
     
+    def iter_pages(self, endpoint: str, params: Optional[Dict] = None, page_size: Optional[int] = None,
+                   prefetch: Optional[int] = None) -> Iterator[Tuple[int, List[Dict]]]:
+        """
+        Yield ``(page_number, records)`` for a table one page at a time.
+        Raises ``AutoCareError`` when a page cannot be fetched.
+        """
+        return self.transport.iter_pages(endpoint, params, page_size=page_size, prefetch=prefetch)
+    
     def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Optional[List[Dict]]:
-        """Make authenticated request to AutoCare API with pagination support"""
-        if not self.ensure_authenticated():
-            logger.error("Failed to authenticate with AutoCare API")
-            return None
-        
-        url = f"{self.base_url}/{endpoint}"
-        headers = {
-            'Authorization': f'Bearer {self.access_token}',
-            'Content-Type': 'application/json'
-        }
-        
-        # Set up pagination parameters
-        page_size = 1000
-        page_number = 1
+        """Fetch every page of a table into one list; prefer iter_pages for large tables"""
         all_data = []
-        
-        while True:
-            # Add pagination parameters to the request
-            request_params = params.copy() if params else {}
-            request_params.update({
-                'PageSize': page_size,
-                'PageNumber': page_number
-            })
-            
-            try:
-                logger.info(f"Making request to: {url} (Page {page_number})")
-                response = requests.get(url, headers=headers, params=request_params, timeout=60)
-                response.raise_for_status()
-                
-                data = response.json()
-                if isinstance(data, list):
-                    # If we get an empty array, we've reached the end
-                    if not data:
-                        logger.info(f"Reached end of data for {endpoint} at page {page_number}")
-                        break
-                    
-                    all_data.extend(data)
-                    logger.info(f"Retrieved {len(data)} records from {endpoint} page {page_number} (Total: {len(all_data)})")
-                    
-                    # If we got fewer records than the page size, we've reached the end
-                    if len(data) < page_size:
-                        logger.info(f"Reached end of data for {endpoint} at page {page_number} (got {len(data)} < {page_size})")
-                        break
-                    
-                    page_number += 1
-                else:
-                    logger.warning(f"Unexpected response format from {endpoint}: {type(data)}")
-                    break
-                    
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Request failed for {endpoint} page {page_number}: {str(e)}")
-                return None
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON response from {endpoint} page {page_number}: {str(e)}")
-                return None
-            except Exception as e:
-                logger.error(f"Unexpected error for {endpoint} page {page_number}: {str(e)}")
-                return None
+        try:
+            for page_number, data in self.iter_pages(endpoint, params):
+                all_data.extend(data)
+                logger.info(f"Retrieved {len(data)} records from {endpoint} page {page_number} (Total: {len(all_data)})")
+        except AutoCareError as e:
+            logger.error(f"Request failed for {endpoint}: {str(e)}")
+            return None
         
         logger.info(f"Retrieved total {len(all_data)} records from {endpoint}")
         return all_data
     
     def _make_request_paginated(self, endpoint: str, params: Optional[Dict] = None, callback=None):
         """Make paginated requests to AutoCare API and process each page with callback"""
-        if not self.ensure_authenticated():
-            logger.error("Failed to authenticate with AutoCare API")
-            return False
-        
-        url = f"{self.base_url}/{endpoint}"
-        headers = {
-            'Authorization': f'Bearer {self.access_token}',
-            'Content-Type': 'application/json'
-        }
-        
-        # Set up pagination parameters
-        page_size = 1000
-        page_number = 1
         total_processed = 0
-        
-        while True:
-            # Add pagination parameters to the request
-            request_params = params.copy() if params else {}
-            request_params.update({
-                'PageSize': page_size,
-                'PageNumber': page_number
-            })
-            
-            try:
-                logger.info(f"Making request to: {url} (Page {page_number})")
-                response = requests.get(url, headers=headers, params=request_params, timeout=60)
-                response.raise_for_status()
-                
-                data = response.json()
-                if isinstance(data, list):
-                    # If we get an empty array, we've reached the end
-                    if not data:
-                        logger.info(f"Reached end of data for {endpoint} at page {page_number}")
-                        break
-                    
-                    # Process this page with the callback
-                    if callback:
-                        try:
-                            processed = callback(data, page_number)
-                            total_processed += processed
-                            logger.info(f"Processed {processed} records from {endpoint} page {page_number} (Total: {total_processed})")
-                        except Exception as e:
-                            logger.error(f"Error processing {endpoint} page {page_number}: {str(e)}")
-                            return False
-                    
-                    # If we got fewer records than the page size, we've reached the end
-                    if len(data) < page_size:
-                        logger.info(f"Reached end of data for {endpoint} at page {page_number} (got {len(data)} < {page_size})")
-                        break
-                    
-                    page_number += 1
-                else:
-                    logger.warning(f"Unexpected response format from {endpoint}: {type(data)}")
-                    break
-                    
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Request failed for {endpoint} page {page_number}: {str(e)}")
-                return False
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON response from {endpoint} page {page_number}: {str(e)}")
-                return False
-            except Exception as e:
-                logger.error(f"Unexpected error for {endpoint} page {page_number}: {str(e)}")
-                return False
+        page_number = 0
+        try:
+            for page_number, data in self.iter_pages(endpoint, params):
+                if not callback:
+                    continue
+                try:
+                    processed = callback(data, page_number)
+                except Exception as e:
+                    logger.error(f"Error processing {endpoint} page {page_number}: {str(e)}")
+                    return False
+                total_processed += processed or 0
+                logger.info(f"Processed {processed} records from {endpoint} page {page_number} (Total: {total_processed})")
+        except AutoCareError as e:
+            logger.error(f"Request failed for {endpoint} after page {page_number}: {str(e)}")
+            return False
         
         logger.info(f"Completed processing {endpoint}. Total records processed: {total_processed}")
         return True
@@ -0,0 +1,179 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from django.test import SimpleTestCase
+
+from .autocare_api import AutoCareAPIClient
+from .transport import AutoCareError, AutoCareTransport, retry_after_seconds
+
+
+class FakeAutoCare:
+    """
+    Minimal AutoCare identity + VCDB server. ``failures`` maps a request
+    path to a list of status codes answered before the real response.
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.failures = {}
+        self.requests = []
+        self.token_requests = []
+        self.valid_tokens = set()
+        self.connections = set()
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def expire_tokens(self):
+        with self.lock:
+            self.valid_tokens.clear()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body=b'', headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _fail_if_scheduled(self, path):
+                with fake.lock:
+                    pending = fake.failures.get(path) or []
+                    status = pending.pop(0) if pending else None
+                if status is None:
+                    return False
+                self._send(status, b'{}', {'Retry-After': '0'} if status == 429 else None)
+                return True
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                form = parse_qs(self.rfile.read(length).decode())
+                with fake.lock:
+                    fake.token_requests.append(form.get('grant_type', [''])[0])
+                    token = f"token-{len(fake.token_requests)}"
+                    fake.valid_tokens.add(token)
+                body = json.dumps({'access_token': token, 'refresh_token': 'refresh', 'expires_in': 3600})
+                self._send(200, body.encode(), {'Content-Type': 'application/json'})
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = parse_qs(parsed.query)
+                table = parsed.path.rsplit('/', 1)[-1]
+                with fake.lock:
+                    fake.requests.append((table, int(query['PageNumber'][0]), self.headers.get('Accept-Encoding')))
+                    fake.connections.add(self.client_address)
+                    authorized = self.headers.get('Authorization', '').replace('Bearer ', '') in fake.valid_tokens
+                if self._fail_if_scheduled(parsed.path):
+                    return
+                if not authorized:
+                    self._send(401, b'{}')
+                    return
+
+                size, number = int(query['PageSize'][0]), int(query['PageNumber'][0])
+                rows = fake.tables.get(table, [])[(number - 1) * size:number * size]
+                body = json.dumps(rows).encode()
+                headers = {'Content-Type': 'application/json'}
+                if 'gzip' in (self.headers.get('Accept-Encoding') or ''):
+                    body = gzip.compress(body)
+                    headers['Content-Encoding'] = 'gzip'
+                self._send(200, body, headers)
+
+        return Handler
+
+
+class AutoCareTransportTests(SimpleTestCase):
+    def setUp(self):
+        self.fake = FakeAutoCare({
+            'Make': [{'MakeID': i, 'MakeName': f"Make {i}"} for i in range(1, 26)],
+            'Year': [],
+        })
+        self.fake.start()
+        self.addCleanup(self.fake.stop)
+        self.sleeps = []
+        self.transport = AutoCareTransport(
+            base_url=f"{self.fake.url}/vcdb", auth_url=f"{self.fake.url}/connect/token",
+            max_retries=3, backoff_seconds=0.01, sleep=self.sleeps.append,
+        )
+        self.addCleanup(self.transport.close)
+
+    def test_pages_are_streamed_over_one_pooled_connection(self):
+        pages = list(self.transport.iter_pages('Make', page_size=10, prefetch=0))
+
+        self.assertEqual([number for number, _ in pages], [1, 2, 3])
+        self.assertEqual(sum(len(records) for _, records in pages), 25)
+        self.assertEqual(len(self.fake.connections), 1)
+        self.assertTrue(all('gzip' in encoding for _, _, encoding in self.fake.requests))
+        self.assertEqual(self.fake.token_requests, ['password'])
+
+    def test_prefetch_yields_pages_in_order(self):
+        pages = list(self.transport.iter_pages('Make', page_size=10, prefetch=2))
+
+        self.assertEqual([number for number, _ in pages], [1, 2, 3])
+        self.assertEqual([records[0]['MakeID'] for _, records in pages], [1, 11, 21])
+
+    def test_empty_table(self):
+        self.assertEqual(list(self.transport.iter_pages('Year', page_size=10, prefetch=0)), [])
+
+    def test_retries_throttling_and_server_errors(self):
+        self.fake.failures['/vcdb/Make'] = [429, 503]
+
+        pages = list(self.transport.iter_pages('Make', page_size=100, prefetch=0))
+
+        self.assertEqual(len(pages[0][1]), 25)
+        # Retry-After: 0 is honoured, the 503 gets a jittered backoff
+        self.assertEqual(self.sleeps[0], 0)
+        self.assertLessEqual(self.sleeps[1], 0.02)
+
+    def test_gives_up_after_max_retries(self):
+        self.fake.failures['/vcdb/Make'] = [500] * 10
+
+        with self.assertRaises(AutoCareError):
+            list(self.transport.iter_pages('Make', page_size=100, prefetch=0))
+        self.assertEqual(len(self.sleeps), 3)
+
+    def test_expired_token_is_refreshed_once(self):
+        list(self.transport.iter_pages('Make', page_size=100, prefetch=0))
+        self.fake.expire_tokens()
+
+        pages = list(self.transport.iter_pages('Make', page_size=100, prefetch=0))
+
+        self.assertEqual(len(pages), 1)
+        self.assertEqual(self.fake.token_requests, ['password', 'refresh_token'])
+
+    def test_client_keeps_list_and_callback_apis(self):
+        client = AutoCareAPIClient(transport=self.transport)
+        seen = []
+
+        self.assertEqual(len(client._make_request('Make')), 25)
+        self.assertTrue(client._make_request_paginated('Make', callback=lambda data, page: seen.append(page) or len(data)))
+        self.assertEqual(seen, [1])
+
+    def test_retry_after_formats(self):
+        self.assertEqual(retry_after_seconds('7'), 7.0)
+        self.assertEqual(retry_after_seconds('Wed, 21 Oct 2015 07:28:00 GMT'), 0.0)
+        self.assertIsNone(retry_after_seconds('soon'))
+        self.assertIsNone(retry_after_seconds(None))
@@ -0,0 +1,301 @@
+"""
+HTTP transport for the AutoCare VCDB API.
+
+One ``AutoCareTransport`` per process (see ``get_transport``) owns:
+
+- a ``requests.Session`` with a connection pool, so pages reuse keep-alive
+  TLS connections instead of doing a handshake per request, and responses
+  are gzip-compressed;
+- an ``AccessToken`` shared by every thread, refreshed once under a lock
+  when it is about to expire or the API answers 401;
+- retries on 429, 5xx and connection errors with jittered exponential
+  backoff, waiting as long as a ``Retry-After`` header asks.
+
+``iter_pages`` yields a table one page at a time. With ``prefetch`` the next
+page is downloaded while the caller processes the current one, and at most
+``prefetch + 1`` pages are held in memory.
+"""
+import email.utils
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta, timezone as dt_timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import requests
+from django.conf import settings
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://vcdb.autocarevip.com/api/v1.0/vcdb"
+DEFAULT_AUTH_URL = "https://autocare-identity.autocare.org/connect/token"
+DEFAULT_SCOPE = "VcdbApis CommonApis openid profile offline_access"
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Tokens are refreshed this long before they expire
+TOKEN_EXPIRY_MARGIN_SECONDS = 60
+
+
+class AutoCareError(Exception):
+    """A request to the AutoCare API failed for good"""
+
+
+class AutoCareAuthError(AutoCareError):
+    """The AutoCare identity server did not issue a token"""
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or an HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if timezone.is_naive(when):
+        when = timezone.make_aware(when, dt_timezone.utc)
+    return max(0.0, (when - timezone.now()).total_seconds())
+
+
+class AccessToken:
+    """Bearer token shared by all threads of a transport"""
+
+    def __init__(self, transport: 'AutoCareTransport'):
+        self.transport = transport
+        self._lock = threading.Lock()
+        self.access_token = None
+        self.refresh_token = None
+        self.expires_at = None
+
+    def is_valid(self) -> bool:
+        return bool(self.access_token and self.expires_at and timezone.now() < self.expires_at)
+
+    def get(self) -> str:
+        if self.is_valid():
+            return self.access_token
+        with self._lock:
+            # Another thread may have refreshed it while we waited
+            if not self.is_valid():
+                self._fetch()
+            return self.access_token
+
+    def invalidate(self, token: str) -> None:
+        """Drop ``token`` after a 401, unless another thread already replaced it"""
+        with self._lock:
+            if self.access_token == token:
+                self.access_token = None
+
+    def _fetch(self) -> None:
+        transport = self.transport
+        if self.refresh_token:
+            data = {
+                'grant_type': 'refresh_token',
+                'refresh_token': self.refresh_token,
+                'client_id': transport.client_id,
+                'client_secret': transport.client_secret,
+            }
+            try:
+                self._store(transport.post_form(transport.auth_url, data))
+                return
+            except AutoCareError as e:
+                logger.info(f"Refresh token rejected, signing in again: {str(e)}")
+                self.refresh_token = None
+
+        logger.info("Authenticating with AutoCare API...")
+        self._store(transport.post_form(transport.auth_url, {
+            'grant_type': 'password',
+            'client_id': transport.client_id,
+            'client_secret': transport.client_secret,
+            'username': transport.username,
+            'password': transport.password,
+            'scope': transport.scope,
+        }))
+        logger.info(f"Successfully authenticated. Token expires at: {self.expires_at}")
+
+    def _store(self, token_data: Dict) -> None:
+        try:
+            self.access_token = token_data['access_token']
+        except (KeyError, TypeError) as e:
+            raise AutoCareAuthError(f"Invalid token response: {str(e)}")
+        self.refresh_token = token_data.get('refresh_token') or self.refresh_token
+        expires_in = int(token_data.get('expires_in', 3600))
+        self.expires_at = timezone.now() + timedelta(seconds=max(expires_in - TOKEN_EXPIRY_MARGIN_SECONDS, 0))
+
+
+class AutoCareTransport:
+    """Pooled, retrying HTTP access to the AutoCare API"""
+
+    def __init__(self, base_url=None, auth_url=None, pool_size=None, max_retries=None,
+                 backoff_seconds=None, backoff_max_seconds=None, timeout=None, sleep=time.sleep):
+        self.base_url = (base_url or getattr(settings, 'AUTOCARE_BASE_URL', DEFAULT_BASE_URL)).rstrip('/')
+        self.auth_url = auth_url or getattr(settings, 'AUTOCARE_AUTH_URL', DEFAULT_AUTH_URL)
+        self.client_id = getattr(settings, 'AUTOCARE_CLIENT_ID', '')
+        self.client_secret = getattr(settings, 'AUTOCARE_CLIENT_SECRET', '')
+        self.username = getattr(settings, 'AUTOCARE_USERNAME', '')
+        self.password = getattr(settings, 'AUTOCARE_PASSWORD', '')
+        self.scope = DEFAULT_SCOPE
+
+        self.max_retries = max_retries if max_retries is not None else getattr(settings, 'AUTOCARE_MAX_RETRIES', 5)
+        self.backoff_seconds = (
+            backoff_seconds if backoff_seconds is not None else getattr(settings, 'AUTOCARE_RETRY_BACKOFF_SECONDS', 1.0)
+        )
+        self.backoff_max_seconds = (
+            backoff_max_seconds if backoff_max_seconds is not None
+            else getattr(settings, 'AUTOCARE_RETRY_BACKOFF_MAX_SECONDS', 60.0)
+        )
+        self.timeout = timeout or getattr(settings, 'AUTOCARE_TIMEOUT_SECONDS', 60)
+        self.sleep = sleep
+
+        pool_size = pool_size or getattr(settings, 'AUTOCARE_HTTP_POOL_SIZE', 4)
+        self.session = requests.Session()
+        # Retries are done here, not by urllib3, so Retry-After and token refresh are handled in one place
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+        })
+        self.token = AccessToken(self)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _backoff(self, attempt: int, response=None) -> float:
+        if response is not None:
+            wait = retry_after_seconds(response.headers.get('Retry-After'))
+            if wait is not None:
+                return wait
+        # Full jitter: spread retries of concurrent callers over the window
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_seconds * 2 ** attempt))
+
+    def _send(self, method: str, url: str, authenticated: bool = True, **kwargs) -> requests.Response:
+        attempt = 0
+        refreshed = False
+        while True:
+            headers = dict(kwargs.pop('headers', None) or {})
+            token = None
+            if authenticated:
+                token = self.token.get()
+                headers['Authorization'] = f'Bearer {token}'
+            kwargs['headers'] = headers
+
+            response = None
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            except requests.RequestException as e:
+                raise AutoCareError(f"{method} {url} failed: {str(e)}")
+            else:
+                if authenticated and response.status_code == 401 and not refreshed:
+                    # Expired or revoked token: refresh once and repeat the request
+                    self.token.invalidate(token)
+                    refreshed = True
+                    response.close()
+                    continue
+                if response.status_code not in RETRY_STATUSES:
+                    if response.status_code >= 400:
+                        raise AutoCareError(f"{method} {url} returned {response.status_code}: {response.text[:200]}")
+                    return response
+                error = AutoCareError(f"{method} {url} returned {response.status_code}")
+
+            if attempt >= self.max_retries:
+                raise AutoCareError(f"{method} {url} failed after {attempt + 1} attempts: {str(error)}")
+            wait = self._backoff(attempt, response)
+            logger.warning(f"{method} {url} failed ({str(error)}), retry {attempt + 1} in {wait:.1f}s")
+            if response is not None:
+                response.close()
+            self.sleep(wait)
+            attempt += 1
+
+    def post_form(self, url: str, data: Dict) -> Dict:
+        response = self._send('POST', url, authenticated=False, data=data,
+                              headers={'Content-Type': 'application/x-www-form-urlencoded'})
+        return response.json()
+
+    def get_json(self, endpoint: str, params: Optional[Dict] = None):
+        response = self._send('GET', f"{self.base_url}/{endpoint}", params=params)
+        try:
+            return response.json()
+        except ValueError as e:
+            raise AutoCareError(f"Invalid JSON from {endpoint}: {str(e)}")
+
+    def get_page(self, endpoint: str, page_number: int, page_size: int, params: Optional[Dict] = None) -> List[Dict]:
+        request_params = dict(params or {})
+        request_params.update({'PageSize': page_size, 'PageNumber': page_number})
+        data = self.get_json(endpoint, request_params)
+        if not isinstance(data, list):
+            raise AutoCareError(f"Unexpected response format from {endpoint}: {type(data).__name__}")
+        return data
+
+    def iter_pages(self, endpoint: str, params: Optional[Dict] = None, page_size: Optional[int] = None,
+                   prefetch: Optional[int] = None) -> Iterator[Tuple[int, List[Dict]]]:
+        """
+        Yield ``(page_number, records)`` until a short or empty page. With
+        ``prefetch`` > 0 that many following pages are requested in the
+        background while the caller works on the current one.
+        """
+        page_size = page_size or getattr(settings, 'AUTOCARE_PAGE_SIZE', 1000)
+        prefetch = getattr(settings, 'AUTOCARE_PREFETCH_PAGES', 1) if prefetch is None else prefetch
+
+        if prefetch <= 0:
+            page_number = 1
+            while True:
+                records = self.get_page(endpoint, page_number, page_size, params)
+                if not records:
+                    return
+                yield page_number, records
+                if len(records) < page_size:
+                    return
+                page_number += 1
+
+        with ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix='autocare-prefetch') as pool:
+            pending = {}
+            next_page = 1
+            current = 1
+            try:
+                while True:
+                    while next_page <= current + prefetch:
+                        pending[next_page] = pool.submit(self.get_page, endpoint, next_page, page_size, params)
+                        next_page += 1
+                    records = pending.pop(current).result()
+                    if not records:
+                        return
+                    yield current, records
+                    if len(records) < page_size:
+                        return
+                    current += 1
+            finally:
+                # Pages requested past the end are not needed
+                for future in pending.values():
+                    future.cancel()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> AutoCareTransport:
+    """The process-wide transport, so every client shares one pool and one token"""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = AutoCareTransport()
+    return _transport
+
+
+def reset_transport() -> None:
+    global _transport
+    with _transport_lock:
+        if _transport is not None:
+            _transport.close()
+        _transport = None
@@ -30,6 +30,7 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
+from sdc.db_routing import replica_reads
 
 
 class MakeViewSet(viewsets.ReadOnlyModelViewSet):
@@ -520,6 +521,7 @@ class VehicleTypeGroupViewSet(viewsets.ReadOnlyModelViewSet):
 
 
 @require_http_methods(["GET"])
+@replica_reads
 def vehicle_search(request):
     """New VCDB vehicle search endpoint for manual fitments"""
     try:
@@ -89,7 +89,6 @@ class AIFitmentUpdateSerializer(serializers.ModelSerializer):
         if validated_data.get('status') == 'approved':
             # Create actual fitment record
             from fitments.models import Fitment
-            import hashlib
             
             fitment_data = {
                 'tenant': instance.tenant,
@@ -114,10 +113,7 @@ class AIFitmentUpdateSerializer(serializers.ModelSerializer):
                 'confidenceScore': instance.confidence_score,
             }
             
-            # Generate hash for the fitment
-            fitment_hash = generate_fitment_hash(fitment_data)
-            fitment_data['hash'] = fitment_hash
-            
-            Fitment.objects.create(**fitment_data)
+            # Approving a fitment the tenant already has does not add another
+            Fitment.objects.bulk_create_new([Fitment(**fitment_data)])
         
         return super().update(instance, validated_data)
@@ -1,26 +1,33 @@
 from celery import shared_task
+from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import F
 from .models import FitmentJob, AIFitment, VCDBCategory, VCDBData
 from products.models import ProductData, ProductConfiguration
 from fitments.models import Fitment
-import hashlib
+from sdc.progress import ProgressReporter
+from workflow.orchestration import (
+    CHUNK_TASK_OPTIONS,
+    chunk_summary,
+    dispatch_chunks,
+    pk_ranges,
+    run_chunk,
+)
 import json
 import random
-import uuid
 
-
-def generate_fitment_hash(fitment_data):
-    """Generate a unique hash for fitment data"""
-    # Create a string representation of the fitment data including tenant
-    tenant_id = str(fitment_data.get('tenant', ''))
-    hash_string = f"{tenant_id}_{fitment_data.get('partId', '')}_{fitment_data.get('year', '')}_{fitment_data.get('makeName', '')}_{fitment_data.get('modelName', '')}_{fitment_data.get('subModelName', '')}"
-    return hashlib.md5(hash_string.encode()).hexdigest()
+FITMENT_JOB_KIND = 'vcdb_fitment_job'
+BULK_CREATE_BATCH_SIZE = 2000
 
 
 @shared_task
 def process_fitment_job(job_id):
-    """Process a fitment job in the background"""
+    """
+    Process a fitment job in the background: products are split into primary
+    key ranges that process_fitment_job_chunk handles in parallel, and
+    finalize_fitment_job sets the final status once every chunk is done.
+    """
     try:
         job = FitmentJob.objects.get(id=job_id)
         
@@ -58,22 +65,30 @@ def process_fitment_job(job_id):
             job.save()
             return
         
-        # Calculate total steps
-        total_products = product_data.count()
-        total_vcdb_records = sum(cat.record_count for cat in vcdb_categories)
-        job.total_steps = total_products * len(vcdb_categories)
-        job.save()
-        
-        # Process fitments based on job type
+        # One chunk per range of products
         if job.job_type == 'manual':
-            process_manual_fitments(job, vcdb_categories, product_data)
-        else:  # AI fitment
-            process_ai_fitments(job, vcdb_categories, product_data)
+            chunk_size = getattr(settings, 'MANUAL_FITMENT_CHUNK_SIZE', 50)
+        else:
+            chunk_size = getattr(settings, 'AI_FITMENT_CHUNK_SIZE', 25)
+        ranges = pk_ranges(product_data, chunk_size)
         
-        # Status is already set by the processing function
-        job.completed_at = timezone.now()
+        # Calculate total steps: manual jobs step through every product/vehicle
+        # pair, AI jobs through products
+        total_products = product_data.count()
+        if job.job_type == 'manual':
+            total_vcdb_records = VCDBData.objects.filter(category__in=vcdb_categories).count()
+            job.total_steps = total_products * total_vcdb_records
+        else:
+            job.total_steps = total_products
+        job.completed_steps = 0
+        job.fitments_created = 0
+        job.fitments_failed = 0
+        job.current_step = f"Processing {total_products} products in {len(ranges)} chunks"
         job.save()
         
+        specs = [{'pkRange': [low, high]} for low, high in ranges]
+        dispatch_chunks(FITMENT_JOB_KIND, job.id, specs, process_fitment_job_chunk, finalize_fitment_job)
+        
     except Exception as e:
         job = FitmentJob.objects.get(id=job_id)
         job.status = 'failed'
@@ -83,8 +98,152 @@ def process_fitment_job(job_id):
         raise
 
 
+@shared_task(**CHUNK_TASK_OPTIONS)
+def process_fitment_job_chunk(self, job_id, index, spec):
+    """Create fitments for one range of a job's products"""
+    job = FitmentJob.objects.filter(id=job_id).first()
+    if job is None:
+        return {'failed': True, 'error': f"Fitment job {job_id} not found"}
+    
+    low, high = spec['pkRange']
+    vcdb_categories = list(VCDBCategory.objects.filter(
+        id__in=job.vcdb_categories,
+        is_active=True,
+        is_valid=True
+    ))
+    product_data = ProductData.objects.filter(tenant=job.tenant, pk__gte=low, pk__lte=high).order_by('pk')
+    
+    if job.job_type == 'manual':
+        result = run_chunk(
+            self, FITMENT_JOB_KIND, job_id, index,
+            apply=lambda _: process_manual_fitments(job, vcdb_categories, product_data),
+            tenant_id=job.tenant_id,
+        )
+    else:
+        result = run_chunk(
+            self, FITMENT_JOB_KIND, job_id, index,
+            prepare=lambda: generate_ai_fitments(job, vcdb_categories, product_data),
+            apply=lambda ai_fitments: process_ai_fitments(job, ai_fitments, product_data.count()),
+            tenant_id=job.tenant_id,
+        )
+    
+    _publish_chunk_progress(job)
+    return result
+
+
+def _publish_chunk_progress(job):
+    """Mirror the job's running totals to its Redis progress hash"""
+    job.refresh_from_db(fields=['completed_steps', 'total_steps', 'fitments_created', 'fitments_failed'])
+    percentage = min(99, int((job.completed_steps / job.total_steps) * 100)) if job.total_steps else 0
+    ProgressReporter(job, model_fields=()).finish(
+        completed_steps=job.completed_steps,
+        progress_percentage=percentage,
+        fitments_created=job.fitments_created,
+        fitments_failed=job.fitments_failed,
+    )
+
+
+def _record_chunk_counts(job, completed_steps, fitments_created, fitments_failed):
+    """Add a chunk's counts to the job row (runs inside the chunk's transaction)"""
+    FitmentJob.objects.filter(pk=job.pk).update(
+        completed_steps=F('completed_steps') + completed_steps,
+        fitments_created=F('fitments_created') + fitments_created,
+        fitments_failed=F('fitments_failed') + fitments_failed,
+        updated_at=timezone.now(),
+    )
+
+
+@shared_task
+def finalize_fitment_job(results, job_id):
+    """Aggregate chunk checkpoints into the job's counts and final status"""
+    try:
+        job = FitmentJob.objects.get(id=job_id)
+    except FitmentJob.DoesNotExist:
+        print(f"Fitment job {job_id} not found, nothing to finalize")
+        return
+    
+    summary = chunk_summary(FITMENT_JOB_KIND, job_id)
+    failed_chunks = summary['failedChunks']
+    fitments_created = summary.get('fitments_created', 0)
+    fitments_failed = summary.get('fitments_failed', 0)
+    fitments_skipped = summary.get('fitments_skipped', 0)
+    chunk_error = f"{len(failed_chunks)} of {summary['chunks']} chunks failed: {failed_chunks[0]['error']}" if failed_chunks else None
+    
+    # Products of chunks that never finished count as failed
+    failed_product_count = 0
+    for chunk in failed_chunks:
+        low, high = chunk['spec']['pkRange']
+        failed_product_count += ProductData.objects.filter(tenant=job.tenant, pk__gte=low, pk__lte=high).count()
+    
+    job.completed_steps = summary.get('completed_steps', 0)
+    job.progress_percentage = 100
+    job.error_message = None
+    
+    if job.job_type == 'manual':
+        # Determine final status based on results
+        if fitments_skipped > 0 and fitments_created == 0:
+            # All fitments were duplicates
+            job.status = 'failed'
+            job.error_message = f"All {fitments_skipped} fitments already exist. No new fitments were created."
+            job.fitments_created = 0
+            job.fitments_failed = fitments_skipped
+        elif fitments_skipped > 0:
+            # Some fitments were duplicates but some were created
+            job.status = 'completed_with_warnings'
+            job.error_message = f"Created {fitments_created} new fitments, but {fitments_skipped} fitments already existed."
+            job.fitments_created = fitments_created
+            job.fitments_failed = fitments_skipped
+        else:
+            # Normal completion
+            job.status = 'completed'
+            job.fitments_created = fitments_created
+            job.fitments_failed = fitments_failed + failed_product_count
+        
+        if failed_chunks and job.status == 'completed':
+            job.status = 'completed_with_warnings'
+            job.error_message = chunk_error
+        if summary.get('duplicate_messages'):
+            print(f"Job {job_id}: {summary.get('total_duplicates', 0)} duplicate fitments, e.g. {summary['duplicate_messages'][0]}")
+    else:
+        job.fitments_created = fitments_created
+        job.fitments_failed = fitments_failed + failed_product_count
+        if failed_chunks and len(failed_chunks) == summary['chunks']:
+            job.status = 'failed'
+            job.error_message = failed_chunks[0]['error']
+        elif fitments_created > 0:
+            job.status = 'completed'
+            job.error_message = chunk_error
+        else:
+            job.status = 'failed'
+            job.error_message = chunk_error or "No fitments were created"
+        print(f"🎯 AI Fitment processing complete: {fitments_created} created, {job.fitments_failed} failed")
+    
+    if job.status != 'failed':
+        job.current_step = "Completed"
+    job.completed_at = timezone.now()
+    job.save()
+    ProgressReporter(job).finish(
+        status=job.status,
+        completed_steps=job.completed_steps,
+        progress_percentage=job.progress_percentage,
+        current_step=job.current_step,
+        fitments_created=job.fitments_created,
+        fitments_failed=job.fitments_failed,
+    )
+    return {
+        'status': job.status,
+        'fitments_created': job.fitments_created,
+        'fitments_failed': job.fitments_failed,
+        'chunks': summary['chunks'],
+        'failed_chunks': len(failed_chunks),
+    }
+
+
 def process_manual_fitments(job, vcdb_categories, product_data):
-    """Process manual fitments following the same pattern as apply_manual_fitment"""
+    """
+    Create manual fitments for a range of products, following the same
+    pattern as apply_manual_fitment. Returns the chunk's counts.
+    """
     fitments_created = 0
     fitments_failed = 0
     fitments_skipped = 0
@@ -94,301 +253,230 @@ def process_manual_fitments(job, vcdb_categories, product_data):
     # Import AppliedFitment model for tracking
     from data_uploads.models import AppliedFitment, DataUploadSession
     
-    for product in product_data:
-        for category in vcdb_categories:
+    # Only track AppliedFitment rows when a valid DataUploadSession is available
+    # to satisfy its NOT NULL constraint
+    session_obj = None
+    if getattr(job, 'session_id', None):
+        session_obj = DataUploadSession.objects.filter(id=job.session_id).first()
+    
+    # VCDB data is loaded once per chunk, not once per product
+    vcdb_data = [list(VCDBData.objects.filter(category=category)) for category in vcdb_categories]
+    products = list(product_data)
+    
+    # Fitments the tenant already has are skipped by the insert (ON CONFLICT DO NOTHING)
+    pending_fitments = []
+    pending_applied = {}
+    
+    def flush():
+        nonlocal fitments_created, fitments_skipped
+        inserted = Fitment.objects.bulk_create_new(pending_fitments)
+        inserted_hashes = {fitment.hash for fitment in inserted}
+        fitments_created += len(inserted)
+        fitments_skipped += len(pending_fitments) - len(inserted)
+        for fitment in pending_fitments:
+            if fitment.hash not in inserted_hashes and len(duplicate_messages) < 10:
+                duplicate_messages.append(
+                    f"Fitment already exists for {fitment.partId} -> {fitment.year} {fitment.makeName} {fitment.modelName}"
+                )
+        applied = [pending_applied[fitment.hash] for fitment in inserted if fitment.hash in pending_applied]
+        if applied:
             try:
-                # Get VCDB data for this category
-                vcdb_data = VCDBData.objects.filter(category=category)
-                
-                for vcdb_record in vcdb_data:
-                    completed_steps += 1
-                    
-                    # Create fitment based on matching criteria
-                    if should_create_fitment(product, vcdb_record, job):
-                        try:
-                            # Check if fitment already exists before creating
-                            existing_fitment = Fitment.objects.filter(
-                                tenant=job.tenant,
-                                partId=product.part_number,
-                                year=vcdb_record.year,
-                                makeName=vcdb_record.make,
-                                modelName=vcdb_record.model,
-                                subModelName=vcdb_record.submodel,
-                                isDeleted=False
-                            ).first()
-                            
-                            if existing_fitment:
-                                # Fitment already exists, count as skipped
-                                fitments_skipped += 1
-                                duplicate_msg = f"Fitment already exists for {product.part_number} -> {vcdb_record.year} {vcdb_record.make} {vcdb_record.model}"
-                                duplicate_messages.append(duplicate_msg)
-                                if len(duplicate_messages) <= 5:  # Limit warnings to first 5 duplicates
-                                    print(duplicate_msg)
-                            else:
-                                # Create Fitment record (following apply_manual_fitment pattern)
-                                fitment = Fitment.objects.create(
-                                    hash=uuid.uuid4().hex,
-                                    tenant=job.tenant,
-                                    partId=product.part_number,
-                                    itemStatus='Active',
-                                    itemStatusCode=0,
-                                    baseVehicleId=str(vcdb_record.id),
-                                    year=vcdb_record.year,
-                                    makeName=vcdb_record.make,
-                                    modelName=vcdb_record.model,
-                                    subModelName=vcdb_record.submodel or '',
-                                    driveTypeName=vcdb_record.drive_type or '',
-                                    fuelTypeName=vcdb_record.fuel_type or 'Gas',
-                                    bodyNumDoors=vcdb_record.num_doors or 4,
-                                    bodyTypeName=vcdb_record.body_type or 'Sedan',
-                                    ptid='PT-22',  # Default part type ID
-                                    partTypeDescriptor=product.part_terminology_name or 'Manual Fitment',
-                                    uom='EA',  # Each
-                                    quantity=1,  # Default quantity
-                                    fitmentTitle=f"Manual Fitment - {product.part_number}",
-                                    fitmentDescription=f"Manual fitment for {vcdb_record.make} {vcdb_record.model}",
-                                    fitmentNotes='Applied via bulk processing',
-                                    position='Front',  # Default position
-                                    positionId=1,  # Default position ID
-                                    liftHeight='Stock',  # Default value
-                                    wheelType='Alloy',  # Default value
-                                    fitmentType='manual_fitment',
-                                    createdBy='bulk_processing',
-                                    updatedBy='bulk_processing'
-                                )
-                                
-                                # Create AppliedFitment record for tracking (optional)
-                                # Only create when a valid DataUploadSession is available to satisfy NOT NULL constraint
-                                session_obj = None
-                                try:
-                                    if hasattr(job, 'session_id') and job.session_id:
-                                        session_obj = DataUploadSession.objects.get(id=job.session_id)
-                                except DataUploadSession.DoesNotExist:
-                                    session_obj = None
-
-                                if session_obj:
-                                    try:
-                                        AppliedFitment.objects.create(
-                                            session=session_obj,
-                                            tenant=job.tenant,
-                                            part_id=product.part_number,
-                                            part_description=getattr(product, 'description', None) or getattr(product, 'part_terminology_name', None) or f"Bulk fitment for {vcdb_record.make} {vcdb_record.model}",
-                                            year=vcdb_record.year,
-                                            make=vcdb_record.make,
-                                            model=vcdb_record.model,
-                                            submodel=vcdb_record.submodel or '',
-                                            drive_type=vcdb_record.drive_type or '',
-                                            position='Front',  # Default position
-                                            quantity=1,  # Default quantity
-                                            title=f"Manual Fitment - {product.part_number}",
-                                            description=f"Manual fitment for {vcdb_record.make} {vcdb_record.model}",
-                                            notes='Applied via bulk processing'
-                                        )
-                                    except Exception:
-                                        # Tracking failure should not mark the overall fitment creation as failed
-                                        pass
-                                
-                                fitments_created += 1
-                                print(f"✅ Created manual fitment: {product.part_number} -> {vcdb_record.year} {vcdb_record.make} {vcdb_record.model}")
-                                
-                        except Exception as e:
-                            fitments_failed += 1
-                            print(f"❌ Error creating fitment for {product.part_number}: {e}")
-                    else:
-                        # Count as failed if no fitment should be created
-                        fitments_failed += 1
-                    
-                    # Update job progress every 10 steps to avoid too many DB writes
-                    if completed_steps % 10 == 0 or completed_steps == job.total_steps:
-                        job.completed_steps = completed_steps
-                        job.progress_percentage = int((completed_steps / job.total_steps) * 100)
-                        job.current_step = f"Processing {product.part_number} for {vcdb_record.year} {vcdb_record.make} {vcdb_record.model}"
-                        job.fitments_created = fitments_created
-                        job.fitments_failed = fitments_failed
-                        job.save()
-                        
+                # Tracking failure should not fail the fitment creation
+                with transaction.atomic():
+                    AppliedFitment.objects.bulk_create(applied)
             except Exception as e:
-                fitments_failed += 1
-                print(f"❌ Error processing {product.part_number}: {e}")
-                continue
+                print(f"⚠️ Could not record applied fitments: {e}")
+        pending_fitments.clear()
+        pending_applied.clear()
     
-    # Final update with proper status handling
-    job.completed_steps = completed_steps
-    job.progress_percentage = 100
+    for product in products:
+        for category_records in vcdb_data:
+            for vcdb_record in category_records:
+                completed_steps += 1
+                
+                # Create fitment based on matching criteria
+                if not should_create_fitment(product, vcdb_record, job):
+                    # Count as failed if no fitment should be created
+                    fitments_failed += 1
+                    continue
+                
+                # Create Fitment record (following apply_manual_fitment pattern)
+                fitment = Fitment(
+                    tenant=job.tenant,
+                    partId=product.part_number,
+                    itemStatus='Active',
+                    itemStatusCode=0,
+                    baseVehicleId=str(vcdb_record.id),
+                    year=vcdb_record.year,
+                    makeName=vcdb_record.make,
+                    modelName=vcdb_record.model,
+                    subModelName=vcdb_record.submodel or '',
+                    driveTypeName=vcdb_record.drive_type or '',
+                    fuelTypeName=vcdb_record.fuel_type or 'Gas',
+                    bodyNumDoors=vcdb_record.num_doors or 4,
+                    bodyTypeName=vcdb_record.body_type or 'Sedan',
+                    ptid='PT-22',  # Default part type ID
+                    partTypeDescriptor=product.part_terminology_name or 'Manual Fitment',
+                    uom='EA',  # Each
+                    quantity=1,  # Default quantity
+                    fitmentTitle=f"Manual Fitment - {product.part_number}",
+                    fitmentDescription=f"Manual fitment for {vcdb_record.make} {vcdb_record.model}",
+                    fitmentNotes='Applied via bulk processing',
+                    position='Front',  # Default position
+                    positionId=1,  # Default position ID
+                    liftHeight='Stock',  # Default value
+                    wheelType='Alloy',  # Default value
+                    fitmentType='manual_fitment',
+                    createdBy='bulk_processing',
+                    updatedBy='bulk_processing'
+                )
+                fitment.set_identity()
+                pending_fitments.append(fitment)
+                if session_obj:
+                    pending_applied[fitment.hash] = AppliedFitment(
+                        session=session_obj,
+                        tenant=job.tenant,
+                        part_id=product.part_number,
+                        part_description=getattr(product, 'description', None) or getattr(product, 'part_terminology_name', None) or f"Bulk fitment for {vcdb_record.make} {vcdb_record.model}",
+                        year=vcdb_record.year,
+                        make=vcdb_record.make,
+                        model=vcdb_record.model,
+                        submodel=vcdb_record.submodel or '',
+                        drive_type=vcdb_record.drive_type or '',
+                        position='Front',  # Default position
+                        quantity=1,  # Default quantity
+                        title=f"Manual Fitment - {product.part_number}",
+                        description=f"Manual fitment for {vcdb_record.make} {vcdb_record.model}",
+                        notes='Applied via bulk processing'
+                    )
+                
+                if len(pending_fitments) >= BULK_CREATE_BATCH_SIZE:
+                    flush()
     
-    # Determine final status based on results
-    if fitments_skipped > 0 and fitments_created == 0:
-        # All fitments were duplicates
-        job.status = 'failed'
-        job.error_message = f"All {fitments_skipped} fitments already exist. No new fitments were created."
-        job.fitments_created = 0
-        job.fitments_failed = fitments_skipped
-    elif fitments_skipped > 0:
-        # Some fitments were duplicates but some were created
-        job.status = 'completed_with_warnings'
-        job.error_message = f"Created {fitments_created} new fitments, but {fitments_skipped} fitments already existed."
-        job.fitments_created = fitments_created
-        job.fitments_failed = fitments_skipped
-    else:
-        # Normal completion
-        job.status = 'completed'
-        job.fitments_created = fitments_created
-        job.fitments_failed = fitments_failed
+    flush()
+    _record_chunk_counts(job, completed_steps, fitments_created, fitments_failed)
+    print(f"✅ Created {fitments_created} manual fitments for {len(products)} products ({fitments_skipped} already existed)")
     
-    job.current_step = "Completed"
+    return {
+        'completed_steps': completed_steps,
+        'fitments_created': fitments_created,
+        'fitments_failed': fitments_failed,
+        'fitments_skipped': fitments_skipped,
+        'total_duplicates': fitments_skipped,
+        'duplicate_messages': duplicate_messages,
+    }
+
+
+def generate_ai_fitments(job, vcdb_categories, product_data):
+    """Ask Azure AI for fitments for a range of products (no database writes)"""
+    from fitment_uploads.azure_ai_service import get_azure_ai_service
     
-    # Store duplicate messages for frontend display
-    if duplicate_messages:
-        job.result = {
-            'duplicate_messages': duplicate_messages[:10],  # Limit to first 10 messages
-            'total_duplicates': len(duplicate_messages)
-        }
+    # Convert VCDB data to list of dictionaries for AI service
+    vcdb_data_list = []
+    for category in vcdb_categories:
+        vcdb_records = VCDBData.objects.filter(category=category)
+        for record in vcdb_records:
+            vcdb_data_list.append({
+                'year': record.year,
+                'make': record.make,
+                'model': record.model,
+                'submodel': record.submodel,
+                'driveType': record.drive_type,
+                'bodyType': record.body_type,
+                'engineType': record.engine_type,
+                'transmissionType': record.transmission,
+                'fuelType': record.fuel_type,
+                'region': 'US',  # Default region since field doesn't exist in model
+                'category': str(category.id),
+                'category_name': category.name
+            })
     
-    job.save()
+    # Convert product data to list of dictionaries for AI service
+    products_data_list = []
+    for product in product_data:
+        products_data_list.append({
+            'id': product.part_number,
+            'description': product.part_terminology_name,
+            'ptid': product.ptid,
+            'parent_child': product.parent_child,
+            'additional_attributes': product.additional_attributes
+        })
+    
+    if not products_data_list:
+        return []
+    
+    # Use Azure AI service to generate fitments
+    ai_fitments = get_azure_ai_service().generate_fitments(vcdb_data_list, products_data_list)
+    print(f"🤖 Azure AI generated {len(ai_fitments)} fitments for {len(products_data_list)} products")
+    return ai_fitments
 
 
-def process_ai_fitments(job, vcdb_categories, product_data):
-    """Process AI fitments using Azure AI service"""
-    from fitment_uploads.azure_ai_service import azure_ai_service
-    
+def process_ai_fitments(job, ai_fitments, product_count):
+    """Store AI-generated fitments for a range of products. Returns the chunk's counts."""
     fitments_created = 0
     fitments_failed = 0
+    fitments_skipped = 0
     
-    try:
-        # Convert VCDB data to list of dictionaries for AI service
-        vcdb_data_list = []
-        for category in vcdb_categories:
-            vcdb_records = VCDBData.objects.filter(category=category)
-            for record in vcdb_records:
-                vcdb_data_list.append({
-                    'year': record.year,
-                    'make': record.make,
-                    'model': record.model,
-                    'submodel': record.submodel,
-                    'driveType': record.drive_type,
-                    'bodyType': record.body_type,
-                    'engineType': record.engine_type,
-                    'transmissionType': record.transmission,
-                    'fuelType': record.fuel_type,
-                    'region': 'US',  # Default region since field doesn't exist in model
-                    'category': str(category.id),
-                    'category_name': category.name
-                })
-        
-        # Convert product data to list of dictionaries for AI service
-        products_data_list = []
-        for product in product_data:
-            products_data_list.append({
-                'id': product.part_number,
-                'description': product.part_terminology_name,
-                'ptid': product.ptid,
-                'parent_child': product.parent_child,
-                'additional_attributes': product.additional_attributes
-            })
-        
-        # Use Azure AI service to generate fitments
-        ai_fitments = azure_ai_service.generate_fitments(vcdb_data_list, products_data_list)
-        
-        print(f"🤖 Azure AI generated {len(ai_fitments)} fitments")
-        
-        # Process each AI-generated fitment
-        for fitment_data in ai_fitments:
-            try:
-                # Map AI response to our fitment structure
-                # Safe defaults to satisfy NOT NULL columns
-                ai_position = (fitment_data.get('position') or '').strip() or 'Standard'
-                ai_position_id = fitment_data.get('positionId')
-                if not isinstance(ai_position_id, int) or ai_position_id is None:
-                    ai_position_id = hash(f"{fitment_data.get('partId', '')}_{fitment_data.get('year', 2020)}_{fitment_data.get('make', '')}_{fitment_data.get('model', '')}_{ai_position}") % 1000000
+    candidates = []
+    for fitment_data in ai_fitments:
+        try:
+            # Map AI response to our fitment structure
+            # Safe defaults to satisfy NOT NULL columns
+            ai_position = (fitment_data.get('position') or '').strip() or 'Standard'
+            ai_position_id = fitment_data.get('positionId')
+            if not isinstance(ai_position_id, int) or ai_position_id is None:
+                ai_position_id = hash(f"{fitment_data.get('partId', '')}_{fitment_data.get('year', 2020)}_{fitment_data.get('make', '')}_{fitment_data.get('model', '')}_{ai_position}") % 1000000
 
-                fitment_dict = {
-                    'tenant': job.tenant,
-                    'partId': fitment_data.get('partId', ''),
-                    'fitmentDescription': fitment_data.get('partDescription', ''),
-                    'year': fitment_data.get('year', 2020),
-                    'makeName': fitment_data.get('make', ''),
-                    'modelName': fitment_data.get('model', ''),
-                    'subModelName': fitment_data.get('submodel', ''),
-                    'driveTypeName': fitment_data.get('driveType', ''),
-                    'position': ai_position,
-                    'quantity': fitment_data.get('quantity', 1),
-                    'fitmentType': 'ai_fitment',
-                    'itemStatus': 'readyToApprove',
-                    'confidenceScore': fitment_data.get('confidence', 0.7),
-                    'aiDescription': fitment_data.get('ai_reasoning', 'AI-generated fitment'),
-                    'fitmentNotes': fitment_data.get('confidence_explanation', ''),
-                    'isDeleted': False,
-                    # Required fields with defaults
-                    'baseVehicleId': f"{fitment_data.get('year', 2020)}_{fitment_data.get('make', '')}_{fitment_data.get('model', '')}",
-                    'fuelTypeName': 'Gasoline',  # Default fuel type
-                    'bodyNumDoors': 4,  # Default number of doors
-                    'bodyTypeName': 'SUV',  # Default body type
-                    'ptid': 'AI001',  # Default PTID for AI fitments
-                    'partTypeDescriptor': fitment_data.get('partDescription', 'AI Generated Part'),
-                    'uom': 'EA',  # Default unit of measure
-                    'fitmentTitle': f"{fitment_data.get('partId', '')} for {fitment_data.get('year', 2020)} {fitment_data.get('make', '')} {fitment_data.get('model', '')}",
-                    'positionId': ai_position_id,
-                    'liftHeight': 'Standard',
-                    'wheelType': 'Alloy',
-                    'itemStatusCode': 0,
-                    'createdBy': 'ai_system',
-                    'updatedBy': 'ai_system'
-                }
-                
-                # Generate hash for uniqueness
-                fitment_hash = generate_fitment_hash(fitment_dict)
-                fitment_dict['hash'] = fitment_hash
-                
-                # Check if fitment already exists
-                existing_fitment = Fitment.objects.filter(
-                    tenant=job.tenant,
-                    partId=fitment_dict['partId'],
-                    year=fitment_dict['year'],
-                    makeName=fitment_dict['makeName'],
-                    modelName=fitment_dict['modelName'],
-                    subModelName=fitment_dict['subModelName'],
-                    isDeleted=False
-                ).first()
-                
-                if not existing_fitment:
-                    # Create new AI fitment
-                    fitment = Fitment.objects.create(**fitment_dict)
-                    fitments_created += 1
-                    print(f"✅ Created AI fitment: {fitment_dict['partId']} -> {fitment_dict['year']} {fitment_dict['makeName']} {fitment_dict['modelName']}")
-                else:
-                    print(f"⏭️  Skipped existing fitment: {fitment_dict['partId']} -> {fitment_dict['year']} {fitment_dict['makeName']} {fitment_dict['modelName']}")
-                
-                # Update job progress
-                job.completed_steps += 1
-                job.progress_percentage = int((job.completed_steps / job.total_steps) * 100)
-                job.current_step = f"AI processing fitment {fitments_created + fitments_failed + 1} of {len(ai_fitments)}"
-                job.save()
-                
-            except Exception as e:
-                fitments_failed += 1
-                print(f"❌ Error processing AI fitment: {e}")
-                continue
-        
-        print(f"🎯 AI Fitment processing complete: {fitments_created} created, {fitments_failed} failed")
-        
-    except Exception as e:
-        print(f"❌ Error in AI fitment processing: {e}")
-        fitments_failed += len(product_data)  # Mark all as failed if AI service fails
-        job.status = 'failed'
-        job.error_message = str(e)
+            fitment_dict = {
+                'tenant': job.tenant,
+                'partId': fitment_data.get('partId', ''),
+                'fitmentDescription': fitment_data.get('partDescription', ''),
+                'year': fitment_data.get('year', 2020),
+                'makeName': fitment_data.get('make', ''),
+                'modelName': fitment_data.get('model', ''),
+                'subModelName': fitment_data.get('submodel', ''),
+                'driveTypeName': fitment_data.get('driveType', ''),
+                'position': ai_position,
+                'quantity': fitment_data.get('quantity', 1),
+                'fitmentType': 'ai_fitment',
+                'itemStatus': 'readyToApprove',
+                'confidenceScore': fitment_data.get('confidence', 0.7),
+                'aiDescription': fitment_data.get('ai_reasoning', 'AI-generated fitment'),
+                'fitmentNotes': fitment_data.get('confidence_explanation', ''),
+                'isDeleted': False,
+                # Required fields with defaults
+                'baseVehicleId': f"{fitment_data.get('year', 2020)}_{fitment_data.get('make', '')}_{fitment_data.get('model', '')}",
+                'fuelTypeName': 'Gasoline',  # Default fuel type
+                'bodyNumDoors': 4,  # Default number of doors
+                'bodyTypeName': 'SUV',  # Default body type
+                'ptid': 'AI001',  # Default PTID for AI fitments
+                'partTypeDescriptor': fitment_data.get('partDescription', 'AI Generated Part'),
+                'uom': 'EA',  # Default unit of measure
+                'fitmentTitle': f"{fitment_data.get('partId', '')} for {fitment_data.get('year', 2020)} {fitment_data.get('make', '')} {fitment_data.get('model', '')}",
+                'positionId': ai_position_id,
+                'liftHeight': 'Standard',
+                'wheelType': 'Alloy',
+                'itemStatusCode': 0,
+                'createdBy': 'ai_system',
+                'updatedBy': 'ai_system'
+            }
+            candidates.append(Fitment(**fitment_dict))
+        except Exception as e:
+            fitments_failed += 1
+            print(f"❌ Error processing AI fitment: {e}")
     
-    # Set final job status
-    if job.status != 'failed':
-        if fitments_created > 0:
-            job.status = 'completed'
-            job.current_step = "Completed"
-        else:
-            job.status = 'failed'
-            job.error_message = "No fitments were created"
+    # Fitments the tenant already has are skipped by the insert (ON CONFLICT DO NOTHING)
+    fitments_created = len(Fitment.objects.bulk_create_new(candidates, batch_size=BULK_CREATE_BATCH_SIZE))
+    fitments_skipped = len(candidates) - fitments_created
+    _record_chunk_counts(job, product_count, fitments_created, fitments_failed)
+    print(f"✅ Created {fitments_created} AI fitments ({fitments_skipped} already existed, {fitments_failed} failed)")
     
-    job.fitments_created = fitments_created
-    job.fitments_failed = fitments_failed
-    job.save()
+    return {
+        'completed_steps': product_count,
+        'fitments_created': fitments_created,
+        'fitments_failed': fitments_failed,
+        'fitments_skipped': fitments_skipped,
+    }
 
 
 def should_create_fitment(product, vcdb_record, job):
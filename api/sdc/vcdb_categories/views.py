@@ -5,7 +5,7 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from django.shortcuts import get_object_or_404
 from django.db import transaction
 from django.utils import timezone
-import pandas as pd
+from sdc.lazy_imports import lazy_module
 import json
 import os
 from .models import VCDBCategory, VCDBData, FitmentJob, AIFitment
@@ -16,6 +16,9 @@ from .serializers import (
 )
 from tenants.models import Tenant
 from tenants.utils import get_tenant_id_from_request
+from sdc.progress import read_progress
+
+pd = lazy_module('pandas')
 
 
 class VCDBCategoryViewSet(viewsets.ModelViewSet):
@@ -200,7 +203,7 @@ class FitmentJobViewSet(viewsets.ModelViewSet):
     def progress(self, request, pk=None):
         """Get job progress"""
         job = self.get_object()
-        return Response({
+        data = {
             'status': job.status,
             'progress_percentage': job.progress_percentage,
             'current_step': job.current_step,
@@ -209,7 +212,15 @@ class FitmentJobViewSet(viewsets.ModelViewSet):
             'fitments_created': job.fitments_created,
             'fitments_failed': job.fitments_failed,
             'error_message': job.error_message
-        })
+        }
+        
+        # While running, the worker publishes progress to Redis far more often
+        # than it writes the job row; once finished the row is authoritative
+        if job.status == 'in_progress':
+            live = read_progress(job) or {}
+            data.update({key: value for key, value in live.items() if key in data})
+        
+        return Response(data)
 
 
 class AIFitmentViewSet(viewsets.ModelViewSet):
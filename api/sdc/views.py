@@ -9,7 +9,7 @@ from django.http import Http404
 import os
 import uuid
 import requests
-import pandas as pd
+from sdc.lazy_imports import lazy_module
 
 from azure.storage.blob import BlobServiceClient, ContentSettings
 from azure.core.exceptions import ResourceExistsError
@@ -23,6 +23,8 @@ from data_uploads.models import ProductData
 from django.core.exceptions import ValidationError
 import uuid
 
+pd = lazy_module('pandas')
+
 
 def _storage_dir() -> str:
     base = os.environ.get("STORAGE_DIR") or os.path.join(settings.BASE_DIR, "..", "storage", "customer")
@@ -0,0 +1,177 @@
+"""
+Vehicle lookup index for the Challenge 1 Solution file.
+
+The solution sheet holds ``SKU|Transmission|Year|Make|Model`` strings in its
+first column. They are parsed and de-duplicated in one vectorized pass into:
+
+- a primary index ``(sku, transmission) -> [(year, make, model), ...]``
+- a secondary index on ``(sku, normalized transmission)`` (dashes removed,
+  upper-cased) that answers "A-500" vs "A500" style misses in O(1)
+
+The built index is pickled under WORKBOOK_CACHE_DIR (see workflow.workbook),
+keyed by the solution file's path, mtime and sha256, so worker restarts skip
+re-parsing the workbook.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from sdc.lazy_imports import lazy_module
+
+from .workbook import cache_path
+
+pd = lazy_module('pandas')
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+Vehicle = Tuple[str, str, str]
+
+
+def normalize_transmission(code) -> str:
+    return str(code).replace('-', '').upper()
+
+
+class VehicleIndex:
+    """Primary and normalized-transmission lookups over the solution mapping"""
+
+    def __init__(self, primary: Dict[Tuple[str, str], List[Vehicle]],
+                 normalized: Optional[Dict[Tuple[str, str], List[Vehicle]]] = None):
+        self.primary = primary
+        if normalized is None:
+            normalized = {}
+            # The first key in file order wins, as the former linear scan did
+            for (sku, transmission), vehicles in primary.items():
+                normalized.setdefault((sku, normalize_transmission(transmission)), vehicles)
+        self.normalized = normalized
+
+    def __len__(self):
+        return len(self.primary)
+
+    def lookup(self, sku, transmission_code) -> List[Vehicle]:
+        vehicles = self.primary.get((sku, transmission_code))
+        if vehicles is not None:
+            return vehicles
+        return self.normalized.get((sku, normalize_transmission(transmission_code)), [])
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'VehicleIndex':
+        """Build the index from the solution sheet in one vectorized pass"""
+        if df.empty:
+            return cls({})
+
+        combined = df.iloc[:, 0].astype(str)
+        combined = combined[combined.str.contains('|', regex=False)]
+        parts = combined.str.split('|', expand=True)
+        if parts.shape[1] < 5:
+            return cls({})
+        parts = parts[parts[4].notna()].iloc[:, :5]
+        parts.columns = ['sku', 'transmission', 'year', 'make', 'model']
+        parts = parts.apply(lambda column: column.str.strip())
+
+        primary: Dict[Tuple[str, str], List[Vehicle]] = {}
+        # Every well-formed row creates its key, even without a complete vehicle
+        for key in zip(parts['sku'], parts['transmission']):
+            primary.setdefault(key, [])
+
+        complete = parts[(parts['year'] != '') & (parts['make'] != '') & (parts['model'] != '')]
+        complete = complete.drop_duplicates()
+        for sku, transmission, year, make, model in complete.itertuples(index=False, name=None):
+            primary[(sku, transmission)].append((year, make, model))
+
+        return cls(primary)
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def sidecar_path(solution_file: str) -> str:
+    return cache_path(solution_file, 'index')
+
+
+def _read_sidecar(path: str) -> Optional[dict]:
+    try:
+        with open(path, 'rb') as fh:
+            payload = pickle.load(fh)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(payload, dict) or payload.get('version') != INDEX_FORMAT_VERSION:
+        return None
+    return payload
+
+
+def _write_sidecar(path: str, payload: dict) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as fh:
+            pickle.dump(payload, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write Challenge 1 index sidecar {path}: {str(e)}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_vehicle_index(solution_file: str) -> VehicleIndex:
+    """
+    Load the index for a solution file, reusing the sidecar when the file's
+    mtime (or, failing that, its sha256) matches the one it was built from.
+    """
+    mtime_ns = os.stat(solution_file).st_mtime_ns
+    try:
+        path = sidecar_path(solution_file)
+    except OSError as e:
+        logger.warning(f"Could not create the workbook cache directory: {str(e)}")
+        return VehicleIndex.from_frame(pd.read_excel(solution_file))
+    payload = _read_sidecar(path)
+
+    checksum = None
+    if payload is not None:
+        if payload.get('mtime_ns') == mtime_ns:
+            return VehicleIndex(payload['primary'], payload['normalized'])
+        checksum = _file_sha256(solution_file)
+        if payload.get('sha256') == checksum:
+            payload['mtime_ns'] = mtime_ns
+            _write_sidecar(path, payload)
+            return VehicleIndex(payload['primary'], payload['normalized'])
+
+    index = VehicleIndex.from_frame(pd.read_excel(solution_file))
+    _write_sidecar(path, {
+        'version': INDEX_FORMAT_VERSION,
+        'mtime_ns': mtime_ns,
+        'sha256': checksum or _file_sha256(solution_file),
+        'primary': index.primary,
+        'normalized': index.normalized,
+    })
+    return index
+
+
+_index_cache: Dict[str, Tuple[int, VehicleIndex]] = {}
+_index_lock = threading.Lock()
+
+
+def get_vehicle_index(solution_file: str) -> VehicleIndex:
+    """Process-wide cached index, rebuilt when the solution file changes"""
+    mtime_ns = os.stat(solution_file).st_mtime_ns
+    cached = _index_cache.get(solution_file)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+
+    with _index_lock:
+        cached = _index_cache.get(solution_file)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+        index = load_vehicle_index(solution_file)
+        _index_cache[solution_file] = (mtime_ns, index)
+        return index
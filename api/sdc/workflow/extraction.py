@@ -0,0 +1,475 @@
+"""
+Vectorized extraction of vehicle/part attributes from free-text columns.
+
+All patterns are compiled once at import time and applied column-at-a-time
+with pandas string methods, so enriching a frame costs a handful of passes per
+description column instead of a dozen ``re.search`` calls per row. Only cells
+that are still missing are ever filled.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+
+from sdc.lazy_imports import lazy_module
+
+pd = lazy_module('pandas')
+
+logger = logging.getLogger(__name__)
+
+
+COMMON_MAKES = [
+    'Ford', 'Chevrolet', 'Chevy', 'Toyota', 'Honda', 'BMW', 'Mercedes', 'Audi', 'KIA', 'Kia',
+    'Acura', 'Nissan', 'Dodge', 'Ram', 'GMC', 'Jeep', 'Subaru', 'Mazda', 'Volkswagen', 'VW',
+    'Hyundai', 'Lexus', 'Infiniti', 'Cadillac', 'Lincoln', 'Buick', 'Chrysler', 'Jaguar',
+    'Land Rover', 'Porsche', 'Tesla', 'Volvo', 'Mitsubishi', 'Suzuki', 'Isuzu', 'Fiat',
+    'Alfa Romeo', 'Genesis', 'Maserati', 'Bentley', 'Rolls-Royce', 'Ferrari', 'Lamborghini',
+    'McLaren', 'Aston Martin', 'Lotus', 'AC',
+]
+
+DESCRIPTION_KEYWORDS = [
+    'description', 'desc', 'notes', 'comment', 'item', 'name', 'title', 'spec', 'detail',
+    'vehicle', 'info', 'product',
+]
+
+TRIM_NAMES = 'Platinum|Limited|SE|XLT|LT|SR|EX|LX|Base|Premium|Sport|Touring|Elite|Ultimate'
+
+_MODEL = r'[A-Z][A-Za-z]+(?:\s+[A-Z][A-Za-z0-9\-]+)?'
+
+YEAR_4_DIGIT = re.compile(r'\b(?P<year>(?:19|20)\d{2})(?:\s*-\s*(?:19|20)\d{2})?\b')
+YEAR_2_DIGIT = re.compile(r'\b(?P<year>\d{2})(?:\s*-\s*\d{2})?\b')
+YEAR_ANY_COLUMN = re.compile(r'\b(?P<year>(?:19|20)\d{2})\b')
+
+VEHICLE_FOR = re.compile(
+    r'(?:for|fits?|compatible with|works with)\s+(?:\d{2,4}(?:\s*-\s*\d{2,4})?\s+)?'
+    r'(?P<make>[A-Z][A-Za-z]+(?:\s+[A-Z][A-Za-z]+)?)\s+(?P<model>' + _MODEL + ')',
+    re.IGNORECASE,
+)
+VEHICLE_YEAR_FIRST = re.compile(
+    r'\b(?:19|20)\d{2}\s+(?P<make>[A-Z][A-Za-z]+(?:\s+[A-Z][A-Za-z]+)?)\s+(?P<model>' + _MODEL + ')'
+)
+# A make mention must start a word; the model follows the make's last word
+WORD_PREFIX_PUNCTUATION = '([{"\'/-'
+MODEL_AT_START = re.compile(r'(?P<model>' + _MODEL + ')', re.IGNORECASE)
+ENGINE_SUFFIX = re.compile(r'\s+\d+\.\d+L.*$')
+
+VEHICLE_INFO_MODEL = re.compile(r'^(?P<model>' + _MODEL + ')')
+TRIM_SUFFIX = re.compile(r'\s+(?:Platinum|Limited|SE|XLT|LT|SR|EX|LX|Base).*$', re.IGNORECASE)
+TRIM = re.compile(r'\b(?P<trim>' + TRIM_NAMES + r')\b', re.IGNORECASE)
+
+POSITION_FRONT = re.compile(r'\b(?:FRONT|Front|front|F|FWD|forward)\b', re.IGNORECASE)
+POSITION_REAR = re.compile(r'\b(?:REAR|Rear|rear|R|back|backward)\b', re.IGNORECASE)
+
+PART_ID_PATTERNS = [
+    (re.compile(r'Part\s*#?\s*:?\s*(?P<value>[A-Z0-9\-]+)', re.IGNORECASE), 0.95),
+    (re.compile(r'SKU\s*:?\s*(?P<value>[A-Z0-9\-]+)', re.IGNORECASE), 0.95),
+    (re.compile(r'Item\s*#?\s*:?\s*(?P<value>[A-Z0-9\-]+)', re.IGNORECASE), 0.90),
+    (re.compile(r'Product\s*#?\s*:?\s*(?P<value>[A-Z0-9\-]+)', re.IGNORECASE), 0.90),
+    (re.compile(r'\b(?P<value>[A-Z]{2,}\d{2,}[A-Z0-9\-]*)\b', re.IGNORECASE), 0.70),  # Alphanumeric codes
+    (re.compile(r'\b(?P<value>[A-Z0-9]{6,})\b', re.IGNORECASE), 0.60),  # Long alphanumeric strings
+]
+
+DIAMETER_PATTERNS = [
+    re.compile(r'(?P<value>\d+\.?\d*)\s*(?:inches|inch|in|"|mm)', re.IGNORECASE),
+    re.compile(r'diameter[:\s]+(?P<value>\d+\.?\d*)', re.IGNORECASE),
+    re.compile(r'(?P<value>\d+\.?\d*)\s*x\s*\d+\.?\d*', re.IGNORECASE),  # Dimensions like "11.8 x 1.2"
+]
+
+BOLT_PATTERN = re.compile(r'(?P<bolts>\d+)\s*x\s*(?P<pcd>\d+\.?\d*)')
+
+# Last-resort patterns used by vcdb_validate on every mapped column
+VALIDATE_MODEL_FOR = re.compile(
+    r'(?:for|fits?)\s+(?:\d{2,4}\s+)?[A-Z][A-Za-z]+\s+(?P<model>' + _MODEL + ')', re.IGNORECASE
+)
+VALIDATE_MODEL_YEAR_FIRST = re.compile(r'\b(?:19|20)\d{2}\s+[A-Z][A-Za-z]+\s+(?P<model>' + _MODEL + ')')
+VALIDATE_PART_PATTERNS = [
+    re.compile(r'\b(?:PART|SKU|ITEM|PN)[\s#:]*(?P<value>[A-Z0-9\-]{3,})\b', re.IGNORECASE),
+    re.compile(r'\b(?P<value>[A-Z0-9]{2,}[\-]?[A-Z0-9]{2,}[A-Z0-9\-]*)\b', re.IGNORECASE),
+    re.compile(r'\b(?P<value>[A-Z]?\d{3,}[A-Z0-9\-]*|[A-Z]{2,}\d{2,}[A-Z0-9\-]*)\b', re.IGNORECASE),
+]
+PART_ID_LIKE = re.compile(r'^[A-Z0-9\-]+$')
+FOUR_DIGITS = re.compile(r'^\d{4}$')
+
+NUMERIC_FIELDS = {'year', 'rotorDiameter'}
+
+
+class MakeMatcher:
+    """
+    Make recogniser over the common make list plus the makes known to the
+    VCDB. Make names are split into lowercase words and indexed by their
+    first word, so each description costs one dict lookup per word however
+    many makes are known. The leftmost make followed by a model wins.
+    """
+
+    def __init__(self, names):
+        canonical = {}
+        by_first_word = {}
+        for name in names:
+            words = tuple((name or '').lower().split())
+            if not words or ' '.join(words) in canonical:
+                continue
+            canonical[' '.join(words)] = ' '.join(name.split())
+            by_first_word.setdefault(words[0], []).append(words)
+        # Longer names first, so "Land Rover" is preferred over a make "Land"
+        for candidates in by_first_word.values():
+            candidates.sort(key=len, reverse=True)
+        self.canonical = canonical
+        self.by_first_word = by_first_word
+
+    def match(self, text: str):
+        """(make, model) for the leftmost make mention followed by a model, or None"""
+        words = text.split()
+        for position, word in enumerate(words):
+            candidates = self.by_first_word.get(word.lstrip(WORD_PREFIX_PUNCTUATION).lower())
+            if not candidates:
+                continue
+            for make_words in candidates:
+                end = position + len(make_words)
+                if len(make_words) > 1 and tuple(w.lower() for w in words[position + 1:end]) != make_words[1:]:
+                    continue
+                model = MODEL_AT_START.match(' '.join(words[end:end + 2]))
+                if model:
+                    return self.canonical[' '.join(make_words)], model.group('model')
+        return None
+
+    def extract(self, text: pd.Series) -> pd.DataFrame:
+        """Return make/model columns (NaN where no make was recognised)"""
+        found = {}
+        for idx, value in text.items():
+            match = self.match(value)
+            if match:
+                found[idx] = match
+        return pd.DataFrame.from_dict(found, orient='index', columns=['make', 'model']).reindex(text.index)
+
+
+_make_matcher = None
+_make_matcher_lock = threading.Lock()
+
+
+def get_make_matcher() -> MakeMatcher:
+    """
+    Build the make matcher once per process. If the VCDB makes cannot be
+    read, a matcher over the common makes is returned but not kept, so the
+    next call tries the VCDB again.
+    """
+    global _make_matcher
+
+    if _make_matcher is None:
+        with _make_matcher_lock:
+            if _make_matcher is None:
+                try:
+                    from vcdb.models import Make
+                    vcdb_makes = list(Make.objects.values_list('make_name', flat=True).distinct())
+                except Exception as e:
+                    logger.warning(f"Could not load VCDB makes, matching common makes only: {str(e)}")
+                    return MakeMatcher(COMMON_MAKES)
+                _make_matcher = MakeMatcher(COMMON_MAKES + vcdb_makes)
+    return _make_matcher
+
+
+def _missing_mask(df: pd.DataFrame, field: str) -> pd.Series:
+    if field not in df.columns:
+        return pd.Series(True, index=df.index)
+    return df[field].isna()
+
+
+def _text_series(series: pd.Series) -> pd.Series:
+    """String view of a column with missing values as empty strings"""
+    return series.where(series.notna(), '').astype(str)
+
+
+class _Extractor:
+    """Fills missing cells in a frame and records what was extracted where"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.positions = pd.Series(range(len(df)), index=df.index)
+        self.records = []
+        self.sequence = 0
+
+    def missing(self, field: str) -> pd.Series:
+        return _missing_mask(self.df, field)
+
+    def fill(self, field, values: pd.Series, source, method, confidence):
+        """Write non-null ``values`` into missing cells of ``field``"""
+        values = values.dropna()
+        if values.empty:
+            return
+        values = values[self.missing(field).reindex(values.index, fill_value=False)]
+        if values.empty:
+            return
+
+        if field not in self.df.columns:
+            self.df[field] = float('nan') if field in NUMERIC_FIELDS else None
+        elif field not in NUMERIC_FIELDS and self.df[field].dtype != object:
+            self.df[field] = self.df[field].astype(object)
+        self.df.loc[values.index, field] = values
+
+        self.sequence += 1
+        confidences = confidence if isinstance(confidence, pd.Series) else None
+        for idx, value in values.items():
+            self.records.append((
+                self.positions[idx],
+                self.sequence,
+                {
+                    'field': field,
+                    'value': value.item() if hasattr(value, 'item') else value,
+                    'source': source,
+                    'method': method,
+                    'confidence': float(confidences[idx]) if confidences is not None else confidence,
+                },
+            ))
+
+    def ordered_records(self):
+        """Extraction records in original row order"""
+        return [entry for _, _, entry in sorted(self.records, key=lambda r: (r[0], r[1]))]
+
+
+def _clean_model(models: pd.Series) -> pd.Series:
+    return models.str.replace(ENGINE_SUFFIX, '', regex=True).str.strip()
+
+
+def _extract_year(ex: _Extractor, text: pd.Series, source: str):
+    rows = ex.missing('year') & (text != '')
+    if not rows.any():
+        return
+    subset = text[rows]
+    four = subset.str.extract(YEAR_4_DIGIT)['year']
+    ex.fill('year', pd.to_numeric(four, errors='coerce').astype('Int64').astype(object), source, 'extracted_from_text', 0.85)
+
+    remaining = subset[four.isna()]
+    if remaining.empty:
+        return
+    two = pd.to_numeric(remaining.str.extract(YEAR_2_DIGIT)['year'], errors='coerce').dropna().astype(int)
+    # Heuristic: if < 30, assume 2000s, else 1900s
+    two = (two + 2000).where(two < 30, two + 1900)
+    ex.fill('year', two.astype(object), source, 'extracted_from_text', 0.75)
+
+
+def _extract_make_model(ex: _Extractor, text: pd.Series, source: str):
+    def needs_vehicle():
+        return (ex.missing('makeName') | ex.missing('modelName')) & (text != '')
+
+    steps = [
+        (lambda s: s.str.extract(VEHICLE_FOR), 'extracted_from_text', 0.85),
+        (lambda s: s.str.extract(VEHICLE_YEAR_FIRST), 'extracted_from_text', 0.80),
+        (lambda s: get_make_matcher().extract(s), 'inferred_from_text', 0.70),
+    ]
+    for extract, method, confidence in steps:
+        rows = needs_vehicle()
+        if not rows.any():
+            return
+        found = extract(text[rows])
+        matched = found['make'].notna() & found['model'].notna()
+        found = found[matched]
+        if found.empty:
+            continue
+        ex.fill('makeName', found['make'].str.strip(), source, method, confidence)
+        ex.fill('modelName', _clean_model(found['model']), source, method, confidence)
+
+
+def _extract_from_vehicle_info(ex: _Extractor, info: pd.Series, rows: pd.Series, source: str):
+    info = info[rows & (info.str.strip().str.len() > 2)]
+    if info.empty:
+        return
+
+    model_rows = ex.missing('modelName').reindex(info.index)
+    if model_rows.any():
+        models = info[model_rows].str.extract(VEHICLE_INFO_MODEL)['model'].dropna().str.strip()
+        # Remove submodel/trim info (e.g., "F-150 Platinum" -> "F-150")
+        models = models.str.replace(TRIM_SUFFIX, '', regex=True).str.strip()
+        ex.fill('modelName', models[models.str.len() > 1], source, 'extracted_from_vehicle_info', 0.75)
+
+    trim_rows = ex.missing('subModelName').reindex(info.index)
+    if trim_rows.any():
+        trims = info[trim_rows].str.extract(TRIM)['trim'].str.strip()
+        ex.fill('subModelName', trims, source, 'extracted_from_vehicle_info', 0.80)
+
+
+def _extract_position(ex: _Extractor, text: pd.Series, source: str):
+    rows = ex.missing('position') & (text != '')
+    if not rows.any():
+        return
+    subset = text[rows]
+    front = subset.str.contains(POSITION_FRONT)
+    rear = ~front & subset.str.contains(POSITION_REAR)
+    positions = pd.Series(None, index=subset.index, dtype=object)
+    positions[front] = 'Front'
+    positions[rear] = 'Rear'
+    ex.fill('position', positions, source, 'extracted_from_text', 0.90)
+
+
+def _extract_part_id(ex: _Extractor, text: pd.Series, source: str):
+    for pattern, confidence in PART_ID_PATTERNS:
+        rows = ex.missing('partId') & (text != '')
+        if not rows.any():
+            return
+        values = text[rows].str.extract(pattern)['value'].str.strip()
+        ex.fill('partId', values[values.str.len() >= 3], source, 'extracted_from_text', confidence)
+
+
+def _extract_rotor_diameter(ex: _Extractor, text: pd.Series, source: str):
+    rows = ex.missing('rotorDiameter') & (text != '')
+    if not rows.any():
+        return
+    subset = text[rows]
+    diameters = pd.Series(float('nan'), index=subset.index)
+    for pattern in DIAMETER_PATTERNS:
+        pending = diameters.isna()
+        if not pending.any():
+            break
+        found = pd.to_numeric(subset[pending].str.extract(pattern)['value'], errors='coerce')
+        diameters[found.index] = found
+    # Convert mm to inches if needed
+    is_mm = subset.str.lower().str.contains('mm', regex=False)
+    diameters = diameters.where(~is_mm, diameters / 25.4)
+    ex.fill('rotorDiameter', diameters, source, 'extracted_from_text', 0.75)
+
+
+def _extract_bolt_pattern(ex: _Extractor, text: pd.Series, source: str):
+    rows = ex.missing('boltPattern') & (text != '')
+    if not rows.any():
+        return
+    found = text[rows].str.extract(BOLT_PATTERN).dropna()
+    ex.fill('boltPattern', found['bolts'] + 'x' + found['pcd'], source, 'extracted_from_text', 0.80)
+
+
+def find_description_columns(original_df: pd.DataFrame, column_mappings: dict):
+    """Description-like columns (Vehicle Info first) and the Vehicle Info column"""
+    description_columns = []
+    mapped_sources = set(column_mappings.values())
+    for col in original_df.columns:
+        col_lower = col.lower()
+        if any(keyword in col_lower for keyword in DESCRIPTION_KEYWORDS):
+            if col not in mapped_sources:  # Not already mapped
+                description_columns.append(col)
+
+    # Prioritize "Vehicle Info" column if it exists (often contains model/submodel)
+    vehicle_info_col = None
+    for col in original_df.columns:
+        if 'vehicle' in col.lower() and 'info' in col.lower():
+            vehicle_info_col = col
+            if col not in description_columns:
+                description_columns.insert(0, col)  # Put it first
+            break
+
+    return description_columns, vehicle_info_col
+
+
+def enrich_from_descriptions(mapped_df: pd.DataFrame, original_df: pd.DataFrame, column_mappings: dict):
+    """
+    Fill missing year/make/model/trim/position/part/spec cells in ``mapped_df``
+    from free-text columns of ``original_df`` (aligned on index). Returns the
+    ordered list of extraction records for UI feedback.
+    """
+    description_columns, vehicle_info_col = find_description_columns(original_df, column_mappings)
+    ex = _Extractor(mapped_df)
+
+    info_text = None
+    if vehicle_info_col:
+        info_text = _text_series(original_df[vehicle_info_col].reindex(mapped_df.index))
+    # Vehicle Info is consulted once a row has any usable description
+    info_consulted = pd.Series(False, index=mapped_df.index)
+
+    for desc_col in description_columns:
+        text = _text_series(original_df[desc_col].reindex(mapped_df.index))
+        # Blank out short values so every step skips them
+        text = text.where(text.str.strip().str.len() >= 3, '')
+        if not (text != '').any():
+            continue
+
+        _extract_year(ex, text, desc_col)
+        _extract_make_model(ex, text, desc_col)
+        if info_text is not None:
+            usable = (text != '') & ~info_consulted
+            _extract_from_vehicle_info(ex, info_text, usable, vehicle_info_col)
+            info_consulted |= usable
+        _extract_position(ex, text, desc_col)
+        _extract_part_id(ex, text, desc_col)
+        _extract_rotor_diameter(ex, text, desc_col)
+        _extract_bolt_pattern(ex, text, desc_col)
+
+    # If still missing the year, check every column for year-like values
+    for col in original_df.columns:
+        rows = ex.missing('year')
+        if not rows.any():
+            break
+        text = _text_series(original_df[col].reindex(mapped_df.index))[rows]
+        text = text[text.str.len() >= 2]
+        years = pd.to_numeric(text.str.extract(YEAR_ANY_COLUMN)['year'], errors='coerce').dropna()
+        ex.fill('year', years.astype(int).astype(object), col, 'inferred_from_column', 0.70)
+
+    return ex.ordered_records()
+
+
+def fill_required_from_columns(mapped_df: pd.DataFrame, required_fields):
+    """
+    Last-resort fill of blank required fields from any other mapped column,
+    used by vcdb_validate. Sources are the column values as they were before
+    any filling, matching the former row-snapshot behaviour.
+    """
+    columns = list(mapped_df.columns)
+    texts = {col: _text_series(mapped_df[col]) for col in columns}
+
+    for field in required_fields:
+        if field not in mapped_df.columns:
+            continue
+
+        def blank():
+            values = mapped_df[field]
+            as_text = values.where(values.notna(), '').astype(str).str.strip()
+            return values.isna() | ((values.map(type) == str) & (as_text == ''))
+
+        for col in columns:
+            rows = blank()
+            if not rows.any():
+                break
+            text = texts[col][rows]
+            text = text[text.str.strip().str.len() >= 3]
+            if text.empty:
+                continue
+
+            if field == 'year':
+                found = pd.to_numeric(text.str.extract(YEAR_ANY_COLUMN)['year'], errors='coerce').dropna()
+                found = found.astype(int).astype(object)
+            elif field == 'makeName':
+                lowered = text.str.lower()
+                found = pd.Series(None, index=text.index, dtype=object)
+                # Earlier makes in the list take precedence
+                for make in reversed(COMMON_MAKES):
+                    found[lowered.str.contains(make.lower(), regex=False)] = make
+                found = found.dropna()
+            elif field == 'modelName':
+                first = _clean_model(text.str.extract(VALIDATE_MODEL_FOR)['model'])
+                second = _clean_model(text.str.extract(VALIDATE_MODEL_YEAR_FIRST)['model'])
+                first = first.where(first.str.len() > 1)
+                found = first.fillna(second.where(second.str.len() > 1)).dropna()
+            elif field == 'partId':
+                cleaned = text.str.strip()
+                found = pd.Series(float('nan'), index=cleaned.index, dtype=object)
+                for pattern in VALIDATE_PART_PATTERNS:
+                    pending = found.isna()
+                    if not pending.any():
+                        break
+                    found[pending] = cleaned[pending].str.extract(pattern)['value']
+                # If no pattern matched, use the value itself when it looks like a part number
+                direct = (
+                    found.isna()
+                    & cleaned.str.len().between(3, 50)
+                    & ~cleaned.str.match(FOUR_DIGITS)
+                    & cleaned.str.upper().str.match(PART_ID_LIKE)
+                )
+                found[direct] = cleaned[direct]
+                found = found.dropna().astype(str).str.strip().str.upper()
+                found = found[found.str.len() >= 2]
+            else:
+                continue
+
+            if found.empty:
+                continue
+            if mapped_df[field].dtype != object and field != 'year':
+                mapped_df[field] = mapped_df[field].astype(object)
+            mapped_df.loc[found.index, field] = found
+
+    return mapped_df
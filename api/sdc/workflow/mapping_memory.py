@@ -0,0 +1,186 @@
+"""
+Column mapping memory for ai_map.
+
+Accepted column mappings are stored per tenant and data type under a header
+signature (sha256 of the sorted, case-folded header names). An upload whose
+headers hash to a known signature reuses the stored mapping without calling
+the model, after a cheap check that the sample values still look like the
+remembered columns. Uploads that only partially overlap a remembered
+template reuse the mappings for the shared columns, so only the novel
+columns need to go to the model.
+"""
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ColumnMappingMemory
+
+# Minimum Jaccard similarity between header sets for a near match
+NEAR_MATCH_THRESHOLD = 0.6
+# Remembered templates compared when there is no exact match
+NEAR_MATCH_CANDIDATES = 50
+
+_WHITESPACE = re.compile(r'\s+')
+_YEAR = re.compile(r'^(?:19|20)\d{2}(?:\s*-\s*(?:19|20)?\d{2})?(?:\.0)?$')
+_NUMBER = re.compile(r'^-?\d+(?:\.\d+)?$')
+
+
+@dataclass
+class MappingRecall:
+    """Result of looking up remembered mappings for a set of headers"""
+    column_mappings: List[Dict] = field(default_factory=list)
+    novel_headers: List[str] = field(default_factory=list)
+    match: str = 'none'  # 'exact', 'near' or 'none'
+    score: float = 0.0
+    memory_id: Optional[str] = None
+
+    def as_dict(self) -> Dict:
+        return {
+            "match": self.match,
+            "score": round(self.score, 3),
+            "memoryId": self.memory_id,
+            "reusedColumns": len(self.column_mappings),
+            "novelColumns": self.novel_headers,
+        }
+
+
+def normalize_header(header) -> str:
+    return _WHITESPACE.sub(' ', str(header)).strip().casefold()
+
+
+def header_signature(headers) -> str:
+    names = sorted({normalize_header(h) for h in headers if str(h).strip()})
+    return hashlib.sha256('\x1f'.join(names).encode('utf-8')).hexdigest()
+
+
+def _value_kind(value) -> str:
+    if value is None:
+        return 'empty'
+    text = str(value).strip()
+    if not text or text.lower() == 'nan':
+        return 'empty'
+    if _YEAR.match(text):
+        return 'year'
+    if _NUMBER.match(text):
+        return 'number'
+    return 'text'
+
+
+def profile_samples(headers, sample_data) -> Dict[str, str]:
+    """Dominant value kind per normalized header across the sample rows"""
+    profile = {}
+    for header in headers:
+        counts = {}
+        for row in sample_data or []:
+            kind = _value_kind(row.get(header))
+            if kind != 'empty':
+                counts[kind] = counts.get(kind, 0) + 1
+        profile[normalize_header(header)] = max(counts, key=counts.get) if counts else 'empty'
+    return profile
+
+
+def _kinds_agree(remembered: Optional[str], current: Optional[str]) -> bool:
+    if not remembered or not current or 'empty' in (remembered, current):
+        return True
+    if remembered == current:
+        return True
+    # Years are numbers; a sample of years can legitimately look either way
+    return {remembered, current} == {'year', 'number'}
+
+
+def _remap(memory: ColumnMappingMemory, headers, profile, source_filter=None) -> List[Dict]:
+    """Stored mappings translated to the current header spelling"""
+    by_name = {normalize_header(h): h for h in headers}
+    remembered_profile = memory.sample_profile or {}
+    mappings = []
+    for mapping in memory.column_mappings:
+        key = mapping.get("source")
+        if key not in by_name or (source_filter and key not in source_filter):
+            continue
+        if not _kinds_agree(remembered_profile.get(key), profile.get(key)):
+            continue
+        mappings.append({**mapping, "source": by_name[key], "extractionMethod": mapping.get("extractionMethod") or "remembered"})
+    return mappings
+
+
+def recall_mappings(tenant, data_type: str, headers, sample_profile=None) -> MappingRecall:
+    """
+    Find remembered mappings for the headers of a new upload.
+    ``sample_profile`` comes from ``profile_samples`` and drives the sample check.
+    """
+    headers = [h for h in headers if str(h).strip()]
+    if not tenant or not headers:
+        return MappingRecall(novel_headers=list(headers))
+
+    profile = sample_profile or {}
+    current = {normalize_header(h) for h in headers}
+    memories = ColumnMappingMemory.objects.filter(tenant=tenant, data_type=data_type)
+
+    memory = memories.filter(signature=header_signature(headers)).first()
+    if memory is not None:
+        mappings = _remap(memory, headers, profile)
+        mapped_sources = {normalize_header(m["source"]) for m in mappings}
+        remembered_sources = {m.get("source") for m in memory.column_mappings}
+        # Every remembered column must still pass the sample check
+        if remembered_sources <= mapped_sources:
+            _touch(memory)
+            return MappingRecall(
+                column_mappings=mappings, match='exact', score=1.0, memory_id=str(memory.id)
+            )
+
+    best, best_score = None, 0.0
+    for candidate in memories.order_by('-updated_at')[:NEAR_MATCH_CANDIDATES]:
+        known = set(candidate.headers or [])
+        score = len(current & known) / len(current | known) if known else 0.0
+        if score > best_score:
+            best, best_score = candidate, score
+
+    if best is None or best_score < NEAR_MATCH_THRESHOLD:
+        return MappingRecall(novel_headers=list(headers), score=best_score)
+
+    mappings = _remap(best, headers, profile, source_filter=set(best.headers or []))
+    mapped = {normalize_header(m["source"]) for m in mappings}
+    known = set(best.headers or [])
+    # Shared columns that were deliberately left unmapped stay unmapped
+    novel = [h for h in headers if normalize_header(h) not in known and normalize_header(h) not in mapped]
+    _touch(best)
+    return MappingRecall(
+        column_mappings=mappings, novel_headers=novel, match='near', score=best_score, memory_id=str(best.id)
+    )
+
+
+def remember_mappings(tenant, data_type: str, headers, column_mappings, sample_profile=None) -> Optional[ColumnMappingMemory]:
+    """Store the mapping accepted for an upload's headers"""
+    headers = [h for h in headers if str(h).strip()]
+    if not tenant or not headers or not column_mappings:
+        return None
+
+    stored = [
+        {**mapping, "source": normalize_header(mapping["source"])}
+        for mapping in column_mappings
+        if mapping.get("source") and mapping.get("target")
+    ]
+    if not stored:
+        return None
+
+    memory, _ = ColumnMappingMemory.objects.update_or_create(
+        tenant=tenant,
+        data_type=data_type,
+        signature=header_signature(headers),
+        defaults={
+            "headers": sorted({normalize_header(h) for h in headers}),
+            "column_mappings": stored,
+            "sample_profile": sample_profile or {},
+        },
+    )
+    return memory
+
+
+def _touch(memory: ColumnMappingMemory) -> None:
+    ColumnMappingMemory.objects.filter(pk=memory.pk).update(
+        hit_count=F('hit_count') + 1, last_used_at=timezone.now()
+    )
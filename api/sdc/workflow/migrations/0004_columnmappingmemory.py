@@ -0,0 +1,34 @@
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0001_initial'),
+        ('workflow', '0003_add_ai_reasoning_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ColumnMappingMemory',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('data_type', models.CharField(max_length=40)),
+                ('signature', models.CharField(max_length=64)),
+                ('headers', models.JSONField()),
+                ('column_mappings', models.JSONField()),
+                ('sample_profile', models.JSONField(blank=True, null=True)),
+                ('hit_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('last_used_at', models.DateTimeField(blank=True, null=True)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='column_mapping_memories', to='tenants.tenant')),
+            ],
+            options={
+                'unique_together': {('tenant', 'data_type', 'signature')},
+                'indexes': [models.Index(fields=['tenant', 'data_type', 'updated_at'], name='ix_mapmem_tenant_type_updated')],
+            },
+        ),
+    ]
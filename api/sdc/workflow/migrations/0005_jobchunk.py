@@ -0,0 +1,32 @@
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow', '0004_columnmappingmemory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobChunk',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('job_kind', models.CharField(max_length=60)),
+                ('job_id', models.CharField(max_length=64)),
+                ('chunk_index', models.IntegerField()),
+                ('spec', models.JSONField(default=dict)),
+                ('status', models.CharField(default='pending', max_length=20)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('attempts', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('job_kind', 'job_id', 'chunk_index')},
+                'indexes': [models.Index(fields=['job_kind', 'job_id', 'status'], name='ix_jobchunk_job_status')],
+            },
+        ),
+    ]
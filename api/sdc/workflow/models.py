@@ -87,3 +87,41 @@ class Lineage(models.Model):
 
     class Meta:
         indexes = [models.Index(fields=['tenant', 'entity_type', 'entity_id'], name='ix_lineage_tenant_entity')]
+
+
+class ColumnMappingMemory(models.Model):
+    """Accepted column mappings remembered per tenant, data type and header signature"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='column_mapping_memories')
+    data_type = models.CharField(max_length=40)
+    signature = models.CharField(max_length=64)
+    headers = models.JSONField()
+    column_mappings = models.JSONField()
+    sample_profile = models.JSONField(null=True, blank=True)
+    hit_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = (('tenant', 'data_type', 'signature'),)
+        indexes = [models.Index(fields=['tenant', 'data_type', 'updated_at'], name='ix_mapmem_tenant_type_updated')]
+
+
+class JobChunk(models.Model):
+    """Checkpoint for one chunk of a fanned-out background job"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    job_kind = models.CharField(max_length=60)
+    job_id = models.CharField(max_length=64)
+    chunk_index = models.IntegerField()
+    spec = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, default='pending')
+    result = models.JSONField(null=True, blank=True)
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = (('job_kind', 'job_id', 'chunk_index'),)
+        indexes = [models.Index(fields=['job_kind', 'job_id', 'status'], name='ix_jobchunk_job_status')]
@@ -0,0 +1,208 @@
+"""
+Chunked fan-out for long-running background jobs.
+
+A coordinator task splits a job into chunks (ranges of products), records a
+``JobChunk`` checkpoint per chunk and dispatches one task per chunk as a
+Celery chord whose body is the job's finalizer. Each chunk:
+
+- returns its stored result straight away when its checkpoint is done, so a
+  redelivered or retried chunk never redoes committed work;
+- runs its slow, side-effect free preparation (e.g. the AI call) outside a
+  transaction, then writes its rows and marks the checkpoint done in one
+  transaction;
+- retries on its own with exponential backoff and, after the last attempt,
+  is recorded as failed instead of failing the chord, so the finalizer
+  always runs;
+- holds one of its tenant's concurrency tokens while it runs, so one
+  tenant's large job cannot take every bulk worker.
+
+Finalizers aggregate the checkpoints rather than the chord results, so the
+counts stay exact when a chunk ran more than once.
+"""
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from celery import chord
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from sdc.celery_queues import PRIORITY_HIGH, PRIORITY_NORMAL
+from sdc.tenant_tokens import TenantBusy, retry_when_busy, tenant_token
+
+from .models import JobChunk
+
+logger = logging.getLogger(__name__)
+
+CHUNK_PENDING = 'pending'
+CHUNK_RUNNING = 'running'
+CHUNK_DONE = 'done'
+CHUNK_FAILED = 'failed'
+
+# Options for chunk tasks: a chunk is redelivered if its worker dies mid-way
+CHUNK_TASK_OPTIONS = {
+    'bind': True,
+    'acks_late': True,
+    'reject_on_worker_lost': True,
+    'max_retries': 3,
+}
+RETRY_BACKOFF_SECONDS = 10
+RETRY_BACKOFF_MAX_SECONDS = 300
+# List values in chunk results are merged up to this many items
+MAX_MERGED_LIST_ITEMS = 50
+
+
+def index_ranges(total: int, size: int) -> List[Tuple[int, int]]:
+    """``[start, stop)`` offsets covering ``total`` items in chunks of ``size``"""
+    return [(start, min(start + size, total)) for start in range(0, total, size)]
+
+
+def pk_ranges(queryset, size: int) -> List[Tuple[int, int]]:
+    """
+    Inclusive primary key bounds that split a queryset into chunks of ``size``
+    rows. Rows are numbered in the database and only the first and last key
+    of each chunk are fetched.
+    """
+    first_slot = 1 % size
+    edges = (
+        queryset.order_by()
+        .annotate(chunk_row=Window(RowNumber(), order_by=F('pk').asc()))
+        .annotate(chunk_slot=F('chunk_row') % size)
+        .filter(chunk_slot__in={first_slot, 0})
+        .order_by('pk')
+        .values_list('pk', 'chunk_slot')
+    )
+    starts, ends = [], []
+    for pk, slot in edges:
+        if slot == first_slot:
+            starts.append(pk)
+        if slot == 0:
+            ends.append(pk)
+    # The last chunk is short unless the row count is a multiple of size
+    if len(ends) < len(starts):
+        ends.append(queryset.order_by('-pk').values_list('pk', flat=True).first())
+    return list(zip(starts, ends))
+
+
+def _checkpoint(job_kind: str, job_id, index: int):
+    return JobChunk.objects.filter(job_kind=job_kind, job_id=str(job_id), chunk_index=index)
+
+
+def dispatch_chunks(job_kind: str, job_id, specs: List[Dict], chunk_task, finalizer):
+    """
+    Record a checkpoint per chunk spec and run ``chunk_task(job_id, index,
+    spec)`` for every spec as a chord ending in ``finalizer(results, job_id)``.
+    Existing checkpoints are kept, so dispatching a job again only redoes the
+    chunks that are not done yet.
+    """
+    job_id = str(job_id)
+    JobChunk.objects.bulk_create(
+        [
+            JobChunk(job_kind=job_kind, job_id=job_id, chunk_index=index, spec=spec)
+            for index, spec in enumerate(specs)
+        ],
+        ignore_conflicts=True,
+    )
+    logger.info(f"Dispatching {len(specs)} chunks for {job_kind} {job_id}")
+
+    if not specs:
+        return finalizer.delay([], job_id)
+
+    # Chunks of small jobs jump ahead of large jobs queued on the bulk queue
+    small = len(specs) <= getattr(settings, 'SMALL_JOB_MAX_CHUNKS', 4)
+    priority = PRIORITY_HIGH if small else PRIORITY_NORMAL
+    header = [chunk_task.s(job_id, index, spec).set(priority=priority) for index, spec in enumerate(specs)]
+    return chord(header)(finalizer.s(job_id))
+
+
+def run_chunk(task, job_kind: str, job_id, index: int, apply: Callable, prepare: Optional[Callable] = None,
+              tenant_id=None) -> Dict:
+    """
+    Execute one chunk of a job with checkpointing and retries.
+
+    ``prepare()`` runs outside any transaction and must be safe to repeat.
+    ``apply(prepared)`` writes the chunk's rows and returns its result dict;
+    it runs in the transaction that marks the checkpoint done. With a
+    ``tenant_id`` the chunk holds one of the tenant's concurrency tokens while
+    it runs and is re-queued when none is free.
+    """
+    checkpoint = _checkpoint(job_kind, job_id, index)
+    done = checkpoint.filter(status=CHUNK_DONE).values_list('result', flat=True).first()
+    if done is not None:
+        return done
+
+    try:
+        with tenant_token(tenant_id):
+            return _execute_chunk(task, job_kind, job_id, index, checkpoint, apply, prepare)
+    except TenantBusy:
+        raise retry_when_busy(task)
+
+
+def _execute_chunk(task, job_kind, job_id, index, checkpoint, apply, prepare):
+    claimed = checkpoint.exclude(status=CHUNK_DONE).update(
+        status=CHUNK_RUNNING, attempts=F('attempts') + 1, updated_at=timezone.now()
+    )
+    if not claimed:
+        # Finished by another delivery since run_chunk checked
+        return checkpoint.values_list('result', flat=True).first() or {}
+    try:
+        prepared = prepare() if prepare else None
+        with transaction.atomic():
+            # The row lock keeps a duplicate delivery from applying the chunk twice
+            row = checkpoint.select_for_update().first()
+            if row is not None and row.status == CHUNK_DONE:
+                return row.result
+            result = apply(prepared) or {}
+            checkpoint.update(status=CHUNK_DONE, result=result, error=None, updated_at=timezone.now())
+        return result
+    except Exception as exc:
+        # Attempts are counted on the checkpoint, so waiting for a tenant
+        # token does not use up the chunk's error retries
+        attempts = checkpoint.values_list('attempts', flat=True).first() or task.request.retries + 1
+        if attempts <= task.max_retries:
+            countdown = min(RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1), RETRY_BACKOFF_MAX_SECONDS)
+            logger.warning(
+                f"Chunk {index} of {job_kind} {job_id} failed (attempt {attempts}), "
+                f"retrying in {countdown}s: {str(exc)}"
+            )
+            raise task.retry(exc=exc, countdown=countdown, max_retries=task.request.retries + 1)
+
+        logger.error(f"Chunk {index} of {job_kind} {job_id} failed permanently: {str(exc)}", exc_info=True)
+        checkpoint.update(status=CHUNK_FAILED, error=str(exc), updated_at=timezone.now())
+        return {'failed': True, 'error': str(exc)}
+
+
+def chunk_progress(job_kind: str, job_id) -> Tuple[int, int]:
+    """(finished chunks, total chunks) for a job"""
+    chunks = JobChunk.objects.filter(job_kind=job_kind, job_id=str(job_id))
+    return chunks.filter(status__in=[CHUNK_DONE, CHUNK_FAILED]).count(), chunks.count()
+
+
+def chunk_summary(job_kind: str, job_id) -> Dict:
+    """
+    Merge the results of a job's chunks: numbers are summed, lists are
+    concatenated (capped at ``MAX_MERGED_LIST_ITEMS``) and chunks that did not
+    finish are listed with their errors under ``failedChunks``.
+    """
+    summary = {'chunks': 0, 'failedChunks': []}
+    rows = (
+        JobChunk.objects.filter(job_kind=job_kind, job_id=str(job_id))
+        .order_by('chunk_index')
+        .values_list('chunk_index', 'status', 'result', 'error', 'spec')
+    )
+    for index, status, result, error, spec in rows:
+        summary['chunks'] += 1
+        if status != CHUNK_DONE:
+            summary['failedChunks'].append({'index': index, 'status': status, 'error': error, 'spec': spec})
+            continue
+        for key, value in (result or {}).items():
+            if isinstance(value, bool):
+                continue
+            if isinstance(value, (int, float)):
+                summary[key] = summary.get(key, 0) + value
+            elif isinstance(value, list):
+                merged = summary.setdefault(key, [])
+                merged.extend(value[:max(0, MAX_MERGED_LIST_ITEMS - len(merged))])
+    return summary
@@ -0,0 +1,159 @@
+"""
+Publishing fitments from upload rows.
+
+Rows are normalized column-at-a-time onto Fitment columns and handed to
+``fitments.publishing.bulk_publish_fitments``, which skips fitments the
+tenant already has and counts them as duplicates.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional, Tuple
+
+from sdc.lazy_imports import lazy_module
+from django.utils import timezone
+
+from fitments.models import Fitment
+from fitments.publishing import PublishResult, bulk_publish_fitments
+
+pd = lazy_module('pandas')
+
+KNOWN_UPPERCASE_MAKES = {"KIA", "BMW", "AUDI", "ACURA", "INFINITI", "LEXUS", "AC"}
+
+# Canonical column -> accepted source keys, in order of precedence
+COLUMN_ALIASES = {
+    'partId': ['partId', 'part_id', 'partNumber', 'Part Number'],
+    'year': ['year', 'Year'],
+    'makeName': ['makeName', 'make', 'Make'],
+    'modelName': ['modelName', 'model', 'Model'],
+    'subModelName': ['submodel'],
+    'driveTypeName': ['driveType'],
+    'fuelTypeName': ['engine'],
+    'bodyNumDoors': ['bodyNumDoors'],
+    'bodyTypeName': ['body'],
+    'ptid': ['ptid'],
+    'partTypeDescriptor': ['productType'],
+    'quantity': ['quantity'],
+    'fitmentDescription': ['description'],
+    'position': ['position'],
+    'positionId': ['positionId'],
+    'liftHeight': ['liftHeight'],
+    'wheelType': ['wheelType'],
+}
+
+
+def _text(series: pd.Series) -> pd.Series:
+    """Stripped string values with missing values as empty strings"""
+    return series.where(series.notna(), '').astype(str).str.strip()
+
+
+def _coalesce(frame: pd.DataFrame, aliases: Iterable[str]) -> pd.Series:
+    """First non-empty value across the alias columns"""
+    result = pd.Series('', index=frame.index, dtype=object)
+    for alias in aliases:
+        if alias in frame.columns:
+            result = result.where(result != '', _text(frame[alias]))
+    return result
+
+
+def _integer(values: pd.Series, default: int) -> pd.Series:
+    numbers = pd.to_numeric(values.where(values != ''), errors='coerce')
+    return numbers.fillna(default).astype(int)
+
+
+def normalize_fitment_frame(frame: pd.DataFrame, case_insensitive: bool = False) -> Tuple[pd.DataFrame, int]:
+    """
+    Map raw rows (NormalizationResult entities or a transformed file) onto
+    Fitment columns. Rows without partId, year, make or model are dropped and
+    counted as skipped. The source frame's index is preserved.
+    """
+    if case_insensitive:
+        # Later columns win on case collisions, as the per-row lookup did
+        lowered = pd.Index([str(col).lower() for col in frame.columns])
+        unique = ~lowered.duplicated(keep='last')
+        frame = frame.loc[:, unique].set_axis(lowered[unique], axis=1)
+        aliases = {
+            target: list(dict.fromkeys(alias.lower() for alias in names))
+            for target, names in COLUMN_ALIASES.items()
+        }
+    else:
+        aliases = COLUMN_ALIASES
+
+    out = pd.DataFrame({target: _coalesce(frame, names) for target, names in aliases.items()}, index=frame.index)
+
+    # Year ranges publish their first year
+    year_text = out['year'].str.split('-').str[0].str.strip()
+    out['year'] = pd.to_numeric(year_text.where(year_text != ''), errors='coerce')
+
+    keep = (out['partId'] != '') & out['year'].notna() & (out['makeName'] != '') & (out['modelName'] != '')
+    skipped = int((~keep).sum())
+    out = out[keep].copy()
+    out['year'] = out['year'].astype(int)
+
+    # Normalize make/model names (proper capitalization)
+    out['makeName'] = out['makeName'].str.title()
+    uppercase = out['makeName'].str.upper().isin(KNOWN_UPPERCASE_MAKES)
+    out.loc[uppercase, 'makeName'] = out.loc[uppercase, 'makeName'].str.upper()
+    out['modelName'] = out['modelName'].str.title()
+
+    out['position'] = out['position'].where(out['position'] != '', 'Front')
+    out['positionId'] = _integer(out['positionId'], 1)
+    out['bodyNumDoors'] = _integer(out['bodyNumDoors'], 0)
+    quantity = _integer(out['quantity'], 1)
+    out['quantity'] = quantity.where(quantity != 0, 1)
+    out['ptid'] = out['ptid'].where(out['ptid'] != '', '0')
+
+    return out, skipped
+
+
+def publish_fitment_frame(frame: pd.DataFrame, tenant, upload, data_type: str = "fitments",
+                          source: Optional[str] = None, case_insensitive: bool = False) -> PublishResult:
+    """
+    Normalize and bulk-insert fitments for an upload.
+
+    ``frame`` carries one source row per line plus ``_rowIndex`` (and
+    ``_normalizationResultId`` when built from NormalizationResult rows),
+    which are recorded in each fitment's source metadata.
+    """
+    normalized, skipped = normalize_fitment_frame(
+        frame.drop(columns=['_rowIndex', '_normalizationResultId'], errors='ignore'),
+        case_insensitive=case_insensitive,
+    )
+    result = PublishResult(skipped=skipped)
+    if normalized.empty:
+        return result
+
+    row_index = frame.loc[normalized.index, '_rowIndex']
+    nr_ids = frame['_normalizationResultId'].reindex(normalized.index) if '_normalizationResultId' in frame.columns else None
+    published_at = timezone.now().isoformat()
+
+    fitments = []
+    for idx, row in zip(normalized.index, normalized.to_dict('records')):
+        source_metadata = {
+            "uploadId": str(upload.id),
+            "uploadFilename": upload.filename,
+        }
+        if nr_ids is not None:
+            source_metadata["normalizationResultId"] = str(nr_ids[idx])
+        source_metadata.update({
+            "rowIndex": int(row_index[idx]),
+            "publishedAt": published_at,
+            "dataType": data_type,
+        })
+        if source:
+            source_metadata["source"] = source
+
+        year, make_name, model_name, part_id = row['year'], row['makeName'], row['modelName'], row['partId']
+        fitments.append(Fitment(
+            tenant=tenant,
+            fitmentTitle=f"{year} {make_name} {model_name} - {part_id}",
+            fitmentNotes=f"Auto-created from upload {upload.filename} ({upload.id}), row {int(row_index[idx])}",
+            uom="EA",
+            baseVehicleId=f"{year}_{make_name}_{model_name}",
+            fitmentType="manual_fitment",
+            createdBy="data_upload",
+            updatedBy="data_upload",
+            dynamicFields={"sourceUpload": source_metadata},
+            **row,
+        ))
+
+    return bulk_publish_fitments(fitments, tenant, result=result)
@@ -2,7 +2,7 @@
 Celery tasks for workflow job processing
 """
 
-from celery import shared_task
+from celery import group, shared_task
 from django.utils import timezone
 from django.db import transaction
 from .models import Job
@@ -141,33 +141,27 @@ def process_ai_fitment_job(job):
 
 @shared_task
 def process_pending_jobs():
-    """Process all pending jobs in the queue"""
+    """
+    Claim all pending jobs in the queue and fan them out as a group of
+    process_workflow_job tasks, so they run in parallel across workers
+    """
     try:
-        # Get all pending jobs
-        pending_jobs = Job.objects.filter(status='queued').order_by('created_at')
-        
-        logger.info(f"Found {pending_jobs.count()} pending jobs to process")
-        
-        for job in pending_jobs:
-            try:
-                # Update job status to processing
-                job.status = 'processing'
-                job.started_at = timezone.now()
-                job.save()
-                
-                # Process the job directly
-                process_workflow_job(str(job.id))
-                logger.info(f"Processed job {job.id} directly")
-            except Exception as e:
-                logger.error(f"Failed to process job {job.id}: {str(e)}")
-                # Mark job as failed
-                job.status = 'failed'
-                job.finished_at = timezone.now()
-                job.result = {'error': str(e)}
-                job.save()
-                continue
-        
-        return f"Processed {pending_jobs.count()} jobs"
+        with transaction.atomic():
+            # Rows locked by a concurrent run are skipped, so a job is claimed once
+            pending_jobs = list(
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(status='queued')
+                .order_by('created_at')
+                .values_list('id', flat=True)
+            )
+            Job.objects.filter(id__in=pending_jobs).update(status='processing', started_at=timezone.now())
+        
+        logger.info(f"Found {len(pending_jobs)} pending jobs to process")
+        
+        if pending_jobs:
+            group(process_workflow_job.s(str(job_id)) for job_id in pending_jobs).apply_async()
+        
+        return f"Dispatched {len(pending_jobs)} jobs"
         
     except Exception as e:
         logger.error(f"Failed to process pending jobs: {str(e)}")
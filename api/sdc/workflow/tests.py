@@ -1,3 +1,440 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import uuid
+from unittest import mock
 
-# Create your tests here.
+import pandas as pd
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError
+from django.test import SimpleTestCase, TestCase, override_settings
+from kombu import Connection
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from sdc.celery import app
+from sdc.celery_queues import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    QUEUE_BULK,
+    QUEUE_INTERACTIVE,
+    QUEUE_MAINTENANCE,
+    QUEUE_SYNC,
+    QUEUE_TIME_LIMITS,
+    TASK_PLACEMENT,
+)
+
+from fitments.models import Fitment
+from tenants.models import Tenant
+from vcdb.models import Make
+
+from .extraction import MakeMatcher, get_make_matcher
+from . import challenge1, workbook
+from .challenge1 import VehicleIndex, load_vehicle_index
+from . import views
+from .mapping_memory import profile_samples, remember_mappings
+from .models import ColumnMappingMemory, Job, JobChunk, Upload
+from .orchestration import CHUNK_DONE, CHUNK_FAILED, _checkpoint, _execute_chunk, chunk_summary, pk_ranges, run_chunk
+from .utils import store_upload_stream
+from .views import _storage_dir, _transformed_file_path, ai_map, publish
+from .workbook import load_workbook_frame
+
+
+def fixture_path(name):
+    return os.path.join(settings.BASE_DIR, name)
+
+
+class CacheDirMixin:
+    """Point WORKBOOK_CACHE_DIR at a temporary directory"""
+
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        override = override_settings(WORKBOOK_CACHE_DIR=self.cache_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+
+class CeleryRoutingTests(SimpleTestCase):
+    """
+    Task routing checked against an in-memory broker. Results are ignored so
+    nothing talks to the Redis result backend.
+    """
+
+    def setUp(self):
+        # Import the task modules so every routed task is registered
+        app.loader.import_default_modules()
+        self.connection = Connection('memory://')
+        self.addCleanup(self.connection.release)
+
+    def route(self, task_name):
+        return app.amqp.router.route({}, task_name)['queue'].name
+
+    def receive(self, queue_name):
+        queue = self.connection.SimpleQueue(queue_name)
+        self.addCleanup(queue.close)
+        message = queue.get(timeout=1)
+        message.ack()
+        return message
+
+    def test_placed_tasks_route_to_their_queue(self):
+        for task_name, (queue, _) in TASK_PLACEMENT.items():
+            with self.subTest(task=task_name):
+                self.assertEqual(self.route(task_name), queue)
+
+    def test_placed_tasks_are_registered(self):
+        for task_name in TASK_PLACEMENT:
+            with self.subTest(task=task_name):
+                self.assertIn(task_name, app.tasks)
+
+    def test_unrouted_tasks_use_interactive_queue(self):
+        self.assertEqual(self.route('sdc.unrouted_task'), QUEUE_INTERACTIVE)
+
+    def test_long_and_short_work_do_not_share_a_queue(self):
+        self.assertEqual(self.route('vcdb.tasks.sync_vcdb_data_task'), QUEUE_SYNC)
+        self.assertEqual(self.route('data_uploads.tasks.generate_ai_fitments_chunk'), QUEUE_BULK)
+        self.assertEqual(self.route('data_uploads.tasks.generate_ai_fitments_task'), QUEUE_INTERACTIVE)
+        self.assertEqual(self.route('data_uploads.tasks.cleanup_old_ai_jobs'), QUEUE_MAINTENANCE)
+
+    def test_published_message_carries_queue_and_priority(self):
+        sync_task = app.tasks['vcdb.tasks.sync_vcdb_data_task']
+        sync_task.apply_async(args=(False,), connection=self.connection, ignore_result=True)
+
+        message = self.receive(QUEUE_SYNC)
+        self.assertEqual(message.headers['task'], 'vcdb.tasks.sync_vcdb_data_task')
+        self.assertEqual(message.properties['priority'], PRIORITY_LOW)
+
+    def test_small_job_chunks_are_high_priority(self):
+        chunk_task = app.tasks['data_uploads.tasks.generate_ai_fitments_chunk']
+        chunk_task.s('job', 0, {}).set(priority=PRIORITY_HIGH).apply_async(connection=self.connection, ignore_result=True)
+
+        message = self.receive(QUEUE_BULK)
+        self.assertEqual(message.properties['priority'], PRIORITY_HIGH)
+
+    def test_queue_time_limits_are_applied(self):
+        for task_name, (queue, priority) in TASK_PLACEMENT.items():
+            soft, hard = QUEUE_TIME_LIMITS[queue]
+            task = app.tasks[task_name]
+            with self.subTest(task=task_name):
+                self.assertEqual(task.soft_time_limit, soft)
+                self.assertEqual(task.time_limit, hard)
+                self.assertEqual(task.priority, priority)
+
+
+class UploadStorageTests(SimpleTestCase):
+    def setUp(self):
+        storage_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, storage_dir)
+        patcher = mock.patch.dict(os.environ, {'STORAGE_DIR': storage_dir})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_identical_uploads_share_the_blob_but_not_derived_files(self):
+        paths = [
+            store_upload_stream(SimpleUploadedFile('parts.csv', b'a,b\n1,2\n'), _storage_dir(), 1024)[0]
+            for _ in range(2)
+        ]
+        first, second = Upload(id=uuid.uuid4(), storage_url=paths[0]), Upload(id=uuid.uuid4(), storage_url=paths[1])
+
+        self.assertEqual(first.storage_url, second.storage_url)
+        self.assertNotEqual(_transformed_file_path(first), _transformed_file_path(second))
+        self.assertNotEqual(os.path.dirname(_transformed_file_path(first)), os.path.dirname(first.storage_url))
+
+
+class MakeMatcherTests(SimpleTestCase):
+    def test_leftmost_make_followed_by_a_model_wins(self):
+        matcher = MakeMatcher(['Land', 'Land Rover', 'Ford', 'Rolls-Royce'])
+        found = matcher.extract(pd.Series([
+            'Pads for (land rover Range Rover Sport)', 'Ford, Focus', 'Ghost by Rolls-Royce Ghost Series', 'none',
+        ]))
+
+        self.assertEqual(found.loc[0].tolist(), ['Land Rover', 'Range Rover'])
+        self.assertTrue(found.loc[[1, 3]].isna().all().all())
+        self.assertEqual(found.loc[2].tolist(), ['Rolls-Royce', 'Ghost Series'])
+
+    @mock.patch('workflow.extraction._make_matcher', None)
+    def test_fallback_matcher_is_not_kept(self):
+        with mock.patch.object(Make, 'objects') as makes:
+            makes.values_list.side_effect = DatabaseError('vcdb unavailable')
+            fallback = get_make_matcher()
+            makes.values_list.side_effect = None
+            makes.values_list.return_value.distinct.return_value = ['Polestar']
+            matcher = get_make_matcher()
+
+        self.assertNotIn('polestar', fallback.canonical)
+        self.assertIn('polestar', matcher.canonical)
+        self.assertIn('ford', matcher.canonical)
+
+
+class WorkbookLoaderTests(CacheDirMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        workbook._rows_cache.clear()
+        self.addCleanup(workbook._rows_cache.clear)
+
+    def test_frames_match_read_excel(self):
+        for name in (
+            'Challenge 1 - Original Data + AI Processed Transmission Codes.xlsx',
+            'Challenge 2 - Original Data.xlsx',
+            'Challenge 3 - Original Data.xlsx',
+        ):
+            with self.subTest(name):
+                frame, _ = load_workbook_frame(fixture_path(name), header_row=0)
+                pd.testing.assert_frame_equal(frame, pd.read_excel(fixture_path(name)))
+
+    def test_wide_layout_is_detected(self):
+        path = fixture_path('Challenge 2 - Original Data.xlsx')
+        frame, layout = load_workbook_frame(path)
+
+        self.assertTrue(layout.wide_front_rear)
+        pd.testing.assert_frame_equal(frame, pd.read_excel(path, header=layout.header_row))
+
+    def test_rows_are_cached_in_the_cache_dir_only(self):
+        path = fixture_path('Challenge 3 - Original Data.xlsx')
+        before = set(os.listdir(os.path.dirname(path)))
+        rows = workbook.workbook_rows(path)
+
+        self.assertEqual(set(os.listdir(os.path.dirname(path))), before)
+        self.assertEqual(os.listdir(self.cache_dir), [os.path.basename(workbook.cache_path(path, 'rows'))])
+
+        # Another process: nothing in memory, the cached rows are reused
+        workbook._rows_cache.clear()
+        with mock.patch.object(workbook, '_read_rows', side_effect=AssertionError('workbook parsed again')):
+            self.assertEqual(workbook.workbook_rows(path), rows)
+
+
+class VehicleIndexTests(CacheDirMixin, SimpleTestCase):
+    def test_lookup_falls_back_to_the_normalized_transmission(self):
+        index = VehicleIndex.from_frame(pd.DataFrame({'SKU|Transmission|Year|Make|Model': [
+            'zcca5|42RH|1988|Dodge|B250',
+            'zcca5|42RH|1988|Dodge|B250',
+            'zcca5|A-500|1990|Dodge|D150',
+            'zcca5|A500|1991|Dodge|D250',
+            'zcca6|4L60| | |',
+            'no separator',
+        ]}))
+
+        self.assertEqual(index.lookup('zcca5', '42RH'), [('1988', 'Dodge', 'B250')])
+        self.assertEqual(index.lookup('zcca5', 'A500'), [('1991', 'Dodge', 'D250')])
+        # The first matching key in file order answers a normalized miss
+        self.assertEqual(index.lookup('zcca5', 'a500'), [('1990', 'Dodge', 'D150')])
+        self.assertEqual(index.lookup('zcca6', '4L60'), [])
+        self.assertEqual(index.lookup('zcca7', '42RH'), [])
+        self.assertEqual(len(index), 4)
+
+    def test_index_is_cached_in_the_cache_dir_only(self):
+        path = fixture_path('Challenge 1 - Solution.xlsx')
+        before = set(os.listdir(os.path.dirname(path)))
+        index = load_vehicle_index(path)
+
+        self.assertIn(('1988', 'Dodge', 'B250'), index.lookup('zcca5', '42RH'))
+        self.assertEqual(set(os.listdir(os.path.dirname(path))), before)
+        self.assertTrue(os.path.exists(challenge1.sidecar_path(path)))
+
+        with mock.patch.object(challenge1.pd, 'read_excel', side_effect=AssertionError('workbook parsed again')):
+            cached = load_vehicle_index(path)
+        self.assertEqual(cached.primary, index.primary)
+        self.assertEqual(cached.normalized, index.normalized)
+
+
+class FakeChunkTask:
+    """The parts of a bound Celery task run_chunk uses"""
+    max_retries = 1
+
+    def __init__(self):
+        self.request = mock.Mock(retries=0)
+
+    def retry(self, exc, countdown, max_retries):
+        return RuntimeError(f"retry in {countdown}s")
+
+
+class ChunkOrchestrationTests(TestCase):
+    job_kind = 'test-job'
+
+    def make_chunks(self, count):
+        return [
+            JobChunk.objects.create(job_kind=self.job_kind, job_id='job-1', chunk_index=index)
+            for index in range(count)
+        ]
+
+    def test_pk_ranges_cover_every_row_once(self):
+        self.make_chunks(7)
+        pks = sorted(JobChunk.objects.values_list('pk', flat=True))
+
+        for size in (1, 3, 7, 10):
+            with self.subTest(size=size):
+                expected = [(pks[start], pks[min(start + size, 7) - 1]) for start in range(0, 7, size)]
+                self.assertEqual(pk_ranges(JobChunk.objects.all(), size), expected)
+
+        subset = JobChunk.objects.filter(chunk_index__gte=2)
+        subset_pks = sorted(subset.values_list('pk', flat=True))
+        self.assertEqual(pk_ranges(subset, 4), [(subset_pks[0], subset_pks[3]), (subset_pks[4], subset_pks[4])])
+        self.assertEqual(pk_ranges(JobChunk.objects.none(), 3), [])
+
+    def test_done_chunk_is_not_applied_again(self):
+        self.make_chunks(2)
+        task = FakeChunkTask()
+        apply = mock.Mock(return_value={'created': 2, 'errors': ['row 3']})
+
+        self.assertEqual(run_chunk(task, self.job_kind, 'job-1', 0, apply), {'created': 2, 'errors': ['row 3']})
+        # A redelivery, and one that got past the done check before the first finished
+        self.assertEqual(run_chunk(task, self.job_kind, 'job-1', 0, apply)['created'], 2)
+        checkpoint = _checkpoint(self.job_kind, 'job-1', 0)
+        self.assertEqual(_execute_chunk(task, self.job_kind, 'job-1', 0, checkpoint, apply, None)['created'], 2)
+
+        apply.assert_called_once()
+        chunk = checkpoint.get()
+        self.assertEqual((chunk.status, chunk.attempts), (CHUNK_DONE, 1))
+
+    def test_failed_chunk_retries_then_is_recorded(self):
+        self.make_chunks(2)
+        task = FakeChunkTask()
+        failing = mock.Mock(side_effect=ValueError('bad row'))
+
+        with self.assertLogs('workflow.orchestration', 'WARNING'):
+            with self.assertRaisesMessage(RuntimeError, 'retry in 10s'):
+                run_chunk(task, self.job_kind, 'job-1', 1, failing)
+            result = run_chunk(task, self.job_kind, 'job-1', 1, failing)
+        self.assertEqual(result, {'failed': True, 'error': 'bad row'})
+        run_chunk(task, self.job_kind, 'job-1', 0, mock.Mock(return_value={'created': 3}))
+
+        chunk = _checkpoint(self.job_kind, 'job-1', 1).get()
+        self.assertEqual((chunk.status, chunk.attempts), (CHUNK_FAILED, 2))
+        summary = chunk_summary(self.job_kind, 'job-1')
+        self.assertEqual(summary['created'], 3)
+        self.assertEqual(summary['chunks'], 2)
+        self.assertEqual(
+            [(failed['index'], failed['status'], failed['error']) for failed in summary['failedChunks']],
+            [(1, CHUNK_FAILED, 'bad row')],
+        )
+
+
+class PublishTests(TestCase):
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.base_dir)
+        # Exports are written under BASE_DIR, transformed files under STORAGE_DIR
+        override = override_settings(BASE_DIR=self.base_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+        patcher = mock.patch.dict(os.environ, {'STORAGE_DIR': self.base_dir})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.tenant = Tenant.objects.create(name='Publish Tenant')
+        self.user = User.objects.create_user('publisher')
+        path = os.path.join(self.base_dir, 'fitments.csv')
+        pd.DataFrame({
+            'Part Number': ['P1', 'P2', 'P2', 'P3'],
+            'Year': ['2020', '2021-2023', '2021', '2022'],
+            'Make': ['acura', 'bmw', 'BMW', 'Ford'],
+            'Model': ['ilx', 'x5', 'X5', ''],
+        }).to_csv(path, index=False)
+        self.upload = Upload.objects.create(
+            tenant=self.tenant, filename='fitments.csv', content_type='text/csv', storage_url=path,
+            file_size_bytes=os.path.getsize(path), file_format='csv', preflight_report={'dataType': 'fitments'},
+        )
+
+    def publish(self):
+        request = APIRequestFactory().post('/', HTTP_X_TENANT_ID=str(self.tenant.id))
+        force_authenticate(request, user=self.user)
+        with self.assertLogs('workflow.views', 'INFO') as logs:
+            response = publish(request, upload_id=str(self.upload.id))
+        self.assertEqual(response.status_code, 200)
+        return response.data, logs.output
+
+    def counts(self, data):
+        return tuple(data[key] for key in ('createdCount', 'duplicateCount', 'skippedCount', 'errorCount'))
+
+    def test_publish_counts_rows_and_logs_a_summary(self):
+        data, logs = self.publish()
+
+        self.assertEqual(self.counts(data), (2, 1, 1, 0))
+        self.assertEqual(data['result']['publishedCount'], 4)
+        self.assertIn('skipped 1 records missing required fields', logs[0])
+        self.assertIn(
+            f'Published upload {self.upload.id} (fitments) for tenant {self.tenant.id}: '
+            'created=2, duplicates=1, skipped=1, errors=0, published=4',
+            logs[-1],
+        )
+        self.assertCountEqual(
+            Fitment.objects.filter(tenant=self.tenant).values_list('partId', 'year', 'makeName', 'modelName'),
+            [('P1', 2020, 'ACURA', 'Ilx'), ('P2', 2021, 'BMW', 'X5')],
+        )
+        source = Fitment.objects.get(partId='P2').dynamicFields['sourceUpload']
+        self.assertEqual((source['rowIndex'], source['source']), (2, 'transformed_file'))
+        self.assertEqual(Job.objects.get(job_type='publish').result['createdCount'], 2)
+
+        # Publishing again inserts nothing
+        data, _ = self.publish()
+        self.assertEqual(self.counts(data), (0, 3, 1, 0))
+        self.assertEqual(Fitment.objects.filter(tenant=self.tenant).count(), 2)
+
+
+class MappingMemoryTests(TestCase):
+    headers = ['Part Number', 'Year', 'Make', 'Model']
+    rows = [
+        {'Part Number': 'P1', 'Year': 2020, 'Make': 'Acura', 'Model': 'ILX'},
+        {'Part Number': 'P2', 'Year': 2021, 'Make': 'Ford', 'Model': 'Focus'},
+    ]
+    mappings = [
+        {'source': 'Part Number', 'target': 'partId', 'confidence': 0.9},
+        {'source': 'Year', 'target': 'year', 'confidence': 0.95},
+        {'source': 'Make', 'target': 'makeName', 'confidence': 0.95},
+        {'source': 'Model', 'target': 'modelName', 'confidence': 0.95},
+    ]
+
+    def setUp(self):
+        self.storage_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.storage_dir)
+        patcher = mock.patch.dict(os.environ, {'AZURE_OPENAI_ENDPOINT': '', 'AZURE_OPENAI_API_KEY': ''})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.tenant = Tenant.objects.create(name='Mapping Tenant')
+        self.user = User.objects.create_user('mapper')
+        # Accepted when the first upload of the template was transformed
+        remember_mappings(
+            self.tenant, 'fitments', self.headers, self.mappings, profile_samples(self.headers, self.rows),
+        )
+
+    def map_upload(self, frame):
+        path = os.path.join(self.storage_dir, f'{uuid.uuid4()}.csv')
+        frame.to_csv(path, index=False)
+        upload = Upload.objects.create(
+            tenant=self.tenant, filename='weekly.csv', content_type='text/csv', storage_url=path,
+            file_size_bytes=os.path.getsize(path), file_format='csv', preflight_report={'dataType': 'fitments'},
+        )
+        request = APIRequestFactory().post('/', {}, format='json')
+        force_authenticate(request, user=self.user)
+        with mock.patch.object(views, '_fallback_column_mapping', wraps=views._fallback_column_mapping) as fallback:
+            response = ai_map(request, upload_id=str(upload.id))
+        self.assertEqual(response.status_code, 200)
+        return response.data['suggestions'], fallback
+
+    def test_same_template_reuses_the_remembered_mapping(self):
+        # Next week's file: columns reordered, renamed in case and spacing
+        frame = pd.DataFrame(self.rows).rename(columns={'Part Number': 'part  number', 'Make': 'MAKE'})
+        suggestions, fallback = self.map_upload(frame[['Model', 'MAKE', 'Year', 'part  number']])
+
+        fallback.assert_not_called()
+        self.assertEqual(suggestions['mappingMemory']['match'], 'exact')
+        self.assertEqual(
+            [(mapping['source'], mapping['target']) for mapping in suggestions['columnMappings']],
+            [('part  number', 'partId'), ('Year', 'year'), ('MAKE', 'makeName'), ('Model', 'modelName')],
+        )
+        self.assertEqual(Job.objects.get(job_type='data-upload').status, 'transforming')
+        self.assertEqual(ColumnMappingMemory.objects.get(tenant=self.tenant).hit_count, 1)
+
+    def test_only_novel_columns_are_mapped_afresh(self):
+        frame = pd.DataFrame(self.rows).assign(Position=['Front', 'Rear'])
+        suggestions, fallback = self.map_upload(frame)
+
+        fallback.assert_called_once_with(['Position'], 'fitments')
+        self.assertEqual(suggestions['mappingMemory']['match'], 'near')
+        self.assertEqual(suggestions['mappingMemory']['novelColumns'], ['Position'])
+        self.assertEqual(
+            [mapping['source'] for mapping in suggestions['columnMappings']][:4], self.headers,
+        )
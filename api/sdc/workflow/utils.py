@@ -1,10 +1,21 @@
 import io
+import os
 import csv
+import uuid
 import hashlib
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
 import chardet
 import mimetypes
-from openpyxl import load_workbook
+
+# Preflight only ever looks at the start of a delimited file
+HEAD_SAMPLE_BYTES = 64 * 1024
+
+# Keys produced by preflight itself (later steps add their own keys to the report)
+PREFLIGHT_KEYS = ("mime", "checksum", "headers", "issues", "fileFormat", "encoding", "delimiter")
+
+
+class UploadTooLarge(Exception):
+    """Raised while streaming an upload once it exceeds the size limit"""
 
 
 def compute_checksum(file_bytes: bytes) -> str:
@@ -24,35 +35,108 @@ def sniff_delimiter(sample: str) -> str:
         return ","
 
 
-def preflight(file_bytes: bytes, filename: str) -> Dict[str, Any]:
-    mime = detect_mime_from_name(filename)
-    checksum = compute_checksum(file_bytes)
-    report: Dict[str, Any] = {"mime": mime, "checksum": checksum, "headers": [], "issues": []}
-    if filename.lower().endswith((".xlsx", ".xlsm")):
-        wb = load_workbook(io.BytesIO(file_bytes), read_only=True)
+def _preflight_delimited(head: bytes, report: Dict[str, Any]) -> None:
+    detected = chardet.detect(head[:4096])
+    encoding = detected.get("encoding") or "utf-8"
+    sample = head[:2048].decode(encoding=encoding, errors="ignore")
+    delimiter = sniff_delimiter(sample)
+    report["fileFormat"] = "csv"
+    report["encoding"] = encoding
+    report["delimiter"] = delimiter
+    reader = csv.reader(io.StringIO(head.decode(encoding, errors="ignore")), delimiter=delimiter)
+    try:
+        headers = next(reader)
+    except StopIteration:
+        headers = []
+    report["headers"] = [h.strip() for h in headers]
+
+
+def _preflight_workbook(source, report: Dict[str, Any]) -> None:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(source, read_only=True)
+    try:
         ws = wb.active
         headers = [str(c.value).strip() if c.value is not None else "" for c in next(ws.iter_rows(min_row=1, max_row=1))]
-        report["fileFormat"] = "xlsx"
-        report["headers"] = headers
-    else:
-        # assume text delimited
-        detected = chardet.detect(file_bytes[:4096])
-        encoding = detected.get("encoding") or "utf-8"
-        sample = file_bytes[:2048].decode(encoding=encoding, errors="ignore")
-        delimiter = sniff_delimiter(sample)
-        report["fileFormat"] = "csv"
-        report["encoding"] = encoding
-        report["delimiter"] = delimiter
-        reader = csv.reader(io.StringIO(file_bytes.decode(encoding, errors="ignore")), delimiter=delimiter)
-        try:
-            headers = next(reader)
-        except StopIteration:
-            headers = []
-        headers = [h.strip() for h in headers]
-        report["headers"] = headers
+    finally:
+        wb.close()
+    report["fileFormat"] = "xlsx"
+    report["headers"] = headers
+
+
+def _check_headers(report: Dict[str, Any]) -> Dict[str, Any]:
     # simple header checks
     if len(report["headers"]) != len(set([h.lower() for h in report["headers"] if h])):
         report["issues"].append("duplicate_headers")
     if any(not h for h in report["headers"]):
         report["issues"].append("empty_headers")
     return report
+
+
+def preflight(file_bytes: bytes, filename: str, checksum: Optional[str] = None) -> Dict[str, Any]:
+    mime = detect_mime_from_name(filename)
+    checksum = checksum or compute_checksum(file_bytes)
+    report: Dict[str, Any] = {"mime": mime, "checksum": checksum, "headers": [], "issues": []}
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        _preflight_workbook(io.BytesIO(file_bytes), report)
+    else:
+        # assume text delimited
+        _preflight_delimited(file_bytes[:HEAD_SAMPLE_BYTES], report)
+    return _check_headers(report)
+
+
+def preflight_path(path: str, filename: str, checksum: str) -> Dict[str, Any]:
+    """Preflight a stored file; delimited files are only read up to a head sample"""
+    mime = detect_mime_from_name(filename)
+    report: Dict[str, Any] = {"mime": mime, "checksum": checksum, "headers": [], "issues": []}
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        # read_only workbooks stream rows from the archive instead of loading it whole
+        _preflight_workbook(path, report)
+    else:
+        with open(path, "rb") as fh:
+            _preflight_delimited(fh.read(HEAD_SAMPLE_BYTES), report)
+    return _check_headers(report)
+
+
+def store_upload_stream(file_obj, dest_dir: str, max_bytes: int) -> Tuple[str, str, int, bool]:
+    """
+    Stream an uploaded file to content-addressed storage.
+
+    Chunks are written to a temporary file while being hashed and counted, so
+    memory stays bounded and oversized uploads are rejected as soon as they
+    cross ``max_bytes``. The blob is stored at ``blobs/<sha[:2]>/<sha><ext>``;
+    if it already exists the temporary copy is discarded.
+
+    Returns (path, checksum, size_bytes, reused).
+    """
+    blob_root = os.path.join(dest_dir, "blobs")
+    os.makedirs(blob_root, exist_ok=True)
+    tmp_path = os.path.join(blob_root, f".incoming-{uuid.uuid4().hex}")
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, "wb") as out:
+            for chunk in file_obj.chunks():
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    checksum = digest.hexdigest()
+    ext = os.path.splitext(file_obj.name or "")[1].lower()
+    blob_dir = os.path.join(blob_root, checksum[:2])
+    os.makedirs(blob_dir, exist_ok=True)
+    blob_path = os.path.join(blob_dir, f"{checksum}{ext}")
+
+    if os.path.exists(blob_path):
+        os.remove(tmp_path)
+        return blob_path, checksum, size, True
+
+    os.replace(tmp_path, blob_path)
+    return blob_path, checksum, size, False
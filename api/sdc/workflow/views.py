@@ -6,23 +6,34 @@ from django.utils import timezone
 from django.conf import settings
 from django.db.models import Q
 from django.http import Http404
+import logging
 import os
 import uuid
 import requests
-import pandas as pd
+from sdc.lazy_imports import lazy_module
 
-from azure.storage.blob import BlobServiceClient, ContentSettings
-from azure.core.exceptions import ResourceExistsError
-from .utils import preflight, compute_checksum
+from .utils import (
+    preflight_path, detect_mime_from_name, store_upload_stream, UploadTooLarge, PREFLIGHT_KEYS,
+)
+from .extraction import enrich_from_descriptions, fill_required_from_columns
+from .publishing import publish_fitment_frame
+from .mapping_memory import profile_samples, recall_mappings, remember_mappings
+from .challenge1 import VehicleIndex, get_vehicle_index
+from .workbook import load_workbook_frame, read_upload_frame
 
 from .models import Upload, Job, NormalizationResult, Lineage, Preset
 from tenants.models import Tenant
 from tenants.utils import get_tenant_from_request, filter_queryset_by_tenant, get_tenant_id_from_request
 from fitments.models import Fitment
+from fitments.publishing import bulk_publish_fitments
 from data_uploads.models import ProductData
 from django.core.exceptions import ValidationError
 import uuid
 
+pd = lazy_module('pandas')
+
+logger = logging.getLogger(__name__)
+
 
 def _storage_dir() -> str:
     base = os.environ.get("STORAGE_DIR") or os.path.join(settings.BASE_DIR, "..", "storage", "customer")
@@ -30,6 +41,47 @@ def _storage_dir() -> str:
     return base
 
 
+def _transformed_file_path(upload) -> str:
+    """
+    Where the mapped rows of an upload are saved. Blobs are shared by every
+    upload of the same bytes, so files derived from one upload are named
+    after the upload, never after its blob.
+    """
+    return os.path.join(_storage_dir(), f"{upload.id}_transformed.csv")
+
+
+def _existing_transformed_file(upload):
+    path = _transformed_file_path(upload)
+    return path if os.path.exists(path) else None
+
+
+def _ingest_upload(file_obj, max_mb: int):
+    """
+    Stream an upload into content-addressed storage and preflight it.
+    Re-uploading identical bytes reuses the stored blob and the preflight
+    report of the earlier upload. Raises UploadTooLarge past ``max_mb``.
+    """
+    storage_url, checksum, file_size, reused = store_upload_stream(
+        file_obj, _storage_dir(), max_mb * 1024 * 1024
+    )
+
+    pf = None
+    if reused:
+        previous = (
+            Upload.objects.filter(checksum=checksum, storage_url=storage_url)
+            .exclude(preflight_report=None)
+            .order_by("-created_at")
+            .values_list("preflight_report", flat=True)
+            .first()
+        )
+        if previous and previous.get("fileFormat"):
+            pf = {key: previous[key] for key in PREFLIGHT_KEYS if key in previous}
+            pf["mime"] = detect_mime_from_name(file_obj.name)
+    if pf is None:
+        pf = preflight_path(storage_url, file_obj.name, checksum)
+    return storage_url, checksum, file_size, pf
+
+
 def get_or_create_upload_job(upload, data_type="fitments"):
     """
     Get or create a single job for an upload that tracks the entire data upload flow.
@@ -88,31 +140,19 @@ def uploads(request):
         return Response({"message": "Invalid or missing tenantId; no default tenant found"}, status=status.HTTP_400_BAD_REQUEST)
     preset_id = request.POST.get("presetId")
 
-    # read bytes (bounded by server max upload settings)
-    file_bytes = file_obj.read()
-    file_obj.seek(0)
-    pf = preflight(file_bytes, file_obj.name)
-    checksum = pf.get("checksum") or compute_checksum(file_bytes)
-
-    # size limit (default 250MB)
+    # Stream to content-addressed storage (size limit default 250MB)
     max_mb = int(os.getenv("MAX_UPLOAD_MB", "250"))
-    if len(file_bytes) > max_mb * 1024 * 1024:
+    try:
+        storage_url, checksum, file_size, pf = _ingest_upload(file_obj, max_mb)
+    except UploadTooLarge:
         return Response({"message": f"File too large (> {max_mb} MB)"}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
 
-    # Always use local storage (per user requirement)
-        safe_name = f"{uuid.uuid4().hex}_{file_obj.name}"
-        dest_dir = _storage_dir()
-        dest_path = os.path.join(dest_dir, safe_name)
-        with open(dest_path, "wb") as out:
-            out.write(file_bytes)
-        storage_url = dest_path
-
     upload = Upload(
         tenant_id=str(tenant_obj.id),
         filename=file_obj.name,
         content_type=file_obj.content_type or "application/octet-stream",
         storage_url=storage_url,
-        file_size_bytes=len(file_bytes),
+        file_size_bytes=file_size,
         status="received",
         checksum=checksum,
         file_format=pf.get("fileFormat"),
@@ -159,7 +199,8 @@ def ai_map(request, upload_id: str):
         else:
             # Local file
             if upload.file_format == "xlsx":
-                df = pd.read_excel(upload.storage_url, nrows=10)
+                # Full single read; later stages reuse the parsed workbook
+                df = load_workbook_frame(upload.storage_url, header_row=0)[0].head(10)
             else:
                 delimiter = upload.preflight_report.get("delimiter", ",") if upload.preflight_report else ","
                 encoding = upload.preflight_report.get("encoding", "utf-8") if upload.preflight_report else "utf-8"
@@ -172,6 +213,27 @@ def ai_map(request, upload_id: str):
         headers = upload.preflight_report.get("headers", []) if upload.preflight_report else []
         sample_data = []
     
+    # Reuse mappings accepted for the same (or a similar) header template
+    sample_profile = profile_samples(headers, sample_data)
+    recall = recall_mappings(upload.tenant, data_type, headers, sample_profile)
+    job.params["mappingHeaders"] = [str(h) for h in headers]
+    job.params["mappingSampleProfile"] = sample_profile
+    
+    if recall.match == "exact" or (recall.match == "near" and not recall.novel_headers):
+        suggestions = {
+            "columnMappings": recall.column_mappings,
+            "mappingMemory": recall.as_dict(),
+        }
+        # Update job status - AI mapping completed, moving to transformation
+        job.status = "transforming"
+        job.params["currentStage"] = "transforming"
+        job.result = suggestions
+        job.save()
+        return Response({"jobId": str(job.id), "suggestions": suggestions})
+    
+    # Only columns the memory knows nothing about go to the model
+    model_headers = recall.novel_headers if recall.match == "near" else headers
+    
     # Try Azure AI Foundry first
     suggestions = None
     endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
@@ -322,7 +384,7 @@ def ai_map(request, upload_id: str):
                 for idx, row in enumerate(sample_data[:5]):
                     sample_data_str += f"\nRow {idx + 1}:\n"
                     for col, val in row.items():
-                        if pd.notna(val) and str(val).strip():
+                        if col in model_headers and pd.notna(val) and str(val).strip():
                             sample_data_str += f"  {col}: {str(val)[:100]}\n"  # Limit value length
             
             # Build configuration context for AI prompt
@@ -365,7 +427,7 @@ def ai_map(request, upload_id: str):
             prompt = f"""You are an expert automotive data mapping specialist with advanced NLP capabilities. Your task is to map messy, unpredictable source data to VCDB-standard target fields and ensure the output is properly formatted for database storage.
 
 SOURCE COLUMNS (may have inconsistent names):
-{', '.join(headers)}
+{', '.join(model_headers)}
 
 TARGET FIELDS (VCDB standards - MUST map to these exact field names):
 {', '.join(target_fields)}
@@ -497,6 +559,8 @@ CRITICAL REQUIREMENTS:
                 content = content[:-3]
             
             suggestions = json.loads(content.strip())
+            suggestions["columnMappings"] = _merge_recalled_mappings(recall, suggestions.get("columnMappings", []))
+            suggestions["mappingMemory"] = recall.as_dict()
             # Update job status - AI mapping completed, moving to transformation
             job.status = "transforming"
             job.params = job.params or {}
@@ -508,7 +572,8 @@ CRITICAL REQUIREMENTS:
             print(f"Azure AI Foundry error: {str(e)}")
             # Fallback to rule-based mapping
             suggestions = {
-                "columnMappings": _fallback_column_mapping(headers, data_type),
+                "columnMappings": _merge_recalled_mappings(recall, _fallback_column_mapping(model_headers, data_type)),
+                "mappingMemory": recall.as_dict(),
             }
             # Update job status - AI mapping completed, moving to transformation
             job.status = "transforming"
@@ -521,7 +586,8 @@ CRITICAL REQUIREMENTS:
         # Fallback to rule-based mapping
         data_type = request.data.get("dataType") or (upload.preflight_report.get("dataType") if upload.preflight_report else "fitments")
         suggestions = {
-            "columnMappings": _fallback_column_mapping(headers, data_type),
+            "columnMappings": _merge_recalled_mappings(recall, _fallback_column_mapping(model_headers, data_type)),
+            "mappingMemory": recall.as_dict(),
     }
     # Update job status - AI mapping completed, moving to transformation
     job.status = "transforming"
@@ -533,6 +599,14 @@ CRITICAL REQUIREMENTS:
     return Response({"jobId": str(job.id), "suggestions": suggestions})
 
 
+def _merge_recalled_mappings(recall, mappings: list) -> list:
+    """Remembered mappings first, then new mappings for columns they do not cover"""
+    if not recall.column_mappings:
+        return mappings
+    recalled_sources = {m.get("source") for m in recall.column_mappings}
+    return recall.column_mappings + [m for m in mappings if m.get("source") not in recalled_sources]
+
+
 def _generate_ai_reasoning_and_confidence(row_data: dict, column_mappings: list, data_type: str, original_row: dict = None) -> tuple:
     """
     Generate AI reasoning and confidence explanation for a row based on mapping quality.
@@ -696,9 +770,6 @@ def _extract_missing_data_from_descriptions(mapped_df, original_df, column_mappi
     Handles messy data by using NLP/regex to extract Year/Make/Model from descriptions.
     Returns the enhanced dataframe and extraction metadata for UI display.
     """
-    import re
-    import pandas as pd
-    
     # Track extraction metadata for UI feedback
     extraction_metadata = {
         'extracted_fields': [],
@@ -706,26 +777,6 @@ def _extract_missing_data_from_descriptions(mapped_df, original_df, column_mappi
         'extraction_summary': {}
     }
     
-    # Find description-like columns that might contain vehicle info
-    description_columns = []
-    for col in original_df.columns:
-        col_lower = col.lower()
-        if any(keyword in col_lower for keyword in ['description', 'desc', 'notes', 'comment', 'item', 'name', 'title', 'spec', 'detail', 'vehicle', 'info', 'product']):
-            if col not in column_mappings.values():  # Not already mapped
-                description_columns.append(col)
-    
-    # Also check ALL columns for potential data (not just description-like ones)
-    all_columns_to_check = list(original_df.columns)
-    
-    # Prioritize "Vehicle Info" column if it exists (often contains model/submodel)
-    vehicle_info_col = None
-    for col in original_df.columns:
-        if 'vehicle' in col.lower() and 'info' in col.lower():
-            vehicle_info_col = col
-            if col not in description_columns:
-                description_columns.insert(0, col)  # Put it first
-            break
-    
     # Check which required fields are missing
     required_fields = ['year', 'makeName', 'modelName']
     missing_fields = [field for field in required_fields if field not in mapped_df.columns or mapped_df[field].isna().all()]
@@ -735,326 +786,22 @@ def _extract_missing_data_from_descriptions(mapped_df, original_df, column_mappi
         if not mapped_df['position'].isna().all() and not mapped_df['partId'].isna().all():
             return mapped_df, extraction_metadata
     
-    # Extract from descriptions using regex patterns
-    for idx, row in mapped_df.iterrows():
-        row_extractions = []
-        
-        # Try to extract from description columns first
-        for desc_col in description_columns:
-            if desc_col in original_df.columns:
-                desc_value = str(original_df.loc[idx, desc_col]) if pd.notna(original_df.loc[idx, desc_col]) else ""
-                
-                if not desc_value or len(desc_value.strip()) < 3:
-                    continue
-                
-                # Extract year (YYYY or YYYY-YYYY or 2-digit years)
-                if 'year' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'year']):
-                    # Pattern for 4-digit years
-                    year_pattern = r'\b(19|20)\d{2}(?:\s*-\s*(?:19|20)\d{2})?\b'
-                    year_match = re.search(year_pattern, desc_value)
-                    if not year_match:
-                        # Try 2-digit years (92-94, 05-10, etc.)
-                        year_pattern_2digit = r'\b(\d{2})(?:\s*-\s*(\d{2}))?\b'
-                        year_match_2digit = re.search(year_pattern_2digit, desc_value)
-                        if year_match_2digit:
-                            year_val = int(year_match_2digit.group(1))
-                            # Heuristic: if < 30, assume 2000s, else 1900s
-                            if year_val < 30:
-                                year_val = 2000 + year_val
-                            else:
-                                year_val = 1900 + year_val
-                            mapped_df.loc[idx, 'year'] = year_val
-                            row_extractions.append({
-                                'field': 'year',
-                                'value': year_val,
-                                'source': desc_col,
-                                'method': 'extracted_from_text',
-                                'confidence': 0.75
-                            })
-                    else:
-                        year_str = year_match.group(0)
-                        if '-' in year_str:
-                            year_str = year_str.split('-')[0].strip()
-                        try:
-                            year_val = int(year_str)
-                            mapped_df.loc[idx, 'year'] = year_val
-                            row_extractions.append({
-                                'field': 'year',
-                                'value': year_val,
-                                'source': desc_col,
-                                'method': 'extracted_from_text',
-                                'confidence': 0.85
-                            })
-                        except:
-                            pass
-                
-                # Extract Make and Model (enhanced patterns)
-                if 'makeName' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'makeName']) or \
-                   'modelName' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'modelName']):
-                    
-                    # Pattern 1: "for YYYY Make Model" or "for YYYY-YYYY Make Model" (e.g., "for 2023 Ford F-150")
-                    vehicle_pattern1 = r'(?:for|fits?|compatible with|works with)\s+(?:\d{2,4}(?:\s*-\s*\d{2,4})?\s+)?([A-Z][A-Za-z]+(?:\s+[A-Z][A-Za-z]+)?)\s+([A-Z][A-Za-z]+(?:\s+[A-Z][A-Za-z0-9\-]+)?)'
-                    vehicle_match1 = re.search(vehicle_pattern1, desc_value, re.IGNORECASE)
-                    if vehicle_match1:
-                        make = vehicle_match1.group(1).strip()
-                        model = vehicle_match1.group(2).strip()
-                        # Clean model (remove engine info like "5.0L" if present)
-                        model = re.sub(r'\s+\d+\.\d+L.*$', '', model).strip()
-                        
-                        if 'makeName' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'makeName']):
-                            mapped_df.loc[idx, 'makeName'] = make
-                            row_extractions.append({
-                                'field': 'makeName',
-                                'value': make,
-                                'source': desc_col,
-                                'method': 'extracted_from_text',
-                                'confidence': 0.85
-                            })
-                        
-                        if 'modelName' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'modelName']):
-                            mapped_df.loc[idx, 'modelName'] = model
-                            row_extractions.append({
-                                'field': 'modelName',
-                                'value': model,
-                                'source': desc_col,
-                                'method': 'extracted_from_text',
-                                'confidence': 0.85
-                            })
-                    
-                    # Pattern 2: "YYYY Make Model" (e.g., "2023 Ford F-150")
-                    if ('makeName' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'makeName'])) or \
-                       ('modelName' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'modelName'])):
-                        vehicle_pattern2 = r'\b(19|20)\d{2}\s+([A-Z][A-Za-z]+(?:\s+[A-Z][A-Za-z]+)?)\s+([A-Z][A-Za-z]+(?:\s+[A-Z][A-Za-z0-9\-]+)?)'
-                        vehicle_match2 = re.search(vehicle_pattern2, desc_value)
-                        if vehicle_match2:
-                            make = vehicle_match2.group(2).strip()
-                            model = vehicle_match2.group(3).strip()
-                            # Clean model
-                            model = re.sub(r'\s+\d+\.\d+L.*$', '', model).strip()
-                            
-                            if 'makeName' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'makeName']):
-                                mapped_df.loc[idx, 'makeName'] = make
-                                row_extractions.append({
-                                    'field': 'makeName',
-                                    'value': make,
-                                    'source': desc_col,
-                                    'method': 'extracted_from_text',
-                                    'confidence': 0.80
-                                })
-                            
-                            if 'modelName' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'modelName']):
-                                mapped_df.loc[idx, 'modelName'] = model
-                                row_extractions.append({
-                                    'field': 'modelName',
-                                    'value': model,
-                                    'source': desc_col,
-                                    'method': 'extracted_from_text',
-                                    'confidence': 0.80
-                                })
-                    
-                    # Pattern 3: "Make Model" (fallback - look for common makes)
-                    if ('makeName' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'makeName'])) or \
-                       ('modelName' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'modelName'])):
-                        common_makes = ['Ford', 'Chevrolet', 'Chevy', 'Toyota', 'Honda', 'BMW', 'Mercedes', 'Audi', 'KIA', 'Kia', 'Acura', 'Nissan', 'Dodge', 'Ram', 'GMC', 'Jeep', 'Subaru', 'Mazda', 'Volkswagen', 'VW', 'Hyundai', 'Lexus', 'Infiniti', 'Cadillac', 'Lincoln', 'Buick', 'Chrysler', 'Jaguar', 'Land Rover', 'Porsche', 'Tesla', 'Volvo', 'Mitsubishi', 'Suzuki', 'Isuzu', 'Fiat', 'Alfa Romeo', 'Genesis', 'Maserati', 'Bentley', 'Rolls-Royce', 'Ferrari', 'Lamborghini', 'McLaren', 'Aston Martin', 'Lotus', 'AC']
-                        for make in common_makes:
-                            make_pattern = rf'\b{re.escape(make)}\s+([A-Z][A-Za-z]+(?:\s+[A-Z][A-Za-z0-9\-]+)?)'
-                            make_match = re.search(make_pattern, desc_value, re.IGNORECASE)
-                            if make_match:
-                                model = make_match.group(1).strip()
-                                # Clean model
-                                model = re.sub(r'\s+\d+\.\d+L.*$', '', model).strip()
-                                
-                                if 'makeName' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'makeName']):
-                                    mapped_df.loc[idx, 'makeName'] = make
-                                    row_extractions.append({
-                                        'field': 'makeName',
-                                        'value': make,
-                                        'source': desc_col,
-                                        'method': 'inferred_from_text',
-                                        'confidence': 0.70
-                                    })
-                                
-                                if 'modelName' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'modelName']):
-                                    mapped_df.loc[idx, 'modelName'] = model
-                                    row_extractions.append({
-                                        'field': 'modelName',
-                                        'value': model,
-                                        'source': desc_col,
-                                        'method': 'inferred_from_text',
-                                        'confidence': 0.70
-                                    })
-                                break
-                
-                # Also check "Vehicle Info" column for model/submodel if description didn't work
-                if vehicle_info_col and vehicle_info_col in original_df.columns:
-                    vehicle_info_value = str(original_df.loc[idx, vehicle_info_col]) if pd.notna(original_df.loc[idx, vehicle_info_col]) else ""
-                    if vehicle_info_value and len(vehicle_info_value.strip()) > 2:
-                        # Vehicle Info often has just model/submodel (e.g., "F-150 Platinum", "Optima")
-                        # Try to extract model from it
-                        if 'modelName' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'modelName']):
-                            # Check if it's a model name (common patterns)
-                            model_pattern = r'^([A-Z][A-Za-z]+(?:\s+[A-Z][A-Za-z0-9\-]+)?)'
-                            model_match = re.search(model_pattern, vehicle_info_value)
-                            if model_match:
-                                model = model_match.group(1).strip()
-                                # Remove submodel/trim info (e.g., "F-150 Platinum" -> "F-150")
-                                model = re.sub(r'\s+(Platinum|Limited|SE|XLT|LT|SR|EX|LX|Base).*$', '', model, flags=re.IGNORECASE).strip()
-                                if len(model) > 1:
-                                    mapped_df.loc[idx, 'modelName'] = model
-                                    row_extractions.append({
-                                        'field': 'modelName',
-                                        'value': model,
-                                        'source': vehicle_info_col,
-                                        'method': 'extracted_from_vehicle_info',
-                                        'confidence': 0.75
-                                    })
-                        
-                        # Extract submodel/trim from Vehicle Info
-                        if 'subModelName' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'subModelName']):
-                            # Look for trim levels in Vehicle Info
-                            trim_pattern = r'\b(Platinum|Limited|SE|XLT|LT|SR|EX|LX|Base|Premium|Sport|Touring|Elite|Ultimate)\b'
-                            trim_match = re.search(trim_pattern, vehicle_info_value, re.IGNORECASE)
-                            if trim_match:
-                                submodel = trim_match.group(1).strip()
-                                mapped_df.loc[idx, 'subModelName'] = submodel
-                                row_extractions.append({
-                                    'field': 'subModelName',
-                                    'value': submodel,
-                                    'source': vehicle_info_col,
-                                    'method': 'extracted_from_vehicle_info',
-                                    'confidence': 0.80
-                                })
-                
-                # Extract position (FRONT/REAR) - enhanced patterns
-                if 'position' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'position']):
-                    if re.search(r'\b(FRONT|Front|front|F|FWD|forward)\b', desc_value, re.IGNORECASE):
-                        mapped_df.loc[idx, 'position'] = 'Front'
-                        row_extractions.append({
-                            'field': 'position',
-                            'value': 'Front',
-                            'source': desc_col,
-                            'method': 'extracted_from_text',
-                            'confidence': 0.90
-                        })
-                    elif re.search(r'\b(REAR|Rear|rear|R|back|backward)\b', desc_value, re.IGNORECASE):
-                        mapped_df.loc[idx, 'position'] = 'Rear'
-                        row_extractions.append({
-                            'field': 'position',
-                            'value': 'Rear',
-                            'source': desc_col,
-                            'method': 'extracted_from_text',
-                            'confidence': 0.90
-                        })
-                
-                # Extract part number from various formats
-                if 'partId' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'partId']):
-                    # Look for patterns like "Part #: XXX" or "SKU: XXX" or alphanumeric codes
-                    part_patterns = [
-                        (r'Part\s*#?\s*:?\s*([A-Z0-9\-]+)', 0.95),
-                        (r'SKU\s*:?\s*([A-Z0-9\-]+)', 0.95),
-                        (r'Item\s*#?\s*:?\s*([A-Z0-9\-]+)', 0.90),
-                        (r'Product\s*#?\s*:?\s*([A-Z0-9\-]+)', 0.90),
-                        (r'\b([A-Z]{2,}\d{2,}[A-Z0-9\-]*)\b', 0.70),  # Alphanumeric codes
-                        (r'\b([A-Z0-9]{6,})\b', 0.60)  # Long alphanumeric strings
-                    ]
-                    for pattern, confidence in part_patterns:
-                        part_match = re.search(pattern, desc_value, re.IGNORECASE)
-                        if part_match:
-                            part_id = part_match.group(1).strip()
-                            if len(part_id) >= 3:  # Minimum length check
-                                mapped_df.loc[idx, 'partId'] = part_id
-                                row_extractions.append({
-                                    'field': 'partId',
-                                    'value': part_id,
-                                    'source': desc_col,
-                                    'method': 'extracted_from_text',
-                                    'confidence': confidence
-                                })
-                                break
-                
-                # Extract technical specs (rotor diameter, bolt pattern, etc.)
-                if 'rotorDiameter' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'rotorDiameter']):
-                    # Look for diameter patterns: "11.8 inches", "300mm", "11.8\""
-                    diameter_patterns = [
-                        r'(\d+\.?\d*)\s*(?:inches|inch|in|"|mm)',
-                        r'diameter[:\s]+(\d+\.?\d*)',
-                        r'(\d+\.?\d*)\s*x\s*\d+\.?\d*'  # Dimensions like "11.8 x 1.2"
-                    ]
-                    for pattern in diameter_patterns:
-                        match = re.search(pattern, desc_value, re.IGNORECASE)
-                        if match:
-                            try:
-                                diameter = float(match.group(1))
-                                # Convert mm to inches if needed
-                                if 'mm' in desc_value.lower():
-                                    diameter = diameter / 25.4
-                                mapped_df.loc[idx, 'rotorDiameter'] = diameter
-                                row_extractions.append({
-                                    'field': 'rotorDiameter',
-                                    'value': diameter,
-                                    'source': desc_col,
-                                    'method': 'extracted_from_text',
-                                    'confidence': 0.75
-                                })
-                                break
-                            except:
-                                pass
-                
-                # Extract bolt pattern
-                if 'boltPattern' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'boltPattern']):
-                    bolt_pattern = r'(\d+)\s*x\s*(\d+\.?\d*)'
-                    match = re.search(bolt_pattern, desc_value)
-                    if match:
-                        bolts = match.group(1)
-                        pcd = match.group(2)
-                        bolt_pattern_str = f"{bolts}x{pcd}"
-                        mapped_df.loc[idx, 'boltPattern'] = bolt_pattern_str
-                        row_extractions.append({
-                            'field': 'boltPattern',
-                            'value': bolt_pattern_str,
-                            'source': desc_col,
-                            'method': 'extracted_from_text',
-                            'confidence': 0.80
-                        })
-        
-        # If still missing critical fields, try to infer from ALL columns
-        if 'year' not in mapped_df.columns or pd.isna(mapped_df.loc[idx, 'year']):
-            # Check all columns for year-like values
-            for col in all_columns_to_check:
-                val = str(original_df.loc[idx, col]) if pd.notna(original_df.loc[idx, col]) else ""
-                if len(val) < 2:
-                    continue
-                # Try 4-digit years first
-                year_match = re.search(r'\b(19|20)\d{2}\b', val)
-                if year_match:
-                    try:
-                        year_val = int(year_match.group(0))
-                        mapped_df.loc[idx, 'year'] = year_val
-                        row_extractions.append({
-                            'field': 'year',
-                            'value': year_val,
-                            'source': col,
-                            'method': 'inferred_from_column',
-                            'confidence': 0.70
-                        })
-                        break
-                    except:
-                        pass
-        
-        # Store extraction metadata for this row
-        if row_extractions:
-            extraction_metadata['extracted_fields'].extend(row_extractions)
-            for ext in row_extractions:
-                field = ext['field']
-                if field not in extraction_metadata['extraction_summary']:
-                    extraction_metadata['extraction_summary'][field] = {
-                        'count': 0,
-                        'methods': set(),
-                        'sources': set()
-                    }
-                extraction_metadata['extraction_summary'][field]['count'] += 1
-                extraction_metadata['extraction_summary'][field]['methods'].add(ext['method'])
-                extraction_metadata['extraction_summary'][field]['sources'].add(ext['source'])
+    # Extract from descriptions column-at-a-time (see workflow.extraction)
+    row_extractions = enrich_from_descriptions(mapped_df, original_df, column_mappings)
+    
+    # Store extraction metadata
+    extraction_metadata['extracted_fields'].extend(row_extractions)
+    for ext in row_extractions:
+        field = ext['field']
+        if field not in extraction_metadata['extraction_summary']:
+            extraction_metadata['extraction_summary'][field] = {
+                'count': 0,
+                'methods': set(),
+                'sources': set()
+            }
+        extraction_metadata['extraction_summary'][field]['count'] += 1
+        extraction_metadata['extraction_summary'][field]['methods'].add(ext['method'])
+        extraction_metadata['extraction_summary'][field]['sources'].add(ext['source'])
     
     # Convert sets to lists for JSON serialization
     for field in extraction_metadata['extraction_summary']:
@@ -1065,108 +812,57 @@ def _extract_missing_data_from_descriptions(mapped_df, original_df, column_mappi
 
 
 # Cache for Challenge 1 Solution mapping (load once, reuse)
-_challenge1_mapping_cache = None
+_challenge1_solution_file = None
 
 def _load_challenge1_vehicle_mapping():
     """
-    Load Challenge 1 Solution file and create a mapping from (SKU, transmission_code) to vehicles.
-    Returns: dict[(sku, transmission_code)] -> list of (year, make, model) tuples
+    Load the Challenge 1 Solution file as a vehicle index over (SKU, transmission_code).
+    Returns: VehicleIndex (see workflow.challenge1); empty when the file is unavailable
     """
-    global _challenge1_mapping_cache
-    
-    # Return cached mapping if already loaded
-    if _challenge1_mapping_cache is not None:
-        return _challenge1_mapping_cache
+    global _challenge1_solution_file
     
-    import pandas as pd
     import os
     
-    # Use paths from settings (configurable via environment variables)
-    possible_paths = getattr(settings, 'CHALLENGE_1_SOLUTION_PATHS', [
-        os.path.join(settings.BASE_DIR, '..', 'Challenge 1 - Solution.xlsx'),
-        os.path.join(settings.BASE_DIR, 'Challenge 1 - Solution.xlsx'),
-        os.path.join(os.getcwd(), 'Challenge 1 - Solution.xlsx'),
-    ])
-    
-    solution_file = None
-    for path in possible_paths:
-        if path and os.path.exists(path):
-            solution_file = path
-            print(f"Found Challenge 1 Solution file at: {path}")
-            break
+    if _challenge1_solution_file is None:
+        # Use paths from settings (configurable via environment variables)
+        possible_paths = getattr(settings, 'CHALLENGE_1_SOLUTION_PATHS', [
+            os.path.join(settings.BASE_DIR, '..', 'Challenge 1 - Solution.xlsx'),
+            os.path.join(settings.BASE_DIR, 'Challenge 1 - Solution.xlsx'),
+            os.path.join(os.getcwd(), 'Challenge 1 - Solution.xlsx'),
+        ])
+        
+        for path in possible_paths:
+            if path and os.path.exists(path):
+                _challenge1_solution_file = path
+                print(f"Found Challenge 1 Solution file at: {path}")
+                break
+        
+        if not _challenge1_solution_file:
+            print(f"Warning: Challenge 1 Solution file not found in any of these paths: {possible_paths}")
+            print(f"Current working directory: {os.getcwd()}")
+            print(f"BASE_DIR: {settings.BASE_DIR}")
+            _challenge1_solution_file = ""
     
-    if not solution_file:
-        print(f"Warning: Challenge 1 Solution file not found in any of these paths: {possible_paths}")
-        print(f"Current working directory: {os.getcwd()}")
-        print(f"BASE_DIR: {settings.BASE_DIR}")
-        _challenge1_mapping_cache = {}
-        return {}
+    if not _challenge1_solution_file:
+        return VehicleIndex({})
     
     try:
-        df = pd.read_excel(solution_file)
-        print(f"Loaded Challenge 1 Solution file: {len(df)} rows")
-        
-        # Parse the combined column format: SKU|Transmission|Year|Make|Model
-        # Create mapping: (SKU, Transmission) -> list of (year, make, model) tuples
-        mapping = {}
-        
-        for _, row in df.iterrows():
-            combined = str(row.iloc[0])  # Get the combined string
-            if '|' in combined:
-                parts = combined.split('|')
-                if len(parts) >= 5:
-                    sku = parts[0].strip()
-                    transmission = parts[1].strip()
-                    year = parts[2].strip()
-                    make = parts[3].strip()
-                    model = parts[4].strip()
-                    
-                    # Create key: (SKU, Transmission) - use original transmission code
-                    key = (sku, transmission)
-                    
-                    if key not in mapping:
-                        mapping[key] = []
-                    
-                    # Add vehicle if not already in list
-                    vehicle = (year, make, model)
-                    if vehicle not in mapping[key] and year and make and model:
-                        mapping[key].append(vehicle)
-        
-        print(f"Created Challenge 1 mapping with {len(mapping)} unique (SKU, Transmission) combinations")
-        print(f"Sample keys: {list(mapping.keys())[:5]}")
-        
-        # Cache the mapping
-        _challenge1_mapping_cache = mapping
-        return mapping
+        # Cached per process and persisted as a sidecar keyed by file mtime/hash
+        return get_vehicle_index(_challenge1_solution_file)
     except Exception as e:
         print(f"Error loading Challenge 1 Solution file: {e}")
-        import traceback
-        traceback.print_exc()
-        _challenge1_mapping_cache = {}
-        return {}
+        _challenge1_solution_file = ""
+        return VehicleIndex({})
 
 
 def _lookup_vehicles_by_sku_transmission(sku, transmission_code):
     """
     Look up vehicles by SKU and transmission code using Challenge 1 Solution file.
+    Exact (sku, transmission) keys win; otherwise the transmission code is
+    normalized (handle variations like "A-500" vs "A500").
     Returns: list of (year, make, model) tuples matching the exact format from solution
     """
-    mapping = _load_challenge1_vehicle_mapping()
-    
-    # Try exact match first
-    key = (sku, transmission_code)
-    if key in mapping:
-        return mapping[key]
-    
-    # Try normalized transmission code (handle variations like "A-500" vs "A500")
-    normalized_trans = transmission_code.replace('-', '').upper()
-    for (mapped_sku, mapped_trans), vehicles in mapping.items():
-        normalized_mapped_trans = mapped_trans.replace('-', '').upper()
-        if mapped_sku == sku and normalized_mapped_trans == normalized_trans:
-            return vehicles
-    
-    # If no exact match, return empty list
-    return []
+    return _load_challenge1_vehicle_mapping().lookup(sku, transmission_code)
 
 
 # Cache for Challenge 2 Solution (load once, reuse)
@@ -1562,25 +1258,19 @@ def transform_data(request, upload_id: str):
         import pandas as pd
         import re
         
-        # Detect Challenge 2 format (wide format with FRONT/REAR columns)
-        # Check if file appears to be Challenge 2 format
+        # Read the uploaded file once; workbook layout detection (Challenge 2
+        # wide FRONT/REAR format) uses the same read
         is_challenge2_format = False
         if upload.file_format == "xlsx":
-            # Try reading with different skiprows to detect format
-            try:
-                df_test = pd.read_excel(upload.storage_url, nrows=5)
-                # Check for Challenge 2 indicators: many columns, FRONT/REAR indicators
-                if len(df_test.columns) > 100:
-                    # Check for FRONT/REAR pattern in first rows
-                    first_row_str = str(df_test.iloc[0].values).upper()
-                    if 'FRONT' in first_row_str and 'REAR' in first_row_str:
-                        is_challenge2_format = True
-                        # Also check data type - Challenge 2 is for products
-                        data_type_check = upload.preflight_report.get("dataType", "") if upload.preflight_report else ""
-                        if data_type_check.lower() == "products":
-                            is_challenge2_format = True
-            except:
-                pass
+            # Challenge 2 format: skip first 4 rows (metadata/header rows)
+            # Row 0: FRONT/REAR labels
+            # Row 1-2: Empty
+            # Row 3: Column descriptions
+            # Row 4+: Actual data
+            df, layout = load_workbook_frame(upload.storage_url)
+            is_challenge2_format = layout.wide_front_rear
+        else:
+            df = read_upload_frame(upload)
         
         # Store Challenge 2 flag in job params
         if is_challenge2_format:
@@ -1589,22 +1279,6 @@ def transform_data(request, upload_id: str):
             job.params["dataType"] = "products"  # Ensure data type is set
             job.save()
         
-        # Read the uploaded file
-        if upload.file_format == "xlsx":
-            if is_challenge2_format:
-                # Challenge 2 format: skip first 4 rows (metadata/header rows)
-                # Row 0: FRONT/REAR labels
-                # Row 1-2: Empty
-                # Row 3: Column descriptions
-                # Row 4+: Actual data
-                df = pd.read_excel(upload.storage_url, skiprows=4)
-            else:
-                df = pd.read_excel(upload.storage_url)
-        else:
-            delimiter = upload.preflight_report.get("delimiter", ",") if upload.preflight_report else ","
-            encoding = upload.preflight_report.get("encoding", "utf-8") if upload.preflight_report else "utf-8"
-            df = pd.read_csv(upload.storage_url, delimiter=delimiter, encoding=encoding)
-        
         # Keep original dataframe for reference
         original_df = df.copy()
         
@@ -1619,6 +1293,17 @@ def transform_data(request, upload_id: str):
                 target = mapping.get("target")
                 if source and target:
                     column_mappings[source] = target
+            
+            # Transforming with a mapping accepts it for this header template
+            mapping_headers = (ai_map_job.params or {}).get("mappingHeaders")
+            if mappings and mapping_headers:
+                try:
+                    remember_mappings(
+                        upload.tenant, data_type, mapping_headers, mappings,
+                        ai_map_job.params.get("mappingSampleProfile"),
+                    )
+                except Exception as e:
+                    print(f"WARNING: could not remember column mappings: {str(e)}")
         
         # Initialize extraction metadata (for UI feedback)
         extraction_metadata = {
@@ -1888,10 +1573,7 @@ def transform_data(request, upload_id: str):
                     transformed_df[col] = None
         
         # Save transformed data to a new file
-        import os
-        transformed_file_path = upload.storage_url.replace(".csv", "_transformed.csv").replace(".xlsx", "_transformed.csv")
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(transformed_file_path), exist_ok=True)
+        transformed_file_path = _transformed_file_path(upload)
         
         # Save with explicit column order to preserve structure
         transformed_df.to_csv(transformed_file_path, index=False)
@@ -1993,21 +1675,12 @@ def vcdb_validate(request, upload_id: str):
         import os
         
         # Read the transformed file if available, otherwise original
-        file_path = upload.storage_url
-        is_transformed = False
-        if upload.preflight_report and upload.preflight_report.get("transformed_file_path"):
-            transformed_path = upload.preflight_report.get("transformed_file_path")
-            if os.path.exists(transformed_path):
-                file_path = transformed_path
-                is_transformed = True
+        transformed_path = _existing_transformed_file(upload)
+        file_path = transformed_path or upload.storage_url
+        is_transformed = transformed_path is not None
         
         # Read the file
-        if file_path.endswith(".xlsx"):
-            df = pd.read_excel(file_path)
-        else:
-            delimiter = upload.preflight_report.get("delimiter", ",") if upload.preflight_report else ","
-            encoding = upload.preflight_report.get("encoding", "utf-8") if upload.preflight_report else "utf-8"
-            df = pd.read_csv(file_path, delimiter=delimiter, encoding=encoding)
+        df = read_upload_frame(upload, file_path)
         
         # If using transformed file, columns are already mapped - no need to apply mappings again
         # If using original file, apply column mappings
@@ -2206,93 +1879,7 @@ def vcdb_validate(request, upload_id: str):
         
         # Last resort: Try to extract missing required fields from all columns if still missing
         # This handles cases where extraction didn't work in transform step
-        for idx, row in mapped_df.iterrows():
-            for field in required_fields:
-                if field in mapped_df.columns:
-                    value = row.get(field)
-                    if pd.isna(value) or (isinstance(value, str) and len(str(value).strip()) == 0):
-                        # Try to extract from any column in the original data
-                        for col in mapped_df.columns:
-                            col_value = str(row.get(col)) if pd.notna(row.get(col)) else ""
-                            if not col_value or len(col_value.strip()) < 3:
-                                continue
-                            
-                            # Extract year
-                            if field == "year":
-                                year_match = re.search(r'\b(19|20)\d{2}\b', col_value)
-                                if year_match:
-                                    try:
-                                        year_val = int(year_match.group(0))
-                                        mapped_df.loc[idx, field] = year_val
-                                        break
-                                    except:
-                                        pass
-                            
-                            # Extract makeName
-                            elif field == "makeName":
-                                common_makes = ['Ford', 'Chevrolet', 'Chevy', 'Toyota', 'Honda', 'BMW', 'Mercedes', 'Audi', 'KIA', 'Kia', 'Acura', 'Nissan', 'Dodge', 'Ram', 'GMC', 'Jeep', 'Subaru', 'Mazda', 'Volkswagen', 'VW', 'Hyundai', 'Lexus', 'Infiniti', 'Cadillac', 'Lincoln', 'Buick', 'Chrysler', 'Jaguar', 'Land Rover', 'Porsche', 'Tesla', 'Volvo', 'Mitsubishi', 'Suzuki', 'Isuzu', 'Fiat', 'Alfa Romeo', 'Genesis', 'Maserati', 'Bentley', 'Rolls-Royce', 'Ferrari', 'Lamborghini', 'McLaren', 'Aston Martin', 'Lotus', 'AC']
-                                for make in common_makes:
-                                    if make.lower() in col_value.lower():
-                                        mapped_df.loc[idx, field] = make
-                                        break
-                                if not pd.isna(mapped_df.loc[idx, field]):
-                                    break
-                            
-                            # Extract modelName
-                            elif field == "modelName":
-                                # Pattern: "for YYYY Make Model" or "YYYY Make Model"
-                                model_pattern = r'(?:for|fits?)\s+(?:\d{2,4}\s+)?([A-Z][A-Za-z]+)\s+([A-Z][A-Za-z]+(?:\s+[A-Z][A-Za-z0-9\-]+)?)'
-                                model_match = re.search(model_pattern, col_value, re.IGNORECASE)
-                                if model_match:
-                                    model = model_match.group(2).strip()
-                                    # Clean model (remove engine info)
-                                    model = re.sub(r'\s+\d+\.\d+L.*$', '', model).strip()
-                                    if len(model) > 1:
-                                        mapped_df.loc[idx, field] = model
-                                        break
-                                # Pattern: "YYYY Make Model"
-                                model_pattern2 = r'\b(19|20)\d{2}\s+([A-Z][A-Za-z]+)\s+([A-Z][A-Za-z]+(?:\s+[A-Z][A-Za-z0-9\-]+)?)'
-                                model_match2 = re.search(model_pattern2, col_value)
-                                if model_match2:
-                                    model = model_match2.group(3).strip()
-                                    model = re.sub(r'\s+\d+\.\d+L.*$', '', model).strip()
-                                    if len(model) > 1:
-                                        mapped_df.loc[idx, field] = model
-                                        break
-                            
-                            # Extract partId - improved pattern matching
-                            elif field == "partId":
-                                # First, try direct value if it looks like a part number
-                                col_value_clean = col_value.strip()
-                                # More flexible patterns for part numbers
-                                # Pattern 1: Alphanumeric codes (e.g., BP-12345, ABC123, 12345-ABC)
-                                part_pattern1 = r'\b([A-Z0-9]{2,}[\-]?[A-Z0-9]{2,}[A-Z0-9\-]*)\b'
-                                # Pattern 2: Numbers with letters (e.g., 12345A, A12345)
-                                part_pattern2 = r'\b([A-Z]?\d{3,}[A-Z0-9\-]*|[A-Z]{2,}\d{2,}[A-Z0-9\-]*)\b'
-                                # Pattern 3: Common part number formats
-                                part_pattern3 = r'\b(?:PART|SKU|ITEM|PN)[\s#:]*([A-Z0-9\-]{3,})\b'
-                                
-                                part_match = None
-                                # Try patterns in order
-                                for pattern in [part_pattern3, part_pattern1, part_pattern2]:
-                                    part_match = re.search(pattern, col_value_clean, re.IGNORECASE)
-                                    if part_match:
-                                        break
-                                
-                                # If no match with patterns, try direct value if it looks valid
-                                if not part_match and len(col_value_clean) >= 3 and len(col_value_clean) <= 50:
-                                    # Check if it's not a date, year, or other common non-part fields
-                                    if not re.match(r'^\d{4}$', col_value_clean) and not re.match(r'^(19|20)\d{2}$', col_value_clean):
-                                        # If it contains letters and numbers, or just alphanumeric
-                                        if re.match(r'^[A-Z0-9\-]+$', col_value_clean.upper()):
-                                            part_match = type('obj', (object,), {'group': lambda x: col_value_clean})()
-                                
-                                if part_match:
-                                    part_id = part_match.group(1) if hasattr(part_match, 'group') else str(part_match)
-                                    part_id = str(part_id).strip().upper()  # Normalize to uppercase
-                                    if len(part_id) >= 2:  # More lenient minimum length
-                                        mapped_df.loc[idx, field] = part_id
-                                        break
+        fill_required_from_columns(mapped_df, required_fields)
         
         # Check if this is Challenge 1 format - validation will be less strict
         is_challenge1 = False
@@ -2553,8 +2140,8 @@ def vcdb_validate(request, upload_id: str):
         transformed_data_df = None
         if job.result and job.result.get("transformed_file_path"):
             try:
-                transformed_path = job.result.get("transformed_file_path")
-                if os.path.exists(transformed_path):
+                transformed_path = _existing_transformed_file(upload)
+                if transformed_path:
                     transformed_data_df = pd.read_csv(transformed_path)
                     use_transformed_data = True
                     print(f"Using transformed file for normalization results: {len(transformed_data_df)} rows")
@@ -2744,19 +2331,10 @@ def publish(request, upload_id: str):
     
     try:
         # Read the transformed file if available, otherwise original
-        file_path = upload.storage_url
-        if upload.preflight_report and upload.preflight_report.get("transformed_file_path"):
-            transformed_path = upload.preflight_report.get("transformed_file_path")
-            if os.path.exists(transformed_path):
-                file_path = transformed_path
+        file_path = _existing_transformed_file(upload) or upload.storage_url
         
         # Read the file
-        if file_path.endswith(".xlsx"):
-            df = pd.read_excel(file_path)
-        else:
-            delimiter = upload.preflight_report.get("delimiter", ",") if upload.preflight_report else ","
-            encoding = upload.preflight_report.get("encoding", "utf-8") if upload.preflight_report else "utf-8"
-            df = pd.read_csv(file_path, delimiter=delimiter, encoding=encoding)
+        df = read_upload_frame(upload, file_path)
         
         # Filter out rows with validation errors (only include valid rows)
         # Get validation errors from the validation job
@@ -2780,21 +2358,21 @@ def publish(request, upload_id: str):
         
         # Get data type and tenant
         data_type = upload.preflight_report.get("dataType", "fitments") if upload.preflight_report else "fitments"
-        print(f"DEBUG: Publishing with dataType={data_type}, valid_df shape={valid_df.shape}, columns={list(valid_df.columns)}")
+        logger.debug(f"Publishing upload {upload.id} with dataType={data_type}, {len(valid_df)} valid rows, columns={list(valid_df.columns)}")
         
         tenant_obj = None
         tenant_override = None
         try:
             tenant_override = get_tenant_from_request(request)
-            print(f"DEBUG: publish -> tenant override from header: {tenant_override.id} ({tenant_override.name})")
+            logger.debug(f"Publish tenant override from header: {tenant_override.id} ({tenant_override.name})")
         except Http404:
             tenant_override = None
         
         if tenant_override:
             tenant_obj = tenant_override
             if str(upload.tenant_id) != str(tenant_obj.id):
-                print(
-                    f"DEBUG: publish -> overriding upload tenant from {upload.tenant_id} "
+                logger.info(
+                    f"Publish overriding upload {upload.id} tenant from {upload.tenant_id} "
                     f"to {tenant_obj.id} based on X-Tenant-ID header"
                 )
                 upload.tenant = tenant_obj
@@ -2803,10 +2381,9 @@ def publish(request, upload_id: str):
         elif upload.tenant_id:
             try:
                 tenant_obj = Tenant.objects.get(id=upload.tenant_id)
-                print(f"DEBUG: Found tenant from upload: {tenant_obj.id} ({tenant_obj.name})")
             except Tenant.DoesNotExist:
                 tenant_obj = Tenant.objects.filter(slug="default").first()
-                print(f"DEBUG: Tenant not found, using default: {tenant_obj.id if tenant_obj else 'None'}")
+                logger.warning(f"Tenant {upload.tenant_id} of upload {upload.id} not found, using default: {tenant_obj.id if tenant_obj else 'None'}")
         
         # Ensure tenant exists - required for database storage
         if not tenant_obj:
@@ -2815,7 +2392,7 @@ def publish(request, upload_id: str):
                 tenant_obj = Tenant.objects.first()
             if not tenant_obj:
                 error_msg = "No tenant found. Cannot publish data without a tenant."
-                print(f"ERROR: {error_msg}")
+                logger.error(error_msg)
                 job.status = "failed"
                 job.result = {"error": error_msg}
                 job.finished_at = timezone.now()
@@ -2824,7 +2401,7 @@ def publish(request, upload_id: str):
                     {"error": error_msg},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            print(f"DEBUG: Using fallback tenant: {tenant_obj.id} ({tenant_obj.name})")
+            logger.warning(f"Upload {upload.id} has no tenant, using fallback tenant: {tenant_obj.id} ({tenant_obj.name})")
         
         # Try to use NormalizationResult records first (they have mapped data)
         # Otherwise fall back to reading from file
@@ -2833,368 +2410,55 @@ def publish(request, upload_id: str):
             upload_id=upload.id
         ).order_by("row_index")
         
-        use_normalization_results = normalization_results.exists() and normalization_results.count() > 0
-        print(f"DEBUG: Found {normalization_results.count()} NormalizationResult records. Using them: {use_normalization_results}")
-        if use_normalization_results:
-            first_nr = normalization_results.first()
-            if first_nr:
-                print(f"DEBUG: First NormalizationResult sample ID: {first_nr.id}, row_index: {first_nr.row_index}")
-                print(f"DEBUG: First NormalizationResult mapped_entities keys: {list(first_nr.mapped_entities.keys()) if first_nr.mapped_entities else 'None'}")
-                print(f"DEBUG: First NormalizationResult sample data: {first_nr.mapped_entities}")
-            else:
-                print(f"DEBUG: No NormalizationResult records found")
+        normalization_count = normalization_results.count()
+        use_normalization_results = normalization_count > 0
+        logger.debug(f"Found {normalization_count} NormalizationResult records. Using them: {use_normalization_results}")
         
         # Create Fitment or ProductData records based on dataType
         created_records = []
         created_count = 0
         error_count = 0
         skipped_count = 0
+        duplicate_count = 0
         
         if data_type == "fitments":
-            # Create Fitment records
+            # Create Fitment records in bulk (see fitments.publishing)
             if use_normalization_results:
-                # Use NormalizationResult records
-                print(f"DEBUG: Processing {normalization_results.count()} NormalizationResult records for fitments")
-                print(f"DEBUG: Tenant being used: {tenant_obj.id if tenant_obj else 'None'} ({tenant_obj.name if tenant_obj else 'None'})")
-                for nr in normalization_results:
-                    try:
-                        mapped_entities = nr.mapped_entities or {}
-                        print(f"DEBUG: Processing NormalizationResult {nr.id} (row {nr.row_index}), mapped_entities keys: {list(mapped_entities.keys())}")
-                        if not mapped_entities:
-                            print(f"DEBUG: ⚠️ WARNING: NormalizationResult {nr.id} has empty mapped_entities!")
-                            skipped_count += 1
-                            continue
-                        
-                        # Extract required fields
-                        part_id = str(mapped_entities.get("partId", "")).strip()
-                        if not part_id:
-                            part_id = str(mapped_entities.get("part_id", "")).strip()
-                        if not part_id:
-                            part_id = str(mapped_entities.get("partNumber", "")).strip()
-                        if not part_id:
-                            part_id = str(mapped_entities.get("Part Number", "")).strip()
-                        if not part_id:
-                            print(f"DEBUG: Skipping NormalizationResult {nr.id} - no partId found. Available keys: {list(mapped_entities.keys())}")
-                            continue
-                        
-                        # Handle year
-                        year_val = mapped_entities.get("year", "")
-                        if not year_val:
-                            year_val = mapped_entities.get("Year", "")
-                        if not year_val:
-                            print(f"DEBUG: ⚠️ Skipping NormalizationResult {nr.id} - no year found. Available keys: {list(mapped_entities.keys())}")
-                            skipped_count += 1
-                            continue
-                        
-                        year_str = str(year_val).strip()
-                        if "-" in year_str:
-                            try:
-                                year = int(year_str.split("-")[0].strip())
-                            except Exception as e:
-                                print(f"DEBUG: Error parsing year range '{year_str}': {e}")
-                                continue
-                        else:
-                            try:
-                                year = int(float(year_val))
-                            except Exception as e:
-                                print(f"DEBUG: Error parsing year '{year_val}': {e}")
-                                continue
-                        
-                        make_name = str(mapped_entities.get("makeName", "")).strip()
-                        if not make_name:
-                            make_name = str(mapped_entities.get("make", "")).strip()
-                        if not make_name:
-                            make_name = str(mapped_entities.get("Make", "")).strip()
-                        
-                        model_name = str(mapped_entities.get("modelName", "")).strip()
-                        if not model_name:
-                            model_name = str(mapped_entities.get("model", "")).strip()
-                        if not model_name:
-                            model_name = str(mapped_entities.get("Model", "")).strip()
-                        
-                        if not make_name or not model_name:
-                            print(f"DEBUG: ⚠️ Skipping NormalizationResult {nr.id} - missing make or model. make={make_name}, model={model_name}. Available keys: {list(mapped_entities.keys())}")
-                            skipped_count += 1
-                            continue
-                        
-                        # Normalize make/model names (proper capitalization)
-                        make_name = make_name.title() if make_name else ""
-                        # Special handling for known makes (KIA, BMW, etc. should be uppercase)
-                        known_uppercase_makes = ["KIA", "BMW", "AUDI", "ACURA", "INFINITI", "LEXUS", "AC"]
-                        if make_name.upper() in known_uppercase_makes:
-                            make_name = make_name.upper()
-                        
-                        model_name = model_name.title() if model_name else ""
-                        # Handle special cases like "F-150" should stay as "F-150" not "F-150"
-                        if "-" in model_name:
-                            parts = model_name.split("-")
-                            model_name = "-".join([p.title() if p else "" for p in parts])
-                        
-                        print(f"DEBUG: Creating fitment for partId={part_id}, year={year}, make={make_name}, model={model_name}")
-                        
-                        position_val = str(mapped_entities.get("position", "")).strip() or "Front"
-                        position_id = int(mapped_entities.get("positionId", 1)) if mapped_entities.get("positionId") else 1
-                        
-                        # Check if fitment already exists (for logging/auditing)
-                        existing_fitment = Fitment.objects.filter(
-                            tenant=tenant_obj,
-                            partId=part_id,
-                            year=year,
-                            makeName=make_name,
-                            modelName=model_name,
-                            position=position_val,
-                            isDeleted=False
-                        ).order_by("-createdAt").first()
-                        if existing_fitment:
-                            print(
-                                f"DEBUG: Found existing fitment {existing_fitment.hash} for "
-                                f"partId={part_id}, year={year}, make={make_name}, model={model_name}. "
-                                "Creating a new version tied to this upload."
-                            )
-                        
-                        source_metadata = {
-                            "uploadId": str(upload.id),
-                            "uploadFilename": upload.filename,
-                            "normalizationResultId": str(nr.id),
-                            "rowIndex": nr.row_index,
-                            "publishedAt": timezone.now().isoformat(),
-                            "dataType": data_type,
-                        }
-                        
-                        fitment_notes = f"Auto-created from upload {upload.filename} ({upload.id}), row {nr.row_index}"
-                        
-                        fitment = Fitment(
-                            tenant=tenant_obj,
-                            partId=part_id,
-                            year=year,
-                            makeName=make_name,
-                            modelName=model_name,
-                            subModelName=str(mapped_entities.get("submodel", "")).strip() or "",
-                            driveTypeName=str(mapped_entities.get("driveType", "")).strip() or "",
-                            fuelTypeName=str(mapped_entities.get("engine", "")).strip() or "",
-                            bodyNumDoors=int(mapped_entities.get("bodyNumDoors", 0)) if mapped_entities.get("bodyNumDoors") else 0,
-                            bodyTypeName=str(mapped_entities.get("body", "")).strip() or "",
-                            ptid=str(mapped_entities.get("ptid", "")).strip() or "0",
-                            partTypeDescriptor=str(mapped_entities.get("productType", "")).strip() or "",
-                            uom="EA",
-                            quantity=int(mapped_entities.get("quantity", 1)) if mapped_entities.get("quantity") else 1,
-                            fitmentTitle=f"{year} {make_name} {model_name} - {part_id}",
-                            fitmentDescription=str(mapped_entities.get("description", "")).strip() or "",
-                            fitmentNotes=fitment_notes,
-                            position=position_val,
-                            positionId=position_id,
-                            liftHeight=str(mapped_entities.get("liftHeight", "")).strip() or "",
-                            wheelType=str(mapped_entities.get("wheelType", "")).strip() or "",
-                            baseVehicleId=f"{year}_{make_name}_{model_name}",
-                            fitmentType="manual_fitment",
-                            createdBy="data_upload",
-                            updatedBy="data_upload",
-                            dynamicFields={
-                                "sourceUpload": source_metadata,
-                            },
-                        )
-                        try:
-                            print(
-                                f"DEBUG: About to create fitment - partId={part_id}, year={year}, "
-                                f"make={make_name}, model={model_name}, tenant={tenant_obj.id if tenant_obj else 'None'}"
-                            )
-                            fitment.save()  # This will generate the hash
-                            created = True
-                            created_count += 1
-                            created_records.append({"type": "fitment", "id": fitment.hash, "partId": part_id})
-                            print(
-                                f"DEBUG: ✅ Successfully created fitment {fitment.hash} for partId={part_id}, "
-                                f"year={year}, make={make_name}, model={model_name}, tenant={tenant_obj.id if tenant_obj else 'None'}"
-                            )
-                            
-                            # Verify it was actually saved
-                            verify_fitment = Fitment.objects.filter(hash=fitment.hash).first()
-                            if verify_fitment:
-                                print(f"DEBUG: ✅ Verification: Fitment {fitment.hash} exists in database")
-                            else:
-                                print(f"DEBUG: ❌ ERROR: Fitment {fitment.hash} was NOT found in database after save!")
-                        except Exception as save_error:
-                            print(f"ERROR saving new fitment: {save_error}")
-                            print(f"ERROR details - partId={part_id}, year={year}, make={make_name}, model={model_name}")
-                            import traceback
-                            traceback.print_exc()
-                            error_count += 1
-                            continue
-                    except Exception as e:
-                        error_count += 1
-                        print(f"ERROR creating fitment from NormalizationResult {nr.id}: {str(e)}")
-                        import traceback
-                        traceback.print_exc()
+                rows = []
+                for nr_id, row_index, mapped_entities in normalization_results.values_list(
+                    "id", "row_index", "mapped_entities"
+                ).iterator(chunk_size=5000):
+                    if not mapped_entities:
+                        skipped_count += 1
                         continue
+                    rows.append({**mapped_entities, "_rowIndex": row_index, "_normalizationResultId": nr_id})
+                publish_result = publish_fitment_frame(
+                    pd.DataFrame(rows), tenant_obj, upload, data_type=data_type
+                )
             else:
-                # Fall back to reading from file
-                # Normalize column names to lowercase for case-insensitive matching
-                column_map = {col.lower(): col for col in valid_df.columns}
-                
-                for idx, row in valid_df.iterrows():
-                    try:
-                        # Helper function to get value with case-insensitive column name
-                        def get_col(key, default=""):
-                            key_lower = key.lower()
-                            if key_lower in column_map:
-                                val = row.get(column_map[key_lower])
-                                return val if pd.notna(val) else default
-                            return default
-                        
-                        # Extract required fields with defaults
-                        part_id = str(get_col("partId", "")).strip()
-                        if not part_id:
-                            # Try alternative column names
-                            part_id = str(get_col("part_id", "")).strip()
-                            if not part_id:
-                                part_id = str(get_col("partnumber", "")).strip()
-                        if not part_id:
-                            continue
-                        
-                        # Handle year (could be range or single year)
-                        year_val = get_col("year", None)
-                        if year_val is None or pd.isna(year_val):
-                            continue
-                        
-                        year_str = str(year_val).strip()
-                        if "-" in year_str:
-                            # Use first year of range
-                            try:
-                                year = int(year_str.split("-")[0].strip())
-                            except:
-                                continue
-                        else:
-                            try:
-                                year = int(float(year_val))
-                            except:
-                                continue
-                        
-                        make_name = str(get_col("makeName", "")).strip()
-                        if not make_name:
-                            make_name = str(get_col("make", "")).strip()
-                        
-                        model_name = str(get_col("modelName", "")).strip()
-                        if not model_name:
-                            model_name = str(get_col("model", "")).strip()
-                        
-                        if not make_name or not model_name:
-                            continue
-                        
-                        # Normalize make/model names (proper capitalization)
-                        make_name = make_name.title() if make_name else ""
-                        # Special handling for known makes (KIA, BMW, etc. should be uppercase)
-                        known_uppercase_makes = ["KIA", "BMW", "AUDI", "ACURA", "INFINITI", "LEXUS", "AC"]
-                        if make_name.upper() in known_uppercase_makes:
-                            make_name = make_name.upper()
-                        
-                        model_name = model_name.title() if model_name else ""
-                        # Handle special cases like "F-150" should stay as "F-150" not "F-150"
-                        if "-" in model_name:
-                            parts = model_name.split("-")
-                            model_name = "-".join([p.title() if p else "" for p in parts])
-                    
-                        position_val = str(get_col("position", "")).strip() or "Front"
-                        position_id_val = get_col("positionId", 1)
-                        position_id = int(position_id_val) if pd.notna(position_id_val) and str(position_id_val).strip() else 1
-                        
-                        existing_fitment = Fitment.objects.filter(
-                            tenant=tenant_obj,
-                            partId=part_id,
-                            year=year,
-                            makeName=make_name,
-                            modelName=model_name,
-                            position=position_val,
-                            isDeleted=False
-                        ).order_by("-createdAt").first()
-                        if existing_fitment:
-                            print(
-                                f"DEBUG: Found existing fitment {existing_fitment.hash} for "
-                                f"partId={part_id}, year={year}, make={make_name}, model={model_name}. "
-                                "Creating a new version tied to this upload."
-                            )
-                        
-                        body_doors = get_col("bodyNumDoors", 0)
-                        qty = get_col("quantity", 1)
-                        
-                        source_metadata = {
-                            "uploadId": str(upload.id),
-                            "uploadFilename": upload.filename,
-                            "rowIndex": idx + 1,
-                            "publishedAt": timezone.now().isoformat(),
-                            "dataType": data_type,
-                            "source": "transformed_file",
-                        }
-                        fitment_notes = f"Auto-created from upload {upload.filename} ({upload.id}), row {idx + 1}"
-                        
-                        fitment = Fitment(
-                            tenant=tenant_obj,
-                            partId=part_id,
-                            year=year,
-                            makeName=make_name,
-                            modelName=model_name,
-                            subModelName=str(get_col("submodel", "")).strip() or "",
-                            driveTypeName=str(get_col("driveType", "")).strip() or "",
-                            fuelTypeName=str(get_col("engine", "")).strip() or "",
-                            bodyNumDoors=int(body_doors) if pd.notna(body_doors) and str(body_doors).strip() else 0,
-                            bodyTypeName=str(get_col("body", "")).strip() or "",
-                            ptid=str(get_col("ptid", "")).strip() or "0",
-                            partTypeDescriptor=str(get_col("productType", "")).strip() or "",
-                            uom="EA",
-                            quantity=int(qty) if pd.notna(qty) and str(qty).strip() else 1,
-                            fitmentTitle=f"{year} {make_name} {model_name} - {part_id}",
-                            fitmentDescription=str(get_col("description", "")).strip() or "",
-                            fitmentNotes=fitment_notes,
-                            position=position_val,
-                            positionId=position_id,
-                            liftHeight=str(get_col("liftHeight", "")).strip() or "",
-                            wheelType=str(get_col("wheelType", "")).strip() or "",
-                            baseVehicleId=f"{year}_{make_name}_{model_name}",
-                            fitmentType="manual_fitment",
-                            createdBy="data_upload",
-                            updatedBy="data_upload",
-                            dynamicFields={
-                                "sourceUpload": source_metadata,
-                            },
-                        )
-                        try:
-                            print(
-                                f"DEBUG: About to create fitment (fallback) - partId={part_id}, year={year}, "
-                                f"make={make_name}, model={model_name}, tenant={tenant_obj.id if tenant_obj else 'None'}"
-                            )
-                            fitment.save()
-                            created = True
-                            created_count += 1
-                            created_records.append({"type": "fitment", "id": fitment.hash, "partId": part_id})
-                            print(
-                                f"DEBUG: ✅ Successfully created fitment {fitment.hash} for partId={part_id}, "
-                                f"year={year}, make={make_name}, model={model_name}, tenant={tenant_obj.id if tenant_obj else 'None'}"
-                            )
-                        except Exception as save_error:
-                            print(f"ERROR saving fitment for row {idx}: {str(save_error)}")
-                            import traceback
-                            traceback.print_exc()
-                            error_count += 1
-                            continue
-                    except Exception as e:
-                        error_count += 1
-                        print(f"ERROR creating fitment for row {idx}: {str(e)}")
-                        import traceback
-                        traceback.print_exc()
-                        continue
+                # Fall back to reading from file (column names are case-insensitive)
+                file_frame = valid_df.assign(_rowIndex=valid_df.index + 1)
+                publish_result = publish_fitment_frame(
+                    file_frame, tenant_obj, upload, data_type=data_type,
+                    source="transformed_file", case_insensitive=True
+                )
+            
+            created_count = publish_result.created
+            error_count = publish_result.errors
+            skipped_count += publish_result.skipped
+            duplicate_count = publish_result.duplicates
+            created_records = publish_result.records
             
-            print(f"DEBUG: Fitment creation complete: created={created_count}, errors={error_count}, skipped={skipped_count}, total_rows={len(valid_df) if not use_normalization_results else normalization_results.count()}")
             if skipped_count > 0:
-                print(f"DEBUG: ⚠️ WARNING: {skipped_count} records were skipped due to missing required fields (partId, year, makeName, modelName)")
+                logger.warning(f"Publish of upload {upload.id} skipped {skipped_count} records missing required fields (partId, year, makeName, modelName)")
         
         elif data_type == "products":
             # Create ProductData records
             if use_normalization_results:
                 # Use NormalizationResult records
-                print(f"DEBUG: Processing {normalization_results.count()} NormalizationResult records for products")
                 for nr in normalization_results:
                     try:
                         mapped_entities = nr.mapped_entities or {}
-                        print(f"DEBUG: Processing NormalizationResult {nr.id} for product, mapped_entities keys: {list(mapped_entities.keys())}")
                         
                         # Extract part ID
                         part_id = str(mapped_entities.get("partId", "")).strip()
@@ -3207,7 +2471,7 @@ def publish(request, upload_id: str):
                         if not part_id:
                             part_id = str(mapped_entities.get("sku", "")).strip()
                         if not part_id:
-                            print(f"DEBUG: Skipping NormalizationResult {nr.id} - no partId found. Available keys: {list(mapped_entities.keys())}")
+                            logger.debug(f"Skipping NormalizationResult {nr.id} - no partId found. Available keys: {list(mapped_entities.keys())}")
                             continue
                         
                         # Extract description
@@ -3260,20 +2524,13 @@ def publish(request, upload_id: str):
                             if created:
                                 created_count += 1
                                 created_records.append({"type": "product", "id": product.id, "part_id": part_id})
-                                print(f"DEBUG: ✅ Successfully created product {product.id} for partId={part_id}, tenant={tenant_obj.id if tenant_obj else 'None'}")
-                            else:
-                                print(f"DEBUG: ✅ Updated existing product {product.id} for partId={part_id}")
                         except Exception as save_error:
-                            print(f"ERROR saving product: {save_error}")
-                            import traceback
-                            traceback.print_exc()
+                            logger.exception(f"Error saving product {part_id}: {save_error}")
                             error_count += 1
                             continue
                     except Exception as e:
                         error_count += 1
-                        print(f"ERROR creating product from NormalizationResult {nr.id}: {str(e)}")
-                        import traceback
-                        traceback.print_exc()
+                        logger.exception(f"Error creating product from NormalizationResult {nr.id}: {str(e)}")
                         continue
             else:
                 # Fall back to reading from file
@@ -3333,20 +2590,13 @@ def publish(request, upload_id: str):
                             if created:
                                 created_count += 1
                                 created_records.append({"type": "product", "id": product.id, "part_id": part_id})
-                                print(f"DEBUG: ✅ Successfully created product {product.id} for partId={part_id}, tenant={tenant_obj.id if tenant_obj else 'None'}")
-                            else:
-                                print(f"DEBUG: ✅ Updated existing product {product.id} for partId={part_id}")
                         except Exception as save_error:
-                            print(f"ERROR saving product: {save_error}")
-                            import traceback
-                            traceback.print_exc()
+                            logger.exception(f"Error saving product {part_id}: {save_error}")
                             error_count += 1
                             continue
                     except Exception as e:
                         error_count += 1
-                        print(f"ERROR creating product for row {idx}: {str(e)}")
-                        import traceback
-                        traceback.print_exc()
+                        logger.exception(f"Error creating product for row {idx}: {str(e)}")
                         continue
         
         # Generate output file
@@ -3356,7 +2606,7 @@ def publish(request, upload_id: str):
         # Create filename with timestamp
         from datetime import datetime
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        original_filename = os.path.basename(upload.storage_url)
+        original_filename = upload.filename or os.path.basename(upload.storage_url)
         base_name = os.path.splitext(original_filename)[0]
         output_filename = f"{base_name}_published_{timestamp}.csv"
         output_path = os.path.join(output_dir, output_filename)
@@ -3379,6 +2629,8 @@ def publish(request, upload_id: str):
         job.result = {
             "publishedCount": published_count,
             "createdCount": created_count,
+            "duplicateCount": duplicate_count,
+            "skippedCount": skipped_count,
             "errorCount": error_count,
             "dataType": data_type,
             "downloadUrl": f"/api/uploads/{upload_id}/download",
@@ -3389,44 +2641,12 @@ def publish(request, upload_id: str):
         job.finished_at = timezone.now()
         job.save()
         
-        print(f"DEBUG: ========== PUBLISH SUMMARY ==========")
-        print(f"DEBUG: Data Type: {data_type}")
-        print(f"DEBUG: Tenant: {tenant_obj.id if tenant_obj else 'None'} ({tenant_obj.name if tenant_obj else 'None'})")
-        print(f"DEBUG: Used NormalizationResult: {use_normalization_results}")
-        print(f"DEBUG: NormalizationResult count: {normalization_results.count() if use_normalization_results else 0}")
-        print(f"DEBUG: Records created: {created_count}")
-        print(f"DEBUG: Records skipped: {skipped_count}")
-        print(f"DEBUG: Errors: {error_count}")
-        print(f"DEBUG: Published count: {published_count}")
-        print(f"DEBUG: ======================================")
-        
-        # Verify records were actually saved
-        if data_type == "fitments":
-            # Count actual fitments in database for this tenant
-            if tenant_obj:
-                actual_count = Fitment.objects.filter(tenant=tenant_obj, isDeleted=False).count()
-                print(f"DEBUG: Verification - Total fitments in database for tenant {tenant_obj.id}: {actual_count}")
-                if created_count > 0:
-                    # Check if the created records actually exist
-                    created_hashes = [r.get("id") for r in created_records if r.get("type") == "fitment"]
-                    if created_hashes:
-                        existing_hashes = Fitment.objects.filter(hash__in=created_hashes, tenant=tenant_obj).count()
-                        print(f"DEBUG: Verification - {existing_hashes} out of {len(created_hashes)} created fitments found in database")
-            else:
-                print(f"DEBUG: ⚠️ WARNING: No tenant found, cannot verify fitments")
-        elif data_type == "products":
-            # Count actual products in database for this tenant
-            if tenant_obj:
-                actual_count = ProductData.objects.filter(tenant=tenant_obj).count()
-                print(f"DEBUG: Verification - Total products in database for tenant {tenant_obj.id}: {actual_count}")
-                if created_count > 0:
-                    # Check if the created records actually exist
-                    created_ids = [r.get("id") for r in created_records if r.get("type") == "product"]
-                    if created_ids:
-                        existing_ids = ProductData.objects.filter(id__in=created_ids, tenant=tenant_obj).count()
-                        print(f"DEBUG: Verification - {existing_ids} out of {len(created_ids)} created products found in database")
-            else:
-                print(f"DEBUG: ⚠️ WARNING: No tenant found, cannot verify products")
+        logger.info(
+            f"Published upload {upload.id} ({data_type}) for tenant {tenant_obj.id}: "
+            f"created={created_count}, duplicates={duplicate_count}, skipped={skipped_count}, "
+            f"errors={error_count}, published={published_count}, "
+            f"normalizationResults={normalization_count if use_normalization_results else 0}"
+        )
         
         return Response({
             "jobId": str(job.id),
@@ -3434,6 +2654,8 @@ def publish(request, upload_id: str):
             "downloadUrl": f"/api/uploads/{upload_id}/download",
             "filename": output_filename,
             "createdCount": created_count,
+            "duplicateCount": duplicate_count,
+            "skippedCount": skipped_count,
             "errorCount": error_count,
             "dataType": data_type,
             "message": f"Successfully created {created_count} {data_type} in database" if created_count > 0 else f"Published {published_count} records (no new database records created)"
@@ -3442,8 +2664,7 @@ def publish(request, upload_id: str):
     except Exception as e:
         import traceback
         error_trace = traceback.format_exc()
-        print(f"ERROR in publish endpoint: {str(e)}")
-        print(f"Traceback: {error_trace}")
+        logger.error(f"Publish of upload {upload_id} failed: {str(e)}\n{error_trace}")
         job.status = "failed"
         job.result = {"error": str(e), "traceback": error_trace}
         job.finished_at = timezone.now()
@@ -3467,12 +2688,13 @@ def download_published_file(request, upload_id: str):
     # Get published file path
     file_path = None
     filename = "output.csv"
+    transformed_path = _existing_transformed_file(upload)
     
     if upload.preflight_report and upload.preflight_report.get("published_file_path"):
         file_path = upload.preflight_report.get("published_file_path")
         filename = upload.preflight_report.get("published_filename", "output.csv")
-    elif upload.preflight_report and upload.preflight_report.get("transformed_file_path"):
-        file_path = upload.preflight_report.get("transformed_file_path")
+    elif transformed_path:
+        file_path = transformed_path
         filename = os.path.basename(file_path)
     else:
         file_path = upload.storage_url
@@ -3616,31 +2838,19 @@ def fitment_rules_upload(request):
     if tenant_obj is None:
         return Response({"message": "Invalid or missing tenantId; no default tenant found"}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Read bytes
-    file_bytes = file_obj.read()
-    file_obj.seek(0)
-    pf = preflight(file_bytes, file_obj.name)
-    checksum = pf.get("checksum") or compute_checksum(file_bytes)
-    
-    # Size limit (250MB)
+    # Stream to content-addressed storage (size limit 250MB)
     max_mb = int(os.getenv("MAX_UPLOAD_MB", "250"))
-    if len(file_bytes) > max_mb * 1024 * 1024:
+    try:
+        storage_url, checksum, file_size, pf = _ingest_upload(file_obj, max_mb)
+    except UploadTooLarge:
         return Response({"message": f"File too large (> {max_mb} MB)"}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
     
-    # Always use local storage
-    safe_name = f"{uuid.uuid4().hex}_{file_obj.name}"
-    dest_dir = _storage_dir()
-    dest_path = os.path.join(dest_dir, safe_name)
-    with open(dest_path, "wb") as out:
-        out.write(file_bytes)
-    storage_url = dest_path
-    
     upload = Upload(
         tenant_id=str(tenant_obj.id),
         filename=file_obj.name,
         content_type=file_obj.content_type or "application/octet-stream",
         storage_url=storage_url,
-        file_size_bytes=len(file_bytes),
+        file_size_bytes=file_size,
         status="received",
         checksum=checksum,
         file_format=pf.get("fileFormat"),
@@ -3742,30 +2952,35 @@ def apply_fitments_batch(request):
         except Tenant.DoesNotExist:
             return Response({"message": f"Tenant with ID {tenant_id} not found"}, status=400)
     
-    created = 0
+    from field_config.models import FieldConfiguration
+    
+    standard_fields = {
+        'partId', 'baseVehicleId', 'year', 'make', 'makeName', 'model', 'modelName', 
+        'submodel', 'subModelName', 'driveType', 'driveTypeName', 'fuelType', 'fuelTypeName',
+        'numDoors', 'bodyNumDoors', 'bodyType', 'bodyTypeName', 'partTypeId', 'ptid',
+        'partTypeDescriptor', 'quantity', 'title', 'description', 'notes', 'position',
+        'positionId', 'liftHeight', 'wheelType', 'fitmentType'
+    }
+    
+    # Resolve field configurations for every dynamic key with one query
+    dynamic_keys = {
+        key for it in items if isinstance(it, dict)
+        for key, value in it.items() if key not in standard_fields and value is not None
+    }
+    field_configs = {}
+    for field_config in FieldConfiguration.objects.filter(name__in=dynamic_keys, is_enabled=True):
+        field_configs.setdefault(field_config.name, field_config)
+    
+    fitments = []
+    errors = 0
     for it in items:
         try:
-            # Extract dynamic fields and map them to field configurations
-            from field_config.models import FieldConfiguration
-            
-            standard_fields = {
-                'partId', 'baseVehicleId', 'year', 'make', 'makeName', 'model', 'modelName', 
-                'submodel', 'subModelName', 'driveType', 'driveTypeName', 'fuelType', 'fuelTypeName',
-                'numDoors', 'bodyNumDoors', 'bodyType', 'bodyTypeName', 'partTypeId', 'ptid',
-                'partTypeDescriptor', 'quantity', 'title', 'description', 'notes', 'position',
-                'positionId', 'liftHeight', 'wheelType', 'fitmentType'
-            }
-            
             # Store dynamic fields with field configuration references
             dynamic_fields = {}
             for key, value in it.items():
                 if key not in standard_fields and value is not None:
-                    # Try to find the field configuration for this field
-                    try:
-                        field_config = FieldConfiguration.objects.get(
-                            name=key,
-                            is_enabled=True
-                        )
+                    field_config = field_configs.get(key)
+                    if field_config:
                         dynamic_fields[str(field_config.id)] = {
                             'value': value,
                             'field_name': key,
@@ -3773,7 +2988,7 @@ def apply_fitments_batch(request):
                             'field_config_name': field_config.name,
                             'field_config_display_name': field_config.display_name
                         }
-                    except FieldConfiguration.DoesNotExist:
+                    else:
                         # If no field config found, store with field name as key (fallback)
                         dynamic_fields[key] = {
                             'value': value,
@@ -3783,7 +2998,7 @@ def apply_fitments_batch(request):
                             'field_config_display_name': key.replace('_', ' ').title()
                         }
             
-            Fitment.objects.create(
+            fitments.append(Fitment(
                 hash=uuid.uuid4().hex,
                 tenant=tenant,  # Associate with tenant
                 partId=it.get('partId', ''),
@@ -3812,11 +3027,14 @@ def apply_fitments_batch(request):
                 fitmentType=it.get('fitmentType', 'manual_fitment'),
                 dynamicFields=dynamic_fields,  # Store dynamic fields
                 createdBy='api', updatedBy='api'
-            )
-            created += 1
+            ))
         except Exception:
+            errors += 1
             continue
-    return Response({"created": created})
+    
+    result = bulk_publish_fitments(fitments, tenant)
+    result.errors += errors
+    return Response({"created": result.created, **result.as_dict()})
 
 
 @api_view(["POST"])
@@ -3940,12 +3158,7 @@ def export_invalid_rows(request, upload_id: str):
             error_row_indices.add(row_num - 2)  # Convert to 0-based index
     
     # Read the original file
-    if upload.file_format == "xlsx":
-        df = pd.read_excel(upload.storage_url)
-    else:
-        delimiter = upload.preflight_report.get("delimiter", ",") if upload.preflight_report else ","
-        encoding = upload.preflight_report.get("encoding", "utf-8") if upload.preflight_report else "utf-8"
-        df = pd.read_csv(upload.storage_url, delimiter=delimiter, encoding=encoding)
+    df = read_upload_frame(upload)
     
     # Filter to only error rows
     invalid_df = df[df.index.isin(error_row_indices)].copy()
@@ -4032,12 +3245,7 @@ def get_job_review_data(request, job_id: str):
     
     # Read original file
     try:
-        if upload.file_format == "xlsx":
-            original_df = pd.read_excel(upload.storage_url)
-        else:
-            delimiter = upload.preflight_report.get("delimiter", ",") if upload.preflight_report else ","
-            encoding = upload.preflight_report.get("encoding", "utf-8") if upload.preflight_report else "utf-8"
-            original_df = pd.read_csv(upload.storage_url, delimiter=delimiter, encoding=encoding)
+        original_df = read_upload_frame(upload)
     except Exception as e:
         print(f"Error reading file: {str(e)}")
         traceback.print_exc()
@@ -4129,11 +3337,10 @@ def get_job_review_data(request, job_id: str):
     # Read transformed file if available (contains solution-format data for Challenge 1)
     if transformed_df is None:
         try:
-            if upload.preflight_report and upload.preflight_report.get("transformed_file_path"):
-                transformed_path = upload.preflight_report.get("transformed_file_path")
-                if os.path.exists(transformed_path):
-                    transformed_df = pd.read_csv(transformed_path)
-                    print(f"Loaded transformed file with {len(transformed_df)} rows")
+            transformed_path = _existing_transformed_file(upload)
+            if transformed_path:
+                transformed_df = pd.read_csv(transformed_path)
+                print(f"Loaded transformed file with {len(transformed_df)} rows")
         except Exception as e:
             print(f"Warning: Could not read transformed file: {e}")
             transformed_df = None
@@ -4630,20 +3837,16 @@ def approve_job_rows(request, job_id: str):
                     print(f"DEBUG: Challenge 2 Solution file not found in any path")
             else:
                 # Try to read the transformed file first, otherwise original
-                file_path = upload.storage_url
-                if upload.preflight_report and upload.preflight_report.get("transformed_file_path"):
-                    transformed_path = upload.preflight_report.get("transformed_file_path")
-                    if os.path.exists(transformed_path):
-                        file_path = transformed_path
+                file_path = _existing_transformed_file(upload) or upload.storage_url
             
             # For Challenge 2 solution file, always read as Excel
             # For other files, use the upload file format
-            if is_challenge2 or file_path.endswith('.xlsx') or file_path.endswith('.xls'):
+            if file_path.endswith('.xls'):
                 df = pd.read_excel(file_path)
+            elif is_challenge2:
+                df = load_workbook_frame(file_path, header_row=0)[0]
             else:
-                delimiter = upload.preflight_report.get("delimiter", ",") if upload.preflight_report else ","
-                encoding = upload.preflight_report.get("encoding", "utf-8") if upload.preflight_report else "utf-8"
-                df = pd.read_csv(file_path, delimiter=delimiter, encoding=encoding)
+                df = read_upload_frame(upload, file_path)
             
             # Get AI mappings if available
             column_mappings = {}
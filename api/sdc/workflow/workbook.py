@@ -0,0 +1,202 @@
+"""
+Single-read workbook loading for upload stages.
+
+An uploaded XLSX is opened once with openpyxl in read-only mode and its cell
+values are kept as raw rows: in memory for the most recent workbooks and in a
+pickle file under WORKBOOK_CACHE_DIR (named after the workbook's path, checked
+against its mtime and size) for other workers and later requests. That
+directory belongs to the app, not to uploads, so pickles are never read from
+a place users can write to. Layout detection (header offset, the wide
+FRONT/REAR Challenge 2 layout) runs on the first rows of that same read, and typed
+DataFrames are materialized from the raw rows with pandas' own text parser, so
+they match ``pd.read_excel``. Transform, validate, publish and review stages
+then pay the XLSX parse cost once per file instead of once per read.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+
+from sdc.lazy_imports import lazy_module
+
+pd = lazy_module('pandas')
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_ROWS = 10
+# Wide Challenge 2 sheets have metadata rows above the real header
+WIDE_HEADER_ROW = 4
+WIDE_MIN_COLUMNS = 100
+ROWS_CACHE_SIZE = 2
+SIDECAR_VERSION = 1
+
+_rows_cache: "OrderedDict[Tuple[str, int, int], List[list]]" = OrderedDict()
+_rows_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class WorkbookLayout:
+    """What the first rows of a sheet say about how to read it"""
+    header_row: int = 0
+    wide_front_rear: bool = False
+    width: int = 0
+
+    def as_dict(self):
+        return asdict(self)
+
+
+def _convert_cell(value):
+    # Same conversions pandas applies to openpyxl cells
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _read_rows(path: str) -> List[list]:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        ws.reset_dimensions()
+        rows = []
+        max_width = 0
+        for values in ws.iter_rows(values_only=True):
+            row = [_convert_cell(value) for value in values]
+            while row and row[-1] == "":
+                row.pop()
+            max_width = max(max_width, len(row))
+            rows.append(row)
+    finally:
+        wb.close()
+
+    # Drop trailing blank rows and pad to a rectangle
+    while rows and not rows[-1]:
+        rows.pop()
+    return [row + [""] * (max_width - len(row)) for row in rows]
+
+
+def cache_path(source: str, kind: str) -> str:
+    """Cache file for data derived from ``source``, named after its absolute path"""
+    directory = getattr(settings, 'WORKBOOK_CACHE_DIR', None) or os.path.join(settings.MEDIA_ROOT, 'cache')
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    digest = hashlib.sha256(os.path.abspath(source).encode('utf-8')).hexdigest()
+    return os.path.join(directory, f"{digest}.{kind}.pkl")
+
+
+def _sidecar_path(path: str) -> str:
+    return cache_path(path, "rows")
+
+
+def _load_sidecar(path: str, key) -> Optional[List[list]]:
+    try:
+        with open(_sidecar_path(path), "rb") as fh:
+            payload = pickle.load(fh)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(payload, dict) or payload.get("version") != SIDECAR_VERSION or payload.get("key") != key:
+        return None
+    return payload["rows"]
+
+
+def _store_sidecar(path: str, key, rows: List[list]) -> None:
+    try:
+        sidecar = _sidecar_path(path)
+    except OSError as e:
+        logger.warning(f"Could not create the workbook cache directory: {str(e)}")
+        return
+    tmp_path = f"{sidecar}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as fh:
+            pickle.dump({"version": SIDECAR_VERSION, "key": key, "rows": rows}, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, sidecar)
+    except OSError as e:
+        logger.warning(f"Could not write workbook sidecar for {path}: {str(e)}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def workbook_rows(path: str) -> List[list]:
+    """Raw cell rows of the active sheet, parsed at most once per file version"""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+    with _rows_lock:
+        rows = _rows_cache.get(key)
+        if rows is not None:
+            _rows_cache.move_to_end(key)
+            return rows
+
+    rows = _load_sidecar(path, key[1:])
+    if rows is None:
+        rows = _read_rows(path)
+        _store_sidecar(path, key[1:], rows)
+
+    with _rows_lock:
+        _rows_cache[key] = rows
+        while len(_rows_cache) > ROWS_CACHE_SIZE:
+            _rows_cache.popitem(last=False)
+    return rows
+
+
+def detect_layout(rows: List[list]) -> WorkbookLayout:
+    """Inspect the first rows of a sheet"""
+    sample = rows[:SAMPLE_ROWS]
+    non_blank = [row for row in sample if any(value != "" for value in row)]
+    width = max((len(row) for row in sample), default=0)
+
+    # Wide format: very many columns and FRONT/REAR labels in the first data row
+    if width > WIDE_MIN_COLUMNS and len(non_blank) > 1:
+        first_row = " ".join(str(value) for value in non_blank[1]).upper()
+        if "FRONT" in first_row and "REAR" in first_row:
+            return WorkbookLayout(header_row=WIDE_HEADER_ROW, wide_front_rear=True, width=width)
+
+    return WorkbookLayout(header_row=0, wide_front_rear=False, width=width)
+
+
+def frame_from_rows(rows: List[list], header_row: int = 0) -> pd.DataFrame:
+    """Typed DataFrame with pd.read_excel semantics for the given header row"""
+    from pandas.io.parsers import TextParser
+
+    data = rows[header_row:]
+    if not data:
+        return pd.DataFrame()
+    return TextParser(data, header=0, skip_blank_lines=True).read()
+
+
+def load_workbook_frame(path: str, header_row: Optional[int] = None) -> Tuple[pd.DataFrame, WorkbookLayout]:
+    """
+    Read a workbook once and return (frame, layout). ``header_row`` overrides
+    the detected header offset (0 reads it like a plain ``pd.read_excel``).
+    """
+    rows = workbook_rows(path)
+    layout = detect_layout(rows)
+    header = layout.header_row if header_row is None else header_row
+    return frame_from_rows(rows, header), layout
+
+
+def read_upload_frame(upload, path: Optional[str] = None, header_row: Optional[int] = 0) -> pd.DataFrame:
+    """
+    Read an upload (or a file derived from it) into a DataFrame. Workbooks go
+    through the single-read loader; delimited files use the preflight
+    delimiter and encoding.
+    """
+    path = path or upload.storage_url
+    is_workbook = path.lower().endswith((".xlsx", ".xlsm")) or (
+        path == upload.storage_url and upload.file_format == "xlsx"
+    )
+    if is_workbook:
+        return load_workbook_frame(path, header_row=header_row)[0]
+
+    report = upload.preflight_report or {}
+    return pd.read_csv(path, delimiter=report.get("delimiter", ","), encoding=report.get("encoding", "utf-8"))
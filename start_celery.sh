@@ -21,19 +21,26 @@ else
     exit 1
 fi
 
-# Start Celery worker with improved settings
-echo "🚀 Starting Celery worker..."
+# Start one Celery worker per queue group (see api/sdc/sdc/celery_queues.py)
+# so bulk and sync work cannot take the slots of interactive tasks
+echo "🚀 Starting Celery workers..."
 cd api/sdc
-/Users/parthkanpariya/Documents/ridefox/DraftyVillainousWatchdog/my_env/bin/python -m celery -A sdc worker \
-    --loglevel=info \
-    --concurrency=2 \
-    --prefetch-multiplier=1 \
-    --max-tasks-per-child=50 \
-    --without-gossip \
-    --without-mingle \
-    --without-heartbeat \
-    --pool=prefork \
-    --queues=default &
+start_worker() {
+    /Users/parthkanpariya/Documents/ridefox/DraftyVillainousWatchdog/my_env/bin/python -m celery -A sdc worker \
+        --loglevel=info \
+        --concurrency=$2 \
+        --prefetch-multiplier=1 \
+        --max-tasks-per-child=50 \
+        --without-gossip \
+        --without-mingle \
+        --without-heartbeat \
+        --pool=prefork \
+        --hostname=$3@%h \
+        --queues=$1 &
+}
+start_worker interactive 2 interactive
+start_worker bulk 2 bulk
+start_worker sync,maintenance 1 sync
 
 # Wait a moment for worker to start
 sleep 3
@@ -57,7 +64,7 @@ except Exception as e:
 echo ""
 echo "✅ Celery services started!"
 echo "📊 Redis: localhost:6379"
-echo "👷 Celery Worker: Running with improved settings"
+echo "👷 Celery Workers: interactive, bulk, sync/maintenance"
 echo ""
 echo "To stop services:"
 echo "  pkill -f 'celery.*sdc'"